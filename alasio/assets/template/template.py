@@ -107,9 +107,8 @@ def __init__(
 
         # A match function that receives image and returns MatchResult
         # function will be patched onto match(), default to Template.match_template_luma_color
-        if match is None:
-            self.match = self.DEFAULT_MATCH
-        else:
+        # Default one is not set on instance, so calls go through Template.match(), which profilers can wrap
+        if match is not None:
             self.match = match
 
         # Template matching similarity, 0 to 1, bigger for more similar
@@ -3,6 +3,8 @@ def on_msgbus_global_event(topic):
     A decorator that mark method as msgbus event handler.
     Method will be called when event with the same topic appears.
     Note that method must be async, because msgbus is async.
+    Method can send events itself, or return ResponseEvent or list[ResponseEvent],
+    returned events are encoded once and broadcast to all connections without blocking.
 
     Examples:
         class ConfigScan(BaseTopic):
@@ -23,6 +25,8 @@ def on_msgbus_config_event(topic):
     A decorator that mark method as config-specific event handler.
     Method will be called when event with the same topic appears.
     Note that method must be async, because msgbus is async.
+    Method can send events itself, or return ResponseEvent or list[ResponseEvent],
+    returned events are encoded once and broadcast to all connections without blocking.
 
     Examples:
         class ConfigScan(BaseTopic):
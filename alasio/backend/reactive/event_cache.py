@@ -9,13 +9,13 @@
 from alasio.backend.reactive.event import ResponseEvent
 from alasio.backend.worker.event import ConfigEvent
 from alasio.backend.ws.ws_topic import BaseTopic
-from alasio.ext.deep import deep_iter_patch, deep_set
+from alasio.ext.deep import deep_patch, deep_set
 from alasio.ext.singleton import Singleton, SingletonNamed
 from alasio.logger import logger
 
 
 def deep_iter_event(topic, before, after):
-    for op, keys, value in deep_iter_patch(before, after):
+    for op, keys, value in deep_patch(before, after):
         yield ResponseEvent(t=topic, o=op, k=keys, v=value)
 
 
@@ -12,6 +12,11 @@
 
 
 class BackendWorkerManager(WorkerManager):
+    # backend may run many workers, receive all pipes with a few threads
+    RECV_MODE = 'hybrid'
+    # fork workers from pre-imported zygote, so restarting many configs is fast
+    START_METHOD = 'zygote'
+
     def worker_start(self, mod: Mod, config: str) -> "tuple[bool, str]":
         project_root = env.PROJECT_ROOT
         mod_root = mod.root
@@ -87,8 +87,9 @@ async def on_config_event(self, event: "ConfigSetEvent | list[ConfigSetEvent] |
             # collect response
             resps.append(ResponseEvent(t=self.topic_name(), o='set', k=topic_key, v=e.value))
 
+        # return responses, so msgbus can encode once and broadcast to all connections
         if resps:
             if len(resps) == 1:
-                await self.server.send(resps[0])
+                return resps[0]
             else:
-                await self.server.send(resps)
+                return resps
@@ -27,6 +27,11 @@ async def getdata(self):
 
 
 class HistoryCache(ResourceCacheTTL):
+    # mods without history.pack are asked on every ModHistory request, remember the error for a while
+    ERROR_TTL = 10.
+    # history.pack is replaced when mod updates
+    REFRESH_AHEAD = True
+
     def load_resource(self, file):
         """
         Load the packed release history of a mod
@@ -40,6 +45,8 @@ def load_resource(self, file):
         return decode_history(atomic_read_bytes(file))
 
 
+# one history per mod, and ModHistory reads all of them on every request,
+# so no eviction policy, idle histories are released by TTL gc
 HISTORY_CACHE = HistoryCache()
 
 
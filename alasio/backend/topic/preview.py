@@ -25,6 +25,8 @@ class PreviewTask(BackgroundTask, metaclass=SingletonNamed):
     ## 消息通信
     后端发送 CommandEvent(c='preview') 给 worker 请求预览图片，worker 在每次截图之后检查后端是否请求图片，
     如果是 则发送预览图片，WorkerManager 收到预览图片后转发给 on_preview()
+    预览图片写在每个 worker 独立的共享内存 PreviewRing 里，管道只传输 (slot, timestamp, size) 通知，
+    on_preview() 直接从共享内存读取，避免大体积的图片阻塞同一管道上的日志。
     多次发送预览请求不会收到多张图片，因为 worker 只是在有新截图的时候发送那一张新截图。
 
     ## 前端调用
@@ -66,6 +68,11 @@ class PreviewTask(BackgroundTask, metaclass=SingletonNamed):
     on_preview() 根据每个订阅者要求的速度和上一次发送时间进行转发。
     如果请求 worker 的速度是 realtime，那么在收到截图的时候再次请求截图，形成快速无限请求。
 
+    ## 重复帧与画质
+    预览请求会带上 (订阅者数量, worker速度, 是否强制)，worker 据此选择预览图的分辨率和画质，订阅者越多画质越低。
+    worker 会跳过与上一张已发送预览几乎相同的截图，并保留预览请求直到画面变化，因此画面不动时不会占用带宽。
+    新增订阅、订阅者变快、worker重新开始运行时，请求会标记为强制，worker 即使画面没变也会发送一张。
+
     ## 停止订阅
     前端调用RPC方法preview_stop() 或者取消订阅Preview，调用 PreviewTask.unsubscribe()
     如果没有订阅者了，停止task循环
@@ -87,6 +94,8 @@ def __init__(self, config_name):
         # preview speed of worker
         self._speed: PREVIEW_SPEED = 'normal'
         self._trigger_on_running = False
+        # request worker to send preview even if screen didn't change
+        self._force_next = False
 
         # cache
         self._preview = None
@@ -112,8 +121,10 @@ def subscribe(self, topic: BaseTopic, speed: PREVIEW_SPEED):
         # clear lastsend
         # - current subscriber will receive the next preview
         # - rest of subscribers will also receive next preview for sync
+        # worker skips duplicated frames, so force it to send one for the new subscriber
         if not speed_decrease:
             self._normal_lastsend = -10000
+            self._force_next = True
         # worker idle, skip trigger and record as _trigger_on_running
         worker = self._manager.state.get(self.config_name)
         if worker is None or worker.state not in PREVIEW_AVAILABLE:
@@ -134,6 +145,7 @@ def unsubscribe(self, topic: BaseTopic):
         if not self._subscribers:
             self._normal_lastsend = -10000
             self._trigger_on_running = False
+            self._force_next = False
             self.task_stop()
 
     async def task_run(self):
@@ -149,7 +161,10 @@ async def task_run(self):
             self._trigger_on_running = True
             return
         # send command
-        command = CommandEvent(c='preview')
+        # worker chooses preview resolution and quality by number of subscribers and speed
+        force = self._force_next
+        self._force_next = False
+        command = CommandEvent(c='preview', v=(len(self._subscribers), self._speed, force))
         worker.send_command(command)
 
     def on_worker_state(self, state: WORKER_STATE):
@@ -167,6 +182,7 @@ def on_worker_state(self, state: WORKER_STATE):
             if self._trigger_on_running:
                 # set False first, task_trigger may re-enable _trigger_on_running
                 self._trigger_on_running = False
+                self._force_next = True
                 self.task_trigger(self._nursery)
         else:
             if state in PREVIEW_IDLE and self._preview:
@@ -188,13 +204,23 @@ def on_preview(self, preview):
         Callback function when worker sends a preview
 
         Args:
-            preview (bytes):
+            preview (bytes | list[int]):
                 b'Preview_' + big-endian millisecond timestamp + JPG image in bytes
+                or (slot, timestamp, size) to read preview from worker's shared memory PreviewRing
         """
         _subscribers = self._subscribers
         _normal_lastsend = self._normal_lastsend
         _speed = self._speed
 
+        if not isinstance(preview, bytes):
+            worker = self._manager.state.get(self.config_name)
+            preview = worker.preview_read(preview) if worker is not None else None
+            if preview is None:
+                # frame overwritten or worker disconnected, request another one to keep realtime loop going
+                if _subscribers and _speed == 'realtime':
+                    self.task_trigger(self._nursery)
+                return
+
         # broadcast
         now = current_time()
         normal_outdated = (now - _normal_lastsend) >= self.recurrence
@@ -44,7 +44,7 @@ async def on_worker_state(self, value):
             event = ResponseEvent(t='Worker', o='del', k=(config,))
         else:
             event = ResponseEvent(t='Worker', o='set', k=(config,), v=state)
-        await self.server.send(event)
+        return event
 
     @rpc
     async def start(self, config: str):
@@ -87,7 +87,22 @@ def worker_test_send_events():
         backend.test_wait.wait(timeout=0.05)
 
 
-def mod_entry(mod_name, config_name, child_conn, project_root='', mod_root='', path_main=''):
+def worker_test_preview():
+    # A worker that sends previews through shared memory
+    backend = BackendBridge()
+    for n in range(1, 4):
+        data = b''.join((b'Preview_', n.to_bytes(8, 'big'), bytes([n]) * 1000))
+        backend.send_preview(data)
+        backend.test_wait.wait(timeout=0.05)
+    # too large for a slot, goes through pipe
+    data = b''.join((b'Preview_', (4).to_bytes(8, 'big'), bytes(1024 * 1024)))
+    backend.send_preview(data)
+    backend.send_preview(b''.join((b'PreviewS', (5).to_bytes(8, 'big'))))
+    while not backend.scheduler_stopping.wait(0.05):
+        backend.test_wait.wait(timeout=0.05)
+
+
+def mod_entry(mod_name, config_name, child_conn, project_root='', mod_root='', path_main='', preview_shm=''):
     """
     Run mod scheduler infinitely
 
@@ -98,8 +113,9 @@ def mod_entry(mod_name, config_name, child_conn, project_root='', mod_root='', p
         project_root:
         mod_root:
         path_main:
+        preview_shm: Name of shared memory PreviewRing, or empty string to send previews through pipe
     """
-    BackendBridge().init(mod_name, config_name, child_conn)
+    BackendBridge().init(mod_name, config_name, child_conn, preview_shm=preview_shm)
 
     if mod_name == 'WorkerTestInfinite':
         worker_test_infinite()
@@ -116,6 +132,9 @@ def mod_entry(mod_name, config_name, child_conn, project_root='', mod_root='', p
     if mod_name == 'WorkerTestSendEvents':
         worker_test_send_events()
         return
+    if mod_name == 'WorkerTestPreview':
+        worker_test_preview()
+        return
 
     # if project_root, mod_root, path_main all provided, consider as real mod
     if project_root and mod_root and path_main:
@@ -181,12 +200,18 @@ def __init__(self):
         self.mod_name = ''
         self.config_name = ''
         self.conn = None
+        self.preview_ring = None
 
         self.main_tid = 0
         self._recv_thread: "Thread | None" = None
         self._send_thread: "Thread | None" = None
         self.scheduler_stopping = Event()
         self.preview_requested = PreemptiveEvent()
+        # Set if backend requests a preview even if screen didn't change, e.g. new subscriber
+        self.preview_force = PreemptiveEvent()
+        # Number of preview subscribers and the fastest speed of them, reported by backend PreviewTask
+        self.preview_subscribers = 1
+        self.preview_speed = 'normal'
         # For test control
         self.test_wait = Event()
 
@@ -204,7 +229,7 @@ def __init__(self):
         self._work_ready = Lock()
         self._work_ready.acquire()  # 初始锁定，让 Worker 待命
 
-    def init(self, mod_name, config_name, child_conn):
+    def init(self, mod_name, config_name, child_conn, preview_shm=''):
         """
         initialize BackendBridge in main thread
         """
@@ -212,6 +237,14 @@ def init(self, mod_name, config_name, child_conn):
         self.config_name = config_name
         self.conn = child_conn
         self.main_tid = get_ident()
+        if preview_shm:
+            from alasio.backend.worker.shm import PreviewRing
+            try:
+                self.preview_ring = PreviewRing.attach(preview_shm)
+            except Exception as e:
+                # fallback to send previews through pipe
+                from alasio.logger import logger
+                logger.warning(f'[BackendBridge] Failed to attach preview shared memory: {e}')
 
         self._send_thread = Thread(target=self._send_loop, daemon=True, name='BackendBridgeSender')
         self._send_thread.start()
@@ -354,10 +387,25 @@ def _send_loop(self):
                 except RuntimeError:
                     pass
 
+    def _set_preview_request(self, value):
+        """
+        Args:
+            value: (subscribers, speed, force) from PreviewTask, or None from older backend
+        """
+        try:
+            subscribers, speed, force = value
+        except (TypeError, ValueError):
+            return
+        self.preview_subscribers = subscribers
+        self.preview_speed = speed
+        if force:
+            self.preview_force.set()
+
     def _handle_backend_command(self, data: bytes):
         event = self._decoder.decode(data)
         command = event.c
         if command == 'preview':
+            self._set_preview_request(event.v)
             self.preview_requested.set()
             return
         if command == 'scheduler-stopping':
@@ -427,6 +475,11 @@ def close(self):
         # Set closing flag to stop threads from logging errors
         self.running = False
 
+        ring = self.preview_ring
+        self.preview_ring = None
+        if ring is not None:
+            ring.close()
+
         # Close and NULLIFY connection to unblock recv_bytes() call
         conn = self.conn
         self.conn = None
@@ -451,6 +504,23 @@ def close(self):
 
         self.inited = False
 
+    def send_preview(self, data: bytes) -> Lock:
+        """
+        Send preview data, see image_preview() and image_preview_stop() for data format.
+
+        If backend provides a shared memory PreviewRing, frame goes through shared memory
+        and only a (slot, timestamp, size) notification goes through pipe,
+        so large previews won't delay logs.
+        """
+        ring = self.preview_ring
+        if ring is not None and data[:8] == b'Preview_':
+            timestamp = int.from_bytes(data[8:16], 'big')
+            notify = ring.write(data, timestamp)
+            if notify is not None:
+                return self.send(ConfigEvent(t='Preview', v=notify))
+        # stop signal, or frame too large for a slot
+        return self.send(ConfigEvent(t='Preview', v=data))
+
     def send_log(self, value):
         return self.send(ConfigEvent(t='Log', v=value))
 
@@ -2,13 +2,16 @@
 import threading
 import time
 from multiprocessing.connection import Connection
-from typing import Literal, Optional
+from typing import Literal, Optional, Union
 
 import msgspec
 from msgspec.msgpack import encode
 
 from alasio.backend.worker.bridge import mod_entry
 from alasio.backend.worker.event import CommandEvent, ConfigEvent, DECODER_CACHE
+from alasio.backend.worker.receiver import WorkerReceiver, WorkerRecvStats
+from alasio.backend.worker.shm import PreviewRing
+from alasio.backend.worker.zygote import Zygote, ZygoteProcess, zygote_available
 from alasio.ext.singleton import Singleton
 from alasio.logger import logger
 
@@ -43,15 +46,28 @@ class WorkerState(msgspec.Struct):
     state: WORKER_STATE
     update: float = 0.
 
-    process: Optional[multiprocessing.Process] = None
+    process: Optional[Union[multiprocessing.Process, ZygoteProcess]] = None
     conn: Optional[Connection] = None
     running_event: threading.Event = msgspec.field(default_factory=threading.Event)
     stopped_event: threading.Event = msgspec.field(default_factory=threading.Event)
     recv_thread: Optional[threading.Thread] = None
+    recv_stats: WorkerRecvStats = msgspec.field(default_factory=WorkerRecvStats)
+    preview_ring: Optional[PreviewRing] = None
+
+    # startup instrumentation
+    # "spawn" or "zygote"
+    start_method: str = ''
+    # timestamp when worker_start() is called
+    start_time: float = 0.
+    # seconds from worker_start() to worker reporting "running"
+    startup_latency: float = 0.
 
     def set_state(self, state: WORKER_STATE):
+        now = time.time()
+        if self.state == 'starting' and state in WORKER_RUNNING_STATE and self.start_time > 0:
+            self.startup_latency = now - self.start_time
         self.state = state
-        self.update = time.time()
+        self.update = now
         if state in WORKER_RUNNING_STATE:
             self.running_event.set()
             self.stopped_event.clear()
@@ -102,6 +118,34 @@ def conn_close(self):
         except Exception:
             pass
 
+    def preview_read(self, notify) -> "bytes | None":
+        """
+        Read preview frame from shared memory
+
+        Args:
+            notify: (slot, timestamp, size) from worker
+
+        Returns:
+            Preview data, or None if frame is overwritten or ring closed
+        """
+        ring = self.preview_ring
+        if ring is None:
+            return None
+        try:
+            slot, timestamp, size = notify
+        except (TypeError, ValueError):
+            return None
+        return ring.read(slot, timestamp, size)
+
+    def preview_close(self):
+        """
+        Close and unlink preview shared memory
+        """
+        ring = self.preview_ring
+        self.preview_ring = None
+        if ring is not None:
+            ring.close()
+
     def process_join(self, timeout):
         process = self.process
         if process and process.is_alive():
@@ -165,6 +209,18 @@ def process_graceful_kill(self, terminate_timeout=1, kill_timeout=1):
 
 
 class WorkerManager(metaclass=Singleton):
+    # How to receive messages from worker pipes
+    # "thread": one recv thread per worker, see _worker_recv_loop()
+    # "hybrid": one selector thread for idle pipes and a few drain threads for hot pipes, see WorkerReceiver
+    RECV_MODE: Literal['thread', 'hybrid'] = 'thread'
+    # number of drain threads in hybrid mode
+    RECV_DRAIN_THREADS = 4
+    # How to start worker processes
+    # "spawn": start a fresh process, which re-imports everything
+    # "zygote": fork from a pre-imported zygote process of the mod, see Zygote.
+    #   Fallback to spawn if fork is unsafe on current platform or zygote failed.
+    START_METHOD: Literal['spawn', 'zygote'] = 'spawn'
+
     def __init__(self):
         self._lock = threading.Lock()
 
@@ -173,6 +229,76 @@ def __init__(self):
         self.state: "dict[str, WorkerState]" = {}
 
         self._ctx = multiprocessing.get_context('spawn')
+        self._receiver: "WorkerReceiver | None" = None
+        # key: (mod, project_root, mod_root, path_main)
+        self._zygotes: "dict[tuple, Zygote]" = {}
+        self._zygote_lock = threading.Lock()
+        # lock of each zygote key, so a slow preload only blocks workers of the same mod
+        self._zygote_start_lock: "dict[tuple, threading.Lock]" = {}
+
+    @property
+    def receiver(self) -> WorkerReceiver:
+        receiver = self._receiver
+        if receiver is None:
+            receiver = WorkerReceiver(
+                handle=self._handle_config_event_safe,
+                disconnect=self._handle_disconnect,
+                pool_size=self.RECV_DRAIN_THREADS,
+            )
+            self._receiver = receiver
+        return receiver
+
+    def zygote_get(self, mod: str, project_root='', mod_root='', path_main='') -> Zygote:
+        """
+        Get or start zygote of a mod.
+        Call this ahead of time to pre-warm, so the first worker_start() is also fast.
+
+        Raises:
+            Exception: If failed to start zygote
+        """
+        key = (mod, project_root, mod_root, path_main)
+        with self._zygote_lock:
+            zygote = self._zygotes.get(key)
+            if zygote is not None and zygote.is_alive():
+                return zygote
+            start_lock = self._zygote_start_lock.setdefault(key, threading.Lock())
+
+        # start zygote outside of _zygote_lock, preload may take seconds
+        with start_lock:
+            with self._zygote_lock:
+                zygote = self._zygotes.get(key)
+                if zygote is not None:
+                    if zygote.is_alive():
+                        # started by another thread while we were waiting
+                        return zygote
+                    self._zygotes.pop(key, None)
+            if zygote is not None:
+                zygote.close()
+            zygote = Zygote(self._ctx, name=mod, project_root=project_root, mod_root=mod_root, path_main=path_main)
+            zygote.start()
+            logger.info(f'[WorkerManager] Zygote started: {mod}, preload={round(zygote.preload_time, 3)}s')
+            with self._zygote_lock:
+                self._zygotes[key] = zygote
+            return zygote
+
+    def zygote_close(self, mod: "str | None" = None):
+        """
+        Stop zygotes of a mod, or all zygotes if mod is None.
+        Call this after mod updated, so new workers won't fork from outdated modules.
+        Running workers are not affected.
+        """
+        with self._zygote_lock:
+            zygotes = [self._zygotes.pop(key) for key in list(self._zygotes) if mod is None or key[0] == mod]
+        for zygote in zygotes:
+            zygote.close()
+
+    def _recv_remove(self, state: WorkerState):
+        """
+        Stop receiving from worker in hybrid mode, call this before closing pipe
+        """
+        receiver = self._receiver
+        if receiver is not None:
+            receiver.remove(state)
 
     def get_state_info(self):
         """
@@ -204,6 +330,7 @@ def _handle_disconnect(self, state: WorkerState):
             state.process_graceful_kill()
 
         # Close connection to unblock recv thread
+        self._recv_remove(state)
         state.conn_close()
 
         # Join recv thread if it is not the current thread
@@ -219,6 +346,7 @@ def _handle_disconnect(self, state: WorkerState):
             state.conn = None
             state.process = None
             state.recv_thread = None
+            state.preview_close()
             if exitcode == 0:
                 self._set_state(state, 'idle')
             else:
@@ -270,6 +398,13 @@ def _handle_config_event(self, data: bytes, worker: WorkerState):
         # broadcast
         self.on_config_event(event)
 
+    def _handle_config_event_safe(self, data: bytes, worker: WorkerState):
+        try:
+            self._handle_config_event(data, worker)
+        except Exception as e:
+            logger.warning(f'[WorkerManager] Failed to handle config event '
+                           f'from "{worker.config}": {e}')
+
     def on_worker_state(self, config: str, state: WORKER_STATE):
         """
         Callback when worker state changed
@@ -298,6 +433,9 @@ def _worker_recv_loop(self, state: WorkerState):
         多线程recv_bytes() 的问题是同时接收多个pipe的时候会有频繁GIL切换导致性能远不如 wait(list_pipe)
         但因为log是稀疏产生的，每个worker的高频时段通常不会集中，所以在我们的运行情景下
         使用 多线程recv_bytes() 的性能就是单线程 recv_bytes()
+
+        但worker数量很多的时候（比如50个以上），每个worker一个线程的内存和GIL竞争开销就不可忽视了，
+        此时可以使用 RECV_MODE="hybrid"，空闲的pipe由一个线程 wait(list_pipe)，有消息的pipe交给少量线程 recv_bytes()
         """
         conn = state.conn
         config = state.config
@@ -340,6 +478,8 @@ def worker_start(self, mod: str, config: str, project_root='', mod_root='', path
             if state.state not in ['idle', 'error']:
                 return False, f'Worker is already running: "{config}", state="{state.state}"'
             # mark immediately
+            state.start_time = time.time()
+            state.startup_latency = 0.
             self._set_state(state, 'starting')
 
         self.on_worker_info(config, f'[WorkerManager] Starting worker: {config}')
@@ -351,21 +491,50 @@ def worker_start(self, mod: str, config: str, project_root='', mod_root='', path
         else:
             # otherwise just testing
             args = (mod, config, child_conn)
-        process = self._ctx.Process(
-            target=mod_entry,
-            args=args,
-            name=f"Worker-{mod}-{config}",
-            daemon=True
-        )
-        process.start()
+        # previews go through shared memory, pipe is kept for logs and small events
+        # create before process start, so shared memory is tracked by the same resource tracker
+        kwargs = {}
+        try:
+            ring = PreviewRing.create()
+        except Exception as e:
+            logger.warning(f'[WorkerManager] Failed to create preview shared memory for "{config}": {e}')
+            ring = None
+        else:
+            kwargs['preview_shm'] = ring.name
+        name = f"Worker-{mod}-{config}"
+        process = None
+        if self.START_METHOD == 'zygote' and zygote_available():
+            try:
+                zygote = self.zygote_get(mod, project_root=project_root, mod_root=mod_root, path_main=path_main)
+                process = zygote.fork(args, kwargs, name)
+                state.start_method = 'zygote'
+            except Exception as e:
+                logger.warning(f'[WorkerManager] Failed to fork worker "{config}" from zygote, fallback to spawn: {e}')
+                process = None
+        if process is None:
+            process = self._ctx.Process(
+                target=mod_entry,
+                args=args,
+                kwargs=kwargs,
+                name=name,
+                daemon=True
+            )
+            process.start()
+            state.start_method = 'spawn'
         # close child_conn of the parent side immediately
         child_conn.close()
 
         with self._lock:
             state.process = process
             state.conn = parent_conn
+            state.preview_ring = ring
             # status will become "running" when worker process initialize BackendBridge
 
+            if self.RECV_MODE == 'hybrid':
+                state.recv_stats = WorkerRecvStats()
+                self.receiver.add(state)
+                return True, 'Success'
+
             # start recv thread
             thread = threading.Thread(
                 target=self._worker_recv_loop,
@@ -512,6 +681,7 @@ def worker_force_kill(self, config: str) -> "tuple[bool, str]":
             self._set_state(state, 'force-killing')
 
         # cleanup
+        self._recv_remove(state)
         state.process_graceful_kill()
         state.conn_close()
         if state.recv_thread and state.recv_thread.is_alive():
@@ -521,6 +691,7 @@ def worker_force_kill(self, config: str) -> "tuple[bool, str]":
             state.process = None
             state.conn = None
             state.recv_thread = None
+            state.preview_close()
             self._set_state(state, 'idle')
 
         return True, 'Success'
@@ -553,6 +724,7 @@ def close(self):
 
             # Close connections
             for state in states:
+                self._recv_remove(state)
                 state.conn_close()
 
             # Wait for threads
@@ -564,9 +736,14 @@ def close(self):
                 for state in states:
                     state.process = None
                     state.recv_thread = None
+                    state.preview_close()
                     self._set_state(state, 'idle')
             # maybe new worker started while we are killing existing workers
 
+        receiver = self._receiver
+        if receiver is not None:
+            receiver.close()
+        self.zygote_close()
         logger.info('[WorkerManager] All closed')
 
 
@@ -0,0 +1,263 @@
+import threading
+import time
+from multiprocessing import Pipe
+from multiprocessing.connection import wait
+from queue import SimpleQueue
+from typing import Callable
+
+import msgspec
+
+from alasio.logger import logger
+
+
+class WorkerRecvStats(msgspec.Struct):
+    """
+    Receiving metrics of one worker pipe
+    """
+    # total messages and bytes received
+    messages: int = 0
+    bytes: int = 0
+    # times the pipe became hot and was handed to a drain thread
+    drains: int = 0
+    # most messages received in one drain
+    max_batch: int = 0
+    # times the pipe was put back to drain queue because other pipes were waiting
+    requeues: int = 0
+    # total and max seconds the hot pipe waited in drain queue, i.e. backlog before any message being read
+    queue_wait: float = 0.
+    max_queue_wait: float = 0.
+
+    def on_queue_wait(self, wait_time: float):
+        self.drains += 1
+        self.queue_wait += wait_time
+        if wait_time > self.max_queue_wait:
+            self.max_queue_wait = wait_time
+
+
+# drain results
+DRAIN_IDLE = 0
+DRAIN_REQUEUE = 1
+DRAIN_DISCONNECT = 2
+
+
+class WorkerReceiver:
+    """
+    Receive messages from all worker pipes with a few threads.
+
+    One selector thread waits on all idle pipes with multiprocessing.connection.wait().
+    Once a pipe has data, it becomes hot and is handed to a small pool of drain threads,
+    drain thread reads it with conn.recv_bytes() in a loop, which is much faster than wait() on bursty logs.
+    If no message comes within HOT_TIMEOUT, pipe cools down and goes back to selector.
+    If a pipe keeps hot for DRAIN_BATCH messages and other hot pipes are waiting,
+    it's put back to the end of drain queue, so a chatty worker can't starve others.
+
+    Workers are objects having `conn`, `config` and `recv_stats` attributes, usually WorkerState.
+    """
+    # drain thread keeps reading a pipe if next message comes within this time
+    HOT_TIMEOUT = 0.005
+    # messages to read before yielding to other hot pipes
+    DRAIN_BATCH = 256
+    # selector wakes up periodically to drop closed pipes
+    SELECT_TIMEOUT = 1.
+
+    def __init__(
+            self,
+            handle: "Callable[[bytes, object], None]",
+            disconnect: "Callable[[object], None]",
+            pool_size: int = 4,
+    ):
+        """
+        Args:
+            handle: Callback on each message, handle(data, worker)
+            disconnect: Callback when pipe broken, disconnect(worker)
+            pool_size: Number of drain threads
+        """
+        self.handle = handle
+        self.disconnect = disconnect
+        self.pool_size = pool_size
+
+        self._lock = threading.Lock()
+        # all registered workers, key: id(worker), because WorkerState is unhashable, value: registered conn
+        # worker may be removed and added again with a new conn, so queued items are checked against it
+        self._workers: "dict[int, object]" = {}
+        # workers waiting in selector, key: conn, value: worker
+        self._idle: "dict[object, object]" = {}
+        # hot workers waiting for drain thread, (worker, conn, queued_time), or None to exit
+        self._queue = SimpleQueue()
+
+        self._wake_r, self._wake_w = Pipe(duplex=False)
+        self._select_thread: "threading.Thread | None" = None
+        self._drain_threads: "list[threading.Thread]" = []
+        self.running = False
+
+    def _ensure_threads(self):
+        """
+        Start threads lazily, lock required
+        """
+        if self.running:
+            return
+        self.running = True
+        if self._wake_r.closed:
+            # restart after close()
+            self._wake_r, self._wake_w = Pipe(duplex=False)
+        self._select_thread = threading.Thread(
+            target=self._select_loop, name='WorkerRecvSelector', daemon=True)
+        self._select_thread.start()
+        for index in range(self.pool_size):
+            thread = threading.Thread(
+                target=self._drain_loop, name=f'WorkerRecvDrain-{index}', daemon=True)
+            thread.start()
+            self._drain_threads.append(thread)
+
+    def _wake(self):
+        try:
+            self._wake_w.send_bytes(b'')
+        except (OSError, ValueError):
+            pass
+
+    def add(self, worker):
+        """
+        Start receiving messages from worker.conn
+        """
+        conn = worker.conn
+        with self._lock:
+            self._ensure_threads()
+            self._workers[id(worker)] = conn
+            self._idle[conn] = worker
+        self._wake()
+
+    def remove(self, worker):
+        """
+        Stop receiving messages from worker.
+        Call this before closing worker.conn, disconnect callback won't be called after remove.
+        """
+        with self._lock:
+            self._workers.pop(id(worker), None)
+            for conn, w in list(self._idle.items()):
+                if w is worker:
+                    del self._idle[conn]
+        self._wake()
+
+    def is_registered(self, worker) -> bool:
+        return id(worker) in self._workers
+
+    def _select_loop(self):
+        wake_r = self._wake_r
+        while self.running:
+            with self._lock:
+                idle = {conn: worker for conn, worker in self._idle.items() if not conn.closed}
+            try:
+                ready = wait([wake_r, *idle], timeout=self.SELECT_TIMEOUT)
+            except (OSError, ValueError):
+                # a pipe closed while waiting, rebuild the list
+                continue
+            now = time.perf_counter()
+            for conn in ready:
+                if conn is wake_r:
+                    try:
+                        while wake_r.poll():
+                            wake_r.recv_bytes()
+                    except (EOFError, OSError):
+                        return
+                    continue
+                with self._lock:
+                    worker = self._idle.pop(conn, None)
+                if worker is None:
+                    # removed while waiting
+                    continue
+                self._queue.put((worker, conn, now))
+
+    def _drain(self, worker, conn) -> int:
+        """
+        Read a hot pipe until it cools down
+        """
+        if not conn:
+            return DRAIN_DISCONNECT
+        stats = worker.recv_stats
+        handle = self.handle
+        queue = self._queue
+        hot_timeout = self.HOT_TIMEOUT
+        batch = self.DRAIN_BATCH
+        n = 0
+        try:
+            while True:
+                data = conn.recv_bytes()
+                n += 1
+                stats.messages += 1
+                stats.bytes += len(data)
+                try:
+                    handle(data, worker)
+                except Exception as e:
+                    logger.warning(f'[WorkerReceiver] Failed to handle message from "{worker.config}": {e}')
+                if n >= batch and not queue.empty():
+                    stats.requeues += 1
+                    return DRAIN_REQUEUE
+                if not conn.poll(hot_timeout):
+                    return DRAIN_IDLE
+        except (EOFError, OSError, TypeError):
+            # TypeError if conn closed by another thread while polling
+            return DRAIN_DISCONNECT
+        finally:
+            if n > stats.max_batch:
+                stats.max_batch = n
+
+    def _drain_loop(self):
+        queue = self._queue
+        while True:
+            item = queue.get()
+            if item is None:
+                return
+            worker, conn, queued = item
+            if self._workers.get(id(worker)) is not conn:
+                # stale item of a removed worker, or of the old pipe of a restarted worker
+                continue
+            worker.recv_stats.on_queue_wait(time.perf_counter() - queued)
+            try:
+                result = self._drain(worker, conn)
+            except Exception as e:
+                logger.error(f'[WorkerReceiver] Drain error "{worker.config}": {e}')
+                result = DRAIN_DISCONNECT
+
+            if result == DRAIN_IDLE:
+                with self._lock:
+                    if self._workers.get(id(worker)) is conn:
+                        self._idle[conn] = worker
+                self._wake()
+            elif result == DRAIN_REQUEUE:
+                queue.put((worker, conn, time.perf_counter()))
+            else:
+                with self._lock:
+                    registered = self._workers.get(id(worker)) is conn
+                    if registered:
+                        del self._workers[id(worker)]
+                # worker removed by manager means manager is handling its shutdown
+                if registered:
+                    try:
+                        self.disconnect(worker)
+                    except Exception as e:
+                        logger.error(f'[WorkerReceiver] Disconnect error "{worker.config}": {e}')
+
+    def close(self, timeout=1.):
+        """
+        Stop all threads, registered pipes are not closed
+        """
+        with self._lock:
+            running = self.running
+            self.running = False
+            self._workers.clear()
+            self._idle.clear()
+        if running:
+            self._wake()
+            for _ in self._drain_threads:
+                self._queue.put(None)
+            for thread in [self._select_thread, *self._drain_threads]:
+                if thread is not None and thread is not threading.current_thread():
+                    thread.join(timeout=timeout)
+            self._select_thread = None
+            self._drain_threads = []
+        # wake pipe is re-created if receiver is started again
+        for conn in [self._wake_r, self._wake_w]:
+            try:
+                conn.close()
+            except OSError:
+                pass
@@ -0,0 +1,128 @@
+from multiprocessing.shared_memory import SharedMemory
+from threading import Lock
+
+# 4 slots, so backend has 3 frames of time to read a notified frame before it's overwritten
+PREVIEW_SLOTS = 4
+# 1280x720 preview in JPEG is about 30~80KB, 2560x1440 is about 150~300KB
+PREVIEW_SLOT_SIZE = 512 * 1024
+# slot header: 8 bytes millisecond timestamp + 4 bytes data size + 4 bytes padding
+PREVIEW_SLOT_HEADER = 16
+
+
+class PreviewRing:
+    """
+    A ring buffer of preview frames on shared memory, so large preview frames never go through the pipe.
+
+    Backend creates the ring and owns its lifecycle, worker attaches to it by name.
+    Worker writes a frame into next slot and sends a small (slot, timestamp, size) notification over the pipe,
+    backend reads frame from the notified slot.
+
+    Each slot is:
+        8 bytes big-endian millisecond timestamp, 0 means slot is being written
+        + 4 bytes big-endian data size
+        + 4 bytes padding
+        + data
+    Reader checks timestamp before and after copying data, if it's changed, frame is overwritten by a newer one.
+    """
+
+    def __init__(self, shm: SharedMemory, owner=False, slots=PREVIEW_SLOTS, slot_size=PREVIEW_SLOT_SIZE):
+        self.shm = shm
+        self.owner = owner
+        self.slots = slots
+        self.slot_size = slot_size
+        # next slot to write, worker side only
+        self._next = 0
+        self._lock = Lock()
+
+    @classmethod
+    def create(cls, slots=PREVIEW_SLOTS, slot_size=PREVIEW_SLOT_SIZE) -> "PreviewRing":
+        """
+        Create a new ring on backend side
+        """
+        size = slots * (PREVIEW_SLOT_HEADER + slot_size)
+        shm = SharedMemory(create=True, size=size)
+        # shared memory on windows is not guaranteed to be zero-filled
+        shm.buf[:size] = bytes(size)
+        return cls(shm, owner=True, slots=slots, slot_size=slot_size)
+
+    @classmethod
+    def attach(cls, name, slots=PREVIEW_SLOTS, slot_size=PREVIEW_SLOT_SIZE) -> "PreviewRing":
+        """
+        Attach to an existing ring on worker side
+        """
+        shm = SharedMemory(name=name)
+        return cls(shm, owner=False, slots=slots, slot_size=slot_size)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def _slot_offset(self, slot):
+        return slot * (PREVIEW_SLOT_HEADER + self.slot_size)
+
+    def write(self, data: bytes, timestamp: int) -> "tuple[int, int, int] | None":
+        """
+        Write a frame into next slot
+
+        Args:
+            data: Frame data
+            timestamp: Millisecond timestamp of frame, must be > 0
+
+        Returns:
+            (slot, timestamp, size) to notify backend, or None if data is too large for a slot
+        """
+        size = len(data)
+        if size > self.slot_size or timestamp <= 0:
+            return None
+        with self._lock:
+            slot = self._next
+            self._next = (slot + 1) % self.slots
+            buf = self.shm.buf
+            offset = self._slot_offset(slot)
+            # mark as writing
+            buf[offset:offset + 8] = b'\x00' * 8
+            start = offset + PREVIEW_SLOT_HEADER
+            buf[start:start + size] = data
+            buf[offset + 8:offset + 12] = size.to_bytes(4, 'big')
+            buf[offset:offset + 8] = timestamp.to_bytes(8, 'big')
+        return slot, timestamp, size
+
+    def read(self, slot: int, timestamp: int, size: int) -> "bytes | None":
+        """
+        Read a notified frame
+
+        Returns:
+            Frame data, or None if frame is overwritten or notification is invalid
+        """
+        if not 0 <= slot < self.slots or not 0 <= size <= self.slot_size:
+            return None
+        try:
+            buf = self.shm.buf
+            offset = self._slot_offset(slot)
+            stamp = timestamp.to_bytes(8, 'big')
+            if buf[offset:offset + 8] != stamp:
+                return None
+            start = offset + PREVIEW_SLOT_HEADER
+            data = bytes(buf[start:start + size])
+            # check again, worker may overwrite the slot while we are copying
+            if buf[offset:offset + 8] != stamp:
+                return None
+        except (TypeError, ValueError):
+            # shared memory closed
+            return None
+        return data
+
+    def close(self):
+        """
+        Close shared memory, and unlink it if it's the owner
+        """
+        shm = self.shm
+        try:
+            shm.close()
+        except Exception:
+            pass
+        if self.owner:
+            try:
+                shm.unlink()
+            except Exception:
+                pass
@@ -0,0 +1,368 @@
+import os
+import signal
+import sys
+import threading
+import time
+
+from alasio.logger import logger
+
+# Modules that every worker imports, import them once in zygote
+ZYGOTE_PRELOAD = [
+    'numpy',
+    'cv2',
+    'msgspec',
+    'alasio.logger',
+    'alasio.backend.worker.bridge',
+    'alasio.backend.worker.shm',
+]
+
+
+def zygote_available() -> bool:
+    """
+    Whether workers can be forked from a zygote.
+    No fork() on Windows, and fork() is unsafe on macOS because system frameworks are not fork-safe.
+    """
+    if not hasattr(os, 'fork'):
+        return False
+    if sys.platform == 'darwin':
+        return False
+    return True
+
+
+def _exitcode(status: int) -> int:
+    """
+    Convert os.waitpid() status to exitcode, same as multiprocessing.Process.exitcode
+    """
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+
+def _zygote_preload(preload, project_root='', mod_root='', path_main=''):
+    import importlib
+    for name in preload:
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            logger.warning(f'[Zygote] Failed to preload {name}: {e}')
+
+    # if project_root, mod_root, path_main all provided, consider as real mod, see mod_entry()
+    if project_root and mod_root and path_main:
+        try:
+            os.chdir(mod_root)
+            sys.path[0] = mod_root
+            from alasio.ext import env
+            env.set_project_root(project_root)
+            from alasio.ext.path.calc import to_python_import
+            importlib.import_module(to_python_import(path_main))
+        except Exception as e:
+            logger.warning(f'[Zygote] Failed to preload mod entry {path_main}: {e}')
+
+
+def _zygote_child(conn, args, kwargs, name):
+    """
+    Run worker in forked child, never returns
+    """
+    code = 0
+    try:
+        conn.close()
+        # restore default signal handlers, zygote may have changed them
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        import multiprocessing
+        multiprocessing.current_process().name = name
+
+        from alasio.backend.worker.bridge import mod_entry
+        mod_entry(*args, **kwargs)
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else 1
+    except BaseException:
+        import traceback
+        traceback.print_exc()
+        code = 1
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        except Exception:
+            pass
+        os._exit(code)
+
+
+def zygote_main(conn, preload=(), project_root='', mod_root='', path_main=''):
+    """
+    Entry of zygote process.
+    Zygote imports modules once and forks workers on request, so workers start without import costs.
+
+    Requests from backend:
+        ('fork', args, kwargs, name) -> pid
+        ('poll', pid) -> exitcode, or None if still running. Exitcode is forgotten once returned.
+        ('signal', pid, sig) -> True if sent, False if pid is not a running child
+        ('close',) -> True if zygote exits now, False if it stays to reap running children.
+            Zygote exits once all children are reaped and their exitcodes are polled.
+    """
+    start = time.perf_counter()
+    _zygote_preload(preload, project_root=project_root, mod_root=mod_root, path_main=path_main)
+    conn.send(('ready', time.perf_counter() - start))
+
+    # pid of running children, a child is not reaped yet so its pid can't be reused
+    children: "set[int]" = set()
+    # exitcode of reaped children
+    exitcodes: "dict[int, int]" = {}
+    closing = False
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, OSError):
+            break
+        # reap zombies
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            children.discard(pid)
+            exitcodes[pid] = _exitcode(status)
+
+        command = request[0]
+        if command == 'fork' and not closing:
+            _, args, kwargs, name = request
+            pid = os.fork()
+            if pid == 0:
+                _zygote_child(conn, args, kwargs, name)
+            # close the child end of worker pipe in zygote, just like backend does
+            for arg in args:
+                if hasattr(arg, 'fileno') and hasattr(arg, 'close'):
+                    arg.close()
+            children.add(pid)
+            conn.send(pid)
+        elif command == 'poll':
+            # backend caches exitcode, so it won't be asked again
+            conn.send(exitcodes.pop(request[1], None))
+        elif command == 'signal':
+            _, pid, sig = request
+            if pid in children:
+                try:
+                    os.kill(pid, sig)
+                    conn.send(True)
+                except OSError:
+                    conn.send(False)
+            else:
+                conn.send(False)
+        elif command == 'close':
+            closing = True
+            conn.send(not children and not exitcodes)
+        else:
+            conn.send(None)
+
+        if closing and not children and not exitcodes:
+            break
+
+
+class ZygoteProcess:
+    """
+    Proxy of a worker forked by zygote, imitating multiprocessing.Process.
+    Worker is a child of zygote, not a child of backend, so exitcode is asked from zygote.
+    """
+
+    def __init__(self, zygote: "Zygote", pid: int, name: str):
+        self.zygote = zygote
+        self.pid = pid
+        self.name = name
+        self.daemon = True
+        self._exitcode: "int | None" = None
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(name={self.name}, pid={self.pid}, exitcode={self._exitcode})'
+
+    @property
+    def exitcode(self) -> "int | None":
+        if self._exitcode is not None:
+            return self._exitcode
+        try:
+            code = self.zygote.poll(self.pid)
+        except (EOFError, OSError):
+            # Zygote died (crashed or killed by OOM killer), worker is reparented to init.
+            # Real exitcode is lost and pid may be reused, so consider worker as exited with error.
+            logger.warning(f'[ZygoteProcess] Zygote lost, exitcode of worker "{self.name}" is unknown')
+            code = -1
+        self._exitcode = code
+        return code
+
+    def is_alive(self) -> bool:
+        return self.exitcode is None
+
+    def join(self, timeout=None):
+        end = None if timeout is None else time.perf_counter() + timeout
+        while self.exitcode is None:
+            if end is not None and time.perf_counter() >= end:
+                return
+            time.sleep(0.01)
+
+    def _signal(self, sig):
+        if self._exitcode is not None:
+            return
+        # signal is sent by zygote, which only signals its running children,
+        # never signal pid directly, it might be reused by an unrelated process
+        try:
+            self.zygote.signal(self.pid, sig)
+        except (EOFError, OSError):
+            logger.warning(f'[ZygoteProcess] Zygote lost, refuse to signal worker "{self.name}"')
+
+    def terminate(self):
+        self._signal(signal.SIGTERM)
+
+    def kill(self):
+        self._signal(getattr(signal, 'SIGKILL', signal.SIGTERM))
+
+
+class Zygote:
+    """
+    Backend side handle of a zygote process
+    """
+
+    def __init__(self, ctx, name: str, preload=None, project_root='', mod_root='', path_main=''):
+        """
+        Args:
+            ctx: multiprocessing context to start zygote, usually "spawn"
+            name: Zygote name
+            preload (list[str]): Modules to import, default to ZYGOTE_PRELOAD
+            project_root:
+            mod_root:
+            path_main:
+        """
+        self.ctx = ctx
+        self.name = name
+        self.preload = ZYGOTE_PRELOAD if preload is None else preload
+        self.project_root = project_root
+        self.mod_root = mod_root
+        self.path_main = path_main
+
+        self.process = None
+        self.conn = None
+        # seconds used to preload modules in zygote
+        self.preload_time = 0.
+        # closed zygote forks no more workers, but stays to reap running workers
+        self.closing = False
+        # pid of forked workers whose exitcode is not polled yet
+        self._children: "set[int]" = set()
+        self._lock = threading.Lock()
+
+    def start(self, timeout=30.):
+        """
+        Start zygote and wait until preload finished
+
+        Raises:
+            TimeoutError:
+            EOFError: If zygote died during preload
+        """
+        parent_conn, child_conn = self.ctx.Pipe()
+        process = self.ctx.Process(
+            target=zygote_main,
+            args=(child_conn, self.preload, self.project_root, self.mod_root, self.path_main),
+            name=f'Zygote-{self.name}',
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        self.process = process
+        self.conn = parent_conn
+        if not parent_conn.poll(timeout):
+            self._release()
+            raise TimeoutError(f'Zygote "{self.name}" preload timeout')
+        try:
+            _, self.preload_time = parent_conn.recv()
+        except (EOFError, OSError):
+            self._release()
+            raise
+        return self
+
+    def is_alive(self) -> bool:
+        """
+        Whether zygote can fork workers
+        """
+        process = self.process
+        return process is not None and process.is_alive() and self.conn is not None and not self.closing
+
+    def _request(self, request):
+        with self._lock:
+            conn = self.conn
+            if conn is None:
+                raise EOFError(f'Zygote "{self.name}" closed')
+            conn.send(request)
+            return conn.recv()
+
+    def fork(self, args, kwargs, name) -> ZygoteProcess:
+        """
+        Fork a worker running mod_entry(*args, **kwargs)
+        """
+        if self.closing:
+            raise EOFError(f'Zygote "{self.name}" closed')
+        pid = self._request(('fork', args, kwargs, name))
+        if pid is None:
+            raise EOFError(f'Zygote "{self.name}" closed')
+        self._children.add(pid)
+        return ZygoteProcess(self, pid, name)
+
+    def poll(self, pid) -> "int | None":
+        """
+        Returns:
+            exitcode of worker, or None if still running
+
+        Raises:
+            EOFError: If zygote is gone
+        """
+        code = self._request(('poll', pid))
+        if code is not None:
+            self._children.discard(pid)
+            if self.closing and not self._children:
+                # zygote exits after the last exitcode is polled
+                self._release()
+        return code
+
+    def signal(self, pid, sig) -> bool:
+        """
+        Send signal to a running worker
+
+        Returns:
+            If sent, False if worker already exited
+
+        Raises:
+            EOFError: If zygote is gone
+        """
+        return self._request(('signal', pid, sig))
+
+    def close(self):
+        """
+        Stop zygote, workers forked from it are not affected.
+        If workers are still running, zygote stays to reap them, so their exitcode is known,
+        and exits after the exitcodes are polled.
+        """
+        self.closing = True
+        try:
+            finished = self._request(('close',))
+        except (EOFError, OSError):
+            finished = True
+        if finished:
+            self._release()
+
+    def _release(self):
+        """
+        Close pipe to zygote and wait until zygote exits
+        """
+        with self._lock:
+            conn = self.conn
+            self.conn = None
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        process = self.process
+        if process is not None and process.is_alive():
+            process.join(timeout=1)
+            if process.is_alive():
+                process.kill()
+                process.join(timeout=1)
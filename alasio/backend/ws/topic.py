@@ -14,7 +14,7 @@
 from alasio.backend.topic.state import DICT_CONFIG_TO_CONN, ConnState
 from alasio.backend.topic.worker import Worker
 from alasio.backend.worker.event import ConfigEvent
-from alasio.backend.ws.ws_server import WebsocketTopicServer
+from alasio.backend.ws.ws_server import BroadcastEncoder, WebsocketTopicServer
 from alasio.backend.ws.ws_topic import BaseTopic
 from alasio.config.const import Const
 from alasio.logger import logger
@@ -109,6 +109,9 @@ def _negotiate_lang(self, default='en-US'):
     async def handle_global_event(cls, topic: str, value):
         """
         Broadcast global events to all connections that subscribed this config
+
+        Handlers may send events by themselves, or return events to broadcast,
+        returned events are encoded once and shared between connections.
         """
         try:
             handlers = MSGBUS_GLOBAL_HANDLERS[topic]
@@ -116,18 +119,26 @@ async def handle_global_event(cls, topic: str, value):
             # nobody listening given topic
             return
 
+        encoder = BroadcastEncoder()
         for handler in handlers:
             topic_cls, func = handler
             # make a copy so we can safely iterate in async
             topic_instances = list(topic_cls.singleton_instances().values())
             for topic_obj in topic_instances:
                 # broadcast
-                await func(topic_obj, value)
+                resp = await func(topic_obj, value)
+                if resp is not None:
+                    data = encoder.encode(resp)
+                    if data is not None:
+                        topic_obj.server.send_broadcast(data)
 
     @classmethod
     async def handle_config_event(cls, event: ConfigEvent):
         """
         Broadcast config events to all connections that subscribed this config
+
+        Handlers may send events by themselves, or return events to broadcast,
+        returned events are encoded once and shared between connections.
         """
         connections = DICT_CONFIG_TO_CONN[event.c]
         if not connections:
@@ -142,6 +153,7 @@ async def handle_config_event(cls, event: ConfigEvent):
 
         # make a copy so we can safely iterate in async
         connections = list(connections)
+        encoder = BroadcastEncoder()
         for handler in handlers:
             topic_cls, func = handler
             # access with cls.singleton_instances()[conn_id] to make sure we don't create new instances
@@ -154,7 +166,11 @@ async def handle_config_event(cls, event: ConfigEvent):
                     # or DICT_CONFIG_TO_CONN is inconsistent with topic_cls(conn_id)
                     continue
                 # broadcast
-                await func(topic_obj, event.v)
+                resp = await func(topic_obj, event.v)
+                if resp is not None:
+                    data = encoder.encode(resp)
+                    if data is not None:
+                        topic_obj.server.send_broadcast(data)
 
     @classmethod
     async def task_msgbus_global(cls):
@@ -3,7 +3,7 @@
 
 import msgspec
 import trio
-from msgspec import DecodeError, EncodeError, ValidationError
+from msgspec import DecodeError, EncodeError, Struct, ValidationError
 from starlette.websockets import WebSocket, WebSocketDisconnect, WebSocketState
 from trio import Event
 
@@ -21,6 +21,62 @@
 CONN_ID_GENERATOR = SafeIDGenerator(prefix='conn')
 
 
+class BroadcastStats(Struct):
+    # number of broadcast messages accepted for delivery
+    sent: int = 0
+    # number of broadcast messages that went to broadcast_overflow because send_buffer is full
+    blocked: int = 0
+    # number of times that connection was closed because broadcast_overflow exceeded its length
+    overflow_closed: int = 0
+
+
+class BroadcastEncoder:
+    """
+    Encode broadcast events once and share the bytes between connections.
+
+    When one msgbus event is broadcast to N connections, handlers of each connection
+    create their own ResponseEvent, but these events usually have the same topic, operation, keys
+    and the very same value object from msgbus event. So events are cached by (t, o, k, id(v), i),
+    and encoded events are held in cache to keep id(v) valid during broadcast.
+    """
+
+    def __init__(self):
+        # key: event key, value: (event, encoded)
+        self.cache: "dict[tuple, tuple[Union[ResponseEvent, list[ResponseEvent]], bytes]]" = {}
+        self.encoded = 0
+        self.hit = 0
+
+    @staticmethod
+    def _event_key(data: "Union[ResponseEvent, list[ResponseEvent]]") -> tuple:
+        if type(data) is list:
+            return tuple([(e.t, e.o, e.k, id(e.v), e.i) for e in data])
+        return data.t, data.o, data.k, id(data.v), data.i
+
+    def encode(self, data: "Union[ResponseEvent, list[ResponseEvent], bytes]") -> "Optional[bytes]":
+        """
+        Returns:
+            bytes: Encoded event, or None if failed to encode
+        """
+        if isinstance(data, bytes):
+            return data
+        try:
+            key = self._event_key(data)
+            cached = self.cache.get(key)
+        except (AttributeError, TypeError):
+            # not a ResponseEvent, or keys are unhashable, encode directly
+            self.encoded += 1
+            return WebsocketTopicServer._encode_msg(data)
+        if cached is not None:
+            self.hit += 1
+            return cached[1]
+
+        self.encoded += 1
+        encoded = WebsocketTopicServer._encode_msg(data)
+        if encoded is not None:
+            self.cache[key] = (data, encoded)
+        return encoded
+
+
 class WebsocketTopicServer:
     """
     """
@@ -54,6 +110,11 @@ async def close_all_connections(cls):
     # if websocket is busy, send_buffer will create back-pressure, old messages in lossy buffer will be dropped
     SEND_BUFFER_LENGTH = 32
     LOSSY_BUFFER_LENGTH = 128
+    # broadcast messages are state changes that can't be dropped,
+    # if send_buffer is full, they wait in broadcast_overflow in order, and are moved into send_buffer once it has room.
+    # if a client is too slow to have more than X messages in overflow, connection is closed,
+    # client will reconnect and get full state again
+    BROADCAST_OVERFLOW_LENGTH = 1024
     # If no activity for X seconds,
     # we will send a "ping" to client
     PING_INTERVAL = 30
@@ -83,7 +144,9 @@ def __init__(self, ws: WebSocket):
         # buffer the message to be sent
         self.send_buffer: "trio.MemorySendChannel[bytes]" = None
         self.lossy_buffer = deque(maxlen=self.LOSSY_BUFFER_LENGTH)
+        self.broadcast_overflow: "Deque[bytes]" = deque()
         self.send_event = Event()
+        self.broadcast_stats = BroadcastStats()
         # All subscribed topics
         # key: topic name, value: topic object Topic(self.id)
         self.subscribed: "dict[str, BaseTopic]" = {}
@@ -246,6 +309,66 @@ def send_lossy(self, data: "Union[ResponseEvent, list[ResponseEvent], bytes]"):
         self._set_send_event()
         return True
 
+    def send_broadcast(self, data: bytes):
+        """
+        Send an encoded broadcast message without blocking, and without dropping.
+        If send_buffer is full, message waits in broadcast_overflow,
+        so a slow client won't stall the broadcast to other connections.
+        If overflow exceeds BROADCAST_OVERFLOW_LENGTH, connection is closed.
+
+        Returns:
+            bool: If success
+        """
+        buffer = self.send_buffer
+        if buffer is None:
+            # connection not ready
+            return False
+        if self.conn_terminated.is_set():
+            # connection closing
+            return False
+        stats = self.broadcast_stats
+        overflow = self.broadcast_overflow
+        if overflow:
+            # keep order, messages in overflow go first
+            overflow.append(data)
+            stats.blocked += 1
+        else:
+            try:
+                buffer.send_nowait(data)
+            except trio.WouldBlock:
+                overflow.append(data)
+                stats.blocked += 1
+            except TRIO_CHANNEL_ERRORS:
+                # buffer closed
+                return False
+        if len(overflow) > self.BROADCAST_OVERFLOW_LENGTH:
+            logger.warning(f'[{self}] Client too slow, {len(overflow)} broadcast messages pending, close connection')
+            overflow.clear()
+            stats.overflow_closed += 1
+            # task_heartbeat closes websocket, then other tasks exit
+            self.conn_terminated.set()
+            return False
+        stats.sent += 1
+        self._set_send_event()
+        return True
+
+    def _broadcast_flush(self):
+        """
+        Move messages from broadcast_overflow to send_buffer, until send_buffer is full
+        """
+        overflow = self.broadcast_overflow
+        buffer = self.send_buffer
+        while overflow:
+            try:
+                buffer.send_nowait(overflow[0])
+            except trio.WouldBlock:
+                return
+            except TRIO_CHANNEL_ERRORS:
+                # buffer closed
+                overflow.clear()
+                return
+            overflow.popleft()
+
     async def send_error(self, data: "Union[ResponseEvent, Exception, str, bytes]"):
         """
         Send data as error
@@ -395,6 +518,12 @@ async def task_send(
                 except trio.WouldBlock:
                     # maybe race condition that send_buffer is empty
                     continue
+                # send_buffer has room now
+                if self.broadcast_overflow:
+                    self._broadcast_flush()
+            elif self.broadcast_overflow:
+                self._broadcast_flush()
+                continue
             # Priority 2: receive from lossy_buffer
             elif lossy_buffer:
                 data = lossy_buffer.popleft()
@@ -5,7 +5,7 @@
 from alasio.backend.reactive.base_topic import BaseTopic as BaseMixin
 from alasio.backend.reactive.event import AccessDenied, ResponseEvent, RpcValueError
 from alasio.backend.reactive.rx_trio import AsyncReactiveCallback, async_reactive
-from alasio.ext.deep import deep_iter_patch
+from alasio.ext.deep import deep_patch
 from alasio.ext.singleton import SingletonNamed
 from alasio.logger import logger
 
@@ -99,7 +99,7 @@ async def reactive_callback(self, name, old, new):
             event = ResponseEvent(t=topic, o='full', v=new)
             await self.server.send(event)
         else:
-            for op, keys, value in deep_iter_patch(old, new):
+            for op, keys, value in deep_patch(old, new):
                 event = ResponseEvent(t=topic, o=op, k=keys, v=value)
                 await self.server.send(event)
 
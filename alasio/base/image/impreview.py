@@ -1,11 +1,18 @@
 import time
+from threading import Event, Lock, Thread
 
 import cv2
 
 from alasio.base.image.imfile import image_encode
 
+# Signature is a tiny thumbnail to detect unchanged screen
+SIGNATURE_STEP = 8
+SIGNATURE_SIZE = (32, 18)
+# Mean absolute difference (0~255) below which two frames are considered the same
+SIGNATURE_THRESHOLD = 1.0
 
-def image_preview(image, now=None, quality=75):
+
+def image_preview(image, now=None, quality=75, scale=0.5):
     """
     Create a preview
 
@@ -13,6 +20,7 @@ def image_preview(image, now=None, quality=75):
         image (np.ndarray): Input image
         now (float | None): Time in second, or 0 or None for now
         quality (int): JPEG quality, 0~100, bigger for better quality
+        scale (float): Resize factor
 
     Returns:
         bytes: Formatted preview data
@@ -20,7 +28,7 @@ def image_preview(image, now=None, quality=75):
             Note that preview message always have 8 bytes of header, 8 bytes of timestamp, and optional data
     """
     # Use 0.5 scale factor to leverage OpenCV internal optimizations
-    res = cv2.resize(image, None, fx=0.5, fy=0.5, interpolation=cv2.INTER_AREA)
+    res = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
     data = image_encode(res, ext='jpg', encode=[cv2.IMWRITE_JPEG_QUALITY, quality]).tobytes()
     if now is None or now <= 0:
         now = int(time.time() * 1000)
@@ -45,3 +53,205 @@ def image_preview_stop(now=None):
     else:
         now = int(now * 1000)
     return b''.join((b'PreviewS', now.to_bytes(8, 'big')))
+
+
+def image_signature(image):
+    """
+    Create a cheap signature of image to detect duplicate frames.
+    Image is strided first, so cost is about 1/64 of a full resize.
+
+    Args:
+        image (np.ndarray):
+
+    Returns:
+        np.ndarray: Thumbnail in SIGNATURE_SIZE, or rotated SIGNATURE_SIZE if image is portrait
+    """
+    height, width = image.shape[:2]
+    size = SIGNATURE_SIZE
+    if height > width:
+        size = (size[1], size[0])
+    image = image[::SIGNATURE_STEP, ::SIGNATURE_STEP]
+    return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+
+def signature_diff(sig1, sig2):
+    """
+    Args:
+        sig1 (np.ndarray | None):
+        sig2 (np.ndarray | None):
+
+    Returns:
+        float: Mean absolute difference, 0~255. 255 if signatures are not comparable
+    """
+    if sig1 is None or sig2 is None:
+        return 255.
+    if sig1.shape != sig2.shape:
+        return 255.
+    diff = cv2.absdiff(sig1, sig2)
+    mean = cv2.mean(diff)
+    if diff.ndim == 2:
+        return mean[0]
+    channel = diff.shape[2]
+    return sum(mean[:channel]) / channel
+
+
+def preview_profile(subscribers=1, speed='normal'):
+    """
+    Choose preview resolution and quality based on how many subscribers are watching.
+    Every preview is broadcast to all subscribers, so bandwidth grows with subscribers in realtime speed.
+
+    Args:
+        subscribers (int): Number of subscribers
+        speed (str): "normal" or "realtime"
+
+    Returns:
+        tuple[float, int]: (scale, quality)
+    """
+    if speed != 'realtime':
+        # normal speed sends 1 preview per 2s, bandwidth is never an issue
+        return 0.5, 75
+    if subscribers <= 1:
+        return 0.5, 70
+    if subscribers <= 3:
+        return 0.5, 60
+    # 1/3 is still an integer factor, which is fast in INTER_AREA
+    return 1 / 3, 60
+
+
+class PreviewEncoder:
+    """
+    Encode previews off the automation thread.
+
+    Only the latest frame is kept, if encoder is busy, older frames are dropped.
+    Frames that look the same as the last sent one are skipped unless forced.
+    Stop signals are ordered after previews, so backend never receives a preview after stop.
+    """
+
+    def __init__(self, send, on_skip=None, threshold=SIGNATURE_THRESHOLD):
+        """
+        Args:
+            send (callable): Function to send preview data, send(data: bytes)
+            on_skip (callable): Function to call when a frame is skipped as duplicate.
+                Caller should re-arm preview request in it, so preview will be sent on next changed frame.
+            threshold (float): Frames with signature_diff below threshold are considered duplicated
+        """
+        self.send = send
+        self.on_skip = on_skip
+        self.threshold = threshold
+
+        self._last_signature = None
+        # (image, now, scale, quality, force) or (None, now, 0, 0, True) for stop signal
+        self._slot: "tuple | None" = None
+        self._slot_lock = Lock()
+        # Locked = no task; Unlocked = has task
+        self._work_ready = Lock()
+        self._work_ready.acquire()
+        # Set = no pending frame and encoder not encoding
+        self._idle = Event()
+        self._idle.set()
+        self._thread: "Thread | None" = None
+
+        # stats
+        self.sent = 0
+        self.skipped = 0
+        self.dropped = 0
+
+    def _ensure_thread(self):
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            return
+        self._thread = Thread(target=self._encode_loop, daemon=True, name='PreviewEncoder')
+        self._thread.start()
+
+    def _put(self, task):
+        with self._slot_lock:
+            if self._slot is not None:
+                self.dropped += 1
+            self._slot = task
+            self._idle.clear()
+            try:
+                self._work_ready.release()
+            except RuntimeError:
+                # already unlocked, encoder thread will take the new slot
+                pass
+        self._ensure_thread()
+
+    def submit(self, image, now=None, scale=0.5, quality=75, force=False):
+        """
+        Submit a frame to encode, returns immediately
+
+        Args:
+            image (np.ndarray): Image should not be modified in place after submit
+            now (float | None): Time in second, or 0 or None for now
+            scale (float):
+            quality (int):
+            force (bool): True to send even if frame is duplicated
+        """
+        self._put((image, now, scale, quality, force))
+
+    def submit_stop(self, now=None):
+        """
+        Submit a stop signal, returns immediately
+        Pending preview will be dropped and last signature will be cleared.
+        """
+        self._put((None, now, 0, 0, True))
+
+    def is_duplicated(self, signature):
+        """
+        Args:
+            signature (np.ndarray):
+
+        Returns:
+            bool:
+        """
+        return signature_diff(self._last_signature, signature) < self.threshold
+
+    def _take(self):
+        with self._slot_lock:
+            task = self._slot
+            self._slot = None
+        return task
+
+    def _handle(self, task):
+        image, now, scale, quality, force = task
+        if image is None:
+            self._last_signature = None
+            self.send(image_preview_stop(now=now))
+            return
+        signature = image_signature(image)
+        if not force and self.is_duplicated(signature):
+            self.skipped += 1
+            if self.on_skip is not None:
+                self.on_skip()
+            return
+        data = image_preview(image, now=now, quality=quality, scale=scale)
+        # compare with last sent frame, not the last seen frame,
+        # so slow changes still accumulate and trigger a send
+        self._last_signature = signature
+        self.sent += 1
+        self.send(data)
+
+    def _encode_loop(self):
+        wait_for_work = self._work_ready.acquire
+        while True:
+            wait_for_work()
+            task = self._take()
+            if task is None:
+                continue
+            try:
+                self._handle(task)
+            except Exception as e:
+                from alasio.logger import logger
+                logger.warning(f'[PreviewEncoder] Failed to encode preview: {e}')
+            with self._slot_lock:
+                if self._slot is None:
+                    self._idle.set()
+
+    def wait_idle(self, timeout=1.):
+        """
+        Wait until all submitted frames are handled
+
+        Returns:
+            bool: True if idle
+        """
+        return self._idle.wait(timeout)
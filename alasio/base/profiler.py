@@ -0,0 +1,283 @@
+import statistics
+import sys
+from time import perf_counter
+
+from msgspec import Struct, field
+
+from alasio.base.pretty import pretty_time
+
+
+class MatchStats(Struct):
+    # Calls of match() and calls that matched
+    calls: int = 0
+    hits: int = 0
+    # Total and max seconds of match()
+    total: float = 0.
+    max: float = 0.
+
+    @property
+    def avg(self):
+        if self.calls:
+            return self.total / self.calls
+        return 0.
+
+
+class LoopStats(Struct):
+    # Where loop() is called, "ClassName.method:line"
+    caller: str = ''
+    # Amount of loop() calls and total iterations
+    loops: int = 0
+    frames: int = 0
+    # How loops ended.
+    # Loops ended by break or by exceptions in loop body are decisions, loop() can't tell them apart.
+    decisions: int = 0
+    timeouts: int = 0
+    errors: int = 0
+    # Total iterations of loops ended by decision, to calculate frames-to-decision
+    decision_frames: int = 0
+    max_frames: int = 0
+    # Total seconds of iterations, of screenshots, of loop body, and of matching in loop body
+    total: float = 0.
+    screenshot: float = 0.
+    body: float = 0.
+    match: float = 0.
+    # Wall time of each iteration
+    samples: "list[float]" = field(default_factory=list)
+
+    @property
+    def frames_to_decision(self):
+        if self.decisions:
+            return self.decision_frames / self.decisions
+        return 0.
+
+    @property
+    def avg(self):
+        if self.frames:
+            return self.total / self.frames
+        return 0.
+
+
+class LoopProfiler:
+    """
+    Profile state loops of ModuleBase.loop(), without changing task code.
+
+    On attach, ModuleBase.loop() and Template.match() are wrapped to record
+    per-iteration wall time, screenshot time, matching time per template and frames-to-decision.
+    Use with ReplayDevice for a reproducible offline benchmark of task logic.
+
+    Examples:
+        with LoopProfiler() as profiler:
+            task = TaskModule(config, device=ReplayDevice(config, './log/frames.zst'))
+            try:
+                task.run()
+            except ReplayEnd:
+                pass
+        profiler.print_report()
+    """
+
+    def __init__(self):
+        # key: caller, value: LoopStats
+        self.loops: "dict[str, LoopStats]" = {}
+        # key: str(template) or str(asset), value: MatchStats
+        self.matches: "dict[str, MatchStats]" = {}
+        # total matching time, nested matches are counted once
+        self._match_time = 0.
+        self._match_depth = 0
+        # list of (owner, attribute name, original value, whether owner had the attribute in __dict__)
+        self._patched = []
+
+    def __enter__(self):
+        self.attach()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.detach()
+
+    def _patch(self, owner, name, value):
+        had = name in vars(owner)
+        self._patched.append((owner, name, getattr(owner, name), had))
+        setattr(owner, name, value)
+
+    def attach(self):
+        """
+        Wrap ModuleBase.loop() and Template.match()
+        """
+        if self._patched:
+            return
+        # local import to avoid importing opencv globally
+        from alasio.assets.template.template import Template
+        from alasio.base.base import ModuleBase
+        self._patch(ModuleBase, 'loop', self._wrap_loop(ModuleBase.loop))
+        self._patch(Template, 'match', self._wrap_match(Template.match, key=None))
+
+    def track(self, *objs):
+        """
+        Record matching time of given objects, for Assets and Templates with custom match functions,
+        which don't go through Template.match().
+
+        Args:
+            *objs: Objects that have a match() method
+        """
+        for obj in objs:
+            self._patch(obj, 'match', self._wrap_match(obj.match, key=str(obj)))
+
+    def detach(self):
+        """
+        Restore wrapped methods
+        """
+        for owner, name, value, had in reversed(self._patched):
+            if had:
+                setattr(owner, name, value)
+            else:
+                try:
+                    delattr(owner, name)
+                except AttributeError:
+                    pass
+        self._patched.clear()
+
+    def _record_match(self, key, cost, result):
+        try:
+            stats = self.matches[key]
+        except KeyError:
+            stats = MatchStats()
+            self.matches[key] = stats
+        stats.calls += 1
+        if result:
+            stats.hits += 1
+        stats.total += cost
+        if cost > stats.max:
+            stats.max = cost
+
+    def _wrap_match(self, func, key):
+        """
+        Args:
+            func (callable): Original match function
+            key (str | None): Key of stats, None to use str() of the first argument
+
+        Returns:
+            callable:
+        """
+        profiler = self
+
+        def match(*args, **kwargs):
+            profiler._match_depth += 1
+            start = perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                cost = perf_counter() - start
+                profiler._match_depth -= 1
+                if profiler._match_depth == 0:
+                    profiler._match_time += cost
+            profiler._record_match(key if key is not None else str(args[0]), cost, result)
+            return result
+
+        return match
+
+    def _get_loop_stats(self, caller):
+        try:
+            return self.loops[caller]
+        except KeyError:
+            stats = LoopStats(caller=caller)
+            self.loops[caller] = stats
+            return stats
+
+    def _wrap_loop(self, func):
+        """
+        Args:
+            func (callable): Original ModuleBase.loop
+
+        Returns:
+            callable:
+        """
+        profiler = self
+
+        def loop(module, *args, **kwargs):
+            # generator body runs on the first next(), which is called by the for statement in task code
+            frame = sys._getframe(1)
+            caller = f'{module.__class__.__name__}.{frame.f_code.co_name}:{frame.f_lineno}'
+            del frame
+            stats = profiler._get_loop_stats(caller)
+            stats.loops += 1
+            frames = 0
+            ended = 'timeout'
+            inner = func(module, *args, **kwargs)
+            try:
+                while 1:
+                    start = perf_counter()
+                    try:
+                        image = next(inner)
+                    except StopIteration:
+                        break
+                    shot = perf_counter()
+                    match_start = profiler._match_time
+                    try:
+                        yield image
+                    except GeneratorExit:
+                        ended = 'decision'
+                        raise
+                    finally:
+                        end = perf_counter()
+                        frames += 1
+                        stats.total += end - start
+                        stats.screenshot += shot - start
+                        stats.body += end - shot
+                        stats.match += profiler._match_time - match_start
+                        stats.samples.append(end - start)
+            except GeneratorExit:
+                raise
+            except BaseException:
+                if ended != 'decision':
+                    ended = 'error'
+                raise
+            finally:
+                inner.close()
+                stats.frames += frames
+                if frames > stats.max_frames:
+                    stats.max_frames = frames
+                if ended == 'decision':
+                    stats.decisions += 1
+                    stats.decision_frames += frames
+                elif ended == 'timeout':
+                    stats.timeouts += 1
+                else:
+                    stats.errors += 1
+
+        return loop
+
+    def clear(self):
+        """
+        Clear recorded stats
+        """
+        self.loops.clear()
+        self.matches.clear()
+        self._match_time = 0.
+
+    def print_report(self):
+        """
+        Print recorded stats of loops and matches
+        """
+        loops = sorted(self.loops.values(), key=lambda s: s.total, reverse=True)
+        width = max([20] + [len(s.caller) + 2 for s in loops])
+        print("\n" + "=" * (width + 72))
+        print("Loop Profile")
+        print("=" * (width + 72))
+        print(f"{'Loop':<{width}} {'Loops':<6} {'Frames':<7} {'ToDecide':<9} {'Median':<11} {'Screenshot':<11} "
+              f"{'Body':<11} {'Match':<11}")
+        print("-" * (width + 72))
+        for s in loops:
+            median = statistics.median(s.samples) if s.samples else 0.
+            frames = s.frames or 1
+            print(f"{s.caller:<{width}} {s.loops:<6} {s.frames:<7} {s.frames_to_decision:<9.1f} "
+                  f"{pretty_time(median):<11} {pretty_time(s.screenshot / frames):<11} "
+                  f"{pretty_time(s.body / frames):<11} {pretty_time(s.match / frames):<11}")
+        print("-" * (width + 72))
+
+        matches = sorted(self.matches.items(), key=lambda item: item[1].total, reverse=True)
+        width = max([20] + [len(key) + 2 for key, _ in matches])
+        print(f"{'Match':<{width}} {'Calls':<7} {'Hits':<7} {'Average':<11} {'Max':<11} {'Total':<11}")
+        print("-" * (width + 48))
+        for key, s in matches:
+            print(f"{key:<{width}} {s.calls:<7} {s.hits:<7} {pretty_time(s.avg):<11} {pretty_time(s.max):<11} "
+                  f"{pretty_time(s.total):<11}")
+        print("-" * (width + 48))
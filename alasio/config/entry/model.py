@@ -6,6 +6,7 @@
 from msgspecerror import ErrorInfo
 
 from alasio.ext.cache import cached_property
+from alasio.ext.cache.policy import TinyLFUPolicy
 from alasio.ext.file.msgspecfile import JsonCacheTTL
 from alasio.ext.singleton import Singleton
 from alasio.logger import logger
@@ -128,4 +129,5 @@ def load_resource(self, file: str, decoder: JsonDecoder = None, default_factory=
             return default_factory()
 
 
-MOD_JSON_CACHE = ModJsonCacheTTL()
+# model json of all mods and languages, frequently used ones survive a scan over another mod
+MOD_JSON_CACHE = ModJsonCacheTTL(TinyLFUPolicy(maxsize=1024))
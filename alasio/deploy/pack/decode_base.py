@@ -1,5 +1,6 @@
 
 from hashlib import sha1
+from itertools import chain
 
 from alasio.deploy.pack.pack_model import IdxInfo
 from alasio.ext.algorithm.bit2coding import decode_bit2
@@ -7,8 +8,25 @@
 from alasio.ext.algorithm.vint import decode_vint
 from alasio.ext.algorithm.vlenint import decode_vlenint
 from alasio.ext.cache import cached_property
-from alasio.ext.compress.algo_lzma import lzma_decompress
-from alasio.ext.compress.algo_zstd import zstd_decompress
+from alasio.ext.compress.algo_lzma import lzma_decompress, lzma_decompress_iter
+from alasio.ext.compress.algo_zstd import zstd_decompress, zstd_decompress_iter
+from alasio.ext.path.atomic import CHUNK_SIZE, atomic_write_stream
+
+
+def iter_chunks(data, chunk_size=CHUNK_SIZE):
+    """
+    Split a buffer into zero-copy chunks.
+
+    Args:
+        data (bytes | memoryview): e.g. a memoryview slice of a mmap-ed pack
+        chunk_size (int): Defaults to 256KB.
+
+    Yields:
+        memoryview:
+    """
+    data = memoryview(data)
+    for start in range(0, len(data), chunk_size):
+        yield data[start:start + chunk_size]
 
 
 class PackDecodeError(ValueError):
@@ -538,6 +556,23 @@ def catfile(self, info) -> memoryview:
         content = self.catdata(info)
         return memoryview(self.decode_content(info, content))
 
+    def catfile_to_file(self, info, file):
+        """
+        Extract the working tree content of this file to a file, like
+        catfile() but streaming: the data is decompressed, checked and
+        written in chunks, memory usage does not grow with the file size.
+
+        Args:
+            info (IdxInfo): Record with data_start / data_size / algo
+            file (str): File to write, written atomically, it is not
+                created if the content fails to decode
+
+        Raises:
+            PackDecodeError: Same as catfile()
+        """
+        data = self.catdata(info)
+        self.decode_content_to_file(info, iter_chunks(data), file)
+
     @staticmethod
     def decode_content(info, data, source=None):
         """
@@ -572,6 +607,125 @@ def decode_content(info, data, source=None):
         PackDecodeBase._check_content(info, data)
         return PackDecodeBase.apply_eol(data, info.eol)
 
+    @staticmethod
+    def decode_content_iter(info, chunks, source=None):
+        """
+        Streaming version of decode_content().
+
+        Raw data chunks are pulled from any source (a file, a mmap slice,
+        an http stream), decompressed by incremental decompressors and
+        hashed incrementally. Content is yielded in bounded chunks with
+        the checkout line ending applied. The size and sha1 check runs
+        at the end, so callers must not trust the yielded content until
+        the generator is exhausted without error. Decoding stops as soon
+        as the content exceeds the recorded size.
+
+        Args:
+            info (IdxInfo): Record of the file
+            chunks (Iterable[bytes | memoryview]): Raw file data in the
+                full pack, in chunks
+            source (bytes | memoryview, optional): Old file content as
+                the zstd dictionary for zstd patch data. Defaults to
+                None.
+
+        Yields:
+            bytes | memoryview: Working tree file content
+
+        Raises:
+            PackDecodeError: Same as decode_content()
+        """
+        if info.algo != 0:
+            chunks = PackDecodeBase._decompress_iter(info, chunks, source=source)
+        chunks = PackDecodeBase._check_content_iter(info, chunks)
+        yield from PackDecodeBase.apply_eol_iter(chunks, info.eol)
+
+    @staticmethod
+    def decode_content_to_file(info, chunks, file, source=None):
+        """
+        Decode raw file data and write the working tree content to a
+        file in chunks, see decode_content_iter().
+
+        Args:
+            info (IdxInfo): Record of the file
+            chunks (Iterable[bytes | memoryview]): Raw file data in chunks
+            file (str): File to write, written atomically, it is not
+                created if the content fails to decode
+            source (bytes | memoryview, optional): Old file content as
+                the zstd dictionary for zstd patch data. Defaults to
+                None.
+
+        Raises:
+            PackDecodeError: Same as decode_content()
+        """
+        iterator = PackDecodeBase.decode_content_iter(info, chunks, source=source)
+        # file_write_stream() creates no file for an empty iterator,
+        # start with an empty chunk so empty files are created too
+        atomic_write_stream(file, chain([b''], iterator))
+
+    @staticmethod
+    def apply_eol_iter(chunks, eol):
+        """
+        Streaming version of apply_eol().
+
+        A chunk ending with CR is held back until the next chunk, so a
+        CRLF split across chunks is not converted twice.
+
+        Args:
+            chunks (Iterable[bytes | memoryview]): Blob content in chunks
+            eol (int): Line ending rule, 0 for LF, 1 for CRLF, 2 for binary
+
+        Yields:
+            bytes | memoryview: Content with the checkout line ending applied
+        """
+        if eol != 1:
+            # LF (0) and binary (2) are written as-is
+            yield from chunks
+            return
+        carry = b''
+        for chunk in chunks:
+            chunk = carry + bytes(chunk)
+            if chunk.endswith(b'\r'):
+                carry = b'\r'
+                chunk = chunk[:-1]
+            else:
+                carry = b''
+            yield chunk.replace(b'\r\n', b'\n').replace(b'\n', b'\r\n')
+        if carry:
+            yield carry
+
+    @staticmethod
+    def _decompress_iter(info, chunks, source=None):
+        """
+        Streaming version of _decompress().
+
+        Args:
+            info (IdxInfo): Record being decompressed
+            chunks (Iterable[bytes | memoryview]): Raw data in chunks
+            source (bytes | memoryview, optional): Old file content as the
+                zstd dictionary for zstd patch data. Defaults to None.
+
+        Yields:
+            bytes: Decompressed content
+
+        Raises:
+            PackDecodeError: Same as _decompress()
+        """
+        if info.algo == 2 and info.source_lookback and source is None:
+            raise PackDecodeError(
+                f'Failed to decompress {info.path}: zstd patch data '
+                f'requires the old file content'
+            )
+        if info.algo == 1:
+            iterator = lzma_decompress_iter(chunks)
+        elif info.algo == 2:
+            iterator = zstd_decompress_iter(chunks, source)
+        else:
+            raise PackDecodeError(f'Failed to decompress {info.path}: unknown algo {info.algo}')
+        try:
+            yield from iterator
+        except Exception as e:
+            raise PackDecodeError(f'Failed to decompress {info.path}: {e}') from e
+
     @staticmethod
     def _decompress(info, data, source=None):
         """
@@ -636,6 +790,45 @@ def _check_content(info, content):
                 f'decoded {sha1(content).hexdigest()}, expected {info.sha1}'
             )
 
+    @staticmethod
+    def _check_content_iter(info, chunks):
+        """
+        Streaming version of _check_content(), hashes chunks while
+        passing them through.
+
+        Args:
+            info (IdxInfo): Record being decoded
+            chunks (Iterable[bytes | memoryview]): Decoded blob content
+
+        Yields:
+            bytes | memoryview: The same chunks
+
+        Raises:
+            PackDecodeError: If the size or sha1 mismatch, a content
+                longer than the record fails before reading the rest
+        """
+        hasher = sha1()
+        size = 0
+        for chunk in chunks:
+            size += len(chunk)
+            if size > info.size:
+                raise PackDecodeError(
+                    f'Failed to decode {info.path}: size mismatch: '
+                    f'decoded more than {info.size} bytes'
+                )
+            hasher.update(chunk)
+            yield chunk
+        if size != info.size:
+            raise PackDecodeError(
+                f'Failed to decode {info.path}: size mismatch: '
+                f'decoded {size} bytes, expected {info.size}'
+            )
+        if info.sha1 and hasher.hexdigest() != info.sha1:
+            raise PackDecodeError(
+                f'Failed to decode {info.path}: sha1 mismatch: '
+                f'decoded {hasher.hexdigest()}, expected {info.sha1}'
+            )
+
     @cached_property
     def refinfo(self) -> "dict[str, IdxInfo]":
         """
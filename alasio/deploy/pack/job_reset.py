@@ -1,14 +1,35 @@
-import httpx
+import os
+from typing import Dict
 
-from alasio.deploy.pack.decode_base import PackDecodeBase, PackDecodeError
-from alasio.deploy.pack.job_base import JobBase, PendingFile
+import msgspec
+
+from alasio.deploy.pack.decode_base import PackDecodeBase, PackDecodeError, iter_chunks
+from alasio.deploy.pack.job_base import CurrentFile, JobBase, MatchResult, PendingFile
 from alasio.deploy.pack.pack_model import IdxInfo
 from alasio.ext import env
 from alasio.ext.cache import InstanceCacheOperation, cached_property
+from alasio.ext.concurrent.threadpool import THREAD_POOL
 from alasio.ext.path.atomic import atomic_read_bytes, atomic_write
 from alasio.logger import logger
 
 
+class ValidateCacheEntry(msgspec.Struct, array_like=True):
+    """
+    A file that matched its record as-is, in the validation cache.
+
+    Encoded as a msgpack array to avoid repeating field names. The file
+    is trusted without hashing when its stat is unchanged and the
+    record has the same sha1 and eol.
+    """
+    # stat of the file when it was verified
+    size: int
+    mtime_ns: int
+    ino: int
+    # sha1 and eol of the record the file matched
+    sha1: str
+    eol: int
+
+
 class ResetJob(JobBase):
     """
     A local file validation and repair task, interruptible and
@@ -47,6 +68,16 @@ class ResetJob(JobBase):
 
     # marker of a validation task in the job file
     MARK = b'REST\x00'
+    # cache of the files verified by validate_files(), relative to the app
+    # root folder. It is not in the workspace, the workspace is removed
+    # after every job.
+    VALIDATE_CACHE = '.pack/validate.cache'
+    # amount of records per THREAD_POOL job in validate_files()
+    VALIDATE_BATCH = 256
+
+    # True to trust the files whose stat is unchanged since the last
+    # validation, see _validate_file()
+    validate_cache = True
 
     def __init__(self, server, resume=False):
         """
@@ -221,20 +252,43 @@ def validate_files(self):
         collected in self.error with an empty tmp, the caller repairs
         them.
 
+        Files are checked in batches on THREAD_POOL. Files that matched
+        as-is are recorded in the validation cache .pack/validate.cache
+        with their stat, the next validation skips hashing them if the
+        stat is unchanged (see _validate_file).
+
         Returns:
             bool: True if every file matches its record, False
                 otherwise
         """
         self.error = []
-        for path, info in self._index_pack.fileinfo.items():
-            current = self._read_current(env.PROJECT_ROOT.joinpath(path))
+        list_info = list(self._index_pack.fileinfo.values())
+        cache, cache_mtime_ns = self._read_validate_cache()
+        batch = self.VALIDATE_BATCH
+        if len(list_info) <= batch:
+            results = self._validate_batch(list_info, cache, cache_mtime_ns)
+        else:
+            # hash files on threads, hashlib and file reads release the GIL
+            with THREAD_POOL.gather_jobs() as pool:
+                for start in range(0, len(list_info), batch):
+                    pool.start_thread_soon(
+                        self._validate_batch, list_info[start:start + batch], cache, cache_mtime_ns)
+            results = [row for rows in pool.results for row in rows]
+
+        # built from the current records only, so paths removed from the
+        # index are dropped from the cache
+        new_cache = {}
+        # records are handled in order, the tmp names are built from the
+        # index in self.error
+        for info, (result, current, entry) in zip(list_info, results):
+            if entry is not None:
+                new_cache[info.path] = entry
             if info.edit == 2:
                 # deleted marker, the file should not exist
                 if current.exist:
                     # the file should be removed by the caller
                     self.error.append(PendingFile(info=info, tmp=''))
                 continue
-            result = self._matches(info, current)
             if result.match:
                 if result.mode_matched:
                     continue
@@ -264,8 +318,107 @@ def validate_files(self):
             # by python with the default mode 666
             self.error.append(PendingFile(
                 info=info, tmp='', mode=info.mode_decoded if info.mode == 1 else None))
+        if new_cache != cache:
+            self._write_validate_cache(new_cache)
         return not self.error
 
+    def _read_validate_cache(self):
+        """
+        Returns:
+            tuple[dict[str, ValidateCacheEntry], int]: Cache of verified
+                files, and the mtime of the cache file in nanoseconds.
+                Empty cache and 0 if the cache is disabled, missing or
+                broken.
+        """
+        if not self.validate_cache:
+            return {}, 0
+        file = env.PROJECT_ROOT.joinpath(self.VALIDATE_CACHE)
+        try:
+            mtime_ns = os.stat(file).st_mtime_ns
+            data = atomic_read_bytes(file)
+            cache = msgspec.msgpack.decode(data, type=Dict[str, ValidateCacheEntry])
+        except FileNotFoundError:
+            return {}, 0
+        except msgspec.DecodeError as e:
+            logger.warning(f'Failed to read validate cache: {e}')
+            return {}, 0
+        return cache, mtime_ns
+
+    def _write_validate_cache(self, cache):
+        """
+        Args:
+            cache (dict[str, ValidateCacheEntry]):
+        """
+        if not self.validate_cache:
+            return
+        file = env.PROJECT_ROOT.joinpath(self.VALIDATE_CACHE)
+        try:
+            atomic_write(file, msgspec.msgpack.encode(cache))
+        except OSError as e:
+            # the cache is optional, validation is still correct without it
+            logger.warning(f'Failed to write validate cache: {e}')
+
+    def _validate_batch(self, list_info, cache, cache_mtime_ns):
+        """
+        Returns:
+            list[tuple[MatchResult, CurrentFile | None, ValidateCacheEntry | None]]:
+                See _validate_file()
+        """
+        return [self._validate_file(info, cache, cache_mtime_ns) for info in list_info]
+
+    def _validate_file(self, info, cache, cache_mtime_ns):
+        """
+        Check a file against its record, trusting the validation cache.
+
+        A cached file is trusted if its size, mtime and inode are the
+        same as the cache entry, and it is not modified after the cache
+        was written. Like racy git, a file with mtime later than or equal
+        to the cache file may be modified in the same timestamp
+        granularity after it was verified, it is hashed again.
+        The file is stat-ed before read, so a file modified during the
+        read never gets its new stat cached with the old content.
+
+        Args:
+            info (IdxInfo): Record to check against
+            cache (dict[str, ValidateCacheEntry]):
+            cache_mtime_ns (int): mtime of the cache file
+
+        Returns:
+            tuple[MatchResult, CurrentFile | None, ValidateCacheEntry | None]:
+                Match result.
+                Current file, None if the file matches as-is so the data
+                is not kept in memory.
+                Cache entry if the file matches as-is, None otherwise.
+        """
+        file = env.PROJECT_ROOT.joinpath(info.path)
+        try:
+            st = os.stat(file)
+        except FileNotFoundError:
+            return MatchResult(match=False), CurrentFile(exist=False, data=b'', mode=0), None
+        if info.edit == 2:
+            # deleted marker, only existence matters
+            return MatchResult(match=False), CurrentFile(exist=True, data=b'', mode=st.st_mode), None
+
+        entry = cache.get(info.path)
+        if entry is not None \
+                and entry.sha1 == info.sha1 and entry.eol == info.eol \
+                and entry.size == st.st_size and entry.mtime_ns == st.st_mtime_ns and entry.ino == st.st_ino \
+                and st.st_mtime_ns < cache_mtime_ns:
+            current = CurrentFile(exist=True, data=b'', mode=st.st_mode)
+            if self._mode_matches(info, current):
+                return MatchResult(match=True), None, entry
+            # mode changed, read the content for the tmp file
+
+        current = self._read_current(file)
+        result = self._matches(info, current)
+        if not result.match:
+            return result, current, None
+        entry = ValidateCacheEntry(
+            size=st.st_size, mtime_ns=st.st_mtime_ns, ino=st.st_ino, sha1=info.sha1, eol=info.eol)
+        if result.mode_matched:
+            return result, None, entry
+        return result, current, entry
+
     def download_index(self):
         """
         Prepare the new index pack of the latest version in the
@@ -325,7 +478,9 @@ def download(self):
         Download the failed files recorded in self.error to tmp files.
 
         Every failed file is fetched from the full pack of the index
-        pack version with a range request, decompressed and written to
+        pack version, nearby files are coalesced into concurrent range
+        requests (see ServerFile.get_file_contents), each file is
+        decompressed and written to
         .pack/workspace/{size}_{sha1}_{index}.tmp, the record is moved
         to self.pending for replace(). Records that already carry a
         tmp (an EOL or mode mismatch fixed in validate_files()) and
@@ -342,28 +497,50 @@ def download(self):
         if server is None:
             raise PackDecodeError('Failed to download the files: no server provided')
         decoder = self._index_pack
+        # {index: (item, tmp)}, records to download
+        download = {}
+        for index, item in enumerate(self.error):
+            info = item.info
+            if info.edit == 2 or item.tmp:
+                # deleted marker, or the tmp was already written during
+                # validation (the EOL or mode of the file was fixed),
+                # no download is needed
+                continue
+            tmp = self.workspace.joinpath(f'{info.size}_{info.sha1}_{index}.tmp')
+            if self._matches(info, self._read_current(tmp)).match:
+                # a leftover tmp file passes the size + sha1 check, reuse it
+                continue
+            download[index] = (item, tmp)
+
+        def on_content(index, data):
+            item, tmp = download[index]
+            decoder.decode_content_to_file(item.info, iter_chunks(data), tmp)
+
+        # data_start is an offset into the full pack file, range requests
+        # use it directly
+        failed = {}
+        if download:
+            failed = server.get_file_contents(
+                decoder.version,
+                {index: (item.info.data_start, item.info.data_size) for index, (item, _) in download.items()},
+                on_content,
+            )
+
         pending = []
         error = []
         for index, item in enumerate(self.error):
             info = item.info
-            if info.edit == 2:
-                # deleted marker, no download, its target is removed
+            if info.edit == 2 or item.tmp:
                 pending.append(item)
                 continue
-            if item.tmp:
-                # the tmp was already written during validation, the
-                # EOL or mode of the file was fixed, no download is
-                # needed
-                pending.append(item)
-                continue
-            try:
-                tmp = self._download_file(decoder, server, info, index)
-            except (PackDecodeError, httpx.HTTPError) as e:
+            e = failed.get(index)
+            if e is not None:
                 # cannot be downloaded or fails the size + sha1 check,
                 # keep the record in error, this is unsolvable
                 logger.warning(f'Failed to download {info.path}: {e}')
                 error.append(item)
                 continue
+            tmp = self.workspace.joinpath(f'{info.size}_{info.sha1}_{index}.tmp')
             # the file is written by python with the default mode 666,
             # a 755 record is chmod-ed in replace()
             pending.append(PendingFile(
@@ -373,33 +550,3 @@ def download(self):
         # the new index pack of download_index()
         self.pending += pending
         self.error = error
-
-    def _download_file(self, decoder, server, info, index):
-        """
-        Download and decompress a file from the full pack, write the
-        content to a tmp file.
-
-        Args:
-            decoder (PackDecodeBase): Decoder of the local index pack
-            server (ServerFile): Server to download from
-            info (IdxInfo): Record of the file to download
-            index (int): Index of the record in self.error, used to
-                build the tmp file name
-
-        Returns:
-            str: Path of the tmp file
-
-        Raises:
-            PackDecodeError: If the downloaded data fails the size +
-                sha1 check
-        """
-        tmp = self.workspace.joinpath(f'{info.size}_{info.sha1}_{index}.tmp')
-        if self._matches(info, self._read_current(tmp)).match:
-            # a leftover tmp file passes the size + sha1 check, reuse it
-            return tmp
-        # data_start is an offset into the full pack file, range requests
-        # use it directly
-        data = server.get_file_content(decoder.version, info.data_start, info.data_size)
-        content = decoder.decode_content(info, data)
-        atomic_write(tmp, content)
-        return tmp
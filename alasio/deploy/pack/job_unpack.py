@@ -139,7 +139,7 @@ def unpack(self):
                 atomic_write(tmp, result.match_data)
             elif not self._matches(info, self._read_current(tmp)).match:
                 # decompress and write to the tmp file
-                atomic_write(tmp, decoder.catfile(info))
+                decoder.catfile_to_file(info, tmp)
             # the file is written by python with the default mode 666,
             # a 755 record is chmod-ed in replace()
             pending.append(PendingFile(
@@ -2,7 +2,7 @@
 
 import httpx
 
-from alasio.deploy.pack.decode_base import PackDecodeBase, PackDecodeError
+from alasio.deploy.pack.decode_base import PackDecodeBase, PackDecodeError, iter_chunks
 from alasio.deploy.pack.job_base import JobBase, PendingFile
 from alasio.deploy.pack.job_reset import ResetJob
 from alasio.deploy.pack.pack_model import IdxInfo
@@ -235,8 +235,9 @@ def download(self):
         A record whose source failed the size + sha1 check cannot be
         computed locally: its content is fetched from the full pack of
         the new version (the new index pack records carry the
-        offsets), decompressed, verified and written to its tmp file
-        like ResetJob. The index pack record is downloaded as a whole
+        offsets) with coalesced concurrent range requests (see
+        ServerFile.get_file_contents), decompressed, verified and
+        written to its tmp file like ResetJob. The index pack record is downloaded as a whole
         index pack: it is not a file of the new full pack, and it is
         downloaded first because the other records need the new index
         for their offsets. The local source files are not repaired.
@@ -308,6 +309,11 @@ def download(self):
                 self.error = failed
                 return
         new_index = PackDecodeBase(new_index_data)
+        # {index: (item, new_info, tmp)}, records to download
+        download = {}
+        # (item, index, tmp) in the order of self.error, index is None if
+        # the record fails before the download
+        records = []
         for item in self.error:
             if item.info.path == self.INDEX_PACK:
                 continue
@@ -316,28 +322,43 @@ def download(self):
             tmp = self.workspace.joinpath(f'{info.size}_{info.sha1}_{index}.tmp')
             if self._matches(info, self._read_current(tmp)).match:
                 # a leftover tmp file passes the size + sha1 check, reuse it
-                pending.append(PendingFile(
-                    info=info, tmp=tmp, mode=info.mode_decoded if info.mode == 1 else None))
+                records.append((item, None, tmp))
                 continue
             new_info = new_index.fileinfo.get(info.path)
             if new_info is None:
                 # the new index does not record the file, this should
                 # not happen
-                failed.append(item)
+                records.append((item, None, None))
                 continue
-            try:
-                # data_start is an offset into the new full pack file,
-                # range requests use it directly
-                data = server.get_file_content(
-                    new_index.version, new_info.data_start, new_info.data_size)
-                content = new_index.decode_content(new_info, data)
-            except (PackDecodeError, httpx.HTTPError) as e:
-                # cannot be downloaded or fails the size + sha1 check,
-                # the record stays in error, this is unsolvable
-                logger.warning(f'Failed to download {info.path}: {e}')
+            download[index] = (item, new_info, tmp)
+            records.append((item, index, tmp))
+
+        def on_content(index, data):
+            _, new_info, tmp = download[index]
+            new_index.decode_content_to_file(new_info, iter_chunks(data), tmp)
+
+        # data_start is an offset into the new full pack file, range
+        # requests use it directly
+        error = {}
+        if download:
+            error = server.get_file_contents(
+                new_index.version,
+                {index: (new_info.data_start, new_info.data_size) for index, (_, new_info, _) in download.items()},
+                on_content,
+            )
+        for item, index, tmp in records:
+            info = item.info
+            if tmp is None:
                 failed.append(item)
                 continue
-            atomic_write(tmp, content)
+            if index is not None:
+                e = error.get(index)
+                if e is not None:
+                    # cannot be downloaded or fails the size + sha1 check,
+                    # the record stays in error, this is unsolvable
+                    logger.warning(f'Failed to download {info.path}: {e}')
+                    failed.append(item)
+                    continue
             pending.append(PendingFile(
                 info=info, tmp=tmp, mode=info.mode_decoded if info.mode == 1 else None))
         self.pending += pending
@@ -1,8 +1,11 @@
+from collections import deque
+
 import httpx
 from msgspec import Struct
 
 from alasio.deploy.pack.decode_base import PackDecodeError
 from alasio.ext.algorithm.vint import decode_vint
+from alasio.ext.concurrent.threadpool import THREAD_POOL
 
 
 class LatestInfo(Struct):
@@ -16,6 +19,55 @@ class LatestInfo(Struct):
     checksum: str
 
 
+class RangeRequest(Struct):
+    """
+    A single http range request that covers one or more files of the
+    full pack, see coalesce_ranges().
+    """
+    # start offset of the request in the full pack
+    start: int
+    # end offset of the request, exclusive
+    end: int
+    # files in the request sorted by offset, list of (key, offset, size)
+    items: list
+
+
+def coalesce_ranges(ranges, max_gap, max_size):
+    """
+    Sort file ranges by offset and merge nearby ones into range
+    requests.
+
+    Two ranges are merged if the gap between them is not larger than
+    max_gap and the merged request does not exceed max_size. Gap bytes
+    are downloaded and dropped, which is cheaper than another round
+    trip when the gap is small. A single range larger than max_size is
+    still requested as a whole.
+
+    Args:
+        ranges (dict[Any, tuple[int, int]]): key: any hashable key of
+            the file, value: (offset, size) in the full pack
+        max_gap (int): Max gap between two ranges to merge
+        max_size (int): Max size of a merged request
+
+    Returns:
+        list[RangeRequest]: Requests sorted by start offset
+    """
+    requests = []
+    current = None
+    for key, (offset, size) in sorted(ranges.items(), key=lambda kv: kv[1][0]):
+        end = offset + size
+        if current is not None \
+                and offset - current.end <= max_gap \
+                and max(end, current.end) - current.start <= max_size:
+            current.items.append((key, offset, size))
+            if end > current.end:
+                current.end = end
+            continue
+        current = RangeRequest(start=offset, end=end, items=[(key, offset, size)])
+        requests.append(current)
+    return requests
+
+
 class ServerFile:
     """
     HTTP client of the update server, downloads pack files with range
@@ -32,11 +84,21 @@ class ServerFile:
     get_index_pack() downloads the index section with two range
     requests: the header plus the index section length first, then
     the exact range of the index pack.
+
+    get_file_contents() downloads many files at once: ranges are
+    coalesced into a few range requests (see coalesce_ranges) that run
+    concurrently on a pooled client.
     """
 
     # bytes to request first for the header: the pack header plus the
     # index section length vint (at most 8 bytes for a int64 length)
     HEADER_REQUEST_SIZE = 64
+    # ranges with a gap not larger than this are merged into one request
+    MAX_GAP = 65536
+    # max size of a merged request, a larger single file is still one request
+    MAX_REQUEST_SIZE = 8388608
+    # max concurrent range requests in get_file_contents()
+    MAX_CONCURRENCY = 6
 
     def __init__(self, base_url, client=None):
         """
@@ -98,6 +160,129 @@ def get_file_content(self, version, offset, size):
             return response.content[offset:offset + size]
         return response.content
 
+    def get_file_contents(self, version, ranges, callback):
+        """
+        Get many ranges of the full pack of a version from
+        base_url/{version}/full.pack.
+
+        Ranges are sorted and coalesced into range requests, which run
+        on at most MAX_CONCURRENCY threads sharing one client. Response
+        bodies are streamed, each file is passed to the callback as soon
+        as its range is received, so the memory holds one file per
+        request instead of the whole response. Gap bytes between files
+        are dropped.
+
+        Args:
+            version (str): Version to query
+            ranges (dict[Any, tuple[int, int]]): key: any hashable key
+                of the file, value: (offset, size) in the full pack
+            callback (Callable[[Any, bytes], Any]): Called with
+                (key, content) on worker threads when a file is
+                received, e.g. to decode and write a tmp file
+
+        Returns:
+            dict[Any, Exception]: Keys of the failed files and their
+                error. A file fails if its request fails, the response
+                is shorter than its range, or the callback raises
+                PackDecodeError or httpx.HTTPError. Other exceptions
+                from the callback are raised.
+        """
+        requests = deque(coalesce_ranges(ranges, self.MAX_GAP, self.MAX_REQUEST_SIZE))
+        if not requests:
+            return {}
+        url = f'{self.base_url}/{version}/full.pack'
+        error = {}
+        concurrency = min(len(requests), self.MAX_CONCURRENCY)
+
+        def worker(client):
+            # workers share the request queue, deque.popleft() is atomic
+            while 1:
+                try:
+                    request = requests.popleft()
+                except IndexError:
+                    return
+                self._stream_request(client, url, request, callback, error)
+
+        client = self._client
+        if client is None:
+            client = httpx.Client(limits=httpx.Limits(max_connections=concurrency))
+            close = True
+        else:
+            close = False
+        try:
+            if concurrency <= 1:
+                worker(client)
+            else:
+                with THREAD_POOL.wait_jobs() as pool:
+                    for _ in range(concurrency):
+                        pool.start_thread_soon(worker, client)
+        finally:
+            if close:
+                client.close()
+        return error
+
+    @staticmethod
+    def _stream_request(client, url, request, callback, error):
+        """
+        Run a range request and slice the files out of the response
+        stream.
+
+        Args:
+            client (httpx.Client):
+            url (str): URL of the full pack
+            request (RangeRequest):
+            callback (Callable[[Any, bytes], Any]):
+            error (dict[Any, Exception]): Failed keys are set into it
+        """
+        items = request.items
+        index = 0
+        headers = {'Range': f'bytes={request.start}-{request.end - 1}'}
+        try:
+            with client.stream('GET', url, headers=headers) as response:
+                response.raise_for_status()
+                # a 200 response means the server ignored the range
+                # request, the stream starts from the beginning of file
+                position = request.start if response.status_code == 206 else 0
+                buffer = bytearray()
+                for chunk in response.iter_bytes():
+                    buffer += chunk
+                    while index < len(items):
+                        key, offset, size = items[index]
+                        end = offset + size - position
+                        if end > len(buffer):
+                            break
+                        start = offset - position
+                        try:
+                            callback(key, bytes(buffer[start:end]))
+                        except (PackDecodeError, httpx.HTTPError) as e:
+                            error[key] = e
+                        index += 1
+                        # drop bytes before the next file, including gaps
+                        if index < len(items):
+                            drop = items[index][1] - position
+                        else:
+                            drop = len(buffer)
+                        drop = min(drop, end)
+                        if drop > 0:
+                            del buffer[:drop]
+                            position += drop
+                    if index >= len(items):
+                        # every file received, stop reading a full
+                        # response of a server ignoring the range
+                        break
+                    # drop leading bytes before the first pending file
+                    drop = min(items[index][1] - position, len(buffer))
+                    if drop > 0:
+                        del buffer[:drop]
+                        position += drop
+        except httpx.HTTPError as e:
+            for key, _, _ in items[index:]:
+                error[key] = e
+            return
+        for key, offset, size in items[index:]:
+            error[key] = PackDecodeError(
+                f'Failed to download range {offset}~{offset + size}: response too short')
+
     def get_index_pack(self, version):
         """
         Get the index pack of a version from
@@ -8,6 +8,7 @@
 from alasio.ext.concurrent.cmd import run_cmd
 from alasio.ext.concurrent.threadpool import THREAD_POOL
 from alasio.ext.path import PathStr
+from alasio.ext.path.atomic import AtomicWriteBatch
 from alasio.ext.path.calc import to_posix
 
 
@@ -177,7 +178,8 @@ def install(self, wheel):
             wheel (str | PathStr): Path to the .whl file
         """
         wheel = PathStr.new(wheel)
-        with THREAD_POOL.wait_jobs() as pool:
+        # write all files then sync once, instead of fsync every file
+        with AtomicWriteBatch() as batch, THREAD_POOL.wait_jobs() as pool:
             with zipfile.ZipFile(wheel, 'r') as zf:
                 # 1. Find .dist-info folder
                 dist_info_folder = None
@@ -237,7 +239,7 @@ def install(self, wheel):
                         target = self.site_packages / rel_path
 
                     data = zf.read(member)
-                    pool.start_thread_soon(target.file_write, data)
+                    pool.start_thread_soon(batch.write, target, data)
 
                     # Add to record
                     # Path in RECORD should be relative to site-packages
@@ -4,7 +4,6 @@
 from typing import TYPE_CHECKING
 
 from alasio.backend.worker.bridge import BackendBridge
-from alasio.backend.worker.event import ConfigEvent
 from alasio.base.image.imfile import image_encode
 from alasio.device.config import DeviceConfig
 from alasio.ext.cache import cached_property_threadsafe
@@ -112,6 +111,27 @@ def ensure_first_screenshot(self):
             pass
         return self.screenshot()
 
+    @cached_property_threadsafe
+    def preview_encoder(self):
+        """
+        Encoder thread that encodes previews off the automation thread
+
+        Returns:
+            PreviewEncoder:
+        """
+        # local import to avoid importing opencv globally
+        from alasio.base.image.impreview import PreviewEncoder
+        backend = BackendBridge()
+
+        def send(data):
+            backend.send_preview(data).acquire()
+
+        def on_skip():
+            # screen not changed, keep preview requested so it will be sent on next changed frame
+            backend.preview_requested.set()
+
+        return PreviewEncoder(send=send, on_skip=on_skip)
+
     def backend_send_preview(self, force=None):
         """
         Send image preview to backend if preview requested and same config
@@ -126,9 +146,10 @@ def backend_send_preview(self, force=None):
             return
 
         if force is None:
-            force = backend.preview_requested.get_and_clear()
-            if not force:
+            if not backend.preview_requested.get_and_clear():
                 return
+            # backend may force a preview even if screen didn't change, e.g. new subscriber
+            force = backend.preview_force.get_and_clear()
 
         try:
             image = self.image
@@ -143,14 +164,14 @@ def backend_send_preview(self, force=None):
             return
 
         # local import to avoid importing opencv globally
-        from alasio.base.image.impreview import image_preview
+        from alasio.base.image.impreview import preview_profile
         now = self._image_time
         if now <= 0:
             # this shouldn't happen
             now = time.time()
-        data = image_preview(image, now=now)
+        scale, quality = preview_profile(backend.preview_subscribers, backend.preview_speed)
+        self.preview_encoder.submit(image, now=now, scale=scale, quality=quality, force=force)
         self._last_preview_time = now
-        return backend.send(ConfigEvent(t='Preview', v=data)).acquire()
 
     def backend_send_preview_stop(self):
         """
@@ -162,9 +183,8 @@ def backend_send_preview_stop(self):
         if not backend.inited or not backend.config_name:
             return
 
-        # local import to avoid importing opencv globally
-        from alasio.base.image.impreview import image_preview_stop
-        data = image_preview_stop()
-        backend.send(ConfigEvent(t='Preview', v=data)).acquire()
+        # send through encoder, so stop signal is ordered after pending previews
+        self.preview_encoder.submit_stop()
+        self.preview_encoder.wait_idle()
         # clear image cache, so it never sends again until next screenshot call
         self.on_idle()
@@ -0,0 +1,229 @@
+import struct
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+import msgspec
+
+from alasio.base.exception import ScriptError
+from alasio.device.base import DeviceBase
+from alasio.device.config import DeviceConfig
+from alasio.ext.compress.algo_zstd import zstd_compress, zstd_decompress
+from alasio.ext.path.atomic import atomic_read_bytes_stream, atomic_write_stream
+from alasio.logger import logger
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Frame log is a sequence of records, each record is a 4-byte little-endian length and a msgpack encoded FrameRecord
+_LENGTH = struct.Struct('<I')
+
+
+class ReplayEnd(Exception):
+    """
+    Raised by ReplayDevice.screenshot() when all frames are replayed
+    """
+    pass
+
+
+class FrameRecord(msgspec.Struct, array_like=True):
+    # Screenshot time in unix timestamp
+    time: float
+    shape: "tuple[int, ...]"
+    dtype: str
+    # True if data is compressed with previous frame as zstd dictionary
+    # Screenshots in a state loop are mostly the same, so delta frames are much smaller
+    delta: bool
+    # zstd compressed image
+    data: bytes
+
+
+def iter_frame_log_encode(frames, level=3):
+    """
+    Args:
+        frames (Iterable[dict]): {"time": datetime | float, "image": np.ndarray}, like DeviceBase.screenshot_deque
+        level (int): zstd compression level
+
+    Yields:
+        bytes: Records of frame log
+    """
+    encoder = msgspec.msgpack.Encoder()
+    prev = None
+    prev_shape = None
+    for frame in frames:
+        image = frame['image']
+        imtime = frame['time']
+        if isinstance(imtime, datetime):
+            imtime = imtime.timestamp()
+        data = image.tobytes()
+        delta = prev is not None and prev_shape == image.shape
+        compressed = zstd_compress(data, source=prev if delta else None, level=level)
+        record = encoder.encode(FrameRecord(
+            time=imtime, shape=image.shape, dtype=image.dtype.str, delta=delta, data=compressed))
+        yield _LENGTH.pack(len(record)) + record
+        prev = data
+        prev_shape = image.shape
+
+
+def save_frame_log(file, frames, level=3):
+    """
+    Save frames into a zstd compressed frame log
+
+    Args:
+        file (str):
+        frames (Iterable[dict]): {"time": datetime | float, "image": np.ndarray}, like DeviceBase.screenshot_deque
+        level (int): zstd compression level
+    """
+    atomic_write_stream(file, iter_frame_log_encode(frames, level=level))
+
+
+def iter_frame_log(file):
+    """
+    Read frames from frame log
+
+    Args:
+        file (str):
+
+    Yields:
+        tuple[float, np.ndarray]: Screenshot time and image, image is read-only
+
+    Raises:
+        FileNotFoundError:
+        ValueError: If frame log is broken
+    """
+    import numpy as np
+    decoder = msgspec.msgpack.Decoder(FrameRecord)
+    buffer = bytearray()
+    prev = None
+    for chunk in atomic_read_bytes_stream(file):
+        buffer += chunk
+        while 1:
+            if len(buffer) < 4:
+                break
+            length = _LENGTH.unpack_from(buffer)[0]
+            end = 4 + length
+            if len(buffer) < end:
+                break
+            try:
+                record = decoder.decode(buffer[4:end])
+            except msgspec.DecodeError as e:
+                raise ValueError(f'Broken frame log "{file}": {e}') from None
+            del buffer[:end]
+            if record.delta and prev is None:
+                raise ValueError(f'Broken frame log "{file}": delta frame without previous frame')
+            data = zstd_decompress(record.data, source=prev if record.delta else None)
+            prev = data
+            image = np.frombuffer(data, dtype=record.dtype).reshape(record.shape)
+            yield record.time, image
+    if buffer:
+        raise ValueError(f'Broken frame log "{file}": {len(buffer)} bytes remain')
+
+
+class ReplayDevice(DeviceBase):
+    """
+    A device that replays screenshots from frame log, to run task logic offline without emulator.
+
+    Examples:
+        # record during real runs
+        save_frame_log('./log/frames.zst', device.screenshot_deque)
+        # replay
+        device = ReplayDevice(DeviceConfig(), './log/frames.zst')
+    """
+    # Default frame log, so ModuleBase can create ReplayDevice from annotation
+    REPLAY_FILE = ''
+    # Replay speed relative to recorded,
+    # 1 to wait for recorded intervals between screenshots, 2 to replay twice as fast, 0 to replay at max speed
+    REPLAY_SPEED = 0.
+    # True to restart from the first frame after the last one, False to raise ReplayEnd
+    REPLAY_LOOP = False
+
+    def __init__(self, config: DeviceConfig, file: str = '', preload=True):
+        """
+        Args:
+            config:
+            file: Frame log, default to REPLAY_FILE
+            preload: True to decode all frames on init, so replay costs nothing on screenshot().
+                False to decode frames on demand, for long frame logs that don't fit in memory.
+        """
+        super().__init__(config)
+        if not file:
+            file = self.REPLAY_FILE
+        if not file:
+            raise ScriptError(f'{self.__class__.__name__} has no frame log to replay')
+        self.file = file
+        self.preload = preload
+        self.frames: "list[tuple[float, np.ndarray]]" = list(iter_frame_log(file)) if preload else []
+        # amount of frames replayed
+        self.frame_count = 0
+        self._frame_iter = None
+        # time of the first frame in recorded time and in perf_counter()
+        self._record_start = 0.
+        self._replay_start = 0.
+        if preload:
+            logger.info(f'[{self.__class__.__name__}] Loaded {len(self.frames)} frames from {file}')
+
+    def _iter_frames(self):
+        if self.preload:
+            return iter(self.frames)
+        else:
+            return iter_frame_log(self.file)
+
+    def _next_frame(self):
+        """
+        Returns:
+            tuple[float, np.ndarray]:
+
+        Raises:
+            ReplayEnd:
+        """
+        if self._frame_iter is None:
+            self._frame_iter = self._iter_frames()
+        try:
+            return next(self._frame_iter)
+        except StopIteration:
+            pass
+        if not self.REPLAY_LOOP:
+            raise ReplayEnd(f'All {self.frame_count} frames replayed')
+        # restart, and restart timing as well
+        self._frame_iter = self._iter_frames()
+        self._replay_start = 0.
+        try:
+            return next(self._frame_iter)
+        except StopIteration:
+            raise ReplayEnd('Frame log is empty') from None
+
+    def screenshot(self):
+        """
+        Returns:
+            np.ndarray:
+
+        Raises:
+            ReplayEnd:
+        """
+        imtime, image = self._next_frame()
+        speed = self.REPLAY_SPEED
+        if speed > 0:
+            now = time.perf_counter()
+            if self._replay_start <= 0:
+                self._record_start = imtime
+                self._replay_start = now
+            else:
+                wait = self._replay_start + (imtime - self._record_start) / speed - now
+                if wait > 0:
+                    time.sleep(wait)
+
+        self.frame_count += 1
+        self.image = image
+        self._image_time = time.time()
+        self.screenshot_deque_append(image)
+        return image
+
+    def reset(self):
+        """
+        Replay from the first frame again
+        """
+        self._frame_iter = None
+        self._replay_start = 0.
+        self.frame_count = 0
+        self.image = None
+        self._image_time = 0.
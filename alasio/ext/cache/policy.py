@@ -0,0 +1,310 @@
+from collections import OrderedDict
+from typing import Any, Callable
+
+from msgspec import Struct
+
+# Eviction policies for ResourceCache and ResourceCacheTTL.
+# A policy tracks keys only, values stay in the dict of ResourceCache so cache hits remain a dict lookup.
+# Policies are not thread-safe, ResourceCache calls them under its own lock.
+
+
+class CacheStats(Struct):
+    # Cache hits and misses
+    hits: int = 0
+    misses: int = 0
+    # Entries removed by policy to stay within capacity
+    evictions: int = 0
+    # Entries refused by admission, refused entries are also counted as evictions
+    rejections: int = 0
+    # Amount of entries in cache
+    size: int = 0
+    # Total weight of entries in policy, equals amount of entries if policy has no sizer
+    weight: int = 0
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        if total:
+            return self.hits / total
+        return 0.
+
+
+class CachePolicy:
+    """
+    Base policy that never evicts, only records statistics
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejections = 0
+
+    @property
+    def weight(self):
+        return 0
+
+    def access(self, key: str):
+        """
+        Called on cache hit.
+        Key may not be tracked by policy, if another thread evicted it just now.
+        """
+        self.hits += 1
+
+    def admit(self, key: str, value: Any) -> "list[str]":
+        """
+        Called after a new value is loaded and set into cache.
+
+        Returns:
+            list[str]: Keys to remove from cache, may contain `key` itself if it is not admitted
+        """
+        self.misses += 1
+        return []
+
+    def remove(self, key: str):
+        """
+        Called when key is removed from cache outside the policy, like gc() of ResourceCacheTTL
+        """
+        pass
+
+    def clear(self):
+        """
+        Called when cache is cleared
+        """
+        pass
+
+    def stats(self, size=0) -> CacheStats:
+        """
+        Args:
+            size (int): Amount of entries in cache
+        """
+        return CacheStats(
+            hits=self.hits, misses=self.misses, evictions=self.evictions, rejections=self.rejections,
+            size=size, weight=self.weight,
+        )
+
+
+class LRUPolicy(CachePolicy):
+    """
+    Evict the least recently used entries when total weight exceeds `maxsize`.
+    Every entry weights 1, so `maxsize` is the maximum amount of entries.
+    """
+
+    def __init__(self, maxsize: int = 128):
+        super().__init__()
+        self.maxsize = maxsize
+        # key: weight of entry, in order of last access
+        self._order: "OrderedDict[str, int]" = OrderedDict()
+        self._weight = 0
+
+    @property
+    def weight(self):
+        return self._weight
+
+    def weigh(self, key: str, value: Any) -> int:
+        return 1
+
+    def access(self, key: str):
+        self.hits += 1
+        try:
+            self._order.move_to_end(key)
+        except KeyError:
+            pass
+
+    def admit(self, key: str, value: Any) -> "list[str]":
+        self.misses += 1
+        order = self._order
+        weight = self.weigh(key, value)
+        if weight > self.maxsize:
+            # too large to be cached, don't flush the entire cache for it
+            self.remove(key)
+            self.evictions += 1
+            self.rejections += 1
+            return [key]
+
+        old = order.pop(key, 0)
+        order[key] = weight
+        self._weight += weight - old
+        evicted = []
+        while self._weight > self.maxsize:
+            evict, old = order.popitem(last=False)
+            self._weight -= old
+            evicted.append(evict)
+        self.evictions += len(evicted)
+        return evicted
+
+    def remove(self, key: str):
+        old = self._order.pop(key, 0)
+        self._weight -= old
+
+    def clear(self):
+        self._order.clear()
+        self._weight = 0
+
+
+class SizedLRUPolicy(LRUPolicy):
+    """
+    Evict the least recently used entries when total size in bytes exceeds `maxsize`.
+    Entries larger than `maxsize` are not cached.
+    """
+
+    def __init__(self, maxsize: int = 64 * 1024 * 1024, sizer: "Callable[[Any], int]" = len):
+        """
+        Args:
+            maxsize: Byte budget of the entire cache
+            sizer: A function that receives a cached value and returns its size in bytes,
+                an estimation is enough, e.g. file size of the source file.
+        """
+        super().__init__(maxsize)
+        self.sizer = sizer
+
+    def weigh(self, key: str, value: Any) -> int:
+        return self.sizer(value)
+
+
+# halve every 4-bit counter of FrequencySketch in one bytes.translate() call
+_HALVE_TABLE = bytes(n >> 1 for n in range(256))
+_HASH_MASK = 0xFFFFFFFFFFFFFFFF
+# 128-bit odd multiplier, hash is multiplied once and sliced into 4 row indexes of 32 bits
+_HASH_MUL = 0x9E3779B97F4A7C15C2B2AE3D27D4EB4F
+
+
+class FrequencySketch:
+    """
+    Count-min sketch with 4 rows of saturating counters (max 15), to estimate access frequency of keys.
+    All counters are halved after `10 * width` increments, so the history fades out over time.
+    """
+
+    def __init__(self, capacity: int):
+        # 4 counters per cached entry in each row, to keep collisions rare
+        width = 16
+        while width < capacity * 4:
+            width <<= 1
+        self.mask = width - 1
+        self.rows = [bytearray(width) for _ in range(4)]
+        self.sample_size = 10 * width
+        self.additions = 0
+
+    def _indexes(self, key):
+        h = (hash(key) & _HASH_MASK) * _HASH_MUL
+        mask = self.mask
+        return (h >> 64) & mask, (h >> 96) & mask, (h >> 128) & mask, (h >> 160) & mask
+
+    def frequency(self, key: str) -> int:
+        r0, r1, r2, r3 = self.rows
+        i0, i1, i2, i3 = self._indexes(key)
+        return min(r0[i0], r1[i1], r2[i2], r3[i3])
+
+    def increment(self, key: str):
+        # unrolled, this is called on every cache hit
+        r0, r1, r2, r3 = self.rows
+        i0, i1, i2, i3 = self._indexes(key)
+        added = False
+        if r0[i0] < 15:
+            r0[i0] += 1
+            added = True
+        if r1[i1] < 15:
+            r1[i1] += 1
+            added = True
+        if r2[i2] < 15:
+            r2[i2] += 1
+            added = True
+        if r3[i3] < 15:
+            r3[i3] += 1
+            added = True
+        if added:
+            self.additions += 1
+            if self.additions >= self.sample_size:
+                self.reset()
+
+    def reset(self):
+        self.rows = [bytearray(row.translate(_HALVE_TABLE)) for row in self.rows]
+        self.additions //= 2
+
+
+class TinyLFUPolicy(CachePolicy):
+    """
+    W-TinyLFU, keeps at most `maxsize` entries.
+
+    New entries enter a small LRU window (1% of capacity).
+    Entries leaving the window compete with the LRU victim of the main cache by estimated access frequency,
+    the less frequent one is evicted, so one-time scans won't flush frequently used entries.
+    The main cache is a segmented LRU, entries hit twice are moved from probation (20%) to protected (80%).
+    """
+
+    def __init__(self, maxsize: int = 128):
+        super().__init__()
+        self.maxsize = maxsize
+        self.window_max = max(1, maxsize // 100)
+        self.main_max = max(0, maxsize - self.window_max)
+        self.protected_max = self.main_max * 4 // 5
+        self.sketch = FrequencySketch(maxsize)
+        self._window: "OrderedDict[str, None]" = OrderedDict()
+        self._probation: "OrderedDict[str, None]" = OrderedDict()
+        self._protected: "OrderedDict[str, None]" = OrderedDict()
+
+    @property
+    def weight(self):
+        return len(self._window) + len(self._probation) + len(self._protected)
+
+    def access(self, key: str):
+        self.hits += 1
+        self.sketch.increment(key)
+        if key in self._window:
+            self._window.move_to_end(key)
+        elif key in self._protected:
+            self._protected.move_to_end(key)
+        elif key in self._probation:
+            del self._probation[key]
+            self._protected[key] = None
+            if len(self._protected) > self.protected_max:
+                # demote to the most recent of probation
+                demote, _ = self._protected.popitem(last=False)
+                self._probation[demote] = None
+
+    def admit(self, key: str, value: Any) -> "list[str]":
+        self.misses += 1
+        self.sketch.increment(key)
+        self.remove(key)
+        window = self._window
+        window[key] = None
+        if len(window) <= self.window_max:
+            return []
+
+        candidate, _ = window.popitem(last=False)
+        probation = self._probation
+        if len(probation) + len(self._protected) < self.main_max:
+            probation[candidate] = None
+            return []
+
+        if probation:
+            victim = next(iter(probation))
+            victim_queue = probation
+        elif self._protected:
+            victim = next(iter(self._protected))
+            victim_queue = self._protected
+        else:
+            # no main cache when maxsize is too small
+            self.evictions += 1
+            self.rejections += 1
+            return [candidate]
+
+        if self.sketch.frequency(candidate) > self.sketch.frequency(victim):
+            del victim_queue[victim]
+            probation[candidate] = None
+            self.evictions += 1
+            return [victim]
+        else:
+            self.evictions += 1
+            self.rejections += 1
+            return [candidate]
+
+    def remove(self, key: str):
+        self._window.pop(key, None)
+        self._probation.pop(key, None)
+        self._protected.pop(key, None)
+
+    def clear(self):
+        self._window.clear()
+        self._probation.clear()
+        self._protected.clear()
@@ -1,16 +1,70 @@
-from threading import Lock
+import os
+from threading import Event, Lock
 from time import time
-from typing import Generic, TypeVar
+from typing import Generic, Optional, TypeVar
+
+from alasio.ext.cache.policy import CachePolicy, CacheStats
+from alasio.ext.concurrent.threadpool import THREAD_POOL
+from alasio.logger import logger
 
 T = TypeVar('T')
 
 
-class ResourceCacheTTL(Generic[T]):
+class _Flight:
+    """
+    A load in progress.
+    The first caller of a missing key loads it, other callers of the same key wait for its result.
+    """
+    __slots__ = ('event', 'value', 'error')
+
     def __init__(self):
+        self.event = Event()
+        self.value = None
+        self.error: "Optional[BaseException]" = None
+
+    def set_result(self, value):
+        self.value = value
+        self.event.set()
+
+    def set_error(self, error: BaseException):
+        self.error = error
+        self.event.set()
+
+    def result(self):
+        self.event.wait()
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+class ResourceCache(Generic[T]):
+    # Seconds to cache the exception of load_resource(), 0 to disable.
+    # Callers within the period receive the same exception without loading again,
+    # so a broken or missing file is not read again and again by every caller.
+    ERROR_TTL = 0.
+    # True to check mtime of cached files on cache hit, at most once per REFRESH_INTERVAL seconds.
+    # Changed files are reloaded on THREAD_POOL in background, callers receive the old value until reload finished.
+    # Keys must be file paths to enable this.
+    REFRESH_AHEAD = False
+    REFRESH_INTERVAL = 2.
+
+    def __init__(self, policy: Optional[CachePolicy] = None):
+        """
+        Args:
+            policy: Eviction policy from alasio.ext.cache.policy,
+                None to keep resources until gc(), which has no overhead on cache hit
+        """
         self._create_lock = Lock()
         self._cache: "dict[str, T]" = {}
-        self._lock: "dict[str, Lock]" = {}
-        self._last_use: "dict[str, float]" = {}
+        # loads in progress
+        self._flight: "dict[str, _Flight]" = {}
+        # key: (expire time, exception)
+        self._error: "dict[str, tuple[float, Exception]]" = {}
+        # mtime of files when they were loaded, and last time of mtime check, for REFRESH_AHEAD
+        self._mtime: "dict[str, Optional[int]]" = {}
+        self._checked: "dict[str, float]" = {}
+        self._policy = policy
+        self._policy_lock = Lock()
 
     def load_resource(self, file: str, **kwargs) -> T:
         """
@@ -23,31 +77,43 @@ def get(self, file: str, **kwargs) -> T:
         """
         Get resource from cache
         If not in cache, load and cache it.
+        Concurrent callers of the same missing key wait for the one that loads it.
         """
         # fast path, return directly
         try:
             value = self._cache[file]
-            self._last_use[file] = time()
-            return value
         except KeyError:
             pass
+        else:
+            if self._policy is not None:
+                self._policy_access(file)
+            if self.REFRESH_AHEAD:
+                self._refresh_check(file, kwargs)
+            return value
 
-        # create pre-resource lock
-        with self._create_lock:
-            if file in self._lock:
-                try:
-                    lock = self._lock[file]
-                except KeyError:
-                    # race condition
-                    lock = Lock()
-                    self._lock[file] = lock
+        return self._get_miss(file, kwargs)
+
+    def _touch(self, file):
+        """
+        Called when resource is loaded or waited by another caller
+        """
+        pass
+
+    def _get_miss(self, file, kwargs):
+        # negative cache
+        if self._error:
+            try:
+                expire, error = self._error[file]
+            except KeyError:
+                pass
             else:
-                lock = Lock()
-                self._lock[file] = lock
+                if expire > time():
+                    raise error
+                self._error.pop(file, None)
 
-        with lock:
+        with self._create_lock:
             # double-checked locking
-            # check if the value was computed before the lock was acquired
+            # check if the value was loaded before the lock was acquired
             # check if in cache first to bypass except KeyError for faster because it's not in cache at happy path
             if file in self._cache:
                 try:
@@ -56,25 +122,201 @@ def get(self, file: str, **kwargs) -> T:
                     # race condition
                     pass
                 else:
-                    self._last_use[file] = time()
-                    # remove pre-resource lock to reduce memory
-                    try:
-                        del self._lock[file]
-                    except KeyError:
-                        pass
+                    self._touch(file)
+                    if self._policy is not None:
+                        self._policy_access(file)
                     return value
+            try:
+                flight = self._flight[file]
+            except KeyError:
+                # we are the first caller, load it
+                flight = _Flight()
+                self._flight[file] = flight
+                leader = True
+            else:
+                leader = False
 
-            # load
-            value = self.load_resource(file, **kwargs)
-            self._cache[file] = value
-            self._last_use[file] = time()
-            # remove pre-resource lock to reduce memory
+        if not leader:
+            # callers that waited for another one to load count as hits, they don't load
+            value = flight.result()
+            self._touch(file)
+            if self._policy is not None:
+                self._policy_access(file)
+            return value
+
+        try:
+            value = self._load(file, kwargs)
+        except BaseException as e:
+            # flight must end on any exception, including KeyboardInterrupt,
+            # otherwise callers waiting for this flight would block forever
+            if self.ERROR_TTL > 0 and isinstance(e, Exception):
+                self._error[file] = (time() + self.ERROR_TTL, e)
+            self._end_flight(file)
+            flight.set_error(e)
+            raise
+        # value is in cache before flight ends, so later callers won't start another flight
+        self._end_flight(file)
+        flight.set_result(value)
+        return value
+
+    def _end_flight(self, file):
+        with self._create_lock:
             try:
-                del self._lock[file]
+                del self._flight[file]
             except KeyError:
                 pass
+
+    def _load(self, file, kwargs, refresh=False):
+        if self.REFRESH_AHEAD:
+            # get mtime before load, so a change during load will trigger another refresh
+            mtime = self._get_mtime(file)
+        value = self.load_resource(file, **kwargs)
+        self._touch(file)
+        if self._policy is None:
+            self._cache[file] = value
+        elif refresh:
+            self._policy_replace(file, value)
+        else:
+            self._policy_admit(file, value)
+        if self.REFRESH_AHEAD:
+            self._mtime[file] = mtime
+            self._checked[file] = time()
+        return value
+
+    @staticmethod
+    def _get_mtime(file):
+        try:
+            return os.stat(file).st_mtime_ns
+        except OSError:
+            return None
+
+    def _refresh_check(self, file, kwargs):
+        now = time()
+        try:
+            if now - self._checked[file] < self.REFRESH_INTERVAL:
+                return
+        except KeyError:
+            pass
+        self._checked[file] = now
+        if self._get_mtime(file) == self._mtime.get(file):
+            return
+
+        with self._create_lock:
+            if file in self._flight:
+                # already loading
+                return
+            flight = _Flight()
+            self._flight[file] = flight
+        THREAD_POOL.start_thread_soon(self._refresh, file, kwargs, flight)
+
+    def _refresh(self, file, kwargs, flight):
+        """
+        Reload a changed file in background
+        """
+        try:
+            value = self._load(file, kwargs, refresh=True)
+        except Exception as e:
+            # keep using the old value, retry at next REFRESH_INTERVAL
+            logger.warning(f'[{self.__class__.__name__}] Failed to refresh "{file}": {e}')
+            self._end_flight(file)
+            flight.set_error(e)
+            return
+        except BaseException as e:
+            self._end_flight(file)
+            flight.set_error(e)
+            raise
+        self._end_flight(file)
+        flight.set_result(value)
+
+    def _policy_access(self, file):
+        with self._policy_lock:
+            self._policy.access(file)
+
+    def _policy_admit(self, file, value):
+        cache = self._cache
+        with self._policy_lock:
+            cache[file] = value
+            for evict in self._policy.admit(file, value):
+                self._evict(evict)
+
+    def _policy_replace(self, file, value):
+        with self._policy_lock:
+            if file in self._cache:
+                # refreshed value replaces the old one, no need to disturb policy
+                self._cache[file] = value
+                return
+        # evicted while refreshing
+        self._policy_admit(file, value)
+
+    def _evict(self, file):
+        self._cache.pop(file, None)
+        self._mtime.pop(file, None)
+        self._checked.pop(file, None)
+
+    def stats(self) -> CacheStats:
+        """
+        Get hit/miss/eviction statistics from policy.
+        Cache without policy records nothing but its size.
+        """
+        if self._policy is None:
+            return CacheStats(size=len(self._cache), weight=len(self._cache))
+        with self._policy_lock:
+            return self._policy.stats(size=len(self._cache))
+
+    def gc(self):
+        """
+        Clear all resources from cache.
+        """
+        # .clear() is an atomic operation in CPython and thus thread-safe.
+        if self._policy is None:
+            self._cache.clear()
+        else:
+            with self._policy_lock:
+                self._cache.clear()
+                self._policy.clear()
+        self._error.clear()
+        self._mtime.clear()
+        self._checked.clear()
+
+
+class ResourceCacheTTL(ResourceCache[T]):
+    def __init__(self, policy: Optional[CachePolicy] = None):
+        """
+        Args:
+            policy: Eviction policy from alasio.ext.cache.policy,
+                None to keep resources until they are idle, which has no overhead on cache hit
+        """
+        super().__init__(policy)
+        self._last_use: "dict[str, float]" = {}
+
+    def get(self, file: str, **kwargs) -> T:
+        """
+        Get resource from cache
+        If not in cache, load and cache it.
+        Concurrent callers of the same missing key wait for the one that loads it.
+        """
+        # fast path, return directly
+        try:
+            value = self._cache[file]
+            self._last_use[file] = time()
+        except KeyError:
+            pass
+        else:
+            if self._policy is not None:
+                self._policy_access(file)
+            if self.REFRESH_AHEAD:
+                self._refresh_check(file, kwargs)
             return value
 
+        return self._get_miss(file, kwargs)
+
+    def _touch(self, file):
+        self._last_use[file] = time()
+
+    def _evict(self, file):
+        super()._evict(file)
+        self._last_use.pop(file, None)
+
     def gc(self, idle=60):
         """
         Release resources that have not been used for more than 60s
@@ -107,76 +349,14 @@ def gc(self, idle=60):
                 del last_use[file]
             except KeyError:
                 pass
+            self._mtime.pop(file, None)
+            self._checked.pop(file, None)
+            if self._policy is not None:
+                with self._policy_lock:
+                    self._policy.remove(file)
 
-
-class ResourceCache(Generic[T]):
-    def __init__(self):
-        self._create_lock = Lock()
-        self._cache: "dict[str, T]" = {}
-        self._lock: "dict[str, Lock]" = {}
-
-    def load_resource(self, file: str, **kwargs) -> T:
-        """
-        Load resource directly.
-        Subclasses must implement this
-        """
-        raise NotImplementedError
-
-    def get(self, file: str, **kwargs) -> T:
-        """
-        Get resource from cache
-        If not in cache, load and cache it.
-        """
-        # fast path, return directly
-        try:
-            return self._cache[file]
-        except KeyError:
-            pass
-
-        # create pre-resource lock
-        with self._create_lock:
-            if file in self._lock:
-                try:
-                    lock = self._lock[file]
-                except KeyError:
-                    # race condition
-                    lock = Lock()
-                    self._lock[file] = lock
-            else:
-                lock = Lock()
-                self._lock[file] = lock
-
-        with lock:
-            # double-checked locking
-            # check if the value was computed before the lock was acquired
-            # check if in cache first to bypass except KeyError for faster because it's not in cache at happy path
-            if file in self._cache:
-                try:
-                    value = self._cache[file]
-                except KeyError:
-                    # race condition
-                    pass
-                else:
-                    # remove pre-resource lock to reduce memory
-                    try:
-                        del self._lock[file]
-                    except KeyError:
-                        pass
-                    return value
-
-            # load
-            value = self.load_resource(file, **kwargs)
-            self._cache[file] = value
-            # remove pre-resource lock to reduce memory
-            try:
-                del self._lock[file]
-            except KeyError:
-                pass
-            return value
-
-    def gc(self):
-        """
-        Clear all resources from cache.
-        """
-        # .clear() is an atomic operation in CPython and thus thread-safe.
-        self._cache.clear()
+        # drop expired errors
+        now = time()
+        for file, (expire, _) in list(self._error.items()):
+            if expire <= now:
+                self._error.pop(file, None)
@@ -1,5 +1,8 @@
 import lzma
 
+# Default output chunk size of lzma_decompress_iter(), 256KB
+CHUNK_SIZE = 262144
+
 
 def _lzma_dictsize(length, max_dict_size=None):
     """
@@ -81,3 +84,35 @@ def lzma_decompress(data):
     # LZMA2 raw stream contains the dictionary size in its header
     # so only the filter id is required for decompression
     return lzma.decompress(data, format=lzma.FORMAT_RAW, filters=[{"id": lzma.FILTER_LZMA2}])
+
+
+def lzma_decompress_iter(chunks, chunk_size=CHUNK_SIZE):
+    """
+    Streaming version of lzma_decompress(), memory usage is bounded by chunk size
+    instead of the decompressed size.
+
+    Args:
+        chunks (Iterable[bytes | memoryview]): Compressed data in chunks
+        chunk_size (int): Max size of each output chunk. Defaults to 256KB.
+
+    Yields:
+        bytes: Decompressed data
+
+    Raises:
+        EOFError: If compressed data ends before the end-of-stream marker
+    """
+    decompressor = lzma.LZMADecompressor(format=lzma.FORMAT_RAW, filters=[{"id": lzma.FILTER_LZMA2}])
+    for chunk in chunks:
+        if decompressor.eof:
+            # lzma.decompress() raises on trailing data too
+            raise lzma.LZMAError('Trailing data after end of stream')
+        out = decompressor.decompress(chunk, max_length=chunk_size)
+        if out:
+            yield out
+        # drain the buffered input without feeding more
+        while not decompressor.needs_input and not decompressor.eof:
+            out = decompressor.decompress(b'', max_length=chunk_size)
+            if out:
+                yield out
+    if not decompressor.eof:
+        raise EOFError('Compressed data ended before the end-of-stream marker was reached')
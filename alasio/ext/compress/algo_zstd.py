@@ -1,5 +1,8 @@
 import zstandard as zstd
 
+# Default output chunk size of zstd_decompress_iter(), 256KB
+CHUNK_SIZE = 262144
+
 
 def zstd_compress(data, source=None, level=22, magicless=True):
     """
@@ -65,3 +68,87 @@ def zstd_decompress(data, source=None):
     )
     out = decompressor.decompress(data)
     return out
+
+
+class _ChunkReader:
+    """
+    File-like reader over an iterable of bytes chunks,
+    so zstd stream APIs can pull from a generator.
+    """
+
+    def __init__(self, chunks):
+        self._iter = iter(chunks)
+        self._buffer = b''
+
+    def _fill(self, size):
+        while len(self._buffer) < size:
+            try:
+                chunk = next(self._iter)
+            except StopIteration:
+                return
+            self._buffer += bytes(chunk)
+
+    def peek(self, size):
+        """
+        Args:
+            size (int):
+
+        Returns:
+            bytes: At most `size` bytes, not consumed
+        """
+        self._fill(size)
+        return self._buffer[:size]
+
+    def read(self, size=-1):
+        """
+        Args:
+            size (int): Max bytes to read, -1 to read all
+
+        Returns:
+            bytes: Empty bytes on EOF
+        """
+        if size < 0:
+            for chunk in self._iter:
+                self._buffer += bytes(chunk)
+            data = self._buffer
+            self._buffer = b''
+            return data
+        if not self._buffer:
+            # return what the next chunk has, don't wait for `size` bytes
+            self._fill(1)
+        data = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return data
+
+
+def zstd_decompress_iter(chunks, source=None, chunk_size=CHUNK_SIZE):
+    """
+    Streaming version of zstd_decompress(), memory usage is bounded by chunk size
+    instead of the decompressed size.
+
+    Args:
+        chunks (Iterable[bytes | memoryview]): Compressed data in chunks
+        source (bytes | memoryview): Old file data as zstd dictionary to
+            decompress like `zstd -d --patch-from`
+        chunk_size (int): Max size of each output chunk. Defaults to 256KB.
+
+    Yields:
+        bytes: Decompressed data
+    """
+    if source is None:
+        dict_data = None
+    else:
+        dict_data = zstd.ZstdCompressionDict(source)
+
+    reader = _ChunkReader(chunks)
+    # Auto-detect format, same as zstd_decompress()
+    if reader.peek(len(zstd.FRAME_HEADER)) == zstd.FRAME_HEADER:
+        fmt = zstd.FORMAT_ZSTD1
+    else:
+        fmt = zstd.FORMAT_ZSTD1_MAGICLESS
+
+    decompressor = zstd.ZstdDecompressor(
+        dict_data=dict_data,
+        format=fmt,
+    )
+    yield from decompressor.read_to_iter(reader, read_size=chunk_size, write_size=chunk_size)
@@ -9,6 +9,7 @@
     Error,
     Job,
     JobKill,
+    MapIterator,
     WorkerThread,
     remove_tb_frames,
 )
@@ -128,6 +129,15 @@ def _ensure_worker(self):
             worker.thread.start()
             # logger.info(f'New worker thread: {worker.default_name}')
 
+    def _remove_worker(self, worker):
+        """
+        Called when worker gets killed, create a replacement if there are jobs waiting
+        """
+        self.all_workers.pop(worker, None)
+        self.idle_workers.pop(worker, None)
+        if not self.task_queue.empty():
+            self._ensure_worker()
+
     def enqueue(
         self,
         func: Callable[[ParamP], ResultT],
@@ -148,6 +158,50 @@ def enqueue(
         self._ensure_worker()
         return job
 
+    def imap(self, func, iterable, priority, chunksize=0, window=0):
+        """
+        Lazy map on threads, items are run in chunks, results are yielded in input order.
+        See ThreadPool.imap()
+
+        Args:
+            func (Callable):
+            iterable:
+            priority: Lower priority to run first, all chunks have the same priority
+            chunksize (int): Amount of items in each job, 0 for adaptive
+            window (int): Max amount of chunks in flight, 0 for 2 * pool_size
+
+        Returns:
+            MapIterator:
+        """
+        if window <= 0:
+            window = self.pool_size * 2
+        return MapIterator(self._priority_submit(priority), func, iterable, chunksize=chunksize, window=window)
+
+    def imap_unordered(self, func, iterable, priority, chunksize=0, window=0):
+        """
+        Same as imap() but results are yielded as soon as chunks finish
+
+        Args:
+            func (Callable):
+            iterable:
+            priority: Lower priority to run first, all chunks have the same priority
+            chunksize (int): Amount of items in each job, 0 for adaptive
+            window (int): Max amount of chunks in flight, 0 for 2 * pool_size
+
+        Returns:
+            MapIterator:
+        """
+        if window <= 0:
+            window = self.pool_size * 2
+        return MapIterator(self._priority_submit(priority), func, iterable, chunksize=chunksize, window=window,
+                           ordered=False)
+
+    def _priority_submit(self, priority):
+        def submit(func, *args):
+            return self.enqueue(func, priority, *args)
+
+        return submit
+
     def wait_jobs(self):
         """
         Auto wait all jobs finished
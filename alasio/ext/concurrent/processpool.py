@@ -1,10 +1,12 @@
 import multiprocessing
+import os
+import sys
 import threading
 import uuid
 from collections import deque
 
 from alasio.backport import process_cpu_count
-from alasio.ext.concurrent.processworker import worker_loop
+from alasio.ext.concurrent.processworker import SharedArg, worker_loop
 
 
 # ===========================
@@ -55,11 +57,152 @@ class Worker:
     将进程 ID、进程对象、通信管道和当前绑定的任务封装在一起。
     """
 
-    def __init__(self, pid, process, conn):
+    def __init__(self, pid, process, conn, arena=None):
         self.pid = pid
         self.process = process
         self.conn = conn  # 主进程端的 Pipe 连接
         self.current_job = None
+        self.arena: "SharedArena | None" = arena  # shared_memory 模式下传递参数的共享内存
+
+
+class SharedArena:
+    """
+    Worker 独占的一块共享内存，用于传递大参数。
+    Worker 一次只执行一个任务，所以每次发送任务时从头覆盖写入即可，共享内存在任务之间复用，
+    只在空间不足时重新创建更大的一块。
+    """
+    # 参数在共享内存中按 64 字节对齐
+    ALIGN = 64
+    # 共享内存大小按 1MB 取整
+    PAGE = 1048576
+
+    def __init__(self, min_size=65536):
+        """
+        Args:
+            min_size (int): 小于此大小的参数直接通过 Pipe 序列化发送
+        """
+        self.min_size = min_size
+        self.shm = None
+
+    def shared_size(self, value):
+        """
+        Returns:
+            int: 参数占用的共享内存大小，0 表示参数不放入共享内存
+        """
+        cls = type(value)
+        if cls is bytes:
+            size = len(value)
+        elif cls is memoryview:
+            size = value.nbytes
+        else:
+            # don't import numpy if caller doesn't use it
+            np = sys.modules.get('numpy')
+            if np is None or cls is not np.ndarray or value.dtype.hasobject:
+                return 0
+            size = value.nbytes
+        if size < self.min_size:
+            return 0
+        return size
+
+    def pack(self, args, kwargs):
+        """
+        把大参数写入共享内存，替换为 SharedArg 句柄
+
+        Args:
+            args (tuple):
+            kwargs (dict):
+
+        Returns:
+            tuple[tuple, dict, str | None]: args, kwargs, 共享内存名称，没有参数放入共享内存时为 None
+        """
+        # plan layout
+        layout = {}
+        total = 0
+        align = self.ALIGN
+        for key, value in enumerate(args):
+            size = self.shared_size(value)
+            if size:
+                layout[key] = total
+                total += (size + align - 1) // align * align
+        for key, value in kwargs.items():
+            size = self.shared_size(value)
+            if size:
+                layout[key] = total
+                total += (size + align - 1) // align * align
+        if not layout:
+            return args, kwargs, None
+
+        shm = self.ensure(total)
+        buf = shm.buf
+        try:
+            args = tuple(self.write(buf, layout[key], value) if key in layout else value
+                         for key, value in enumerate(args))
+            kwargs = {key: self.write(buf, layout[key], value) if key in layout else value
+                      for key, value in kwargs.items()}
+        finally:
+            del buf
+        return args, kwargs, shm.name
+
+    def ensure(self, size):
+        """
+        确保共享内存至少有 size 字节，不足时创建新的共享内存并释放旧的。
+        Worker 发现名称变化后会重新连接。
+
+        Returns:
+            SharedMemory:
+        """
+        shm = self.shm
+        if shm is not None:
+            if shm.size >= size:
+                return shm
+            size = max(size, shm.size * 2)
+            self.close()
+        from multiprocessing.shared_memory import SharedMemory
+        size = (size + self.PAGE - 1) // self.PAGE * self.PAGE
+        self.shm = shm = SharedMemory(create=True, size=size)
+        return shm
+
+    @staticmethod
+    def write(buf, offset, value):
+        """
+        Returns:
+            SharedArg:
+        """
+        cls = type(value)
+        if cls is bytes:
+            size = len(value)
+            buf[offset:offset + size] = value
+            return SharedArg('bytes', offset, size)
+        if cls is memoryview:
+            size = value.nbytes
+            if value.c_contiguous:
+                buf[offset:offset + size] = value.cast('B')
+            else:
+                buf[offset:offset + size] = value.tobytes()
+            return SharedArg('memoryview', offset, size, dtype=value.format, shape=value.shape)
+        # ndarray, copy into shared memory directly, also handles non-contiguous arrays
+        import numpy as np
+        dst = np.ndarray(value.shape, dtype=value.dtype, buffer=buf, offset=offset)
+        dst[...] = value
+        del dst
+        return SharedArg('ndarray', offset, value.nbytes, dtype=value.dtype, shape=value.shape)
+
+    def close(self):
+        """
+        释放并删除共享内存
+        """
+        shm = self.shm
+        if shm is None:
+            return
+        self.shm = None
+        try:
+            shm.close()
+        except BufferError:
+            pass
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
 
 
 def get_max_worker():
@@ -112,14 +255,44 @@ class ProcessPool:
 
     3.  **重试机制**:
         -   任务具有 `retries` 计数。超出 `max_retry` 后任务标记为失败。
-    """
 
-    def __init__(self, worker_func, max_workers: int = None, max_retry=0):
+    ### 共享内存传参 (shared_memory=True)
+    大于 `SHARED_MIN_SIZE` 的 bytes/memoryview/ndarray 参数 (仅限顶层的 args 和 kwargs 值)
+    被写入 Worker 独占的共享内存，Pipe 上只发送句柄，省去序列化和管道传输的复制。
+    共享内存在任务之间复用，只在空间不足时扩容。
+    Worker 中 bytes 参数会被复制为 bytes，memoryview 和 ndarray 参数是共享内存上的视图，
+    只在本次调用期间有效，不能在任务结束后继续持有。
+    """
+    # Arguments smaller than this are pickled through Pipe in shared_memory mode
+    SHARED_MIN_SIZE = 65536
+
+    def __init__(
+            self,
+            worker_func,
+            max_workers: int = None,
+            max_retry=0,
+            initializer=None,
+            initargs=(),
+            shared_memory=False,
+    ):
+        """
+        Args:
+            worker_func (callable): 在子进程中执行的函数，必须可以被 pickle
+            max_workers (int): 最大进程数，默认为物理核心数
+            max_retry (int): Worker 崩溃时任务的最大重试次数
+            initializer (callable | None): 每个 Worker 启动时调用一次 initializer(*initargs)，
+                用于准备每个进程的状态，例如预加载模板或解码器
+            initargs (tuple):
+            shared_memory (bool): True 以通过共享内存传递大的 bytes/memoryview/ndarray 参数
+        """
         if max_workers is not None and max_workers < 1:
             raise ValueError('max_workers must >= 1')
         self.worker_func = worker_func
         self.max_workers = max_workers or get_max_worker()
         self.max_retry = max_retry
+        self.initializer = initializer
+        self.initargs = initargs
+        self.shared_memory = shared_memory
 
         # 信号量用于控制并发总数 (背压)
         self._capacity_sem = threading.Semaphore(self.max_workers)
@@ -187,7 +360,7 @@ def submit(self, *args, **kwargs) -> Job:
 
             # 3. 尝试发送任务 (IO 操作)
             try:
-                worker.conn.send((args, kwargs))
+                self._send(worker, job)
                 return job
 
             except (EOFError, OSError, BrokenPipeError) as e:
@@ -222,6 +395,35 @@ def submit(self, *args, **kwargs) -> Job:
                 self._capacity_sem.release()
                 return job
 
+    def map(self, *iterables):
+        """
+        与内置的 map() 相同，在进程池中执行 worker_func(*args)，按顺序 yield 结果。
+        任务在迭代时逐个提交，最多有 max_workers 个任务在执行，不会一次性提交所有任务。
+
+        Args:
+            *iterables: 每个 iterable 提供 worker_func 的一个位置参数
+
+        Yields:
+            Any: worker_func 的返回值，任务失败时抛出异常
+        """
+        jobs = deque()
+        for args in zip(*iterables):
+            # submit() blocks when all workers are busy, so all workers are kept running
+            jobs.append(self.submit(*args))
+            if len(jobs) > self.max_workers:
+                yield jobs.popleft().get()
+        while jobs:
+            yield jobs.popleft().get()
+
+    def _send(self, worker: Worker, job: Job):
+        """
+        发送任务到 Worker，shared_memory 模式下先把大参数写入 Worker 的共享内存
+        """
+        args, kwargs, shm_name = job.args, job.kwargs, None
+        if worker.arena is not None:
+            args, kwargs, shm_name = worker.arena.pack(args, kwargs)
+        worker.conn.send((args, kwargs, shm_name))
+
     def _spawn_worker(self) -> Worker:
         """创建一个新的 Worker 进程和对应的监听线程"""
         parent_conn, child_conn = multiprocessing.Pipe()
@@ -230,15 +432,25 @@ def _spawn_worker(self) -> Worker:
             self._worker_count += 1
             name = f'ProcessPool-{self.worker_func.__name__}-worker{self._worker_count}'
 
+        arena = None
+        if self.shared_memory:
+            arena = SharedArena(min_size=self.SHARED_MIN_SIZE)
+            if os.name == 'posix':
+                # Start resource tracker before fork, so workers share it with main process.
+                # Otherwise each worker starts its own tracker on attaching shared memory,
+                # which warns about leaks and unlinks the memory when worker exits.
+                from multiprocessing import resource_tracker
+                resource_tracker.ensure_running()
+
         p = multiprocessing.Process(
             target=worker_loop,
-            args=(child_conn, self.worker_func),
+            args=(child_conn, self.worker_func, self.initializer, self.initargs),
             name=name,
             daemon=True
         )
         p.start()
 
-        worker = Worker(p.pid, p, parent_conn)
+        worker = Worker(p.pid, p, parent_conn, arena)
         self._workers[p.pid] = worker
 
         # 启动后台监听线程
@@ -303,6 +515,8 @@ def _handle_crash(self, crashed_worker: Worker):
                 crashed_worker.conn.close()
             except:
                 pass
+            if crashed_worker.arena is not None:
+                crashed_worker.arena.close()
 
         # 如果没有任务 (闲置时崩溃或已被解绑)，只需通知状态更新
         if job is None:
@@ -329,7 +543,7 @@ def _handle_crash(self, crashed_worker: Worker):
 
             try:
                 # 尝试发送重试数据
-                new_worker.conn.send((job.args, job.kwargs))
+                self._send(new_worker, job)
                 return
 
             except (EOFError, OSError, BrokenPipeError) as e:
@@ -349,6 +563,8 @@ def _handle_crash(self, crashed_worker: Worker):
                     if new_worker.pid in self._workers:
                         del self._workers[new_worker.pid]
                     new_worker.process.terminate()
+                    if new_worker.arena is not None:
+                        new_worker.arena.close()
                     self._notify_if_all_idle()
                 return
 
@@ -366,5 +582,7 @@ def _terminate_all(self):
                 if worker.process.is_alive():
                     worker.process.terminate()
                     worker.process.join()
+                if worker.arena is not None:
+                    worker.arena.close()
             self._workers.clear()
             self._idle_workers.clear()
@@ -1,22 +1,108 @@
-def worker_loop(conn, func):
+class SharedArg:
+    """
+    共享内存中的参数句柄。
+    主进程把大的 bytes/memoryview/ndarray 参数写入 Worker 的共享内存，通过 Pipe 只发送句柄。
+    """
+    __slots__ = ('kind', 'offset', 'size', 'dtype', 'shape')
+
+    def __init__(self, kind, offset, size, dtype=None, shape=None):
+        # "bytes", "memoryview" or "ndarray"
+        self.kind = kind
+        self.offset = offset
+        self.size = size
+        # ndarray: np.dtype, memoryview: format str
+        self.dtype = dtype
+        self.shape = shape
+
+    def __getstate__(self):
+        return self.kind, self.offset, self.size, self.dtype, self.shape
+
+    def __setstate__(self, state):
+        self.kind, self.offset, self.size, self.dtype, self.shape = state
+
+    def load(self, buf):
+        """
+        在 Worker 中还原参数。
+        bytes 会被复制出来，memoryview 和 ndarray 是共享内存上的视图，只在本次调用期间有效。
+
+        Args:
+            buf (memoryview): SharedMemory.buf
+
+        Returns:
+            bytes | memoryview | np.ndarray:
+        """
+        if self.kind == 'bytes':
+            return bytes(buf[self.offset:self.offset + self.size])
+        if self.kind == 'memoryview':
+            view = buf[self.offset:self.offset + self.size]
+            if self.dtype != 'B' or len(self.shape) != 1:
+                view = view.cast(self.dtype, self.shape)
+            return view
+        # import numpy only when there are ndarray arguments
+        import numpy as np
+        return np.ndarray(self.shape, dtype=self.dtype, buffer=buf, offset=self.offset)
+
+
+def _attach(name, shm):
+    """
+    连接到主进程创建的共享内存，并关闭之前的共享内存
+    """
+    from multiprocessing.shared_memory import SharedMemory
+    if shm is not None:
+        try:
+            shm.close()
+        except BufferError:
+            # views of old memory are still referenced by worker function, let gc close it
+            pass
+    return SharedMemory(name=name)
+
+
+def worker_loop(conn, func, initializer=None, initargs=()):
     """
     子进程运行循环。
     当 Pipe 另一端(主进程)关闭或断开时，自动退出。
 
     worker_loop 是一个单独的 python 文件，来避免 worker 进程启动的时候导入 ProcessPool
+
+    Args:
+        conn (Connection):
+        func (callable):
+        initializer (callable | None): 在 worker 启动时调用一次，用于准备每个进程的状态，
+            例如预加载模板或解码器
+        initargs (tuple): initializer 的参数
     """
     try:
+        # initializer 失败时 worker 仍然存活，但所有任务都返回 initializer 的异常，
+        # 避免主进程不断重建 worker
+        init_error = None
+        if initializer is not None:
+            try:
+                initializer(*initargs)
+            except Exception as e:
+                init_error = e
+
+        shm = None
         while True:
             try:
-                args, kwargs = conn.recv()
+                args, kwargs, shm_name = conn.recv()
             except (OSError, EOFError, BrokenPipeError):
                 # pipe broken, exit process
                 break
 
             try:
+                if init_error is not None:
+                    raise init_error
+                if shm_name is not None:
+                    if shm is None or shm.name != shm_name:
+                        shm = _attach(shm_name, shm)
+                    buf = shm.buf
+                    args = [arg.load(buf) if type(arg) is SharedArg else arg for arg in args]
+                    kwargs = {k: v.load(buf) if type(v) is SharedArg else v for k, v in kwargs.items()}
+                    del buf
                 result = func(*args, **kwargs)
             except Exception as e:
                 # failed, send ERR
+                args = kwargs = None
                 try:
                     conn.send(('ERR', e))
                     continue
@@ -25,11 +111,14 @@ def worker_loop(conn, func):
                     break
 
             # success, send OK
+            # release views of shared memory before next job
+            args = kwargs = None
             try:
                 conn.send(('OK', result))
             except (OSError, EOFError, BrokenPipeError):
                 # pipe broken, exit process
                 break
+            result = None
     except KeyboardInterrupt:
         # suppress KeyboardInterrupt of worker process logging on terminal
         pass
@@ -1,8 +1,13 @@
 import ctypes
+from collections import deque
 from functools import wraps
-from threading import Lock, Thread
+from itertools import islice
+from queue import SimpleQueue
+from threading import Condition, Lock, Thread
+from time import perf_counter
 from typing import Callable, Generic, TypeVar, Union
 
+from msgspec import Struct
 from typing_extensions import ParamSpec
 
 from alasio.ext.concurrent.cmd import CmdlineResultStr, run_cmd
@@ -88,15 +93,19 @@ class Job(Generic[ResultT]):
     which removes all locking overhead on the internal data path.
     ``get()`` may be called multiple times (the result is cached).
     """
-    __slots__ = ('worker', 'func', 'args', 'kwargs', 'result', 'put_lock', 'notify_get')
+    __slots__ = ('worker', 'func', 'args', 'kwargs', 'result', 'put_lock', 'notify_get', 'queued', 'pool')
 
     def __init__(self, worker, func, args, kwargs):
-        # Having attribute "worker" means job is ongoing
+        # Having attribute "worker" means job is ongoing, worker is None if job is waiting in queue
         # Not having attribute "worker" means job is finished or killed
         self.worker = worker
         self.func = func
         self.args = args
         self.kwargs = kwargs
+        # time.perf_counter() when job entered queue
+        self.queued = 0.
+        # ThreadPool that job is queued in, so a waiting job can be removed from queue when killed
+        self.pool: "ThreadPool | None" = None
 
         self.result: "Union[ResultT, NODEFAULT]" = NODEFAULT
         self.put_lock = Lock()
@@ -129,7 +138,7 @@ def get_or_kill(self, timeout) -> ResultT:
         if success, return job result, or raise job error, or raise JobKill
         if failed, kill job and raise JobTimeout
 
-        Note that JobTimeout may not raises immediately if POOL_SIZE reached
+        If job is still waiting in queue, it is removed from queue and will never run
         """
         result = self.result
         if result is not NODEFAULT:
@@ -158,8 +167,19 @@ def _kill(self):
                 # Trying to kill a finished job, do nothing
                 return
             if worker is None:
-                # Job running on unknown worker, do nothing
-                return
+                # Job waiting in queue
+                pool = self.pool
+                if pool is None:
+                    # Job of a pool that doesn't support cancelling, do nothing
+                    return
+                if pool._cancel_job(self):
+                    del self.worker
+                    self.result = Error(JobKill())
+                    self.notify_get.release()
+                    return
+                # Job just taken by a worker, worker is set within pool lock,
+                # and can't deliver result since we are holding put_lock, so kill it
+                worker = self.worker
             worker.kill()
             del self.worker
 
@@ -173,14 +193,6 @@ def __init__(self, thread_pool, index):
         """
         self.job: "Job | None" = None
         self.thread_pool = thread_pool
-        # This Lock is used in an unconventional way.
-        #
-        # "Unlocked" means we have a pending job that's been assigned to us;
-        # "locked" means that we don't.
-        #
-        # Initially we have no job, so it starts out in locked state.
-        self.worker_lock = Lock()
-        self.worker_lock.acquire()
         self.default_name = f"Alasio thread {index}"
 
         self.thread = Thread(target=self._work, name=self.default_name, daemon=True)
@@ -188,7 +200,7 @@ def __init__(self, thread_pool, index):
     def __repr__(self):
         return f'{self.__class__.__name__}({self.default_name})'
 
-    def _handle_job(self) -> bool:
+    def _handle_job(self, job: Job) -> bool:
         """
         Handle a job on this worker.
 
@@ -196,9 +208,7 @@ def _handle_job(self) -> bool:
             bool: True if worker should continue, False if worker was
                 killed and should exit
         """
-        job = self.job
-        del self.job
-
+        self.job = job
         # Capture func result
         try:
             result = job.func(*job.args, **job.kwargs)
@@ -207,21 +217,14 @@ def _handle_job(self) -> bool:
             result = Error(exc)
 
             # If worker was killed, deliver result and exit without going
-            # back to idle pool.  kill() already removed from all_workers,
-            # idle_workers and released full_lock.  _kill() already deleted
-            # job.worker so we skip that here.
+            # back to the pool.  kill() already removed from all_workers.
+            # _kill() already deleted job.worker so we skip that here.
             if type(result.error) is JobKill:
                 with job.put_lock:
                     job.result = result
                     job.notify_get.release()
                 return False
-
-        # Tell the cache that we're available to be assigned a new
-        # job. We do this *before* calling 'deliver', so that if
-        # 'deliver' triggers a new job, it can be assigned to us
-        # instead of spawning a new thread.
-        self.thread_pool.idle_workers[self] = None
-        self.thread_pool.release_full_lock()
+        self.job = None
 
         # Job finished, putin result and notify
         # logger.info('deliver job')
@@ -239,32 +242,15 @@ def _work(self) -> None:
         pool = self.thread_pool
         try:
             while True:
-                if self.worker_lock.acquire(timeout=pool.IDLE_TIMEOUT):
-                    # We got a job, exit if worker was killed
-                    if not self._handle_job():
-                        return
-                else:
-                    # Timeout acquiring lock, so we can probably exit. But,
-                    # there's a race condition: we might be assigned a job *just*
-                    # as we're about to exit. So we have to check.
-                    try:
-                        del pool.idle_workers[self]
-                    except KeyError:
-                        # Someone else removed us from the idle worker queue, so
-                        # they must be in the process of assigning us a job - loop
-                        # around and wait for it.
-                        pool.release_full_lock()
-                        continue
-                    else:
-                        # We successfully removed ourselves from the idle
-                        # worker queue, so no more jobs are incoming; it's safe to
-                        # exit.
-                        pool.all_workers.pop(self, None)
-                        pool.release_full_lock()
-                        return
+                job = pool._take_job(self)
+                if job is None:
+                    # Idle timeout, pool already removed us
+                    return
+                if not self._handle_job(job):
+                    return
         except JobKill:
             # Worker thread was killed. kill() already removed it from
-            # all_workers and released full_lock. Thread exits cleanly.
+            # all_workers. Thread exits cleanly.
             return
 
     def kill(self):
@@ -287,174 +273,313 @@ def kill(self):
             thread_id, ctypes.py_object(JobKill)
         )
         if res <= 1:
-            self.thread_pool.all_workers.pop(self, None)
-            self.thread_pool.idle_workers.pop(self, None)
-            self.thread_pool.release_full_lock()
+            self.thread_pool._remove_worker(self)
             return True
         else:
-            try:
-                job = self.job
-            except AttributeError:
-                job = None
-            logger.error(f"Failed to kill thread {self.thread.ident} from job {job}")
+            logger.error(f"Failed to kill thread {self.thread.ident} from job {self.job}")
             # Failed to send JobKill, reset it
             ctypes.pythonapi.PyThreadState_SetAsyncExc(thread_id, 0)
             return False
 
 
+def _run_chunk(func, chunk, index, done):
+    """
+    Run func on every item of a chunk, send results to the MapIterator that submitted it.
+    """
+    start = perf_counter()
+    try:
+        result = [func(item) for item in chunk]
+    except BaseException as exc:
+        done.put((index, len(chunk), perf_counter() - start, Error(remove_tb_frames(exc, 1))))
+        if type(exc) is JobKill:
+            raise
+        return
+    done.put((index, len(chunk), perf_counter() - start, result))
+
+
+class MapIterator(Generic[ResultT]):
+    """
+    Lazy results of imap() and imap_unordered().
+
+    Items are grouped into chunks and each chunk runs as one job.
+    If chunksize is not given, chunk size adapts to the observed time per item,
+    so each chunk takes about TARGET_CHUNK_TIME and job dispatch cost is amortized.
+    At most `window` chunks are in flight or waiting to be consumed, next chunks are submitted
+    as results are consumed, so a slow consumer or an endless iterable won't flood the pool.
+
+    The first window of chunks is submitted on creation, so the caller may do something else
+    before iterating results.
+    """
+    # Seconds that a chunk should take, dispatching a job costs ~15us
+    TARGET_CHUNK_TIME = 0.002
+    MAX_CHUNK_SIZE = 1024
+
+    def __init__(self, submit, func, iterable, chunksize=0, window=8, ordered=True):
+        """
+        Args:
+            submit (Callable): Function to submit a job, e.g. ThreadPool.start_thread_soon
+            func (Callable[[Any], ResultT]): Function to run on each item
+            iterable (Iterable):
+            chunksize (int): Amount of items in each job, 0 for adaptive
+            window (int): Max amount of chunks in flight or waiting to be consumed
+            ordered (bool): True to yield results in input order,
+                False to yield results as soon as chunks finish
+        """
+        self.submit = submit
+        self.func = func
+        self.iterator = iter(iterable)
+        self.adaptive = chunksize <= 0
+        self.chunksize = 1 if self.adaptive else chunksize
+        self.window = max(window, 1)
+        self.ordered = ordered
+
+        self.done = SimpleQueue()
+        # results of the current chunk
+        self.results: "deque[ResultT]" = deque()
+        # finished chunks waiting to be consumed, key: chunk index
+        self.buffer: "dict[int, Union[list[ResultT], Error]]" = {}
+        self.submitted = 0
+        self.consumed = 0
+        self.inflight = 0
+        self.exhausted = False
+        # estimated seconds per item
+        self.item_time = 0.
+        self._fill()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> ResultT:
+        results = self.results
+        while not results:
+            chunk = self._next_chunk()
+            if type(chunk) is Error:
+                # stop submitting, jobs already in flight finish on their own
+                self.exhausted = True
+                self.inflight = 0
+                self.buffer.clear()
+                return chunk.unwrap()
+            results.extend(chunk)
+        return results.popleft()
+
+    def _fill(self):
+        while not self.exhausted and self.inflight + len(self.buffer) < self.window:
+            chunk = list(islice(self.iterator, self.chunksize))
+            if not chunk:
+                self.exhausted = True
+                break
+            self.submit(_run_chunk, self.func, chunk, self.submitted, self.done)
+            self.submitted += 1
+            self.inflight += 1
+
+    def _receive(self):
+        index, count, cost, result = self.done.get()
+        self.inflight -= 1
+        self.buffer[index] = result
+        if self.adaptive:
+            item_time = cost / count
+            if self.item_time:
+                item_time = self.item_time * 0.7 + item_time * 0.3
+            self.item_time = item_time
+            if item_time > 0:
+                self.chunksize = min(max(int(self.TARGET_CHUNK_TIME / item_time), 1), self.MAX_CHUNK_SIZE)
+            else:
+                self.chunksize = self.MAX_CHUNK_SIZE
+
+    def _next_chunk(self):
+        buffer = self.buffer
+        if self.ordered:
+            while self.consumed not in buffer:
+                if not self.inflight:
+                    raise StopIteration
+                self._receive()
+            chunk = buffer.pop(self.consumed)
+        else:
+            if not buffer:
+                if not self.inflight:
+                    raise StopIteration
+                self._receive()
+            _, chunk = buffer.popitem()
+        self.consumed += 1
+        self._fill()
+        return chunk
+
+
+class ThreadPoolStats(Struct):
+    # Amount of submitted jobs
+    submitted: int = 0
+    # Amount of jobs waiting in queue right now, and the max ever
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+    # Seconds jobs waited in queue before a worker picked them up
+    wait_total: float = 0.
+    wait_max: float = 0.
+    # Amount of submissions that blocked because queue was full
+    blocked: int = 0
+    # Amount of worker threads, and idle ones right now
+    workers: int = 0
+    idle: int = 0
+
+    @property
+    def wait_avg(self):
+        picked = self.submitted - self.queue_depth
+        if picked > 0:
+            return self.wait_total / picked
+        return 0.
+
+
 class ThreadPool:
     """
     A thread pool imitating trio.to_thread.start_thread_soon()
     https://github.com/python-trio/trio/issues/6
+
+    Jobs go into a bounded FIFO queue, idle workers are woken up by condition
+    and finished workers pull the next job directly.
     """
 
     # Thread exits after 10s idling.
     IDLE_TIMEOUT = 10
 
-    def __init__(self, pool_size: int = 8):
+    def __init__(self, pool_size: int = 8, queue_size: int = 64):
         # Pool has 8 threads at max.
         # Alasio is for local low-frequency access so default pool size is small
         self.pool_size = pool_size
+        # Max amount of jobs waiting for workers, start_thread_soon() blocks if queue is full.
+        self.queue_size = max(queue_size, 1)
 
+        self.queue: "deque[Job]" = deque()
         self.idle_workers: "dict[WorkerThread, None]" = {}
         self.all_workers: "dict[WorkerThread, None]" = {}
+        self.worker_index = 0
+
+        self.lock = Lock()
+        # Notified when a job is queued, idle workers wait on it
+        self.not_empty = Condition(self.lock)
+        # Notified when a job is taken from queue, blocked submitters wait on it
+        self.not_full = Condition(self.lock)
+
+        # Metrics, protected by `lock`
+        self._submitted = 0
+        self._max_queue_depth = 0
+        self._wait_total = 0.
+        self._wait_max = 0.
+        self._blocked = 0
+
+    def _new_worker(self):
+        """
+        Create a worker thread, must be called with `lock`
+        """
+        worker = WorkerThread(self, self.worker_index)
+        self.worker_index += 1
+        self.all_workers[worker] = None
+        worker.thread.start()
+        # logger.info(f'New worker thread: {worker.default_name}')
+
+    def _submit(self, job: Job):
+        with self.lock:
+            queue = self.queue
+            if len(queue) >= self.queue_size:
+                self._blocked += 1
+                while len(queue) >= self.queue_size:
+                    self.not_full.wait()
+            job.queued = perf_counter()
+            job.pool = self
+            queue.append(job)
+            depth = len(queue)
+            self._submitted += 1
+            if depth > self._max_queue_depth:
+                self._max_queue_depth = depth
+            # Wake an idle worker, or create one if all existing ones are busy
+            if depth > len(self.idle_workers) and len(self.all_workers) < self.pool_size:
+                self._new_worker()
+            else:
+                self.not_empty.notify()
 
-        self.notify_worker = Lock()
-        self.notify_worker.acquire()
-        self.notify_pool = Lock()
-        self.notify_pool.acquire()
-
-        self.create_lock = Lock()
+    def _take_job(self, worker: WorkerThread) -> "Job | None":
+        """
+        Called by worker to get the next job, blocks until there is one.
 
-    def release_full_lock(self):
+        Returns:
+            The next job, or None if worker has been idle for IDLE_TIMEOUT and should exit
+        """
+        with self.lock:
+            queue = self.queue
+            while not queue:
+                self.idle_workers[worker] = None
+                try:
+                    notified = self.not_empty.wait(self.IDLE_TIMEOUT)
+                finally:
+                    self.idle_workers.pop(worker, None)
+                # A job may be queued just as we timed out, so check the queue again
+                if not notified and not queue:
+                    self.all_workers.pop(worker, None)
+                    return None
+            job = queue.popleft()
+            self.not_full.notify()
+            # Having attribute "worker" means job is ongoing
+            job.worker = worker
+            wait = perf_counter() - job.queued
+            self._wait_total += wait
+            if wait > self._wait_max:
+                self._wait_max = wait
+            return job
+
+    def _cancel_job(self, job: Job) -> bool:
         """
-        Call this method if worker finished any job, or exited, or get killed.
+        Remove a job from queue, so it never runs
 
-        When pool full,
-        Pool tells all workers: any worker finishes his job notify me.
-        ``self.notify_worker.release()``
-        Then the pool blocks himself.
-        ``self.notify_pool.acquire()``
-        The fastest worker, and also the only worker, receives the message,
-        ``if self.notify_worker.acquire(blocking=False):``
-        Worker tells the pool, new pool slot is ready, you are ready to go.
-        ``self.notify_pool.release()``
+        Returns:
+            bool: True if removed, False if job is not in queue (taken by a worker)
         """
-        if self.notify_worker.acquire(blocking=False):
+        with self.lock:
             try:
-                self.notify_pool.release()
-            except RuntimeError:
-                # Race condition when multiple threads trying to get thread worker
-                # They released `notify_worker` but not yet acquire `notify_pool`
-                pass
+                self.queue.remove(job)
+            except ValueError:
+                return False
+            self.not_full.notify()
+            return True
 
-    def _get_thread_worker(self) -> "WorkerThread":
-        try:
-            worker, _ = self.idle_workers.popitem()
-            # logger.info(f'reuse worker thread: {worker.default_name}')
-            return worker
-        except KeyError:
-            pass
-
-        # Wait if reached max thread
-        # Check without `create_lock` first, otherwise will be 10x slower
-        # if multiple thread trying to get `create_lock`
-        if len(self.all_workers) >= self.pool_size:
-            # See release_full_lock()
-            try:
-                self.notify_worker.release()
-            except RuntimeError:
-                # Race condition when multiple threads trying to get thread worker
-                # It's ok to treat multiple release as one
-                pass
-            while True:
-                # If any worker finishes within timeout, we can get it
-                # Race condition when all workers just done `release_full_lock`
-                # and no one notifies. To handle that, we acquire with timeout
-                # and check if there's idle worker.
-                self.notify_pool.acquire(timeout=0.01)
-                # Re-acquire `notify_worker` so other workers can
-                # call `release_full_lock` for next `_get_thread_worker`
-                self.notify_worker.acquire(blocking=False)
-                # A worker just idle
-                try:
-                    worker, _ = self.idle_workers.popitem()
-                    return worker
-                except KeyError:
-                    # Race condition when multiple threads trying to get
-                    # thread worker, they all pass through full lock check
-                    # and pop the only idle worker. Just let the slower ones
-                    # do full lock check again.
-                    pass
-                # A thread just exited, pool no longer full
-                if len(self.all_workers) < self.pool_size:
-                    break
-
-        # Create thread with lock
-        with self.create_lock:
-            # Wait if reached max thread
-            # Check without `create_lock` first, otherwise will be 10x slower
-            # if multiple thread trying to get `create_lock`
-            if len(self.all_workers) >= self.pool_size:
-                # See release_full_lock()
-                try:
-                    self.notify_worker.release()
-                except RuntimeError:
-                    # Race condition when multiple threads trying to get thread worker
-                    # It's ok to treat multiple release as one
-                    pass
-                while True:
-                    # If any worker finishes within timeout, we can get it
-                    # Race condition when all workers just done `release_full_lock`
-                    # and no one notifies. To handle that, we acquire with timeout
-                    # and check if there's idle worker.
-                    self.notify_pool.acquire(timeout=0.01)
-                    # Re-acquire `notify_worker` so other workers can
-                    # call `release_full_lock` for next `_get_thread_worker`
-                    self.notify_worker.acquire(blocking=False)
-                    # A worker just idle
-                    try:
-                        worker, _ = self.idle_workers.popitem()
-                        return worker
-                    except KeyError:
-                        # Race condition when multiple threads trying to get thread worker,
-                        # they all pass through full lock check and pop the only idle worker.
-                        # Just let the slower ones do full lock check again
-                        pass
-                    # A thread just existed, pool no longer full
-                    if len(self.all_workers) < self.pool_size:
-                        break
-            else:
-                # A thread just idle while we were waiting for `create_lock`
-                try:
-                    worker, _ = self.idle_workers.popitem()
-                    # logger.info(f'reuse worker thread: {worker.default_name}')
-                    return worker
-                except KeyError:
-                    pass
-            # Create thread
-            worker = WorkerThread(self, len(self.all_workers))
-            self.all_workers[worker] = None
-            worker.thread.start()
-            # logger.info(f'New worker thread: {worker.default_name}')
-        return worker
+    def _remove_worker(self, worker: WorkerThread):
+        """
+        Called when worker gets killed, create a replacement if there are jobs waiting
+        """
+        with self.lock:
+            self.all_workers.pop(worker, None)
+            self.idle_workers.pop(worker, None)
+            if len(self.queue) > len(self.idle_workers) and len(self.all_workers) < self.pool_size:
+                self._new_worker()
+
+    def stats(self) -> ThreadPoolStats:
+        """
+        Returns:
+            Snapshot of queue depth and wait time metrics
+        """
+        with self.lock:
+            return ThreadPoolStats(
+                submitted=self._submitted,
+                queue_depth=len(self.queue),
+                max_queue_depth=self._max_queue_depth,
+                wait_total=self._wait_total,
+                wait_max=self._wait_max,
+                blocked=self._blocked,
+                workers=len(self.all_workers),
+                idle=len(self.idle_workers),
+            )
 
     def start_thread_soon(
             self, func: "Callable[[ParamP], ResultT]", *args: "ParamP.args", **kwargs: "ParamP.kwargs"
     ) -> "Job[ResultT]":
         """
         Run a function on thread, costs extra ~15us,
-        result can be got from ``job`` object
+        result can be got from ``job`` object.
+        If all workers are busy, job waits in queue, and this method blocks if queue is full.
 
         Examples:
             job = THREAD_POOL.start_thread_soon(func, *args)
             result = job.get()
         """
-        worker = self._get_thread_worker()
-        job = Job(worker, func, args, kwargs)
-
-        worker.job = job
-        worker.worker_lock.release()
+        job = Job(None, func, args, kwargs)
+        self._submit(job)
         return job
 
     def run_on_thread(self, func: "Callable[[ParamP], ResultT]") -> "Callable[[ParamP], Job[ResultT]]":
@@ -489,11 +614,8 @@ def start_cmd_soon(self, cmd, timeout=10, strip=True) -> "Job[CmdlineResultStr]"
         Returns:
             Job that returns str or raises CmdlineError
         """
-        worker = self._get_thread_worker()
-        job = Job(worker, run_cmd, (cmd,), {'timeout': timeout, 'strip': strip})
-
-        worker.job = job
-        worker.worker_lock.release()
+        job = Job(None, run_cmd, (cmd,), {'timeout': timeout, 'strip': strip})
+        self._submit(job)
         return job
 
     def wait_jobs(self) -> "WaitJobsWrapper":
@@ -519,6 +641,46 @@ def gather_jobs(self) -> "GatherJobsWrapper":
         """
         return GatherJobsWrapper(self)
 
+    def imap(self, func, iterable, chunksize=0, window=0) -> "MapIterator[ResultT]":
+        """
+        Lazy alternative to multiprocessing.pool.Pool().imap(func, iterable) but on threads,
+        items are run in chunks, results are yielded in input order.
+
+        Args:
+            func (Callable[..., ResultT]):
+            iterable:
+            chunksize (int): Amount of items in each job, 0 for adaptive
+            window (int): Max amount of chunks in flight, 0 for 2 * pool_size
+
+        Returns:
+            MapIterator[ResultT]: Iterator of results, raises the first job error when reached
+
+        Examples:
+            for result in THREAD_POOL.imap(func, items):
+                pass
+        """
+        if window <= 0:
+            window = self.pool_size * 2
+        return MapIterator(self.start_thread_soon, func, iterable, chunksize=chunksize, window=window)
+
+    def imap_unordered(self, func, iterable, chunksize=0, window=0) -> "MapIterator[ResultT]":
+        """
+        Same as imap() but results are yielded as soon as chunks finish
+
+        Args:
+            func (Callable[..., ResultT]):
+            iterable:
+            chunksize (int): Amount of items in each job, 0 for adaptive
+            window (int): Max amount of chunks in flight, 0 for 2 * pool_size
+
+        Returns:
+            MapIterator[ResultT]: Iterator of results, raises the first job error when reached
+        """
+        if window <= 0:
+            window = self.pool_size * 2
+        return MapIterator(self.start_thread_soon, func, iterable, chunksize=chunksize, window=window,
+                           ordered=False)
+
     def thread_map(self, func, iterables):
         """
         Alternative to ThreadPoolExecutor.map(func, iterables)
@@ -530,9 +692,7 @@ def thread_map(self, func, iterables):
         Returns:
             list[ResultT]:
         """
-        jobs = [self.start_thread_soon(func, arg) for arg in iterables]
-        results = [job.get() for job in jobs]
-        return results
+        return list(self.imap(func, iterables))
 
     def thread_starmap(self, func, iterables):
         """
@@ -545,9 +705,7 @@ def thread_starmap(self, func, iterables):
         Returns:
             list[ResultT]:
         """
-        jobs = [self.start_thread_soon(func, *arg) for arg in iterables]
-        results = [job.get() for job in jobs]
-        return results
+        return list(self.imap(lambda arg: func(*arg), iterables))
 
     def thread_funcmap(self, func_iterables):
         """
@@ -11,6 +11,8 @@
 OP_ADD = 'add'
 OP_SET = 'set'
 OP_DEL = 'del'
+# Placeholder of not exist in diff engine, so None values can be diffed
+_MISSING = object()
 
 
 def deep_get(d, keys, default=None):
@@ -909,3 +911,230 @@ def deep_iter_patch(before, after):
         queue = new_queue
         if not queue:
             break
+
+
+class PathIntern:
+    """
+    Interned key paths as tuples.
+    Paths are stored in a tree, so the same path is the same tuple object across diffs,
+    and looking up a child path costs one dict lookup instead of building and hashing a tuple.
+    """
+
+    def __init__(self, limit=65536):
+        """
+        Args:
+            limit (int): Maximum amount of paths to keep, tree is dropped if exceeded
+        """
+        self.limit = limit
+        # (path, children), children is a dict of key to (path, children)
+        self.root = ((), {})
+        # approximate amount of paths, increased without lock
+        self.size = 0
+
+    def get_root(self):
+        """
+        Returns:
+            tuple[tuple, dict]: Path node of root
+        """
+        if self.size > self.limit:
+            # paths are still valid tuples, they just won't be shared with new ones
+            self.root = ((), {})
+            self.size = 0
+        return self.root
+
+    def child(self, node, key):
+        """
+        Args:
+            node (tuple[tuple, dict]): Path node
+            key: Dict key
+
+        Returns:
+            tuple[tuple, dict]: Path node of child
+        """
+        children = node[1]
+        try:
+            return children[key]
+        except KeyError:
+            pass
+        child = (node[0] + (key,), {})
+        children[key] = child
+        self.size += 1
+        return child
+
+    def intern(self, keys):
+        """
+        Args:
+            keys (list | tuple):
+
+        Returns:
+            tuple: Interned path
+        """
+        node = self.get_root()
+        for key in keys:
+            node = self.child(node, key)
+        return node[0]
+
+
+PATH_INTERN = PathIntern()
+
+
+def _iter_diff_nodes(before, after):
+    """
+    Diff engine of deep_diff() and deep_patch().
+    Each dict pair is walked once: values are skipped if they are the same object,
+    or equal in C level comparison, only different sub-dicts are queued to descend.
+    So unchanged subtrees that are structurally shared between before and after cost nothing.
+
+    Yields:
+        tuple[tuple, dict]: Path node
+        Any: Value in before, or _MISSING if not exists
+        Any: Value in after, or _MISSING if not exists
+    """
+    if before is after:
+        return
+    try:
+        if before == after:
+            return
+    except RecursionError:
+        # Circular reference or too deep to compare: fall through to diff
+        pass
+    root = PATH_INTERN.get_root()
+    if type(before) is not dict or type(after) is not dict:
+        yield root, before, after
+        return
+
+    child = PATH_INTERN.child
+    # Guard against circular references
+    visited = set()
+    queue = deque([(root, before, after)])
+    while queue:
+        node, d1, d2 = queue.popleft()
+        pair = (id(d1), id(d2))
+        if pair in visited:
+            # Circular reference: already compared, skip to avoid infinite loop
+            continue
+        visited.add(pair)
+        for key, val1 in d1.items():
+            try:
+                val2 = d2[key]
+            except KeyError:
+                yield child(node, key), val1, _MISSING
+                continue
+            # identity first, then compare in C, which is pretty fast
+            if val1 is val2:
+                continue
+            try:
+                if val1 == val2:
+                    continue
+            except RecursionError:
+                # Too deep to compare, treat as different
+                pass
+            if type(val1) is dict and type(val2) is dict:
+                queue.append((child(node, key), val1, val2))
+            else:
+                yield child(node, key), val1, val2
+        # keys view comparison is a set operation in C
+        if not d2.keys() <= d1.keys():
+            for key, val2 in d2.items():
+                if key not in d1:
+                    yield child(node, key), _MISSING, val2
+
+
+def deep_diff(before, after):
+    """
+    Iter diff between 2 dict, like deep_iter_diff() but faster on large dicts.
+    Values are compared by identity first, so if `after` is created by copying only the changed branches
+    of `before`, time cost depends on the number of differences, not the size of dict.
+
+    Args:
+        before:
+        after:
+
+    Yields:
+        tuple: Key path, interned, the same path is the same tuple object
+        Any: Value in before, or None if not exists
+        Any: Value in after, or None if not exists
+    """
+    for node, val1, val2 in _iter_diff_nodes(before, after):
+        if val1 is _MISSING:
+            val1 = None
+        elif val2 is _MISSING:
+            val2 = None
+        yield node[0], val1, val2
+
+
+def deep_patch(before, after):
+    """
+    Iter patch event from before to after, like deep_iter_patch() but faster on large dicts.
+
+    Args:
+        before:
+        after:
+
+    Yields:
+        str: OP_ADD, OP_SET, OP_DEL
+        tuple: Key path, interned, the same path is the same tuple object
+        Any: Value in after,
+            or None of event is OP_DEL
+    """
+    for node, val1, val2 in _iter_diff_nodes(before, after):
+        if val2 is _MISSING:
+            yield OP_DEL, node[0], None
+        elif val1 is _MISSING:
+            yield OP_ADD, node[0], val2
+        else:
+            yield OP_SET, node[0], val2
+
+
+def deep_patch_ops(before, after):
+    """
+    Create compact patch ops from before to after, which can be encoded by msgpack or json directly.
+
+    Args:
+        before:
+        after:
+
+    Returns:
+        list[tuple]: List of (op, keys, value), or (op, keys) if op is OP_DEL
+    """
+    ops = []
+    for node, val1, val2 in _iter_diff_nodes(before, after):
+        if val2 is _MISSING:
+            ops.append((OP_DEL, node[0]))
+        elif val1 is _MISSING:
+            ops.append((OP_ADD, node[0], val2))
+        else:
+            ops.append((OP_SET, node[0], val2))
+    return ops
+
+
+def deep_apply_patch(d, ops):
+    """
+    Apply patch ops in place.
+
+    Note that always use:
+        d = deep_apply_patch(d, ops)
+    because patches on root replace the whole data.
+
+    Args:
+        d (dict):
+        ops (Iterable[tuple | list]): Ops from deep_patch_ops() or deep_patch(),
+            or the decoded ones, in which keys are lists
+
+    Returns:
+        dict:
+    """
+    for op in ops:
+        keys = op[1]
+        if op[0] == OP_DEL:
+            if keys:
+                deep_pop(d, keys)
+            else:
+                d = {}
+            continue
+        # OP_ADD, OP_SET
+        if keys:
+            d = deep_set(d, keys, op[2])
+        else:
+            d = op[2]
+    return d
@@ -13,10 +13,28 @@
     - The lock is released automatically when the holding process crashes or
       exits, because the operating system releases the underlying file locks
       and SQLite rolls back unfinished transactions.
+    - Instances on the same lock file in one process share a process-wide
+      threading lock. Only the first holder in a process takes the file lock,
+      and it is handed over to waiting threads of the same process without
+      touching the file, then released when nobody in the process holds or waits.
+    - FlockFileLock is an alternative backend using fcntl.flock() on Linux and
+      macOS. SQLite locks and flock locks do not exclude each other, all users
+      of a lock file must use the same backend.
 """
 import os
 import sqlite3
 import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+
+
+# Max busy timeout of SQLite in seconds, 2^31-1 milliseconds
+SQLITE_MAX_TIMEOUT = 2147483.0
 
 
 class FilelockTimeout(Exception):
@@ -33,6 +51,39 @@ def __init__(self, lock_file):
         super().__init__(f"Timeout occurred trying to acquire lock for: {lock_file}")
 
 
+class _LockEntry:
+    """
+    Process-wide state of a lock file, shared by all instances in the process
+    """
+    __slots__ = ('mutex', 'users', 'handle')
+
+    def __init__(self):
+        # in-process mutual exclusion between instances and threads
+        self.mutex = threading.Lock()
+        # amount of instances holding or waiting for the lock in this process
+        self.users = 0
+        # OS-level lock handle, e.g. sqlite3.Connection, None if not held by this process
+        self.handle = None
+
+
+# key: (backend, lock_file), value: _LockEntry
+_REGISTRY: "dict[tuple[str, str], _LockEntry]" = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def _reset_registry():
+    """
+    Locks held by parent process are not held by forked child
+    """
+    global _REGISTRY_LOCK
+    _REGISTRY.clear()
+    _REGISTRY_LOCK = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_registry)
+
+
 class SQLiteFileLock:
     """
     Cross-platform file lock based on SQLite exclusive transactions
@@ -78,6 +129,9 @@ class SQLiteFileLock:
                 # critical section
     """
 
+    # Name of the file lock backend, instances of different backends don't share process-wide state
+    BACKEND = 'sqlite'
+
     def __init__(self, lock_file, timeout=-1):
         """
         Args:
@@ -102,7 +156,7 @@ def __init__(self, lock_file, timeout=-1):
         self._default_timeout = timeout
 
         # Internal state, supports reentrant locking within the same instance
-        self._conn = None
+        self._entry = None
         self._lock_counter = 0
         self._thread_lock = threading.Lock()
 
@@ -147,6 +201,7 @@ def acquire(self, timeout=None, poll_interval=0.05):
             timeout (float): Overrides the constructor timeout. Defaults to None.
             poll_interval (float): Kept for compatibility with the filelock
                 interface, the SQLite C layer polls automatically.
+                FlockFileLock polls at this interval when timeout > 0.
                 Defaults to 0.05.
 
         Returns:
@@ -164,41 +219,88 @@ def acquire(self, timeout=None, poll_interval=0.05):
                 self._lock_counter += 1
                 return self
 
-        # The thread lock above only guards the shared state. The SQLite lock
-        # itself is acquired outside the thread lock, so a thread waiting on
-        # the SQLite lock never blocks other threads of the same instance,
-        # and every thread waits on its own timeout budget.
+        # The thread lock above only guards the shared state. The process-wide
+        # lock and the file lock are acquired outside the thread lock, so a
+        # thread waiting on them never blocks other threads of the same
+        # instance, and every thread waits on its own timeout budget.
+        start = time.monotonic()
+        key = (self.BACKEND, self._lock_file)
+        with _REGISTRY_LOCK:
+            entry = _REGISTRY.get(key)
+            if entry is None:
+                entry = _LockEntry()
+                _REGISTRY[key] = entry
+            entry.users += 1
+
+        # Wait for other holders in this process without touching the file
+        if timeout < 0:
+            acquired = entry.mutex.acquire()
+        elif timeout == 0:
+            acquired = entry.mutex.acquire(blocking=False)
+        else:
+            acquired = entry.mutex.acquire(timeout=timeout)
+        if not acquired:
+            self._leave(key, entry, holding=False)
+            raise FilelockTimeout(self._lock_file)
+
+        # The first holder in this process takes the file lock,
+        # following holders inherit it from the previous one
+        if entry.handle is None:
+            if timeout > 0:
+                timeout = max(0.0, timeout - (time.monotonic() - start))
+            try:
+                entry.handle = self._file_acquire(timeout, poll_interval)
+            except BaseException:
+                self._leave(key, entry, holding=True)
+                raise
+
+        # Holding the process-wide lock, no other thread can have set the counter
+        with self._thread_lock:
+            self._entry = entry
+            self._lock_counter = 1
+        return self
+
+    def _file_acquire(self, timeout, poll_interval):
+        """
+        Acquire the file lock, creating the parent directory if missing.
+
+        Args:
+            timeout (float): Timeout in seconds, < 0 waits forever, 0 is non-blocking
+            poll_interval (float):
+
+        Returns:
+            sqlite3.Connection: Connection holding the exclusive lock
+
+        Raises:
+            FilelockTimeout: If the lock cannot be acquired within the timeout
+        """
         # Convert to the SQLite C API timeout in seconds:
         # < 0 waits forever, 0 is non-blocking.
-        # 315360000.0 is 10 years, effectively infinite for a blocking wait
-        sql_timeout = 315360000.0 if timeout < 0 else max(0.0, float(timeout))
+        # SQLite takes busy timeout as int milliseconds, larger values overflow
+        # and disable waiting, so a blocking wait uses the max value and retries.
+        sql_timeout = SQLITE_MAX_TIMEOUT if timeout < 0 else min(max(0.0, float(timeout)), SQLITE_MAX_TIMEOUT)
 
         # Optimistically assume the parent directory exists to save IO.
         # Create it and retry once only if connect fails with
         # "unable to open database file".
-        conn = None
-        for attempt in range(2):
+        attempt = 0
+        while True:
             try:
-                conn = self.__begin_exclusive(sql_timeout)
-                break
+                return self.__begin_exclusive(sql_timeout)
+            except FilelockTimeout:
+                if timeout < 0:
+                    continue
+                raise
             except sqlite3.OperationalError as e:
                 if attempt == 0 and str(e).lower() == "unable to open database file":
                     # Create the missing parent directory and retry once
+                    attempt += 1
                     parent_dir = os.path.dirname(self._lock_file)
                     if parent_dir:
                         os.makedirs(parent_dir, exist_ok=True)
                     continue
                 raise
 
-        # Register the connection and the counter atomically. BEGIN EXCLUSIVE
-        # is globally exclusive, so while this connection holds the lock no
-        # other thread can have set the counter, and no other thread can
-        # succeed before this registration.
-        with self._thread_lock:
-            self._conn = conn
-            self._lock_counter = 1
-        return self
-
     def __begin_exclusive(self, sql_timeout):
         """
         Open a connection and start an exclusive transaction.
@@ -241,6 +343,49 @@ def __begin_exclusive(self, sql_timeout):
                 raise FilelockTimeout(self._lock_file) from e
             raise
 
+    @staticmethod
+    def _file_release(handle):
+        """
+        Release the file lock.
+
+        Args:
+            handle (sqlite3.Connection): Return value of _file_acquire()
+        """
+        try:
+            # End the transaction
+            handle.rollback()
+        except Exception:
+            pass
+        finally:
+            try:
+                # Close the connection, the OS releases the exclusive lock
+                handle.close()
+            except Exception:
+                pass
+
+    def _leave(self, key, entry, holding):
+        """
+        Stop using the process-wide lock entry, called by its holder
+        or by a waiter that failed to acquire it.
+        The file lock is released when nobody in this process holds or waits.
+
+        Args:
+            key (tuple[str, str]):
+            entry (_LockEntry):
+            holding (bool): True if the caller holds entry.mutex
+        """
+        with _REGISTRY_LOCK:
+            entry.users -= 1
+            if entry.users <= 0:
+                if _REGISTRY.get(key) is entry:
+                    del _REGISTRY[key]
+                handle = entry.handle
+                entry.handle = None
+                if handle is not None:
+                    self._file_release(handle)
+        if holding:
+            entry.mutex.release()
+
     def release(self, force=False):
         """
         Release the lock.
@@ -258,21 +403,12 @@ def release(self, force=False):
 
             self._lock_counter -= 1
 
-            # Only close the connection and release the file lock when the counter drops to zero
+            # Only release the process-wide lock when the counter drops to zero
             if self._lock_counter == 0:
-                if self._conn:
-                    try:
-                        # End the transaction
-                        self._conn.rollback()
-                    except Exception:
-                        pass
-                    finally:
-                        try:
-                            # Close the connection, the OS releases the exclusive lock
-                            self._conn.close()
-                        except Exception:
-                            pass
-                        self._conn = None
+                entry = self._entry
+                self._entry = None
+                if entry is not None:
+                    self._leave((self.BACKEND, self._lock_file), entry, holding=True)
 
     def __enter__(self):
         """
@@ -296,3 +432,86 @@ def __del__(self):
         # __init__ raises, so guard against missing attributes
         if hasattr(self, '_thread_lock'):
             self.release(force=True)
+
+
+class FlockFileLock(SQLiteFileLock):
+    """
+    File lock based on fcntl.flock(), available on Linux and macOS.
+
+    Same interface and semantics as SQLiteFileLock, but acquiring the file lock
+    is a single syscall instead of opening a SQLite database.
+    The lock file is an empty file that stays on disk after release.
+    Note that flock() locks are not shared with SQLite locks,
+    all users of a lock file must use the same backend.
+    """
+    BACKEND = 'flock'
+
+    def __init__(self, lock_file, timeout=-1):
+        """
+        Args:
+            lock_file (str or Path): Lock file path, parent directories are
+                created automatically if missing
+            timeout (float): Timeout in seconds. Defaults to -1.
+
+        Raises:
+            ValueError: If lock_file is ":memory:"
+            NotImplementedError: If fcntl is not available, e.g. on Windows
+        """
+        if fcntl is None:
+            raise NotImplementedError('FlockFileLock requires fcntl.flock(), which is not available on this platform')
+        super().__init__(lock_file, timeout=timeout)
+
+    def _file_acquire(self, timeout, poll_interval):
+        """
+        Acquire the file lock, creating the parent directory if missing.
+
+        Args:
+            timeout (float): Timeout in seconds, < 0 waits forever, 0 is non-blocking
+            poll_interval (float): Seconds between attempts when timeout > 0
+
+        Returns:
+            int: File descriptor holding the lock
+
+        Raises:
+            FilelockTimeout: If the lock cannot be acquired within the timeout
+        """
+        try:
+            fd = os.open(self._lock_file, os.O_RDWR | os.O_CREAT, 0o666)
+        except FileNotFoundError:
+            parent_dir = os.path.dirname(self._lock_file)
+            if parent_dir:
+                os.makedirs(parent_dir, exist_ok=True)
+            fd = os.open(self._lock_file, os.O_RDWR | os.O_CREAT, 0o666)
+
+        try:
+            if timeout < 0:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                return fd
+            deadline = time.monotonic() + timeout
+            while True:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    return fd
+                except BlockingIOError:
+                    pass
+                remain = deadline - time.monotonic()
+                if remain <= 0:
+                    raise FilelockTimeout(self._lock_file)
+                time.sleep(min(poll_interval, remain))
+        except BaseException:
+            os.close(fd)
+            raise
+
+    @staticmethod
+    def _file_release(handle):
+        """
+        Release the file lock.
+
+        Args:
+            handle (int): Return value of _file_acquire()
+        """
+        try:
+            # Closing the file descriptor releases the flock
+            os.close(handle)
+        except OSError:
+            pass
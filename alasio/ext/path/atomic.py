@@ -1,6 +1,8 @@
 import os
 import random
 import string
+import sys
+import threading
 import time
 
 IS_WINDOWS = os.name == 'nt'
@@ -229,7 +231,7 @@ def atomic_rename(path_from, path_to):
         os.rename(path_from, path_to)
 
 
-def file_write(file, data):
+def file_write(file, data, fsync=True):
     """
     Write data into file, auto create directory
     Auto determines write mode based on the type of data.
@@ -237,6 +239,7 @@ def file_write(file, data):
     Args:
         file (str): Target file path
         data (Union[str, bytes]): Data to write
+        fsync (bool): False to skip fsync, caller must sync the file before relying on it
     """
     if isinstance(data, str):
         mode = 'w'
@@ -268,8 +271,9 @@ def file_write(file, data):
         with open(file, mode=mode, encoding=encoding, newline=newline) as f:
             f.write(data)
             # Ensure data flush to disk
-            f.flush()
-            os.fsync(f.fileno())
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
         return
     except FileNotFoundError:
         pass
@@ -281,11 +285,12 @@ def file_write(file, data):
     with open(file, mode=mode, encoding=encoding, newline=newline) as f:
         f.write(data)
         # Ensure data flush to disk
-        f.flush()
-        os.fsync(f.fileno())
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
 
 
-def file_write_stream(file, data_generator):
+def file_write_stream(file, data_generator, fsync=True):
     """
     Only creates a file if the generator yields at least one data chunk.
     Auto determines write mode based on the type of first chunk.
@@ -293,6 +298,7 @@ def file_write_stream(file, data_generator):
     Args:
         file (str): Target file path
         data_generator (Iterable): An iterable that yields data chunks (str or bytes)
+        fsync (bool): False to skip fsync, caller must sync the file before relying on it
     """
     # Convert generator to iterator to ensure we can peek at first chunk
     data_iter = iter(data_generator)
@@ -326,8 +332,9 @@ def file_write_stream(file, data_generator):
             for chunk in data_iter:
                 f.write(chunk)
             # Ensure data flush to disk
-            f.flush()
-            os.fsync(f.fileno())
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
         return
     except FileNotFoundError:
         pass
@@ -341,8 +348,9 @@ def file_write_stream(file, data_generator):
         for chunk in data_iter:
             f.write(chunk)
         # Ensure data flush to disk
-        f.flush()
-        os.fsync(f.fileno())
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
 
 
 async def afile_write_stream(file, data_iter):
@@ -430,12 +438,205 @@ def atomic_write_stream(file, data_generator):
     Args:
         file (str): Target file path
         data_generator (Iterable): An iterable that yields data chunks (str or bytes)
+            If the generator raises, the temp file is removed and target file is untouched.
     """
     tmp = to_tmp_file(file)
-    file_write_stream(tmp, data_generator)
+    try:
+        file_write_stream(tmp, data_generator)
+    except BaseException:
+        file_remove(tmp)
+        raise
     replace_tmp(tmp, file)
 
 
+_SYNCFS = None
+
+
+def _get_syncfs():
+    """
+    Returns:
+        callable | None: libc syncfs(fd) on Linux, None if not available
+    """
+    global _SYNCFS
+    if _SYNCFS is None:
+        _SYNCFS = False
+        if sys.platform.startswith('linux'):
+            try:
+                import ctypes
+                func = ctypes.CDLL(None, use_errno=True).syncfs
+            except (OSError, AttributeError):
+                pass
+            else:
+                func.argtypes = [ctypes.c_int]
+                func.restype = ctypes.c_int
+                _SYNCFS = func
+    return _SYNCFS or None
+
+
+def sync_files(files, syncfs=True):
+    """
+    Flush written files to disk.
+    On Linux, call syncfs() once per filesystem instead of fsync() every file,
+    which commits filesystem journal once.
+
+    Args:
+        files (Iterable[str]): File paths
+        syncfs (bool): False to always fsync() files one by one
+    """
+    func = _get_syncfs() if syncfs else None
+    if func is None:
+        for file in files:
+            fd = os.open(file, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        return
+
+    # one file on each filesystem
+    devices = {}
+    for folder in {os.path.dirname(file) or '.' for file in files}:
+        dev = os.stat(folder).st_dev
+        if dev not in devices:
+            devices[dev] = folder
+    for folder in devices.values():
+        fd = os.open(folder, os.O_RDONLY)
+        try:
+            if func(fd) != 0:
+                import ctypes
+                errno = ctypes.get_errno()
+                raise OSError(errno, os.strerror(errno), folder)
+        finally:
+            os.close(fd)
+
+
+class AtomicWriteBatch:
+    """
+    Atomic write of many files with one sync pass.
+
+    atomic_write() fsyncs every file before os.replace(), writing hundreds of files pays hundreds of fsync.
+    AtomicWriteBatch writes all temp files without fsync, syncs them together on exit,
+    then replaces target files in order.
+
+    Crash semantics are the same as calling atomic_write() on each file:
+    a target is replaced only after its content is on disk, so each target file is either the old one or the new one.
+    If crashed during replacing, files before it are new and files after it are old,
+    their temp files are left and can be removed by atomic_failure_cleanup().
+
+    Examples:
+        with AtomicWriteBatch() as batch:
+            batch.write('a.json', data_a)
+            # manifest is replaced after the files it references
+            batch.write('manifest.json', manifest, order=1)
+
+    write() is thread-safe, files can be written on THREAD_POOL.
+    Target files are untouched until exiting the `with` block,
+    if the block raises, all temp files are removed and no target is replaced.
+    """
+    # Use syncfs() on Linux if there are at least this many files,
+    # syncfs() flushes the whole filesystem, which can be slower than fsync() a few files
+    # if other processes are writing a lot.
+    SYNCFS_MIN_FILES = 8
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # key: target file, value: (order, index, tmp)
+        self._files: "dict[str, tuple[int, int, str]]" = {}
+        self._index = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+
+    def _add(self, file, tmp, order):
+        with self._lock:
+            self._index += 1
+            old = self._files.get(file)
+            self._files[file] = (order, self._index, tmp)
+        if old is not None:
+            # same file written twice, the last one wins
+            file_remove(old[2])
+
+    def write(self, file, data, order=0):
+        """
+        Write data to a temp file of the target file.
+
+        Args:
+            file (str): Target file path
+            data (Union[str, bytes]): Data to write
+            order (int): Files are replaced in ascending order, then in the order they were written
+        """
+        file = str(file)
+        tmp = to_tmp_file(file)
+        try:
+            file_write(tmp, data, fsync=False)
+        except BaseException:
+            file_remove(tmp)
+            raise
+        self._add(file, tmp, order)
+
+    def write_stream(self, file, data_generator, order=0):
+        """
+        Write streaming data to a temp file of the target file.
+        If the generator yields nothing, no file is created and the target file is untouched.
+
+        Args:
+            file (str): Target file path
+            data_generator (Iterable): An iterable that yields data chunks (str or bytes)
+            order (int): Files are replaced in ascending order, then in the order they were written
+        """
+        file = str(file)
+        tmp = to_tmp_file(file)
+        try:
+            file_write_stream(tmp, data_generator, fsync=False)
+        except BaseException:
+            file_remove(tmp)
+            raise
+        if os.path.exists(tmp):
+            self._add(file, tmp, order)
+
+    def commit(self):
+        """
+        Sync all temp files, then replace target files.
+        Remaining temp files are removed if any replace fails.
+        """
+        with self._lock:
+            files = sorted(self._files.items(), key=lambda item: item[1][:2])
+            self._files = {}
+        if not files:
+            return
+        tmps = [tmp for _, (_, _, tmp) in files]
+        try:
+            sync_files(tmps, syncfs=len(tmps) >= self.SYNCFS_MIN_FILES)
+        except BaseException:
+            for tmp in tmps:
+                file_remove(tmp)
+            raise
+
+        for index, (file, (_, _, tmp)) in enumerate(files):
+            try:
+                replace_tmp(tmp, file)
+            except BaseException:
+                for _, (_, _, remain) in files[index + 1:]:
+                    file_remove(remain)
+                raise
+
+    def abort(self):
+        """
+        Remove all temp files, target files are untouched.
+        """
+        with self._lock:
+            files = self._files
+            self._files = {}
+        for _, _, tmp in files.values():
+            file_remove(tmp)
+
+
 def file_read_text(file, encoding='utf-8', errors='strict'):
     """
     Read text file content
@@ -1,6 +1,52 @@
+import platform
+import statistics
+import sys
 import time
 
+import msgspec
+
 from alasio.base.pretty import pretty_time
+from alasio.ext.path.atomic import atomic_read_bytes, atomic_write
+
+# Scale MAD to the standard deviation of normal distribution
+MAD_SCALE = 1.4826
+
+
+def set_cpu_affinity(cpus):
+    """
+    Pin current process to given CPUs
+
+    Args:
+        cpus (int | list[int]): CPU id or list of CPU ids
+
+    Returns:
+        list[int] | None: Previous affinity to restore, or None if not supported on current platform
+    """
+    if isinstance(cpus, int):
+        cpus = [cpus]
+    import psutil
+    process = psutil.Process()
+    try:
+        previous = process.cpu_affinity()
+        process.cpu_affinity(list(cpus))
+    except (AttributeError, NotImplementedError, OSError) as e:
+        # cpu_affinity() is not available on macOS
+        print(f"Failed to set CPU affinity to {cpus}: {e}")
+        return None
+    return previous
+
+
+def median_mad(samples):
+    """
+    Args:
+        samples (list[float]):
+
+    Returns:
+        tuple[float, float]: Median and median absolute deviation
+    """
+    median = statistics.median(samples)
+    mad = statistics.median([abs(s - median) for s in samples])
+    return median, mad
 
 
 class PerformanceTest:
@@ -11,6 +57,11 @@ def __init__(self):
         self.min_duration = 0.3  # Minimum runtime (seconds)
         self.min_iterations = 15  # Minimum iterations
         self.outputs_consistent = True  # Track output consistency
+        self.verify = True  # Whether to verify outputs are consistent, False to test unrelated functions together
+        self.warmup = 0  # Warm-up iterations before timing each function
+        self.repeat = 5  # Split iterations into samples, to calculate median and MAD
+        self.cpus = None  # CPU id or list of CPU ids to pin the process on while testing, None to not pin
+        self.results = []  # Results of the last run
 
     def __enter__(self):
         return self
@@ -267,23 +318,34 @@ def run_performance_test(self, iterations_map):
             # Extract function to avoid dictionary lookup overhead
             func = func_info['func']
 
-            # Performance test (no warm-up, simple loop)
-            total_start = time.perf_counter()
-
-            for _ in range(iterations):
+            # Warm up caches, lazy imports and branch predictors
+            for _ in range(self.warmup):
                 func()
 
-            total_end = time.perf_counter()
-            total_time = total_end - total_start
+            # Performance test, iterations are split into samples
+            # so a few interrupted samples won't affect median
+            repeat = max(1, min(self.repeat, iterations))
+            per_sample = iterations // repeat
+            iterations = per_sample * repeat
+            samples = []
+            for _ in range(repeat):
+                sample_start = time.perf_counter()
+                for _ in range(per_sample):
+                    func()
+                samples.append((time.perf_counter() - sample_start) / per_sample)
 
             # Calculate average time
-            avg_time = total_time / iterations
+            avg_time = sum(samples) / repeat
+            median, mad = median_mad(samples)
 
             result = {
                 'name': func_name,
                 'params': func_params,
                 'iterations': iterations,
-                'avg_time': avg_time
+                'avg_time': avg_time,
+                'median': median,
+                'mad': mad,
+                'samples': samples,
             }
             results.append(result)
 
@@ -330,14 +392,15 @@ def print_results(self, results):
         fastest_time = sorted_results[0]['avg_time']
 
         # Calculate total width for main data columns (excluding parameters)
-        main_data_width = name_width + 12 + 12 + 10 + 2  # name + iterations + average + slower + padding
+        # name + iterations + average + mad + slower + padding
+        main_data_width = name_width + 12 + 12 + 12 + 10 + 3
 
         print("\n" + "=" * main_data_width)
         print("Performance Test Results")
         print("=" * main_data_width)
 
         # Table header
-        header = f"{'Function':<{name_width}} {'Iterations':<12} {'Average':<12} {'Slower':<10}"
+        header = f"{'Function':<{name_width}} {'Iterations':<12} {'Average':<12} {'MAD':<12} {'Slower':<10}"
         if show_params:
             header += " Parameters"
         print(header)
@@ -349,6 +412,7 @@ def print_results(self, results):
         # Data rows
         for i, result in enumerate(sorted_results):
             row = f"{result['name']:<{name_width}} {result['iterations']:<12} {pretty_time(result['avg_time']):<12}"
+            row += f" {pretty_time(result.get('mad', 0.)):<12}"
 
             if i == 0:
                 # Fastest function - no slower ratio
@@ -379,18 +443,142 @@ def run_all_tests(self):
 
         print(f"Starting performance test with {len(self.functions)} registered functions")
 
-        # Step 1: Verify output consistency
-        self.verify_outputs()
+        previous_cpus = None
+        if self.cpus is not None:
+            previous_cpus = set_cpu_affinity(self.cpus)
+        try:
+            # Step 1: Verify output consistency
+            if self.verify:
+                self.verify_outputs()
 
-        # Step 2: Estimate test parameters
-        iterations_map = self.estimate_iterations()
+            # Step 2: Estimate test parameters
+            iterations_map = self.estimate_iterations()
 
-        # Step 3: Execute performance test
-        results = self.run_performance_test(iterations_map)
+            # Step 3: Execute performance test
+            results = self.run_performance_test(iterations_map)
+        finally:
+            if previous_cpus is not None:
+                set_cpu_affinity(previous_cpus)
 
         # Step 4: Print results
+        self.results = results
         self.print_results(results)
 
+    @staticmethod
+    def result_key(result):
+        """
+        Args:
+            result (dict): Performance test result
+
+        Returns:
+            str: Identifier to match results across runs
+        """
+        return f"{result['name']}{result['params']}"
+
+    def export_json(self, file, results=None):
+        """
+        Export results to JSON file, which can be used as baseline of compare()
+
+        Args:
+            file (str): Output file
+            results (list): Performance test results, default to results of the last run
+        """
+        if results is None:
+            results = self.results
+        data = {
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'machine': platform.machine(),
+            'cpus': self.cpus,
+            'time': time.time(),
+            'results': results,
+        }
+        atomic_write(file, msgspec.json.format(msgspec.json.encode(data), indent=2))
+
+    @staticmethod
+    def load_json(file):
+        """
+        Args:
+            file (str): File exported by export_json()
+
+        Returns:
+            list[dict]: Performance test results
+        """
+        data = msgspec.json.decode(atomic_read_bytes(file))
+        return data['results']
+
+    def compare(self, baseline, results=None, threshold=0.1, mad_factor=3.):
+        """
+        Compare results with baseline.
+        A function is considered as regressed if its median is slower than baseline by more than
+        both `threshold` of baseline median and `mad_factor` times the noise of either run,
+        so noisy benchmarks need a larger difference to be reported.
+
+        Args:
+            baseline (str | list[dict]): Baseline file exported by export_json(), or results
+            results (list): Performance test results, default to results of the last run
+            threshold (float): Minimum relative difference to report
+            mad_factor (float): Minimum difference in scaled MADs to report
+
+        Returns:
+            list[dict]: Regressed results, each has keys "key", "base", "current", "ratio", "status"
+        """
+        if isinstance(baseline, str):
+            baseline = self.load_json(baseline)
+        if results is None:
+            results = self.results
+        base_map = {self.result_key(r): r for r in baseline}
+
+        rows = []
+        for result in results:
+            key = self.result_key(result)
+            current = result.get('median', result['avg_time'])
+            try:
+                base_result = base_map[key]
+            except KeyError:
+                rows.append({'key': key, 'base': None, 'current': current, 'ratio': None, 'status': 'new'})
+                continue
+            base = base_result.get('median', base_result['avg_time'])
+            noise = MAD_SCALE * max(result.get('mad', 0.), base_result.get('mad', 0.))
+            limit = max(threshold * base, mad_factor * noise)
+            if current - base > limit:
+                status = 'slower'
+            elif base - current > limit:
+                status = 'faster'
+            else:
+                status = 'same'
+            ratio = current / base if base > 0 else None
+            rows.append({'key': key, 'base': base, 'current': current, 'ratio': ratio, 'status': status})
+
+        self.print_compare(rows)
+        return [row for row in rows if row['status'] == 'slower']
+
+    @staticmethod
+    def print_compare(rows):
+        """
+        Print comparison with baseline
+
+        Args:
+            rows (list[dict]): Rows from compare()
+        """
+        if not rows:
+            print("No results to compare")
+            return
+        key_width = max(20, max(len(row['key']) for row in rows) + 2)
+        width = key_width + 12 + 12 + 10 + 8 + 4
+
+        print("\n" + "=" * width)
+        print("Compare With Baseline")
+        print("=" * width)
+        print(f"{'Function':<{key_width}} {'Baseline':<12} {'Current':<12} {'Ratio':<10} {'Status':<8}")
+        print("-" * width)
+        for row in rows:
+            base = pretty_time(row['base']) if row['base'] is not None else '-'
+            ratio = f"{row['ratio']:.2f}x" if row['ratio'] is not None else '-'
+            print(f"{row['key']:<{key_width}} {base:<12} {pretty_time(row['current']):<12} {ratio:<10} "
+                  f"{row['status']:<8}")
+        print("-" * width)
+
 
 # Usage example
 if __name__ == "__main__":
@@ -437,13 +625,13 @@ def python_sort(arr):
 
     # Example output with simplified parameter display:
     """
-    ========================================================
+    =====================================================================
     Performance Test Results
-    ========================================================
-    Function             Iterations   Average      Slower    
-    --------------------------------------------------------
-    python_sort          549846       0.462us      (fastest) 
-    selection_sort       38596        7.723us      16.71x
-    bubble_sort          29060        10.425us     22.55x
-    --------------------------------------------------------
+    =====================================================================
+    Function             Iterations   Average      MAD          Slower    
+    ---------------------------------------------------------------------
+    python_sort          549845       0.462us      0.012us      (fastest) 
+    selection_sort       38595        7.723us      0.105us      16.71x
+    bubble_sort          29060        10.425us     0.231us      22.55x
+    ---------------------------------------------------------------------
     """
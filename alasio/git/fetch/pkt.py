@@ -183,6 +183,26 @@ async def agather_bytes(stream_iterator):
     return b''.join(content)
 
 
+async def agather_pack(stream_iterator, indexer=None):
+    """
+    Gather pack data to a bytes object, and feed each chunk to `indexer` as it arrives
+
+    Args:
+        stream_iterator: An async iterator yielding bytes or memoryview
+        indexer (StreamIdx): Incremental pack indexer, or None to just gather
+
+    Returns:
+        bytes:
+    """
+    if indexer is None:
+        return await agather_bytes(stream_iterator)
+    content = deque()
+    async for data in stream_iterator:
+        indexer.feed(data)
+        content.append(data)
+    return b''.join(content)
+
+
 def create_pkt_line(data):
     """
     Create a standard pkt-line formatted byte string.
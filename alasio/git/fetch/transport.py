@@ -2,6 +2,7 @@
 from alasio.git.fetch.argument import Arguments, Capabilities
 from alasio.git.fetch.pkt import FetchPayload
 from alasio.git.stage.gitcommit import GitCommit
+from alasio.git.stage.genidx import StreamIdx
 
 
 class BaseTransport:
@@ -44,6 +45,19 @@ async def fetch(self, output_file) -> int:
         """
         raise NotImplementedError
 
+    def create_indexer(self, index_file=None):
+        """
+        Args:
+            index_file (str): Output .idx file, None to skip indexing
+
+        Returns:
+            StreamIdx | None: Incremental indexer that consumes pack data while fetching
+        """
+        if index_file is None:
+            return None
+        # REF_DELTA in thin pack may refer to local objects
+        return StreamIdx(self.arguments.repo_path)
+
     def build_fetch_payload(self, want, depth=0, head=None):
         """
         Builds the complete negotiation request body in pkt-line format.
@@ -1,7 +1,8 @@
 import trio
 
 from alasio.ext.path.atomic import atomic_write
-from alasio.git.fetch.pkt import FetchPayload, agather_bytes, aparse_packfile_stream, aparse_pkt_line, create_pkt_line, parse_pkt_line
+from alasio.ext.path.calc import with_suffix
+from alasio.git.fetch.pkt import FetchPayload, agather_pack, aparse_packfile_stream, aparse_pkt_line, create_pkt_line, parse_pkt_line
 from alasio.git.fetch.transport import BaseTransport
 from alasio.logger import logger
 
@@ -63,12 +64,14 @@ async def fetch_refs(self):
 
         return out
 
-    async def fetch_pack_v1(self, payload: FetchPayload, output_file=None):
+    async def fetch_pack_v1(self, payload: FetchPayload, output_file=None, index_file=None):
         """
         Args:
             payload (FetchPayload):
             output_file (str): Write into output_file directly
                 If output_file is None, return pack file data
+            index_file (str): Index pack while receiving and write .idx into index_file,
+                .objtype side table is written next to it. None to skip indexing
 
         Returns:
             bytes | None:
@@ -77,6 +80,7 @@ async def fetch_pack_v1(self, payload: FetchPayload, output_file=None):
         port = self.arguments.repo_url.port or 9418
         path = self.arguments.repo_url.path
         logger.info(f'fetch_pack_v1: git://{host}:{port}{path}')
+        indexer = self.create_indexer(index_file)
 
         async with await trio.open_tcp_stream(host, port) as stream:
             # Send handshake
@@ -106,11 +110,14 @@ async def stream_iterator():
 
             pkt_stream = aparse_pkt_line(stream_iterator())
             file_stream = aparse_packfile_stream(pkt_stream)
-            data = await agather_bytes(file_stream)
+            data = await agather_pack(file_stream, indexer)
 
         atomic_write(output_file, data)
+        if indexer is not None:
+            atomic_write(index_file, indexer.finish())
+            atomic_write(with_suffix(index_file, '.objtype'), indexer.pack_to_objtype())
 
-    async def fetch_pack_v2(self, payload: FetchPayload, output_file=None):
+    async def fetch_pack_v2(self, payload: FetchPayload, output_file=None, index_file=None):
         """
         Fetch pack using Git Protocol v2.
         
@@ -118,6 +125,8 @@ async def fetch_pack_v2(self, payload: FetchPayload, output_file=None):
             payload (FetchPayload): The fetch request payload.
             output_file (str): Write into output_file directly.
                 If output_file is None, return pack file data.
+            index_file (str): Index pack while receiving and write .idx into index_file,
+                .objtype side table is written next to it. None to skip indexing.
 
         Returns:
             bytes | None:
@@ -126,6 +135,7 @@ async def fetch_pack_v2(self, payload: FetchPayload, output_file=None):
         port = self.arguments.repo_url.port or 9418
         path = self.arguments.repo_url.path
         logger.info(f'fetch_pack_v2: git://{host}:{port}{path}')
+        indexer = self.create_indexer(index_file)
 
         async with await trio.open_tcp_stream(host, port) as stream:
             # Send v2 handshake (includes version=2)
@@ -158,9 +168,12 @@ async def stream_iterator():
 
             pkt_stream = aparse_pkt_line(stream_iterator())
             file_stream = aparse_packfile_stream(pkt_stream)
-            data = await agather_bytes(file_stream)
+            data = await agather_pack(file_stream, indexer)
 
         atomic_write(output_file, data)
+        if indexer is not None:
+            atomic_write(index_file, indexer.finish())
+            atomic_write(with_suffix(index_file, '.objtype'), indexer.pack_to_objtype())
 
     def _build_v2_payload(self, payload: FetchPayload):
         """
@@ -4,8 +4,9 @@
 import trio
 
 from alasio.ext.path.atomic import atomic_write, file_write_stream
+from alasio.ext.path.calc import with_suffix
 from alasio.git.fetch.argument import Arguments
-from alasio.git.fetch.pkt import FetchPayload, agather_bytes, aparse_packfile_stream, aparse_pkt_line, parse_pkt_line
+from alasio.git.fetch.pkt import FetchPayload, agather_pack, aparse_packfile_stream, aparse_pkt_line, parse_pkt_line
 from alasio.git.fetch.transport import BaseTransport
 from alasio.logger import logger
 
@@ -53,12 +54,14 @@ async def fetch_refs(self):
 
         return out
 
-    async def fetch_pack_v1(self, payload: FetchPayload, output_file=None):
+    async def fetch_pack_v1(self, payload: FetchPayload, output_file=None, index_file=None):
         """
         Args:
             payload (FetchPayload):
             output_file (str): Write into output_file directly
                 If output_file is None, return pack file data
+            index_file (str): Index pack while receiving and write .idx into index_file,
+                .objtype side table is written next to it. None to skip indexing
 
         Returns:
             bytes | None:
@@ -66,6 +69,7 @@ async def fetch_pack_v1(self, payload: FetchPayload, output_file=None):
         repo = self.arguments.repo_url.to_http()
         url = f'{repo}/git-upload-pack'
         logger.info(f'fetch_refs: {url}')
+        indexer = self.create_indexer(index_file)
 
         headers = self.capabilities.headers(protocol_v2=False)
         headers.update({
@@ -81,11 +85,14 @@ async def fetch_pack_v1(self, payload: FetchPayload, output_file=None):
                 response.raise_for_status()
                 pkt_stream = aparse_pkt_line(response.aiter_raw())
                 file_stream = aparse_packfile_stream(pkt_stream)
-                data = await agather_bytes(file_stream)
+                data = await agather_pack(file_stream, indexer)
 
         atomic_write(output_file, data)
+        if indexer is not None:
+            atomic_write(index_file, indexer.finish())
+            atomic_write(with_suffix(index_file, '.objtype'), indexer.pack_to_objtype())
 
-    async def fetch_pack_v2(self, payload: FetchPayload, output_file=None):
+    async def fetch_pack_v2(self, payload: FetchPayload, output_file=None, index_file=None):
         """
         Fetch pack using HTTP Protocol v2.
         
@@ -93,6 +100,8 @@ async def fetch_pack_v2(self, payload: FetchPayload, output_file=None):
             payload (FetchPayload): The fetch request payload.
             output_file (str): Write into output_file directly.
                 If output_file is None, return pack file data.
+            index_file (str): Index pack while receiving and write .idx into index_file,
+                .objtype side table is written next to it. None to skip indexing.
 
         Returns:
             bytes | None:
@@ -100,6 +109,7 @@ async def fetch_pack_v2(self, payload: FetchPayload, output_file=None):
         repo = self.arguments.repo_url.to_http()
         url = f'{repo}/git-upload-pack'
         logger.info(f'fetch_pack_v2: {url}')
+        indexer = self.create_indexer(index_file)
 
         headers = self.capabilities.headers(protocol_v2=True)
         headers.update({
@@ -117,9 +127,12 @@ async def fetch_pack_v2(self, payload: FetchPayload, output_file=None):
                 response.raise_for_status()
                 pkt_stream = aparse_pkt_line(response.aiter_raw())
                 file_stream = aparse_packfile_stream(pkt_stream)
-                data = await agather_bytes(file_stream)
+                data = await agather_pack(file_stream, indexer)
 
         atomic_write(output_file, data)
+        if indexer is not None:
+            atomic_write(index_file, indexer.finish())
+            atomic_write(with_suffix(index_file, '.objtype'), indexer.pack_to_objtype())
 
     def _build_v2_payload(self, payload: FetchPayload):
         """
@@ -0,0 +1,92 @@
+import threading
+from collections import OrderedDict
+
+from alasio.git.obj.obj import GitObject
+
+
+class DeltaBaseCache:
+    def __init__(self, limit=100663296):
+        """
+        Byte-budgeted LRU cache of resolved delta objects, similar to delta_base_cache in git.
+        Sibling objects usually share the same delta bases, so caching resolved bases
+        avoids inflating and applying the whole delta chain again on every `cat`.
+
+        Args:
+            limit (int): Maximum total size of cached object data in bytes,
+                default to 96MB, same as core.deltaBaseCacheLimit in git
+        """
+        self.limit = limit
+        # total size of cached object data
+        self.size = 0
+        self.hit = 0
+        self.miss = 0
+        self.evicted = 0
+        # key: sha1, value: resolved GitObject, least recently used first
+        self._cache: "OrderedDict[str, GitObject]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._cache)
+
+    def __contains__(self, sha1):
+        return sha1 in self._cache
+
+    def get(self, sha1):
+        """
+        Args:
+            sha1 (str):
+
+        Returns:
+            GitObject | None: Resolved object, or None if not cached
+        """
+        with self._lock:
+            try:
+                obj = self._cache[sha1]
+            except KeyError:
+                self.miss += 1
+                return None
+            self._cache.move_to_end(sha1)
+            self.hit += 1
+            return obj
+
+    def set(self, sha1, obj):
+        """
+        Args:
+            sha1 (str):
+            obj (GitObject): Resolved object
+        """
+        size = len(obj.data)
+        if size > self.limit:
+            # too large to cache
+            return
+        with self._lock:
+            cache = self._cache
+            old = cache.pop(sha1, None)
+            if old is not None:
+                self.size -= len(old.data)
+            cache[sha1] = obj
+            self.size += size
+            # evict least recently used
+            while self.size > self.limit:
+                _, old = cache.popitem(last=False)
+                self.size -= len(old.data)
+                self.evicted += 1
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self.size = 0
+
+    def stats(self):
+        """
+        Returns:
+            dict[str, int]:
+        """
+        return {
+            'hit': self.hit,
+            'miss': self.miss,
+            'evicted': self.evicted,
+            'count': len(self._cache),
+            'size': self.size,
+            'limit': self.limit,
+        }
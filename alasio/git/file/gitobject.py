@@ -1,12 +1,14 @@
 import os
 from collections import defaultdict, deque
 
+from alasio.ext.cache import cached_property
 from alasio.ext.concurrent.threadpool import THREAD_POOL
 from alasio.ext.path.calc import joinnormpath
+from alasio.git.file.deltacache import DeltaBaseCache
 from alasio.git.file.exception import PackBroken
 from alasio.git.file.loose import LoosePath
 from alasio.git.file.pack import PackFile
-from alasio.git.obj.obj import GitLooseObject, GitObject, OBJTYPE_BASIC, parse_objdata
+from alasio.git.obj.obj import GitLooseObject, GitObject, OBJTYPE_BASIC, OBJTYPE_DELTA, parse_objdata
 from alasio.git.stage.base import GitRepoBase
 
 
@@ -25,14 +27,31 @@ class GitObjectManager(GitRepoBase):
     # git objects that not yet read
     # key: sha1 of git object, value: self
     dict_object_unread: "dict[str, PackFile | LoosePath]" = {}
-    # where git object is from, used for query ofs_delta
-    # key: sha1 of git object, value: sub manager
-    dict_object_from: "dict[str, PackFile | LoosePath]" = {}
+    # pack files in newer first order, used to find where git object is from, see object_pack_offset()
+    # we lookup .idx of each pack instead of building a dict of all objects,
+    # so idx_mmap mode doesn't need to iterate all sha1
+    list_pack_newer: "list[PackFile]" = []
 
     # Skip reading objects with size > skip_size in lazy read
     # 1MB is balanced value that assume reading from HDD of 100MB/s read and 100 IOPS,
     # so read 1MB less file read means we can have 1 more file seek
     skip_size: int = 1048576
+    # Whether to mmap .idx files instead of parsing them into dict, see IdxFile.idx_mmap
+    idx_mmap: bool = False
+    # Maximum bytes of resolved delta objects to cache, default to 96MB, see DeltaBaseCache
+    # If 0, delta objects are resolved in place and stay in dict_object forever, which uses unbounded memory
+    delta_base_cache_limit: int = 100663296
+    # Delta chains resolving to objects >= this size are applied in one pass, see apply_delta_chain()
+    # Composing deltas costs python loops on every instruction, but saves copying large intermediates
+    delta_chain_min_size: int = 1048576
+
+    @cached_property
+    def delta_base_cache(self) -> "DeltaBaseCache | None":
+        limit = self.delta_base_cache_limit
+        if limit > 0:
+            return DeltaBaseCache(limit)
+        else:
+            return None
 
     def _manager_prepare(self):
         """
@@ -40,7 +59,9 @@ def _manager_prepare(self):
         """
         dict_pack = {}
         for pack, _ in self._iter_pack_idx():
-            dict_pack[pack] = PackFile(pack.path)
+            pack_file = PackFile(pack.path)
+            pack_file.idx_mmap = self.idx_mmap
+            dict_pack[pack] = pack_file
         self.loose = LoosePath(joinnormpath(self.path, '.git/objects'))
         self.dict_pack = dict_pack
 
@@ -93,20 +114,20 @@ def _manager_build(self):
         dict_object: "dict[str, GitObject | GitLooseObject]" = self.loose.dict_object
         dict_object_data: "dict[str, memoryview]" = self.loose.dict_object_data
         dict_object_unread: "dict[str, PackFile | LoosePath]" = self.loose.dict_object_unread
-        dict_object_from: "dict[str, PackFile | LoosePath]" = dict.fromkeys(self.loose.dict_object_unread, self.loose)
 
         # if multiple pack files contain the same object, the newer one will be used
         for pack in self.dict_pack.values():
             dict_object.update(pack.dict_object)
             dict_object_data.update(pack.dict_object_data)
             dict_object_unread.update(pack.dict_object_unread)
-            object_from = dict.fromkeys(pack.dict_offset, pack)
-            dict_object_from.update(object_from)
 
         self.dict_object = dict_object
         self.dict_object_data = dict_object_data
         self.dict_object_unread = dict_object_unread
-        self.dict_object_from = dict_object_from
+        self.list_pack_newer = list(reversed(self.dict_pack.values()))
+        cache = cached_property.pop(self, 'delta_base_cache')
+        if cache is not None:
+            cache.clear()
 
     def _manager_clear_sub(self):
         """
@@ -165,6 +186,46 @@ def read_lazy(self, skip_size=None):
         self._manager_clear_sub()
         return self
 
+    def object_pack_offset(self, sha1):
+        """
+        Find the pack file that git object is from, by looking up .idx of each pack
+
+        Args:
+            sha1 (str):
+
+        Returns:
+            tuple[PackFile, int] | None: (pack, offset_start) of object in pack,
+                or None if object is a loose object or not exist
+        """
+        # if multiple pack files contain the same object, the newer one will be used
+        for pack in self.list_pack_newer:
+            offset = pack.dict_offset.get(sha1)
+            if offset is not None:
+                return pack, offset[0]
+        return None
+
+    def objtype_info(self, sha1):
+        """
+        Get object type and uncompressed size from .objtype side table, without reading object data
+
+        Args:
+            sha1 (str):
+
+        Returns:
+            tuple[int, int] | None: (objtype, size), or None if pack has no side table or object is not in pack
+        """
+        found = self.object_pack_offset(sha1)
+        if found is None:
+            return None
+        pack, offset = found
+        table = pack.objtype_read()
+        if table is None:
+            return None
+        try:
+            return table.get(offset)
+        except KeyError:
+            return None
+
     def cat_shallow(self, sha1):
         """
         Get object from given sha1.
@@ -237,48 +298,103 @@ def cat(self, sha1):
         if obj.type in OBJTYPE_BASIC:
             return obj
 
-        # lookup delta
-        dict_object_from = self.dict_object_from
-        result_obj = obj
+        cache = self.delta_base_cache
+        if cache is None:
+            return self._cat_delta_inplace(sha1, obj)
+
+        result_obj = cache.get(sha1)
+        if result_obj is not None:
+            return result_obj
+
+        # lookup delta, until reaching a non-delta object or a cached resolved object
         # notes:
         # don't use recursion to handle delta objects
         # because delta reference can up to depth of 4096 and python can only have recursion depth < 1000
-        queue = deque([obj])
+        queue = deque([(sha1, obj)])
         while 1:
-            typ = obj.type
-            if typ == 6:
-                # sha1 -> source sha1
-                offset_delta = obj.decoded.offset
-                try:
-                    pack = dict_object_from[sha1]
-                except KeyError:
-                    # this should not happen
-                    raise PackBroken(f'Failed to solve ofs_delta object {sha1}: cannot find where it came from')
-                try:
-                    offset_base = pack.dict_offset[sha1][0]
-                except KeyError:
-                    # this should not happen
-                    raise PackBroken(f'Failed to solve ofs_delta object {sha1}: cannot find its offset')
-                offset = offset_base - offset_delta
-                if offset < 0:
-                    # this should not happen
-                    raise PackBroken(f'Failed to solve ofs_delta object {sha1}: source offset {offset} < 0')
-                try:
-                    sha1 = pack.dict_offset_to_sha1[offset]
-                except KeyError:
-                    # this should not happen
-                    raise PackBroken(f'Failed to solve ofs_delta object {sha1}: '
-                                     f'offset {offset} does not point to any object in {pack.pack_file}')
-                obj = self.cat_shallow(sha1)
-                queue.appendleft(obj)
-            elif typ == 7:
-                # sha1 -> ref sha1
-                sha1 = obj.decoded.ref
-                obj = self.cat_shallow(sha1)
-                queue.appendleft(obj)
-            else:
-                # non-delta object
+            sha1 = self._delta_base_sha1(sha1, obj)
+            source = cache.get(sha1)
+            if source is not None:
                 break
+            obj = self.cat_shallow(sha1)
+            if obj.type in OBJTYPE_BASIC:
+                source = obj
+                break
+            queue.appendleft((sha1, obj))
+
+        # apply delta
+        # queue is (delta, delta, ...), objects in dict_object are kept as delta,
+        # resolved objects are new objects that go into delta base cache
+        _ = source.decoded
+        if len(queue) > 1:
+            sha1, delta = queue[-1]
+            if delta.decoded.result_size >= self.delta_chain_min_size:
+                # large object, apply the whole chain in one pass without materializing intermediates
+                result_obj = GitObject(type=delta.type, size=delta.size, data=delta.data)
+                cached_property.set(result_obj, 'decoded', delta.decoded)
+                result_obj.apply_delta_chain_from_source(source, [d for _, d in queue])
+                cache.set(sha1, result_obj)
+                return result_obj
+        for sha1, delta in queue:
+            result_obj = GitObject(type=delta.type, size=delta.size, data=delta.data)
+            cached_property.set(result_obj, 'decoded', delta.decoded)
+            result_obj.apply_delta_from_source(source)
+            cache.set(sha1, result_obj)
+            source = result_obj
+
+        return result_obj
+
+    def _delta_base_sha1(self, sha1, obj):
+        """
+        Args:
+            sha1 (str): sha1 of delta object
+            obj (GitObject): delta object
+
+        Returns:
+            str: sha1 of delta base
+
+        Raises:
+            PackBroken:
+        """
+        typ = obj.type
+        if typ == 6:
+            # sha1 -> source sha1
+            offset_delta = obj.decoded.offset
+            found = self.object_pack_offset(sha1)
+            if found is None:
+                # this should not happen
+                raise PackBroken(f'Failed to solve ofs_delta object {sha1}: cannot find where it came from')
+            pack, offset_base = found
+            offset = offset_base - offset_delta
+            if offset < 0:
+                # this should not happen
+                raise PackBroken(f'Failed to solve ofs_delta object {sha1}: source offset {offset} < 0')
+            try:
+                return pack.dict_offset_to_sha1[offset]
+            except KeyError:
+                # this should not happen
+                raise PackBroken(f'Failed to solve ofs_delta object {sha1}: '
+                                 f'offset {offset} does not point to any object in {pack.pack_file}')
+        if typ == 7:
+            # sha1 -> ref sha1
+            return obj.decoded.ref
+        # this should not happen
+        raise PackBroken(f'Object {sha1} is not a delta object, type={typ}')
+
+    def _cat_delta_inplace(self, sha1, obj):
+        """
+        Resolve delta object in place, without delta base cache.
+        Delta objects in dict_object will become resolved objects.
+        """
+        result_obj = obj
+        # notes:
+        # don't use recursion to handle delta objects
+        # because delta reference can up to depth of 4096 and python can only have recursion depth < 1000
+        queue = deque([obj])
+        while obj.type in OBJTYPE_DELTA:
+            sha1 = self._delta_base_sha1(sha1, obj)
+            obj = self.cat_shallow(sha1)
+            queue.appendleft(obj)
 
         # apply delta
         # queue is (source, delta, delta, ...)
@@ -1,12 +1,252 @@
 import hashlib
+import mmap
 import os
 import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
 
 from alasio.ext.path.atomic import atomic_read_bytes
 from alasio.ext.path.calc import with_suffix
 from alasio.git.file.exception import PackBroken
 
 
+class IdxOffsetTable:
+    """
+    Offset table of a mmap-ed .idx file.
+    Objects are lookup by fanout table and binary search over the raw 20-byte sha1 table,
+    instead of unpacking all sha1 into str.
+
+    Offsets are sorted lazily on the first lookup of object end or offset to sha1,
+    sorted offsets are stored in array to keep memory low.
+    """
+
+    def __init__(self, data, size, offset_list, pack_end):
+        """
+        Args:
+            data (mmap.mmap): Entire .idx file
+            size (int): Amount of objects
+            offset_list (array): Object offsets in sha1 order
+            pack_end (int): End of data in pack file
+        """
+        self.data = data
+        self.size = size
+        self.offset_list = offset_list
+        self.pack_end = pack_end
+        # fanout[byte] is the amount of objects whose first byte <= byte
+        self.fanout = struct.unpack('>256I', data[8:1032])
+
+        # lazy sorted offsets
+        # offset_sorted[i] is the i-th smallest offset, offset_order[i] is its index in sha1 table
+        # offset_order is only built when lookup sha1 from offset
+        self._offset_sorted: "array | None" = None
+        self._offset_order: "array | None" = None
+
+    def close(self):
+        data = self.data
+        self.data = None
+        if data is not None:
+            try:
+                data.close()
+            except BufferError:
+                # still exported by memoryview, mmap will be closed by gc
+                pass
+
+    def _sha1_at(self, index):
+        start = 1032 + index * 20
+        return self.data[start:start + 20]
+
+    def index(self, sha1):
+        """
+        Args:
+            sha1 (str): sha1 length=40
+
+        Returns:
+            int: Index in sha1 table
+
+        Raises:
+            KeyError: If sha1 not exists
+        """
+        try:
+            sha = bytes.fromhex(sha1)
+        except (ValueError, TypeError):
+            raise KeyError(sha1)
+        if len(sha) != 20:
+            raise KeyError(sha1)
+        byte = sha[0]
+        lo = self.fanout[byte - 1] if byte else 0
+        hi = self.fanout[byte]
+        data = self.data
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = 1032 + mid * 20
+            current = data[start:start + 20]
+            if current < sha:
+                lo = mid + 1
+            elif current > sha:
+                hi = mid
+            else:
+                return mid
+        raise KeyError(sha1)
+
+    def _build_sorted(self):
+        """
+        Returns:
+            array: Sorted offsets
+        """
+        sorted_ = self._offset_sorted
+        if sorted_ is None:
+            sorted_ = array('Q', sorted(self.offset_list))
+            self._offset_sorted = sorted_
+        return sorted_
+
+    def _build_order(self):
+        """
+        Returns:
+            tuple[array, array]: Sorted offsets, and index in sha1 table of each sorted offset
+        """
+        order = self._offset_order
+        if order is not None:
+            return self._build_sorted(), order
+        # sort (offset << 32 | index) as plain int, which is much faster than sorting with key
+        packed = sorted([(offset << 32) | index for index, offset in enumerate(self.offset_list)])
+        order = array('I', [i & 0xffffffff for i in packed])
+        if self._offset_sorted is None:
+            self._offset_sorted = array('Q', [i >> 32 for i in packed])
+        del packed
+        self._offset_order = order
+        return self._offset_sorted, order
+
+    def offset_end(self, offset):
+        """
+        Returns:
+            int: End of the object starting at given offset
+        """
+        sorted_ = self._build_sorted()
+        pos = bisect_right(sorted_, offset)
+        if pos < len(sorted_):
+            return sorted_[pos]
+        return self.pack_end
+
+    def get_offset(self, sha1):
+        """
+        Returns:
+            tuple[int, int]: (offset_start, offset_end)
+
+        Raises:
+            KeyError: If sha1 not exists
+        """
+        offset = self.offset_list[self.index(sha1)]
+        return offset, self.offset_end(offset)
+
+    def get_sha1(self, offset):
+        """
+        Returns:
+            str: sha1 of the object starting at given offset
+
+        Raises:
+            KeyError: If no object starts at given offset
+        """
+        sorted_, order = self._build_order()
+        pos = bisect_left(sorted_, offset)
+        if pos < len(sorted_) and sorted_[pos] == offset:
+            return self._sha1_at(order[pos]).hex()
+        raise KeyError(offset)
+
+    def iter_offset(self):
+        """
+        Iter objects in offset ascending, same order as IdxFile.dict_offset
+
+        Yields:
+            tuple[str, tuple[int, int]]: sha1, (offset_start, offset_end)
+        """
+        sorted_, order = self._build_order()
+        if not sorted_:
+            return
+        prev_offset = sorted_[0]
+        prev_index = order[0]
+        for index, offset in zip(order[1:], sorted_[1:]):
+            yield self._sha1_at(prev_index).hex(), (prev_offset, offset)
+            prev_offset = offset
+            prev_index = index
+        yield self._sha1_at(prev_index).hex(), (prev_offset, self.pack_end)
+
+
+class IdxOffsetDict:
+    """
+    Read-only dict-like view to replace IdxFile.dict_offset in mmap mode
+    key: sha1 length=40, value: (offset_start, offset_end)
+    """
+
+    def __init__(self, table: IdxOffsetTable):
+        self.table = table
+
+    def __getitem__(self, sha1):
+        return self.table.get_offset(sha1)
+
+    def get(self, sha1, default=None):
+        try:
+            return self.table.get_offset(sha1)
+        except KeyError:
+            return default
+
+    def __contains__(self, sha1):
+        try:
+            self.table.index(sha1)
+            return True
+        except KeyError:
+            return False
+
+    def __len__(self):
+        return self.table.size
+
+    def __iter__(self):
+        for sha1, _ in self.table.iter_offset():
+            yield sha1
+
+    def keys(self):
+        return iter(self)
+
+    def items(self):
+        return self.table.iter_offset()
+
+    def values(self):
+        for _, offset in self.table.iter_offset():
+            yield offset
+
+
+class IdxOffsetToSha1Dict:
+    """
+    Read-only dict-like view to replace IdxFile.dict_offset_to_sha1 in mmap mode
+    key: offset, value: sha1 length=40
+    """
+
+    def __init__(self, table: IdxOffsetTable):
+        self.table = table
+
+    def __getitem__(self, offset):
+        return self.table.get_sha1(offset)
+
+    def get(self, offset, default=None):
+        try:
+            return self.table.get_sha1(offset)
+        except KeyError:
+            return default
+
+    def __contains__(self, offset):
+        try:
+            self.table.get_sha1(offset)
+            return True
+        except KeyError:
+            return False
+
+    def __len__(self):
+        return self.table.size
+
+    def __iter__(self):
+        return iter(self.table._build_sorted())
+
+
 class IdxFile:
     def __init__(self, file):
         """
@@ -36,9 +276,20 @@ def __init__(self, file):
         self.pack_sha1: str = ''
         self.idx_sha1: str = ''
 
+        # Whether to mmap .idx file instead of parsing all of it into dict
+        # In mmap mode, dict_offset and dict_offset_to_sha1 are read-only dict-like views,
+        # sha1 is lookup by fanout table and binary search, which is fast to open large repositories.
+        # Note that mmap holds the .idx file open until clear_idx()
+        self.idx_mmap: bool = False
+        self._offset_table: "IdxOffsetTable | None" = None
+
     def clear_idx(self):
-        self.dict_offset.clear()
-        self.dict_offset_to_sha1.clear()
+        table = self._offset_table
+        self._offset_table = None
+        if table is not None:
+            table.close()
+        self.dict_offset = {}
+        self.dict_offset_to_sha1 = {}
         self.pack_end = 0
         self.mtime = 0.
         self.pack_sha1 = ''
@@ -55,6 +306,9 @@ def idx_read(self):
             FileNotFoundError:
             PackBroken:
         """
+        if self.idx_mmap:
+            return self.idx_read_mmap()
+
         # Get pack size
         pack_size = os.stat(self.pack_file).st_size
         # the end of objects, last 20 bytes is sha1 of all object sha1
@@ -120,9 +374,8 @@ def idx_read(self):
 
         # large table offset
         large_size = 0
-        for i in offset_list:
-            if i >= 2147483648:
-                large_size += 1
+        if max(offset_list) >= 2147483648:
+            large_size = sum(1 for i in offset_list if i >= 2147483648)
         if large_size:
             start = end
             expect_length = large_size * 8
@@ -186,3 +439,114 @@ def idx_read(self):
         self.mtime = mtime
         self.pack_sha1 = pack_sha1
         self.idx_sha1 = idx_sha1
+        return len(dict_offset)
+
+    def idx_read_mmap(self):
+        """
+        mmap .idx file and validate it, without parsing sha1 table
+
+        Returns:
+            int: Amount of hashes in idx file
+
+        Raises:
+            FileNotFoundError:
+            PackBroken:
+        """
+        # Get pack size
+        pack_size = os.stat(self.pack_file).st_size
+        # the end of objects, last 20 bytes is sha1 of all object sha1
+        pack_end = pack_size - 20
+        if pack_end <= 0:
+            raise PackBroken(f'Pack file too short: {pack_size}')
+
+        with open(self.idx_file, 'rb') as f:
+            mtime = os.fstat(f.fileno()).st_mtime
+            try:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # cannot mmap an empty file
+                raise PackBroken('Empty idx file')
+        try:
+            size, offset_list, pack_sha1, idx_sha1 = self._idx_parse_mmap(data)
+        except Exception:
+            data.close()
+            raise
+
+        # set attribute
+        self.clear_idx()
+        table = IdxOffsetTable(data, size=size, offset_list=offset_list, pack_end=pack_end)
+        self._offset_table = table
+        self.dict_offset = IdxOffsetDict(table)
+        self.dict_offset_to_sha1 = IdxOffsetToSha1Dict(table)
+        self.pack_end = pack_end
+        self.mtime = mtime
+        self.pack_sha1 = pack_sha1
+        self.idx_sha1 = idx_sha1
+        return size
+
+    @staticmethod
+    def _idx_parse_mmap(data):
+        """
+        Args:
+            data (mmap.mmap):
+
+        Returns:
+            tuple[int, array, str, str]: size, offset_list, pack_sha1, idx_sha1
+        """
+        # Version 2 pack index
+        if not data[:8] == b'\xfftOc\x00\x00\x00\x02':
+            raise PackBroken(f'Unexpected idx header {data[:8]}')
+        # Get size, last fanout is size
+        size = data[1028:1032]
+        if len(size) != 4:
+            raise PackBroken(f'Empty idx size')
+        size = struct.unpack('>I', size)[0]
+        if not size:
+            raise PackBroken(f'Empty sha1 table')
+
+        # sha1 table is searched in place, offset table is loaded since it's 4 bytes per object
+        start = 1032 + size * 24
+        end = start + size * 4
+        table = data[start:end]
+        if len(table) != size * 4:
+            raise PackBroken('Length of offset table does not match idx size')
+        offset_list = array('I', table)
+        if sys.byteorder == 'little':
+            offset_list.byteswap()
+
+        # large table offset
+        large_size = 0
+        if max(offset_list) >= 2147483648:
+            large_size = sum(1 for i in offset_list if i >= 2147483648)
+        if large_size:
+            start = end
+            end = start + large_size * 8
+            table = data[start:end]
+            if len(table) != large_size * 8:
+                raise PackBroken('Length of large offset table does not match large size')
+            large_list = struct.unpack(f'>{large_size}Q', table)
+            try:
+                offset_list = array('Q', [large_list[i - 2147483648] if i >= 2147483648 else i for i in offset_list])
+            except IndexError:
+                raise PackBroken('IndexError when query large offset')
+
+        # trailer sha1
+        pack_sha1 = data[end:end + 20]
+        if len(pack_sha1) != 20:
+            raise PackBroken(f'Unexpected length of pack sha1: {pack_sha1}')
+        idx_sha1 = data[end + 20:end + 40]
+        if len(idx_sha1) != 20:
+            raise PackBroken(f'Unexpected length of idx sha1: {idx_sha1}')
+        pack_sha1 = pack_sha1.hex()
+        idx_sha1 = idx_sha1.hex()
+        # validate sha1
+        with memoryview(data) as view:
+            sha1 = hashlib.sha1(view[:end + 20]).hexdigest()
+        if sha1 != idx_sha1:
+            raise PackBroken(f'Idx file sha1 not match: current={sha1}, expected={idx_sha1}')
+        # end of file
+        rest = len(data) - end - 40
+        if rest:
+            raise PackBroken(f'Idx file read end but {rest} bytes left')
+
+        return size, offset_list, pack_sha1, idx_sha1
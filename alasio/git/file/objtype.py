@@ -0,0 +1,193 @@
+import hashlib
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+
+from alasio.git.file.exception import PackBroken
+
+OBJTYPE_SIGNATURE = b'ATYP'
+OBJTYPE_VERSION = 1
+# signature, version, amount of objects, pack sha1
+OBJTYPE_HEADER = struct.Struct('>4sII20s')
+
+
+def gen_objtype_table(list_info, pack_sha1):
+    """
+    Generate content of .objtype file, a side table next to .idx that records
+    the final object type and uncompressed size of every object in pack.
+
+    File format:
+        32 bytes header: b'ATYP', uint32 version, uint32 amount of objects, 20 bytes pack sha1
+        + uint64 offsets in ascending order
+        + uint64 uncompressed sizes, delta objects are resolved
+        + uint8 object types, delta objects are resolved to 1, 2, 3, 4
+        + 20 bytes sha1 of all above
+    All integers are big-endian.
+
+    Args:
+        list_info (list[PackObjectInfo]): Resolved objects
+        pack_sha1 (bytes): Trailing checksum of pack file
+
+    Returns:
+        bytes:
+    """
+    list_info = sorted(list_info, key=lambda i: i.offset)
+    count = len(list_info)
+    data = b''.join([
+        OBJTYPE_HEADER.pack(OBJTYPE_SIGNATURE, OBJTYPE_VERSION, count, bytes(pack_sha1)),
+        struct.pack(f'>{count}Q', *[i.offset for i in list_info]),
+        struct.pack(f'>{count}Q', *[i.size for i in list_info]),
+        bytes([i.type for i in list_info]),
+    ])
+    return data + hashlib.sha1(data).digest()
+
+
+class ObjtypeTable:
+    """
+    A mmap-ed .objtype file, see gen_objtype_table()
+
+    Objects are stored in pack offset order, same order as PackFile.dict_offset,
+    so types can be zipped with dict_offset directly without lookup.
+    """
+
+    def __init__(self, data, count):
+        """
+        Args:
+            data (mmap.mmap): Entire .objtype file
+            count (int): Amount of objects
+        """
+        self.data = data
+        self.count = count
+        # lazy loaded offsets, for lookup by offset
+        self._offset_list: "array | None" = None
+
+    @classmethod
+    def open(cls, file, pack_sha1, count):
+        """
+        mmap .objtype file and validate it
+
+        Args:
+            file (str): Path to .objtype file
+            pack_sha1 (str): Pack sha1 from .idx, table of another pack is considered outdated
+            count (int): Amount of objects from .idx
+
+        Returns:
+            ObjtypeTable:
+
+        Raises:
+            FileNotFoundError:
+            PackBroken: If file is broken or outdated
+        """
+        with open(file, 'rb') as f:
+            try:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # cannot mmap an empty file
+                raise PackBroken('Empty objtype file')
+        try:
+            cls._validate(data, pack_sha1, count)
+        except Exception:
+            data.close()
+            raise
+        return cls(data, count)
+
+    @staticmethod
+    def _validate(data, pack_sha1, count):
+        header = data[:OBJTYPE_HEADER.size]
+        if len(header) != OBJTYPE_HEADER.size:
+            raise PackBroken(f'Unexpected objtype header {header}')
+        signature, version, size, sha1 = OBJTYPE_HEADER.unpack(header)
+        if signature != OBJTYPE_SIGNATURE or version != OBJTYPE_VERSION:
+            raise PackBroken(f'Unexpected objtype header {header}')
+        if sha1.hex() != pack_sha1:
+            raise PackBroken(f'Objtype file outdated, pack_sha1={sha1.hex()}, expected={pack_sha1}')
+        if size != count:
+            raise PackBroken(f'Objtype size not match, size={size}, expected={count}')
+        end = OBJTYPE_HEADER.size + size * 17
+        if len(data) != end + 20:
+            raise PackBroken(f'Unexpected objtype file length {len(data)}, expected={end + 20}')
+        with memoryview(data) as view:
+            sha1 = hashlib.sha1(view[:end]).digest()
+        if sha1 != data[end:end + 20]:
+            raise PackBroken(f'Objtype file sha1 not match')
+
+    def close(self):
+        data = self.data
+        self.data = None
+        if data is not None:
+            try:
+                data.close()
+            except BufferError:
+                # still exported by memoryview, mmap will be closed by gc
+                pass
+
+    @property
+    def types(self):
+        """
+        Returns:
+            bytes: Object types in pack offset order
+        """
+        start = OBJTYPE_HEADER.size + self.count * 16
+        return self.data[start:start + self.count]
+
+    def _load_array(self, start):
+        table = array('Q', self.data[start:start + self.count * 8])
+        if sys.byteorder == 'little':
+            table.byteswap()
+        return table
+
+    @property
+    def offsets(self):
+        """
+        Returns:
+            array: Object offsets in ascending order
+        """
+        table = self._offset_list
+        if table is None:
+            table = self._load_array(OBJTYPE_HEADER.size)
+            self._offset_list = table
+        return table
+
+    @property
+    def sizes(self):
+        """
+        Returns:
+            array: Uncompressed object sizes in pack offset order
+        """
+        return self._load_array(OBJTYPE_HEADER.size + self.count * 8)
+
+    def index(self, offset):
+        """
+        Args:
+            offset (int): Offset of object in pack file
+
+        Returns:
+            int: Index of object in table
+
+        Raises:
+            KeyError: If offset not exists
+        """
+        table = self.offsets
+        index = bisect_left(table, offset)
+        if index < self.count and table[index] == offset:
+            return index
+        raise KeyError(offset)
+
+    def get(self, offset):
+        """
+        Args:
+            offset (int): Offset of object in pack file
+
+        Returns:
+            tuple[int, int]: (objtype, size)
+
+        Raises:
+            KeyError: If offset not exists
+        """
+        index = self.index(offset)
+        start = OBJTYPE_HEADER.size + self.count * 8 + index * 8
+        size = struct.unpack('>Q', self.data[start:start + 8])[0]
+        objtype = self.data[OBJTYPE_HEADER.size + self.count * 16 + index]
+        return objtype, size
@@ -1,9 +1,12 @@
 from typing import Tuple
 
 from alasio.ext.path.atomic import atomic_read_bytes
+from alasio.ext.path.calc import with_suffix
 from alasio.git.file.exception import PackBroken
 from alasio.git.file.idx import IdxFile
+from alasio.git.file.objtype import ObjtypeTable
 from alasio.git.obj.obj import GitObject, parse_objdata
+from alasio.logger import logger
 
 
 class PackFile(IdxFile):
@@ -31,6 +34,42 @@ def __init__(self, file):
         # so read 1MB less file read means we can have 1 more file seek
         self.skip_size: int = 1048576
 
+        # side table of object types and sizes, see gen_objtype_table()
+        self.objtype_file = with_suffix(self.pack_file, '.objtype')
+        # None if not loaded, False if not available
+        self._objtype_table: "ObjtypeTable | None | bool" = None
+
+    def clear_idx(self):
+        table = self._objtype_table
+        self._objtype_table = None
+        if table:
+            table.close()
+        super().clear_idx()
+
+    def objtype_read(self):
+        """
+        mmap .objtype file generated during indexing.
+        Must call after idx_read(), since table is invalidated by pack sha1.
+
+        Returns:
+            ObjtypeTable | None: None if file not exist, broken or outdated
+        """
+        table = self._objtype_table
+        if table is not None:
+            return table or None
+        if not self.pack_sha1:
+            # idx not read
+            return None
+        try:
+            table = ObjtypeTable.open(self.objtype_file, pack_sha1=self.pack_sha1, count=len(self.dict_offset))
+        except FileNotFoundError:
+            table = False
+        except PackBroken as e:
+            logger.warning(f'[PackFile] Ignore objtype file {self.objtype_file}, {e}')
+            table = False
+        self._objtype_table = table
+        return table or None
+
     def clear_object(self):
         self.dict_object = {}
         self.dict_object_data = {}
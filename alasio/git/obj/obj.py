@@ -6,7 +6,7 @@
 from alasio.ext.cache import cached_property
 from alasio.git.file.exception import ObjectBroken
 from alasio.git.obj.objcommit import parse_commit
-from alasio.git.obj.objdelta import apply_delta, parse_ofs_delta, parse_ref_delta
+from alasio.git.obj.objdelta import apply_delta, apply_delta_chain, parse_ofs_delta, parse_ref_delta
 from alasio.git.obj.objtag import parse_tag
 from alasio.git.obj.objtree import parse_tree
 
@@ -114,8 +114,23 @@ def apply_delta_from_source(self, source: "GitObject"):
         # no need to check because apply_delta() already checked
         # if len(data) != self.size:
         #     raise ObjectBroken(f'Unexpected data length after apply_data, size={self.size}, actual={len(data)}')
+        self._set_resolved(source, data)
 
-        # set
+    def apply_delta_chain_from_source(self, source: "GitObject", chain: "list[GitObject]"):
+        """
+        Apply a chain of delta objects to source in one pass, and set result to self.
+        Intermediate objects are not materialized, which is faster on large objects.
+
+        This object must be a DELTA object and source must not be a DELTA object
+
+        Args:
+            source:
+            chain: Delta objects from the nearest to source to self, self included
+        """
+        data = apply_delta_chain(source.data, [delta.decoded for delta in chain])
+        self._set_resolved(source, data)
+
+    def _set_resolved(self, source: "GitObject", data: bytes):
         objtype = source.type
         self.type = objtype
         if objtype == 3:
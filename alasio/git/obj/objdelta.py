@@ -1,6 +1,7 @@
 import zlib
+from bisect import bisect_right
 from collections import deque
-from typing import Deque, Tuple
+from typing import Deque, List, Optional, Tuple
 from zlib import decompress
 
 import msgspec
@@ -34,6 +35,22 @@ class RefDeltaObj(msgspec.Struct):
     all_instructions: Deque[Tuple[int, int, memoryview]]
 
 
+class DeltaOps(msgspec.Struct):
+    # Delta instructions compiled into arrays, i-th op writes result[dst[i]:dst[i] + length[i]]
+    # size of the data to copy from
+    source_size: int
+    # size of the result data after delta instructions applied
+    result_size: int
+    # offset in result
+    dst: List[int]
+    # offset in source, or -1 if op is literal
+    src: List[int]
+    # length of op
+    length: List[int]
+    # literal data, or None if op is copy
+    literal: List[Optional[memoryview]]
+
+
 def parse_ofs_delta(data):
     """
     OBJ_OFS_DELTA and OBJ_REF_DELTA are the most complex things in git
@@ -427,3 +444,186 @@ def apply_delta(source, delta):
                            f'but result is ln length={len(result)}', result)
 
     return result
+
+
+def compile_delta(delta):
+    """
+    Compile delta instructions into DeltaOps, bounds are validated here,
+    so apply_delta_ops() can write into preallocated buffer directly.
+
+    Args:
+        delta (OfsDeltaObj | RefDeltaObj):
+
+    Returns:
+        DeltaOps:
+
+    Raises:
+        ObjectBroken:
+    """
+    source_size = delta.source_size
+    dst = []
+    src = []
+    length = []
+    literal = []
+    position = 0
+    for offset, size, append in delta.all_instructions:
+        if size:
+            # instruction: copy
+            if offset + size > source_size:
+                raise ObjectBroken(f'Delta copy instruction offset={offset} size={size} '
+                                   f'is out of source_size={source_size}')
+            # merge continuous copy
+            if src and src[-1] >= 0 and src[-1] + length[-1] == offset:
+                length[-1] += size
+            else:
+                dst.append(position)
+                src.append(offset)
+                length.append(size)
+                literal.append(None)
+            position += size
+        else:
+            # instruction: append
+            size = len(append)
+            dst.append(position)
+            src.append(-1)
+            length.append(size)
+            literal.append(append)
+            position += size
+
+    # validate result_size
+    if position != delta.result_size:
+        raise ObjectBroken(f'Delta instructions expects result_size={delta.result_size} '
+                           f'but result is ln length={position}')
+
+    return DeltaOps(
+        source_size=source_size,
+        result_size=position,
+        dst=dst,
+        src=src,
+        length=length,
+        literal=literal,
+    )
+
+
+def compose_delta_ops(first, second):
+    """
+    Compose 2 deltas into 1, so source -> first -> second becomes source -> result,
+    without materializing the intermediate data.
+
+    Args:
+        first (DeltaOps): delta from source to intermediate
+        second (DeltaOps): delta from intermediate to result
+
+    Returns:
+        DeltaOps: delta from source to result
+
+    Raises:
+        ObjectBroken:
+    """
+    if second.source_size != first.result_size:
+        raise ObjectBroken(f'Delta instructions expects source_size={second.source_size} '
+                           f'but data is ln length={first.result_size}')
+
+    first_dst = first.dst
+    first_src = first.src
+    first_length = first.length
+    first_literal = first.literal
+    dst = []
+    src = []
+    length = []
+    literal = []
+    position = 0
+    for offset, size, data in zip(second.src, second.length, second.literal):
+        if offset < 0:
+            # literal stays literal
+            dst.append(position)
+            src.append(-1)
+            length.append(size)
+            literal.append(data)
+            position += size
+            continue
+
+        # copy from intermediate, lookup the ops that wrote intermediate[offset:offset + size]
+        end = offset + size
+        index = bisect_right(first_dst, offset) - 1
+        while offset < end:
+            op_start = first_dst[index]
+            op_end = op_start + first_length[index]
+            piece_end = op_end if op_end < end else end
+            piece = piece_end - offset
+            op_src = first_src[index]
+            if op_src >= 0:
+                op_src += offset - op_start
+                # merge continuous copy
+                if src and src[-1] >= 0 and src[-1] + length[-1] == op_src:
+                    length[-1] += piece
+                else:
+                    dst.append(position)
+                    src.append(op_src)
+                    length.append(piece)
+                    literal.append(None)
+            else:
+                dst.append(position)
+                src.append(-1)
+                length.append(piece)
+                literal.append(first_literal[index][offset - op_start:piece_end - op_start])
+            position += piece
+            offset = piece_end
+            index += 1
+
+    return DeltaOps(
+        source_size=first.source_size,
+        result_size=position,
+        dst=dst,
+        src=src,
+        length=length,
+        literal=literal,
+    )
+
+
+def apply_delta_ops(source, ops):
+    """
+    Apply compiled delta to source
+
+    Args:
+        source (memoryview | bytes):
+        ops (DeltaOps):
+
+    Returns:
+        bytes:
+    """
+    # validate source_size
+    if len(source) != ops.source_size:
+        raise ObjectBroken(f'Delta instructions expects source_size={ops.source_size} '
+                           f'but data is ln length={len(source)}', source)
+
+    # bounds are validated in compile_delta(), so just slice
+    # note that `join` is faster than writing into a preallocated bytearray,
+    # both do one memcpy for each op, but bytearray needs another copy to become bytes
+    source = memoryview(source)
+    return b''.join([
+        source[offset:offset + size] if offset >= 0 else data
+        for offset, size, data in zip(ops.src, ops.length, ops.literal)
+    ])
+
+
+def apply_delta_chain(source, deltas):
+    """
+    Apply a chain of deltas to source in one pass, without materializing intermediate data.
+
+    Args:
+        source (memoryview):
+        deltas (Iterable[OfsDeltaObj | RefDeltaObj]): deltas from the nearest to source to the final
+
+    Returns:
+        bytes:
+    """
+    ops = None
+    for delta in deltas:
+        if ops is None:
+            ops = compile_delta(delta)
+        else:
+            ops = compose_delta_ops(ops, compile_delta(delta))
+    if ops is None:
+        return bytes(source)
+    return apply_delta_ops(source, ops)
@@ -8,6 +8,7 @@
 from alasio.ext.cache import cached_property
 from alasio.git.file.exception import ObjectBroken, PackBroken
 from alasio.git.file.gitobject import GitObjectManager
+from alasio.git.file.objtype import gen_objtype_table
 from alasio.git.obj.obj import GitObject, OBJTYPE_BASIC, parse_objdata_return_info
 from alasio.git.obj.objdelta import OfsDeltaObj, RefDeltaObj, parse_delta_object, parse_ofs_delta_info
 from alasio.logger import logger
@@ -163,9 +164,156 @@ class PackObjectInfo(Struct):
     sha: bytes
     offset: int
     crc: int
+    # resolved object type and uncompressed size, for .objtype side table
+    type: int = 0
+    size: int = 0
+
+
+def scan_pack_objects(data, num_objects):
+    """
+    Find object boundaries and delta sources without resolving deltas
+
+    Args:
+        data (memoryview): Pack data
+        num_objects (int):
+
+    Returns:
+        tuple[list[int], list[int | str | None]]:
+            offsets of objects, with the end of last object appended,
+            sources, int offset of OFS_DELTA source, str sha1 of REF_DELTA source, None for non-delta object
+    """
+    list_offset = []
+    list_source = []
+    index = 12
+    for _ in range(num_objects):
+        list_offset.append(index)
+        objtype, _, consumed = parse_objdata_return_info(data[index:index + 10])
+        consumed += index
+        if objtype in OBJTYPE_BASIC:
+            list_source.append(None)
+        elif objtype == 6:
+            offset, add = parse_ofs_delta_info(data[consumed:consumed + 10])
+            consumed += add
+            list_source.append(index - offset)
+        elif objtype == 7:
+            end = consumed + 20
+            list_source.append(data[consumed:end].hex())
+            consumed = end
+        else:
+            raise ObjectBroken(f'Unknown object type {objtype}', data[index:index + 10])
+        _, index = progressive_decompress(data, consumed)
+    list_offset.append(index)
+    return list_offset, list_source
+
+
+def resolve_pack_task(shm_name, entries, external):
+    """
+    Resolve a group of pack objects in ProcessPool worker
+
+    Args:
+        shm_name (str): Name of shared memory that contains the whole pack
+        entries (list[tuple[int, int, int | str | None, bool]]):
+            (offset, end, source, emit) in topological order,
+            source is int offset of OFS_DELTA source, str sha1 of REF_DELTA source, None for non-delta object,
+            emit=False means object is only resolved as delta source of following entries
+        external (dict[str, tuple[int, bytes]]): REF_DELTA sources outside pack,
+            key: sha1, value: (objtype, data)
+
+    Returns:
+        list[tuple[bytes, int, int, int, int]]: (sha, offset, crc, type, size) of emitted objects
+    """
+    from multiprocessing.shared_memory import SharedMemory
+    shm = SharedMemory(name=shm_name)
+    data = shm.buf
+    try:
+        # reference count of delta sources, drop resolved objects once they are not needed
+        refcount = {}
+        for _, _, source, _ in entries:
+            if type(source) is int:
+                refcount[source] = refcount.get(source, 0) + 1
+        resolved = {}
+        out = []
+        for offset, end, source, emit in entries:
+            obj = resolved.get(offset)
+            if obj is None:
+                obj, _ = read_first_obj(data[offset:end])
+                if source is not None:
+                    if type(source) is int:
+                        base = resolved[source]
+                    else:
+                        objtype, content = external[source]
+                        base = GitObject(type=objtype, size=len(content), data=memoryview(content))
+                    obj.apply_delta_from_source(base)
+                if refcount.get(offset):
+                    resolved[offset] = obj
+            if emit:
+                out.append((obj.sha1(), offset, crc32(data[offset:end]), obj.type, len(obj.data)))
+            # release source
+            if type(source) is int:
+                count = refcount[source] - 1
+                refcount[source] = count
+                if count <= 0:
+                    resolved.pop(source, None)
+            del obj
+        del resolved
+        return out
+    finally:
+        del data
+        shm.close()
 
 
 class GenIdx(GitObjectManager):
+    # Resolve pack objects in a ProcessPool when generating idx,
+    # number of processes, or 0 to resolve in current process
+    idx_process = 0
+    # Packs smaller than this are always resolved in current process
+    idx_process_min_size = 8388608
+    # objects of the last generated idx, sorted by sha1
+    idx_list_info: "list[PackObjectInfo]" = []
+    # trailing checksum of the last indexed pack
+    idx_pack_sha1 = b''
+
+    def _resolve_pack_object(self, obj, index, crc, dict_offset_to_object):
+        """
+        Apply delta on a pack object and generate its info.
+        Objects must be resolved in offset order, so OFS_DELTA sources are resolved already.
+
+        Args:
+            obj (GitObject): Object from read_first_obj()
+            index (int): Offset of object in pack file
+            crc (int): CRC32 of raw object entry data
+            dict_offset_to_object (dict[int, GitObject]): Resolved objects,
+                key: int offset, value: GitObject
+
+        Returns:
+            PackObjectInfo:
+        """
+        # apply delta
+        objtype = obj.type
+        if objtype == 7:
+            # apply REF_DELTA
+            ref = obj.decoded.ref
+            source = self.cat(ref)  # may raise KeyError
+            obj.apply_delta_from_source(source)
+        elif objtype == 6:
+            # apply OFS_DELTA
+            offset = index - obj.decoded.offset
+            try:
+                source = dict_offset_to_object[offset]
+            except KeyError:
+                # this shouldn't happen
+                raise PackBroken(f'No corresponding pack object at offset={offset}. '
+                                 f'index={index}, ofs_delta={obj.decoded.offset}')
+            obj.apply_delta_from_source(source)
+
+        dict_offset_to_object[index] = obj
+        # prepare info
+        # note that we skip decoding object here, since we just want to solve deltas and get sha1.
+        # meaning that you cannot get `obj.decoded` which requires compressed `obj.data`.
+
+        # SHA-1 is of the final, reconstructed object data
+        sha = obj.sha1()
+        return PackObjectInfo(sha=sha, offset=index, crc=crc, type=obj.type, size=len(obj.data))
 
     def _parse_pack_info(self, data):
         """
@@ -194,34 +342,9 @@ def _parse_pack_info(self, data):
         index = 12
         for _ in range(num_objects):
             obj, consumed = read_first_obj(data)
-            # apply delta
-            objtype = obj.type
-            if objtype == 7:
-                # apply REF_DELTA
-                ref = obj.decoded.ref
-                source = self.cat(ref)  # may raise KeyError
-                obj.apply_delta_from_source(source)
-            elif objtype == 6:
-                # apply OFS_DELTA
-                offset = index - obj.decoded.offset
-                try:
-                    source = dict_offset_to_object[offset]
-                except KeyError:
-                    # this shouldn't happen
-                    raise PackBroken(f'No corresponding pack object at offset={offset}. '
-                                     f'index={index}, ofs_delta={obj.decoded.offset}')
-                obj.apply_delta_from_source(source)
-
-            dict_offset_to_object[index] = obj
-            # prepare info
-            # note that we skip decoding object here, since we just want to solve deltas and get sha1.
-            # meaning that you cannot get `obj.decoded` which requires compressed `obj.data`.
-
             # CRC32 is calculated over the raw object entry data (header + body)
             crc = crc32(data[:consumed])
-            # SHA-1 is of the final, reconstructed object data
-            sha = obj.sha1()
-            info = PackObjectInfo(sha=sha, offset=index, crc=crc)
+            info = self._resolve_pack_object(obj, index, crc, dict_offset_to_object)
             list_info.append(info)
             # next
             data = data[consumed:]
@@ -235,6 +358,134 @@ def _parse_pack_info(self, data):
         list_info.sort(key=lambda i: i.sha)
         return list_info
 
+    def _parse_pack_info_parallel(self, data):
+        """
+        Same as _parse_pack_info() but resolve objects in ProcessPool.
+
+        Delta dependency forest is built after scanning object headers,
+        then split into subtrees of similar weight and resolved in worker processes.
+        Pack data is passed to workers through shared memory.
+
+        Args:
+            data (bytes | memoryview):
+
+        Returns:
+            list[PackObjectInfo]:
+        """
+        if type(data) is bytes:
+            data = memoryview(data)
+
+        # check header, must be pack file and version 2
+        if not data[:8] == b'PACK\x00\x00\x00\x02':
+            raise PackBroken(f'Unexpected pack header {data[:8]}')
+        try:
+            num_objects = unpack('>I', data[8:12])[0]
+        except struct_error as e:
+            raise PackBroken(str(e))
+        validate_pack(data)
+        if len(data) - 20 <= 12:
+            return []
+
+        list_offset, list_source = scan_pack_objects(data, num_objects)
+        if len(data) - list_offset[-1] != 20:
+            logger.warning('Pack file has redundant trailing data')
+
+        # build delta forest
+        dict_end = dict(zip(list_offset, list_offset[1:]))
+        children = {}
+        roots = []
+        external = {}
+        for offset, source in zip(list_offset, list_source):
+            if type(source) is int:
+                if source not in dict_end:
+                    # this shouldn't happen
+                    raise PackBroken(f'No corresponding pack object at offset={source}. index={offset}')
+                children.setdefault(source, []).append(offset)
+            else:
+                if source is not None and source not in external:
+                    obj = self.cat(source)  # may raise KeyError
+                    external[source] = (obj.type, bytes(obj.data))
+                roots.append(offset)
+        dict_source = dict(zip(list_offset, list_source))
+
+        # weight of subtrees
+        weight = {}
+        for offset in reversed(list_offset[:-1]):
+            w = dict_end[offset] - offset + 64
+            for child in children.get(offset, []):
+                w += weight[child]
+            weight[offset] = w
+        process = self.idx_process
+        task_count = process * 4
+        target = sum(weight[root] for root in roots) // task_count + 1
+
+        # split forest into items, item is a list of (offset, end, source, emit)
+        items = []
+
+        def subtree(root):
+            out = []
+            stack = [root]
+            while stack:
+                offset = stack.pop()
+                out.append((offset, dict_end[offset], dict_source[offset], True))
+                stack += children.get(offset, [])
+            return out
+
+        stack = [(root, ()) for root in reversed(roots)]
+        while stack:
+            offset, chain = stack.pop()
+            if weight[offset] <= target:
+                items.append((weight[offset], chain, subtree(offset)))
+                continue
+            # too heavy, emit this object only and split its children
+            items.append((dict_end[offset] - offset + 64, chain, [(offset, dict_end[offset], dict_source[offset], True)]))
+            chain = chain + (offset,)
+            for child in reversed(children.get(offset, [])):
+                stack.append((child, chain))
+
+        # group items into tasks, keep adjacent items together so chains are shared
+        tasks = []
+        entries = []
+        task_weight = 0
+        for w, chain, nodes in items:
+            for offset in chain:
+                entries.append((offset, dict_end[offset], dict_source[offset], False))
+            entries += nodes
+            task_weight += w
+            if task_weight >= target:
+                tasks.append(entries)
+                entries = []
+                task_weight = 0
+        if entries:
+            tasks.append(entries)
+
+        from multiprocessing.shared_memory import SharedMemory
+        from alasio.ext.concurrent.processpool import ProcessPool
+        shm = SharedMemory(create=True, size=len(data))
+        try:
+            shm.buf[:len(data)] = data
+            name = shm.name
+            with ProcessPool(resolve_pack_task, max_workers=min(process, len(tasks))) as pool:
+                jobs = []
+                for entries in tasks:
+                    refs = {source for _, _, source, _ in entries if type(source) is str}
+                    ext = {ref: external[ref] for ref in refs}
+                    jobs.append(pool.submit(name, entries, ext))
+                list_info = []
+                for job in jobs:
+                    for sha, offset, crc, objtype, size in job.get():
+                        list_info.append(PackObjectInfo(sha=sha, offset=offset, crc=crc, type=objtype, size=size))
+        finally:
+            shm.close()
+            shm.unlink()
+
+        if len(list_info) != num_objects:
+            # this shouldn't happen
+            raise PackBroken(f'Unexpected resolved objects, expect {num_objects}, got {len(list_info)}')
+        # sort objects by sha1, same as sorting offset ordered list stably
+        list_info.sort(key=lambda i: (i.sha, i.offset))
+        return list_info
+
     @staticmethod
     def _iter_idx_data(list_info, data):
         """
@@ -278,9 +529,9 @@ def _iter_idx_data(list_info, data):
             offset = info.offset
             if offset >= 2147483648:
                 # Set MSB to 1 and store the index into the large offset table
-                count_large += 1
                 table.append(2147483648 + count_large)
                 table_large.append(offset)
+                count_large += 1
             else:
                 table.append(offset)
         yield pack(f'>{len(table)}I', *table)
@@ -299,9 +550,356 @@ def pack_to_idx(self, data):
             data (bytes | memoryview):
 
         Returns:
-
+            bytes: Content of .idx file
         """
-        list_info = self._parse_pack_info(data)
+        if self.idx_process and len(data) >= self.idx_process_min_size:
+            list_info = self._parse_pack_info_parallel(data)
+        else:
+            list_info = self._parse_pack_info(data)
+        self.idx_list_info = list_info
+        self.idx_pack_sha1 = bytes(data[-20:])
         idx = b''.join(self._iter_idx_data(list_info, data))
         checksum = sha1(idx).digest()
         return b''.join([idx, checksum])
+
+    def pack_to_objtype(self):
+        """
+        Generate .objtype side table of the last indexed pack, must call after pack_to_idx()
+
+        Returns:
+            bytes: Content of .objtype file
+        """
+        return gen_objtype_table(self.idx_list_info, self.idx_pack_sha1)
+
+
+def _pack_header_length(data, index):
+    """
+    Get length of object header, including type, size and delta base
+
+    Args:
+        data (bytearray):
+        index (int): Start of object
+
+    Returns:
+        int: Header length, or 0 if header is incomplete
+    """
+    end = len(data)
+    i = index
+    # type and size
+    while True:
+        if i >= end:
+            return 0
+        byte = data[i]
+        i += 1
+        if byte < 128:
+            break
+    objtype = (data[index] >> 4) & 7
+    if objtype == 6:
+        # OFS_DELTA offset
+        while True:
+            if i >= end:
+                return 0
+            byte = data[i]
+            i += 1
+            if byte < 128:
+                break
+    elif objtype == 7:
+        # REF_DELTA sha1
+        i += 20
+        if i > end:
+            return 0
+    return i - index
+
+
+class StreamIdx(GenIdx):
+    """
+    Incremental pack indexer that consumes pack data chunk by chunk while fetching.
+    Object boundaries, crc32 and sha1 are calculated as bytes arrive,
+    so .idx is ready almost as soon as the last byte lands.
+
+    Usage:
+        indexer = StreamIdx(repo_path)
+        for chunk in stream:
+            indexer.feed(chunk)
+        idx = indexer.finish()
+    """
+
+    def __init__(self, path):
+        super().__init__(path)
+        # unparsed pack data
+        self._buffer = bytearray()
+        # position of parsed data in _buffer
+        self._pos = 0
+        # offset of _buffer[0] in pack file
+        self._buffer_offset = 0
+        # running sha1 of pack content, excluding the 20 bytes trailing checksum
+        self._pack_sha1 = sha1()
+        # amount of bytes that has been hashed
+        self._hashed = 0
+        # total bytes received
+        self.received = 0
+        # amount of objects in pack, or -1 if header not received
+        self.num_objects = -1
+
+        # state of current object
+        # offset of current object in pack file, or -1 if waiting for header
+        self._obj_offset = -1
+        self._obj_type = 0
+        self._obj_size = 0
+        self._obj_base = None
+        self._obj_crc = 0
+        self._obj_decompresser = None
+        self._obj_content = deque()
+
+        # amount of objects parsed
+        self.parsed = 0
+        # resolved objects
+        self._dict_offset_to_object: "dict[int, GitObject]" = {}
+        self._dict_sha1_to_object: "dict[str, GitObject]" = {}
+        # deltas whose source is not resolved yet
+        # key: int offset of OFS_DELTA source, or str sha1 of REF_DELTA source
+        # value: list of (delta object, offset, crc)
+        self._dict_pending: "dict[int | str, list[tuple[GitObject, int, int]]]" = {}
+        # offsets of deltas in _dict_pending, maintained along with it,
+        # so checking if OFS_DELTA source is a pending delta doesn't iterate all pending deltas
+        self._set_pending_offset: "set[int]" = set()
+        self.list_info: "list[PackObjectInfo]" = []
+
+    def feed(self, data):
+        """
+        Args:
+            data (bytes | memoryview): Chunk of pack data
+
+        Raises:
+            PackBroken:
+            ObjectBroken:
+        """
+        if not data:
+            return
+        buffer = self._buffer
+        buffer.extend(data)
+        self.received += len(data)
+        # hash everything except the last 20 bytes which might be checksum
+        end = self.received - 20
+        if end > self._hashed:
+            start = self._hashed - self._buffer_offset
+            self._pack_sha1.update(memoryview(buffer)[start:end - self._buffer_offset])
+            self._hashed = end
+
+        if self.num_objects < 0:
+            if len(buffer) < 12:
+                return
+            # check header, must be pack file and version 2
+            if not buffer[:8] == b'PACK\x00\x00\x00\x02':
+                raise PackBroken(f'Unexpected pack header {bytes(buffer[:8])}')
+            self.num_objects = unpack('>I', buffer[8:12])[0]
+            self._pos = 12
+
+        while self.parsed < self.num_objects:
+            if not self._feed_object():
+                break
+
+        # drop parsed data, but keep unhashed ones
+        drop = min(self._pos, self._hashed - self._buffer_offset)
+        if drop >= 65536 or drop >= len(buffer) // 2:
+            del buffer[:drop]
+            self._pos -= drop
+            self._buffer_offset += drop
+
+    def _feed_object(self):
+        """
+        Parse current object with available data
+
+        Returns:
+            bool: True if an object is finished
+        """
+        buffer = self._buffer
+        pos = self._pos
+        if self._obj_offset < 0:
+            # new object header
+            length = _pack_header_length(buffer, pos)
+            if not length:
+                return False
+            header = memoryview(buffer)[pos:pos + length]
+            objtype, size, consumed = parse_objdata_return_info(header)
+            if objtype == 6:
+                offset, _ = parse_ofs_delta_info(header[consumed:])
+                self._obj_base = offset
+            elif objtype == 7:
+                self._obj_base = header[consumed:consumed + 20].hex()
+            elif objtype not in OBJTYPE_BASIC:
+                raise ObjectBroken(f'Unknown object type {objtype}', bytes(header))
+            self._obj_offset = self._buffer_offset + pos
+            self._obj_type = objtype
+            self._obj_size = size
+            self._obj_crc = crc32(header)
+            self._obj_decompresser = decompressobj()
+            header.release()
+            pos += length
+            self._pos = pos
+
+        # object content
+        # feed decompresser a window about the size of object,
+        # because data after the end of zlib stream is copied into unused_data,
+        # feeding the whole buffer would copy the rest of pack on every object
+        decompresser = self._obj_decompresser
+        window = self._obj_size + 1024
+        end = len(buffer)
+        while pos < end:
+            chunk = memoryview(buffer)[pos:pos + window]
+            self._obj_content.append(decompresser.decompress(chunk))
+            if decompresser.eof:
+                consumed = len(chunk) - len(decompresser.unused_data)
+            else:
+                consumed = len(chunk)
+            self._obj_crc = crc32(chunk[:consumed], self._obj_crc)
+            chunk.release()
+            pos += consumed
+            if decompresser.eof:
+                break
+        self._pos = pos
+        if not decompresser.eof:
+            return False
+
+        # object finished
+        content = b''.join(self._obj_content)
+        self._obj_content.clear()
+        self._obj_decompresser = None
+        obj = self._create_object(content)
+        self._resolve_stream_object(obj, self._obj_offset, self._obj_crc)
+        self.parsed += 1
+        self._obj_offset = -1
+        return True
+
+    def _get_source(self, obj, offset):
+        """
+        Args:
+            obj (GitObject): Delta object
+            offset (int): Offset of delta object
+
+        Returns:
+            tuple[GitObject | None, int | str]: Source object or None if not resolved yet, key of source
+        """
+        if obj.type == 7:
+            ref = obj.decoded.ref
+            source = self._dict_sha1_to_object.get(ref)
+            if source is not None:
+                return source, ref
+            # REF_DELTA in thin pack refers to local objects
+            try:
+                return self.cat(ref), ref
+            except KeyError:
+                # source may be received later
+                return None, ref
+        else:
+            base = offset - obj.decoded.offset
+            source = self._dict_offset_to_object.get(base)
+            if source is not None:
+                return source, base
+            if base not in self._set_pending_offset:
+                # this shouldn't happen
+                raise PackBroken(f'No corresponding pack object at offset={base}. '
+                                 f'index={offset}, ofs_delta={obj.decoded.offset}')
+            return None, base
+
+    def _resolve_stream_object(self, obj, offset, crc):
+        """
+        Apply delta and generate info, then resolve pending deltas that depend on it
+
+        Args:
+            obj (GitObject):
+            offset (int):
+            crc (int):
+        """
+        stack = [(obj, offset, crc)]
+        while stack:
+            obj, offset, crc = stack.pop()
+            if obj.type in [6, 7]:
+                source, key = self._get_source(obj, offset)
+                if source is None:
+                    self._dict_pending.setdefault(key, []).append((obj, offset, crc))
+                    self._set_pending_offset.add(offset)
+                    continue
+                obj.apply_delta_from_source(source)
+
+            sha = obj.sha1()
+            self._dict_offset_to_object[offset] = obj
+            self._dict_sha1_to_object[sha.hex()] = obj
+            self.list_info.append(PackObjectInfo(sha=sha, offset=offset, crc=crc, type=obj.type, size=len(obj.data)))
+            if self._dict_pending:
+                for pending in [self._dict_pending.pop(offset, None), self._dict_pending.pop(sha.hex(), None)]:
+                    if pending:
+                        stack += pending
+                        self._set_pending_offset.difference_update([item[1] for item in pending])
+
+    def _create_object(self, content):
+        """
+        Same as read_first_obj() but from decompressed content
+
+        Args:
+            content (bytes):
+
+        Returns:
+            GitObject:
+        """
+        objtype = self._obj_type
+        if objtype in OBJTYPE_BASIC:
+            return GitObject(type=objtype, size=self._obj_size, data=memoryview(content))
+        source_size, result_size, all_instructions = parse_delta_object(content)
+        if objtype == 7:
+            decoded = RefDeltaObj(
+                ref=self._obj_base,
+                source_size=source_size,
+                result_size=result_size,
+                all_instructions=all_instructions,
+            )
+        else:
+            decoded = OfsDeltaObj(
+                offset=self._obj_base,
+                source_size=source_size,
+                result_size=result_size,
+                all_instructions=all_instructions,
+            )
+        obj = GitObject(type=objtype, size=result_size, data=memoryview(content))
+        cached_property.set(obj, 'decoded', decoded)
+        return obj
+
+    def finish(self):
+        """
+        Validate pack checksum and generate idx
+
+        Returns:
+            bytes: Content of .idx file
+
+        Raises:
+            PackBroken:
+        """
+        if self.num_objects < 0:
+            raise PackBroken(f'Pack file incomplete, received={self.received}')
+        if self.parsed < self.num_objects:
+            raise PackBroken(f'Pack file incomplete, expect {self.num_objects} objects, '
+                             f'got {self.parsed}, received={self.received}')
+        if self._dict_pending:
+            bases = [base for base in self._dict_pending if isinstance(base, str)]
+            raise PackBroken(f'Delta source not found: {bases}')
+        trailing = self._buffer[self._pos:]
+        if len(trailing) < 20:
+            raise PackBroken(f'Pack validate failed, unexpected checksum length: {trailing.hex()}')
+        if len(trailing) > 20:
+            # this shouldn't happen, we hashed all data before last 20 bytes, so checksum won't match
+            logger.warning('Pack file has redundant trailing data')
+        checksum = bytes(trailing[-20:])
+        sha = self._pack_sha1.digest()
+        if sha != checksum:
+            raise PackBroken(f'Pack validate failed, checksum not match, sha1={sha.hex()}, checksum={checksum.hex()}')
+
+        # release memory
+        self._dict_offset_to_object = {}
+        self._dict_sha1_to_object = {}
+        self._buffer = bytearray()
+        list_info = sorted(self.list_info, key=lambda i: i.sha)
+        self.idx_list_info = list_info
+        self.idx_pack_sha1 = checksum
+        idx = b''.join(self._iter_idx_data(list_info, checksum))
+        checksum = sha1(idx).digest()
+        return b''.join([idx, checksum])
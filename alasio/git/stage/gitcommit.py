@@ -1,4 +1,4 @@
-import itertools
+from itertools import islice
 
 from alasio.ext.cache import cached_property
 from alasio.ext.concurrent.threadpool import THREAD_POOL
@@ -9,24 +9,6 @@
 from alasio.logger import logger
 
 
-def batch_generator(iterable, batch_size=50):
-    """
-    Args:
-        iterable: e.g., list, tuple, dict.items()
-        batch_size (int):
-
-    Yields:
-        list: 代表一个批次的列表。
-    """
-    # 从可迭代对象创建一个迭代器
-    it = iter(iterable)
-    while True:
-        batch = list(itertools.islice(it, batch_size))
-        if not batch:
-            break
-        yield batch
-
-
 class GitCommit(GitObjectManager):
     @cached_property
     def dict_objtype(self):
@@ -45,24 +27,32 @@ def dict_objtype(self):
         # key: ref_from, value: ref_to
         delta_ref = {}
 
-        def read_loose(batch_):
-            for sha1_, file in batch_:
-                if type(file) is LoosePath:
-                    try:
-                        objtype_ = file.read_objtype(sha1_)
-                    except Exception as e_:
-                        logger.warning(f'dict_objtype: Failed to read objtype from sha1={sha1_}, {e_}')
-                        continue
-                    result[sha1_] = objtype_
-                # TODO: cache object header of unread pack object and get objtype from it
+        # objects in packs that have .objtype side table
+        for pack in self.dict_pack.values():
+            table = pack.objtype_read()
+            if table is not None:
+                # both in pack offset order
+                result.update(zip(pack.dict_offset, table.types))
+
+        def read_loose(item_):
+            sha1_, file = item_
+            if sha1_ in result:
+                return
+            if type(file) is LoosePath:
+                try:
+                    objtype_ = file.read_objtype(sha1_)
+                except Exception as e_:
+                    logger.warning(f'dict_objtype: Failed to read objtype from sha1={sha1_}, {e_}')
+                    return
+                result[sha1_] = objtype_
+            # unread pack objects are typed by .objtype side table if available
 
         def offset_to_ref(sha1_, offset_delta_):
-            try:
-                pack = self.dict_object_from[sha1_]
-                offset_base = pack.dict_offset[sha1_][0]
-            except KeyError as e_:
-                logger.warning(e_)
+            found = self.object_pack_offset(sha1_)
+            if found is None:
+                logger.warning(f'dict_objtype: OFS_DELTA object not in any pack, sha1={sha1_}')
                 return None
+            pack, offset_base = found
             offset = offset_base - offset_delta_
             if offset < 0:
                 logger.warning(f'dict_objtype: OFS_DELTA object offset < 0, '
@@ -76,37 +66,61 @@ def offset_to_ref(sha1_, offset_delta_):
                                f'sha1={sha1_}, offset_base={offset_base}, offset_delta={offset_delta_}')
                 return None
 
-        with THREAD_POOL.wait_jobs() as pool:
-            for batch in batch_generator(self.dict_object_unread.items()):
-                pool.start_thread_soon(read_loose, batch)
-
-            # populate all objdata to git object
-            dict_object = self.dict_object
-            dict_object_data = self.dict_object_data
-            for sha1, data in self.dict_object_data.items():
-                try:
-                    obj = parse_objdata(data)
-                    dict_object[sha1] = obj
-                except Exception as e:
-                    logger.warning(f'dict_objtype: obj parse failed, sha1={sha1}, {e}')
+        # read loose objects on threads, while we parse cached data below.
+        # Only a bounded window of chunks is in flight, next chunks are submitted as results are consumed,
+        # so we consume a chunk every `chunksize` parsed objects to keep reading during parsing
+        chunksize = 50
+        loose = THREAD_POOL.imap_unordered(read_loose, list(self.dict_object_unread.items()), chunksize=chunksize)
+
+        def loose_pull():
+            for _ in islice(loose, chunksize):
+                pass
+
+        # populate all objdata to git object
+        dict_object = self.dict_object
+        dict_object_data = self.dict_object_data
+        parsed = []
+        for index, (sha1, data) in enumerate(self.dict_object_data.items(), start=1):
+            if not index % chunksize:
+                loose_pull()
+            if sha1 in result:
+                continue
+            try:
+                obj = parse_objdata(data)
+                dict_object[sha1] = obj
+            except Exception as e:
+                logger.warning(f'dict_objtype: obj parse failed, sha1={sha1}, {e}')
+            parsed.append(sha1)
+        if len(parsed) == len(dict_object_data):
             dict_object_data.clear()
-
-            # while the thread are working, we read from cached data, which is CPU-bound
-            dict_object = self.dict_object
-            for sha1, obj in dict_object.items():
-                try:
-                    objtype = obj.type
-                    if objtype in OBJTYPE_BASIC:
-                        result[sha1] = objtype
-                    elif objtype == 7:
-                        ref = parse_ref_delta_ref(obj.data)
-                        delta_ref[sha1] = ref
-                    elif objtype == 6:
-                        offset_delta = parse_ofs_delta_offset(obj.data)
-                        ref = offset_to_ref(sha1, offset_delta)
-                        delta_ref[sha1] = ref
-                except Exception as e:
-                    logger.warning(f'dict_objtype: obj parse failed, sha1={sha1}, {e}')
+        else:
+            for sha1 in parsed:
+                del dict_object_data[sha1]
+
+        # while the thread are working, we read from cached data, which is CPU-bound
+        dict_object = self.dict_object
+        for index, (sha1, obj) in enumerate(dict_object.items(), start=1):
+            if not index % chunksize:
+                loose_pull()
+            if sha1 in result:
+                continue
+            try:
+                objtype = obj.type
+                if objtype in OBJTYPE_BASIC:
+                    result[sha1] = objtype
+                elif objtype == 7:
+                    ref = parse_ref_delta_ref(obj.data)
+                    delta_ref[sha1] = ref
+                elif objtype == 6:
+                    offset_delta = parse_ofs_delta_offset(obj.data)
+                    ref = offset_to_ref(sha1, offset_delta)
+                    delta_ref[sha1] = ref
+            except Exception as e:
+                logger.warning(f'dict_objtype: obj parse failed, sha1={sha1}, {e}')
+
+        # wait until all loose objects are read
+        for _ in loose:
+            pass
 
         # solve delta
         for sha1 in delta_ref:
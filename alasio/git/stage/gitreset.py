@@ -1,3 +1,4 @@
+import os
 from collections import deque
 
 import msgspec
@@ -6,6 +7,8 @@
 from alasio.ext.path.atomic import file_write
 from alasio.git.file.gitobject import GitObjectManager
 from alasio.git.stage.hashobj import git_file_hash
+from alasio.git.stage.index import GitIndex, GitIndexEntry
+from alasio.logger import logger
 
 
 class FileEntry(msgspec.Struct):
@@ -14,7 +17,60 @@ class FileEntry(msgspec.Struct):
     path: str
 
 
-class GitReset(GitObjectManager):
+def index_entry_from_stat(file, st):
+    """
+    Args:
+        file (FileEntry):
+        st (os.stat_result):
+
+    Returns:
+        GitIndexEntry:
+    """
+    # index stores 32bit values
+    return GitIndexEntry(
+        ctime_s=int(st.st_ctime) & 0xffffffff, ctime_ns=st.st_ctime_ns % 1000000000,
+        mtime_s=int(st.st_mtime) & 0xffffffff, mtime_ns=st.st_mtime_ns % 1000000000,
+        dev=st.st_dev & 0xffffffff, ino=st.st_ino & 0xffffffff, mode=int(file.mode, 8),
+        uid=st.st_uid & 0xffffffff, gid=st.st_gid & 0xffffffff, size=st.st_size & 0xffffffff,
+        sha1=bytes.fromhex(file.sha1), path=file.path,
+    )
+
+
+def index_entry_stat_match(entry, st, index_mtime_ns):
+    """
+    Check if file is unchanged since index entry recorded, like ie_match_stat() in git
+
+    Args:
+        entry (GitIndexEntry):
+        st (os.stat_result):
+        index_mtime_ns (int): mtime of index file
+
+    Returns:
+        bool: True if file is unchanged, False if file needs to be hashed
+    """
+    if entry.size != st.st_size & 0xffffffff:
+        return False
+    if entry.mtime_s != int(st.st_mtime) & 0xffffffff or entry.mtime_ns != st.st_mtime_ns % 1000000000:
+        return False
+    if entry.ctime_s != int(st.st_ctime) & 0xffffffff or entry.ctime_ns != st.st_ctime_ns % 1000000000:
+        return False
+    # GitAdd writes ino=0
+    if entry.ino and entry.ino != st.st_ino & 0xffffffff:
+        return False
+    # racy git
+    # file modified at the same time of writing index may have unchanged stat but changed content,
+    # entries with mtime >= index mtime can't be trusted
+    if entry.mtime_s * 1000000000 + entry.mtime_ns >= index_mtime_ns:
+        return False
+    return True
+
+
+class GitReset(GitObjectManager, GitIndex):
+    # Whether to use .git/index as stat cache in git_reset_hard(), like git does.
+    # Files whose stat data matches index entry are considered unchanged and won't be hashed,
+    # index is updated after reset.
+    reset_stat_cache = False
+
     def list_files(self, sha1):
         """
         List all files under the tree of given sha1
@@ -116,6 +172,11 @@ def get_file(self, sha1, filepath):
         Returns:
             FileEntry | None: FileEntry if found, None otherwise
         """
+        # Check type from .objtype side table first, so we don't read a large blob just to know it's a blob
+        info = self.objtype_info(sha1)
+        if info is not None and info[0] == 3:
+            raise ValueError('Object is a file, cannot get file in it')
+
         # Resolve commit/tag to tree sha1
         while 1:
             obj = self.cat(sha1)
@@ -295,66 +356,115 @@ def _compare_trees(self, old_tree_sha1, new_tree_sha1, prefix):
 
         return added, modified, deleted
 
-    @staticmethod
-    def _reset_task_iter(dict_file):
+    def _reset_write_file(self, file):
+        """
+        Args:
+            file (FileEntry): file to write from repo
+
+        Returns:
+            bool: If written
+        """
+        obj = self.cat(file.sha1)
+        if obj.type != 3:
+            # This shouldn't happen
+            return False
+        # write, no need to be atomic
+        file_write(f'{self.path}/{file.path}', obj.decoded)
+        return True
+
+    def _reset_validate_file(self, file):
         """
-        Split dict_file by every 50 files.
-        50 is the magic number, ALAS has average file size 23.6KB and SRC is 22.8KB,
-        so 50 files are about 1MB for each task to read.
+        Validate a local file, reset it if it doesn't match
 
         Args:
-            dict_file (dict[str, FileEntry]): files that need validate
+            file (FileEntry): file that need validate
 
-        Yields:
-            ict[str, FileEntry]:
+        Returns:
+            bool: If file reset
         """
-        count = 0
-        dict_task = {}
-        for sha1, file in dict_file.items():
-            dict_task[sha1] = file
-            count += 1
-            if count >= 50:
-                yield dict_task
-                dict_task = {}
-                count = 1
-
-        yield dict_task
-
-    def _reset_task_validate_files(self, dict_file):
+        filepath = f'{self.path}/{file.path}'
+        try:
+            sha1 = git_file_hash(filepath)
+        except FileNotFoundError:
+            # need to write new file
+            sha1 = None
+        if file.sha1 == sha1:
+            return False
+        # need to reset file
+        return self._reset_write_file(file)
+
+    def _reset_validate_file_stat(self, file, index_mtime_ns):
         """
+        Same as _reset_validate_file(), but skip hashing file if its stat matches index entry
+
         Args:
-            dict_file (dict[str, FileEntry]): files that need validate
+            file (FileEntry): file that need validate
+            index_mtime_ns (int): mtime of index file
 
         Returns:
-            dict[str, FileEntry]: files that reset
+            GitIndexEntry | None: new index entry, or None if file cannot be indexed
         """
-        root = self.path
-        # validate files
-        need_reset = {}
-        for sha1, file in dict_file.items():
-            filepath = f'{root}/{file.path}'
+        filepath = f'{self.path}/{file.path}'
+        try:
+            st = os.stat(filepath)
+        except FileNotFoundError:
+            # need to write new file
+            st = None
+        if st is not None:
+            entry = self.dict_entry.get((file.path, 0))
+            if entry is not None and entry.sha1.hex() == file.sha1 \
+                    and index_entry_stat_match(entry, st, index_mtime_ns):
+                # unchanged, keep entry
+                return entry
             try:
                 sha1 = git_file_hash(filepath)
             except FileNotFoundError:
-                # need to write new file
-                need_reset[sha1] = file
-                continue
-            if file.sha1 != sha1:
-                # need to reset file
-                need_reset[sha1] = file
-
-        # write files
-        for sha1, file in need_reset.items():
-            filepath = f'{root}/{file.path}'
-            obj = self.cat(sha1)
-            if obj.type != 3:
-                # This shouldn't happen
-                continue
-            # write, no need to be atomic
-            data = obj.decoded
-            file_write(filepath, data)
+                sha1 = None
+            if file.sha1 == sha1:
+                return index_entry_from_stat(file, st)
+
+        # need to reset file
+        if not self._reset_write_file(file):
+            return None
+        try:
+            st = os.stat(filepath)
+        except FileNotFoundError:
+            # race condition that file deleted, don't index it
+            return None
+        return index_entry_from_stat(file, st)
+
+    def reset_validate_files_stat(self, dict_file):
+        """
+        Validate local files by given `dict_file`, using .git/index as stat cache,
+        then write new .git/index that matches `dict_file`
 
-        return need_reset
+        Args:
+            dict_file (dict[str, FileEntry]): files that need validate
+        """
+        try:
+            index_mtime_ns = os.stat(self.index_file).st_mtime_ns
+            self.index_read()
+        except FileNotFoundError:
+            # no index, hash all files
+            index_mtime_ns = 0
+            self.clear_index_cache()
+        except Exception as e:
+            # broken index, hash all files
+            logger.warning(f'GitReset failed to read index, {e}')
+            index_mtime_ns = 0
+            self.clear_index_cache()
+
+        def validate(file):
+            return self._reset_validate_file_stat(file, index_mtime_ns)
+
+        dict_entry = {}
+        for entry in THREAD_POOL.imap_unordered(validate, dict_file.values()):
+            if entry is not None:
+                dict_entry[(entry.path, 0)] = entry
+        self.dict_entry = dict_entry
+        if not self.index_version:
+            self.index_version = 2
+        self.index_write()
 
     def reset_validate_files(self, dict_file):
         """
@@ -363,15 +473,16 @@ def reset_validate_files(self, dict_file):
         Args:
             dict_file (dict[str, FileEntry]): files that need validate
         """
-        tasks = list(self._reset_task_iter(dict_file))
-        if not tasks:
+        if self.reset_stat_cache:
+            self.reset_validate_files_stat(dict_file)
+            return
+        if len(dict_file) <= 50:
+            # a few files, not worth switching threads
+            for file in dict_file.values():
+                self._reset_validate_file(file)
             return
-        if len(tasks) == 1:
-            self._reset_task_validate_files(tasks[0])
-        else:
-            with THREAD_POOL.wait_jobs() as pool:
-                for task in tasks:
-                    pool.start_thread_soon(self._reset_task_validate_files, task)
+        for _ in THREAD_POOL.imap_unordered(self._reset_validate_file, dict_file.values()):
+            pass
 
     def git_reset_hard(self, sha1):
         """
@@ -85,7 +85,13 @@ def _build_stat(st_mode, ino, dev, nlink, uid, gid, size, atime, mtime, ctime):
     Returns:
         os.stat_result:
     """
-    return os.stat_result((st_mode, ino, dev, nlink, uid, gid, size, atime, mtime, ctime))
+    # integer times, float times and nanosecond times, same as os.stat()
+    return os.stat_result((
+        st_mode, ino, dev, nlink, uid, gid, size,
+        int(atime), int(mtime), int(ctime),
+        atime, mtime, ctime,
+        round(atime * 1e9), round(mtime * 1e9), round(ctime * 1e9),
+    ))
 
 
 class FakeFile(msgspec.Struct):
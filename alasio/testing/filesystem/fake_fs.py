@@ -504,6 +504,7 @@ def open(self, file, mode='r', buffering=-1, encoding=None, errors=None,
                 entry = self.create_file(file, st_mode=0o666)
             else:
                 entry.content = b''
+                entry.mtime = entry.ctime = time.time()
         elif action == 'a':
             if entry is None:
                 entry = self.create_file(file, st_mode=0o666)
@@ -1117,6 +1118,7 @@ def os_open(self, path, flags, mode=0o777):
                 raise FileExistsError(errno.EEXIST, 'File exists', path)
             if flags & os.O_TRUNC:
                 entry.content = b''
+                entry.mtime = entry.ctime = time.time()
         elif path in self._dirs:
             raise IsADirectoryError(errno.EISDIR, 'Is a directory', path)
         else:
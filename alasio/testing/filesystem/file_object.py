@@ -7,6 +7,7 @@
 """
 import io
 import os
+import time
 
 
 class FakeFileObject:
@@ -143,6 +144,14 @@ def _get_view(self):
             text = text.replace('\r\n', '\n').replace('\r', '\n')
         return text
 
+    def _modified(self):
+        """
+        Update mtime and ctime of the record, like a real write.
+        """
+        now = time.time()
+        self._entry.mtime = now
+        self._entry.ctime = now
+
     def _flush_view(self, view):
         """
         Write a text view back to the record content.
@@ -158,6 +167,7 @@ def _flush_view(self, view):
         else:
             raw = view
         self._entry.content = raw.encode(self._encoding, self._errors)
+        self._modified()
 
     """
     Read
@@ -304,6 +314,7 @@ def write(self, data):
                 raise TypeError(f'a bytes-like object is required, not {type(data).__name__!r}')
             data = bytes(data)
             content = self._entry.content
+            self._modified()
             if self._append:
                 self._entry.content = content + data
             else:
@@ -367,6 +378,7 @@ def truncate(self, size=None):
                 # growing truncate pads with zeros
                 content = content + b'\x00' * (size - len(content))
             self._entry.content = content
+            self._modified()
         else:
             view = self._get_view()
             if size < len(view):
@@ -0,0 +1,80 @@
+"""
+Benchmark writing many small files atomically, one fsync per file versus one sync pass.
+
+- "atomic_write": atomic_write() each file, fsync every file then os.replace()
+- "batch": AtomicWriteBatch, write all temp files, sync once, then os.replace() in order
+- "batch-fsync": AtomicWriteBatch with syncfs disabled, fsync temp files in one pass
+Default runs on ./temp (usually ext4 or similar disk filesystem) and /dev/shm (tmpfs) if it exists.
+
+Usage:
+    python -m benchmarks.bench_atomic_batch
+    python -m benchmarks.bench_atomic_batch --files 500 --size 4096 --path ./temp/bench_atomic
+"""
+import argparse
+import os
+import shutil
+import time
+
+from alasio.ext.path.atomic import AtomicWriteBatch, atomic_write
+
+
+def bench_atomic_write(folder, files, data):
+    start = time.perf_counter()
+    for i in range(files):
+        atomic_write(os.path.join(folder, f'{i}.bin'), data)
+    return time.perf_counter() - start
+
+
+def bench_batch(folder, files, data, syncfs=True):
+    start = time.perf_counter()
+    with AtomicWriteBatch() as batch:
+        if not syncfs:
+            batch.SYNCFS_MIN_FILES = files + 1
+        for i in range(files):
+            batch.write(os.path.join(folder, f'{i}.bin'), data)
+    return time.perf_counter() - start
+
+
+def fs_type(folder):
+    # best effort, read filesystem type from /proc/mounts
+    try:
+        with open('/proc/mounts', 'r', encoding='utf-8') as f:
+            mounts = [line.split()[1:3] for line in f]
+    except OSError:
+        return 'unknown'
+    folder = os.path.realpath(folder)
+    best = ('', 'unknown')
+    for point, typ in mounts:
+        if (folder == point or folder.startswith(point.rstrip('/') + '/')) and len(point) > len(best[0]):
+            best = (point, typ)
+    return best[1]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--files', type=int, default=300)
+    parser.add_argument('--size', type=int, default=2048, help='Bytes of each file')
+    parser.add_argument('--path', action='append', help='Folders to benchmark, can be given multiple times')
+    args = parser.parse_args()
+
+    paths = args.path or ['./temp/bench_atomic_batch']
+    if not args.path and os.path.isdir('/dev/shm'):
+        paths.append('/dev/shm/bench_atomic_batch')
+    data = os.urandom(args.size)
+
+    for path in paths:
+        print(f'{path} fs={fs_type(os.path.dirname(os.path.abspath(path)))} files={args.files} size={args.size}')
+        for name, func in [
+            ('atomic_write', lambda folder: bench_atomic_write(folder, args.files, data)),
+            ('batch', lambda folder: bench_batch(folder, args.files, data)),
+            ('batch-fsync', lambda folder: bench_batch(folder, args.files, data, syncfs=False)),
+        ]:
+            shutil.rmtree(path, ignore_errors=True)
+            os.makedirs(path)
+            cost = func(path)
+            print(f'  {name:<13} cost={cost:.3f}s files_per_second={args.files / cost:.0f}')
+        shutil.rmtree(path, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark a thundering herd on ResourceCache, many threads on THREAD_POOL ask for the same cold keys at once.
+
+- "uncoordinated": every caller that misses loads the resource itself
+- "single-flight": ResourceCache.get(), the first caller loads and others wait for its result
+- "error": the resource is broken, compared with and without ERROR_TTL negative caching
+
+Usage:
+    python -m benchmarks.bench_cache_herd
+    python -m benchmarks.bench_cache_herd --threads 4 --keys 20 --size 200000
+"""
+import argparse
+import threading
+import time
+
+import msgspec
+
+from alasio.ext.cache.resource import ResourceCache
+from alasio.ext.concurrent.threadpool import THREAD_POOL
+
+
+class JsonCache(ResourceCache):
+    def __init__(self, data, broken=False):
+        super().__init__()
+        self.data = data
+        self.broken = broken
+        self.loads = 0
+        self.loads_lock = threading.Lock()
+
+    def load_resource(self, file, **kwargs):
+        with self.loads_lock:
+            self.loads += 1
+        if self.broken:
+            # parse then fail, like a file with an invalid field at the end
+            msgspec.json.decode(self.data)
+            raise ValueError(f'Broken file: {file}')
+        return msgspec.json.decode(self.data)
+
+
+class UncoordinatedCache(JsonCache):
+    def get(self, file, **kwargs):
+        try:
+            return self._cache[file]
+        except KeyError:
+            pass
+        value = self.load_resource(file, **kwargs)
+        self._cache[file] = value
+        return value
+
+
+def herd(cache, threads, keys, rounds):
+    barrier = threading.Barrier(threads)
+    errors = 0
+
+    def worker():
+        nonlocal errors
+        barrier.wait()
+        for _ in range(rounds):
+            for index in range(keys):
+                try:
+                    cache.get(f'/mod/file{index}.json')
+                except ValueError:
+                    errors += 1
+
+    start = time.perf_counter()
+    with THREAD_POOL.wait_jobs() as pool:
+        for _ in range(threads):
+            pool.start_thread_soon(worker)
+    return time.perf_counter() - start, errors
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--threads', type=int, default=THREAD_POOL.pool_size)
+    parser.add_argument('--keys', type=int, default=10)
+    parser.add_argument('--size', type=int, default=100000, help='Amount of items in each JSON')
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+    # callers wait for each other on a barrier, all of them must be running at the same time
+    args.threads = min(args.threads, THREAD_POOL.pool_size)
+
+    data = msgspec.json.encode([{'name': f'item{i}', 'value': i, 'tags': ['a', 'b']} for i in range(args.size)])
+    print(f'threads={args.threads} keys={args.keys} json={len(data) / 1048576:.1f}MB')
+
+    for name, cache in [
+        ('uncoordinated', UncoordinatedCache(data)),
+        ('single-flight', JsonCache(data)),
+    ]:
+        cost, _ = herd(cache, args.threads, args.keys, 1)
+        print(f'{name:<14} loads={cache.loads:<4} cost={cost:.3f}s')
+
+    for error_ttl in [0., 10.]:
+        cache = JsonCache(data, broken=True)
+        cache.ERROR_TTL = error_ttl
+        cost, errors = herd(cache, args.threads, args.keys, args.rounds)
+        name = f'error ttl={error_ttl:g}'
+        print(f'{name:<14} loads={cache.loads:<4} cost={cost:.3f}s errors={errors}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark ResourceCache with eviction policies, lookup overhead and hit rate.
+
+- "hit": get() of keys that are all in cache, compared with a plain dict lookup and the cache without policy
+- "zipf": get() of keys in a zipf-like distribution with a one-time scan mixed in,
+  cache capacity is smaller than the key space, so policies evict and hit rate differs
+
+Usage:
+    python -m benchmarks.bench_cache_resource
+    python -m benchmarks.bench_cache_resource --keys 10000 --capacity 1000 --lookups 1000000
+"""
+import argparse
+import random
+import time
+
+from alasio.ext.cache.policy import CachePolicy, LRUPolicy, SizedLRUPolicy, TinyLFUPolicy
+from alasio.ext.cache.resource import ResourceCache
+
+
+class Cache(ResourceCache):
+    def load_resource(self, file, **kwargs):
+        return file
+
+
+def create_policies(capacity):
+    # byte budget that holds `capacity` keys
+    size = len('/mod/file00000000.json')
+    return {
+        'none': lambda: None,
+        'stats': lambda: CachePolicy(),
+        'lru': lambda: LRUPolicy(maxsize=capacity),
+        'sized': lambda: SizedLRUPolicy(maxsize=capacity * size, sizer=len),
+        'tinylfu': lambda: TinyLFUPolicy(maxsize=capacity),
+    }
+
+
+def create_workload(keys, lookups):
+    rng = random.Random(1)
+    names = [f'/mod/file{i:08d}.json' for i in range(keys)]
+    weights = [1 / (i + 1) for i in range(keys)]
+    workload = rng.choices(names, weights=weights, k=lookups)
+    # one-time scan in the middle, like opening a rarely used mod
+    middle = lookups // 2
+    scan = [f'/scan/file{i:08d}.json' for i in range(keys)]
+    return workload[:middle] + scan + workload[middle:]
+
+
+def bench_hit(name, factory, keys, lookups):
+    names = [f'/mod/file{i:08d}.json' for i in range(keys)]
+    workload = [names[i % keys] for i in range(lookups)]
+    if name == 'dict':
+        cache = {key: key for key in names}
+        get = cache.__getitem__
+    else:
+        # capacity of policies is large enough to keep all keys
+        cache = Cache(factory())
+        get = cache.get
+        for key in names:
+            get(key)
+    start = time.perf_counter()
+    for key in workload:
+        get(key)
+    cost = time.perf_counter() - start
+    print(f'hit   {name:<8} lookups={lookups} cost={cost:.3f}s per_lookup={cost / lookups * 1e9:.0f}ns')
+
+
+def bench_zipf(name, factory, workload):
+    cache = Cache(factory())
+    get = cache.get
+    start = time.perf_counter()
+    for key in workload:
+        get(key)
+    cost = time.perf_counter() - start
+    stats = cache.stats()
+    print(f'zipf  {name:<8} lookups={len(workload)} cost={cost:.3f}s '
+          f'hit_rate={stats.hit_rate:.3f} evictions={stats.evictions} size={stats.size}')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--keys', type=int, default=10000)
+    parser.add_argument('--capacity', type=int, default=1000)
+    parser.add_argument('--lookups', type=int, default=500000)
+    args = parser.parse_args()
+
+    bench_hit('dict', None, args.keys, args.lookups)
+    for name, factory in create_policies(args.keys * 2).items():
+        bench_hit(name, factory, args.keys, args.lookups)
+
+    workload = create_workload(args.keys, args.lookups)
+    for name, factory in create_policies(args.capacity).items():
+        if name in ['none', 'stats']:
+            # never evicts
+            continue
+        bench_zipf(name, factory, workload)
+
+
+if __name__ == '__main__':
+    main()
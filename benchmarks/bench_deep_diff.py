@@ -0,0 +1,98 @@
+"""
+Benchmark diffing large nested dicts with sparse changes, deep_iter_patch() versus deep_patch().
+
+Creates a config-like dict of groups > tasks > args > fields, then changes a few args in two ways:
+- "copy": after is a deep copy of before with changes, nothing is shared
+- "shared": after copies only the changed branches of before, unchanged subtrees are the same objects
+Also measures deep_patch_ops() and deep_apply_patch() of the msgpack encoded ops.
+
+Usage:
+    python -m benchmarks.bench_deep_diff
+    python -m benchmarks.bench_deep_diff --size 60 --changes 100
+"""
+import argparse
+import copy
+import random
+import time
+
+import msgspec
+
+from alasio.ext.deep import deep_apply_patch, deep_iter_patch, deep_patch, deep_patch_ops
+
+
+def create_data(size):
+    return {
+        f'Group{i}': {
+            f'Task{j}': {
+                f'Arg{k}': {'value': k, 'type': 'input', 'option': ['a', 'b', 'c']}
+                for k in range(size)
+            }
+            for j in range(size)
+        }
+        for i in range(size)
+    }
+
+
+def change_copy(data, paths):
+    after = copy.deepcopy(data)
+    for group, task, arg in paths:
+        after[group][task][arg]['value'] = -1
+    return after
+
+
+def change_shared(data, paths):
+    # copy-on-write, like reactive data that is re-computed from the changed parts only
+    after = dict(data)
+    for group, task, arg in paths:
+        d_group = dict(after[group])
+        d_task = dict(d_group[task])
+        d_arg = dict(d_task[arg])
+        d_arg['value'] = -1
+        d_task[arg] = d_arg
+        d_group[task] = d_task
+        after[group] = d_group
+    return after
+
+
+def bench(func, *args, rounds=5):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        result = func(*args)
+    return (time.perf_counter() - start) / rounds, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size', type=int, default=40, help='Keys in each level, leaves are size^3 args')
+    parser.add_argument('--changes', type=int, default=10)
+    args = parser.parse_args()
+
+    data = create_data(args.size)
+    rng = random.Random(1)
+    paths = [(f'Group{rng.randrange(args.size)}', f'Task{rng.randrange(args.size)}', f'Arg{rng.randrange(args.size)}')
+             for _ in range(args.changes)]
+    print(f'args={args.size ** 3} changes={args.changes}')
+
+    for mode, after in [
+        ('copy', change_copy(data, paths)),
+        ('shared', change_shared(data, paths)),
+    ]:
+        old, old_patch = bench(lambda: list(deep_iter_patch(data, after)))
+        new, new_patch = bench(lambda: list(deep_patch(data, after)))
+        assert len(old_patch) == len(new_patch)
+        print(f'{mode:<7} deep_iter_patch={old * 1000:.2f}ms deep_patch={new * 1000:.2f}ms '
+              f'speedup={old / new:.1f}x ops={len(new_patch)}')
+
+    after = change_shared(data, paths)
+    cost, ops = bench(deep_patch_ops, data, after)
+    encoded = msgspec.msgpack.encode(ops)
+    target = copy.deepcopy(data)
+    start = time.perf_counter()
+    target = deep_apply_patch(target, msgspec.msgpack.decode(encoded))
+    apply = time.perf_counter() - start
+    assert target == after
+    print(f'ops     deep_patch_ops={cost * 1000:.2f}ms msgpack={len(encoded)}B deep_apply_patch={apply * 1000:.2f}ms')
+
+
+if __name__ == '__main__':
+    main()
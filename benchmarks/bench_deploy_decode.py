@@ -0,0 +1,80 @@
+"""
+Benchmark peak memory of decoding a large file from deploy pack data, in-memory versus streaming.
+
+Generates a large asset, compresses it like PackFull does, then decodes it to a file in two ways:
+- "memory": PackDecodeBase.decode_content() returns the whole content, then atomic_write()
+- "stream": PackDecodeBase.decode_content_to_file() decompresses, checks and writes in chunks
+Peak memory is the peak of python allocations measured by tracemalloc, excluding the input data.
+
+Usage:
+    python -m benchmarks.bench_deploy_decode
+    python -m benchmarks.bench_deploy_decode --size 256 --algo zstd
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from hashlib import sha1
+
+from alasio.deploy.pack.decode_base import PackDecodeBase, iter_chunks
+from alasio.deploy.pack.pack_model import IdxInfo
+from alasio.ext.compress.algo_lzma import lzma_compress
+from alasio.ext.compress.algo_zstd import zstd_compress
+from alasio.ext.path.atomic import atomic_write
+
+DICT_ALGO = {'raw': 0, 'lzma': 1, 'zstd': 2}
+
+
+def create_content(size):
+    # compressible binary-ish content, like game assets
+    rng = random.Random(1)
+    blocks = [bytes(rng.getrandbits(8) for _ in range(4096)) for _ in range(16)]
+    count = size // 4096
+    return b''.join(blocks[rng.randrange(16)] for _ in range(count))
+
+
+def compress(content, algo):
+    if algo == 'zstd':
+        return zstd_compress(content, level=3)
+    if algo == 'lzma':
+        return lzma_compress(content, max_dict_size=1 << 20)
+    return content
+
+
+def decode(mode, info, data, file):
+    if mode == 'memory':
+        atomic_write(file, PackDecodeBase.decode_content(info, data))
+    else:
+        PackDecodeBase.decode_content_to_file(info, iter_chunks(data), file)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size', type=int, default=128, help='Content size in MB')
+    parser.add_argument('--algo', choices=list(DICT_ALGO), default='zstd')
+    args = parser.parse_args()
+
+    content = create_content(args.size * 1048576)
+    data = compress(content, args.algo)
+    info = IdxInfo(path='asset.bin', size=len(content), sha1=sha1(content).hexdigest(),
+                   eol=2, algo=DICT_ALGO[args.algo], data_size=len(data))
+    del content
+    print(f'algo={args.algo} content={info.size / 1048576:.1f}MB data={len(data) / 1048576:.1f}MB')
+
+    with tempfile.TemporaryDirectory() as folder:
+        file = os.path.join(folder, 'asset.bin')
+        for mode in ['memory', 'stream']:
+            tracemalloc.start()
+            start = time.perf_counter()
+            decode(mode, info, data, file)
+            cost = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            assert os.path.getsize(file) == info.size
+            print(f'{mode:<7} peak={peak / 1048576:.1f}MB cost={cost:.3f}s')
+
+
+if __name__ == '__main__':
+    main()
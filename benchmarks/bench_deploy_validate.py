@@ -0,0 +1,84 @@
+"""
+Benchmark ResetJob.validate_files() on a generated tree, cold versus warm validation cache.
+
+Writes a tree of many small files to a temp folder with their index records, then validates:
+- "serial": one thread, no validation cache, every file is read and hashed
+- "cold": batches on THREAD_POOL, no validation cache yet, every file is hashed and cached
+- "warm": batches on THREAD_POOL, files with unchanged stat are trusted from the cache
+
+Usage:
+    python -m benchmarks.bench_deploy_validate
+    python -m benchmarks.bench_deploy_validate --files 20000 --size 4096 --rounds 5
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from hashlib import sha1
+from types import SimpleNamespace
+
+from alasio.deploy.pack.job_reset import ResetJob
+from alasio.deploy.pack.pack_model import IdxInfo
+from alasio.ext import env
+from alasio.ext.cache import InstanceCacheOperation
+
+
+def create_tree(root, files, size):
+    """
+    Returns:
+        dict[str, IdxInfo]: Records of the files, like PackDecodeBase.fileinfo
+    """
+    rng = random.Random(1)
+    fileinfo = {}
+    for index in range(files):
+        # text files, 100 files in each folder
+        path = f'folder{index // 100}/file{index}.py'
+        content = ''.join(f'{index} line {n} {rng.random()}\n' for n in range(size // 32)).encode()
+        file = os.path.join(root, path)
+        os.makedirs(os.path.dirname(file), exist_ok=True)
+        with open(file, 'wb') as f:
+            f.write(content)
+        # move mtime to the past, so no file is racy to the cache
+        os.utime(file, (1000000000, 1000000000))
+        fileinfo[path] = IdxInfo(path=path, size=len(content), sha1=sha1(content).hexdigest())
+    return fileinfo
+
+
+def validate(fileinfo, mode):
+    job = ResetJob(None)
+    # validate_files() reads the records only, the index pack is not needed
+    InstanceCacheOperation.set(job, '_index_pack', SimpleNamespace(fileinfo=fileinfo))
+    if mode == 'serial':
+        job.validate_cache = False
+        job.VALIDATE_BATCH = 1 << 30
+    elif mode == 'cold':
+        try:
+            os.remove(env.PROJECT_ROOT.joinpath(ResetJob.VALIDATE_CACHE))
+        except FileNotFoundError:
+            pass
+    start = time.perf_counter()
+    assert job.validate_files()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--files', type=int, default=20000)
+    parser.add_argument('--size', type=int, default=4096)
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        env.set_project_root(root)
+        os.makedirs(os.path.join(root, '.pack'))
+        fileinfo = create_tree(root, args.files, args.size)
+        for mode in ['serial', 'cold', 'warm']:
+            # "warm" runs on the cache written by the last "cold" round
+            cost = [validate(fileinfo, mode) for _ in range(args.rounds)]
+            print(f'{mode:<7} files={args.files} median={statistics.median(cost):.3f}s min={min(cost):.3f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark file lock acquire/release under contention across threads and processes.
+
+- "direct": open and lock the SQLite file on every acquire, which is what SQLiteFileLock did
+  before the process-wide fast path
+- "sqlite": SQLiteFileLock, threads in the same process hand the file lock over to each other
+- "flock": FlockFileLock, the fcntl.flock() backend, Linux and macOS only
+Each mode runs with threads in one process, then with processes of one thread each.
+Every holder increments a counter in a shared file, the final count proves mutual exclusion.
+
+Usage:
+    python -m benchmarks.bench_filelock
+    python -m benchmarks.bench_filelock --workers 4 --rounds 200
+"""
+import argparse
+import multiprocessing
+import os
+import shutil
+import threading
+import time
+
+from alasio.ext.file.filelock import FlockFileLock, SQLiteFileLock, fcntl
+
+
+class DirectLock:
+    """
+    SQLite file lock without the process-wide fast path
+    """
+
+    def __init__(self, lock_file):
+        self.lock = SQLiteFileLock(lock_file)
+        self.handle = None
+
+    def __enter__(self):
+        self.handle = self.lock._file_acquire(-1, 0.05)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.lock._file_release(self.handle)
+        self.handle = None
+
+
+LOCKS = {
+    'direct': DirectLock,
+    'sqlite': SQLiteFileLock,
+    'flock': FlockFileLock,
+}
+
+
+def increment(counter_file):
+    with open(counter_file, 'r+', encoding='utf-8') as f:
+        value = int(f.read() or 0)
+        f.seek(0)
+        f.write(str(value + 1))
+        f.truncate()
+
+
+def work(name, lock_file, counter_file, rounds):
+    cls = LOCKS[name]
+    for _ in range(rounds):
+        with cls(lock_file):
+            increment(counter_file)
+
+
+def run(name, folder, workers, rounds, use_process):
+    lock_file = os.path.join(folder, f'{name}.lock')
+    counter_file = os.path.join(folder, f'{name}.count')
+    with open(counter_file, 'w', encoding='utf-8') as f:
+        f.write('0')
+    if use_process:
+        ctx = multiprocessing.get_context('spawn')
+        tasks = [ctx.Process(target=work, args=(name, lock_file, counter_file, rounds)) for _ in range(workers)]
+    else:
+        tasks = [threading.Thread(target=work, args=(name, lock_file, counter_file, rounds)) for _ in range(workers)]
+    start = time.perf_counter()
+    for task in tasks:
+        task.start()
+    for task in tasks:
+        task.join()
+    cost = time.perf_counter() - start
+    with open(counter_file, 'r', encoding='utf-8') as f:
+        count = int(f.read())
+    return cost, count
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--rounds', type=int, default=300, help='Acquires of each worker')
+    parser.add_argument('--path', default='./temp/bench_filelock')
+    args = parser.parse_args()
+
+    folder = os.path.abspath(args.path)
+    shutil.rmtree(folder, ignore_errors=True)
+    os.makedirs(folder)
+    names = list(LOCKS) if fcntl is not None else ['direct', 'sqlite']
+    total = args.workers * args.rounds
+    try:
+        for use_process in [False, True]:
+            kind = 'processes' if use_process else 'threads'
+            for name in names:
+                cost, count = run(name, folder, args.workers, args.rounds, use_process)
+                # process startup is included, but it's the same for all modes
+                print(f'{kind:<9} {name:<6} workers={args.workers} acquires={total} cost={cost:.3f}s '
+                      f'per_acquire={cost / total * 1e6:.0f}us count={count}')
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark delta resolution of GitObjectManager.cat, resolving in place versus delta base cache.
+
+Creates a repo with many commits that each change a few lines of many files,
+repacks it into long delta chains, then runs git_reset_hard on an empty worktree
+and compare_commit between commits.
+
+"inplace" resolves delta objects in dict_object forever, which is fast but uses unbounded memory.
+"cache-*" keeps delta objects and caches resolved objects in a byte-budgeted LRU.
+
+Usage:
+    python -m benchmarks.bench_git_delta
+    python -m benchmarks.bench_git_delta --commits 200 --files 50
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+from alasio.git.repo import GitRepo
+
+
+def run_git(path, *args):
+    result = subprocess.run(
+        ['git', '-c', 'user.name=bench', '-c', 'user.email=bench@bench', *args],
+        cwd=path, check=True, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+    )
+    return result.stdout.decode().strip()
+
+
+def create_repo(path, commits, files):
+    run_git(path, 'init', '-q')
+    contents = {}
+    for index in range(files):
+        folder = f'dir{index % 5}/sub{index % 3}'
+        contents[f'{folder}/file{index}.txt'] = [f'{index} line {i} {"x" * 60}\n' for i in range(400)]
+    history = []
+    for n in range(commits):
+        for index, (name, lines) in enumerate(contents.items()):
+            if (n + index) % 3:
+                continue
+            lines[(n * 13 + index) % len(lines)] = f'changed {n} {index}\n'
+            file = os.path.join(path, name)
+            os.makedirs(os.path.dirname(file), exist_ok=True)
+            with open(file, 'w', encoding='utf-8', newline='') as f:
+                f.write(''.join(lines))
+        run_git(path, 'add', '-A')
+        run_git(path, 'commit', '-q', '-m', f'commit {n}')
+        history.append(run_git(path, 'rev-parse', 'HEAD'))
+    run_git(path, 'repack', '-adf', '-q', '--depth=250', '--window=250')
+    return history
+
+
+def clear_worktree(path):
+    for name in os.listdir(path):
+        if name == '.git':
+            continue
+        shutil.rmtree(os.path.join(path, name))
+
+
+def bench(name, limit, path, history):
+    clear_worktree(path)
+    repo = GitRepo(path)
+    repo.delta_base_cache_limit = limit
+
+    start = time.perf_counter()
+    repo.git_reset_hard(history[-1])
+    reset_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for old, new in zip(history[:-1], history[1:]):
+        repo.compare_commit(old, new)
+    compare_time = time.perf_counter() - start
+
+    cache = repo.delta_base_cache
+    if cache is None:
+        resolved = sum(len(obj.data) for obj in repo.dict_object.values() if obj.type in [1, 2, 3, 4])
+        info = f'resolved_in_dict_object={resolved / 1048576:.1f}MB'
+    else:
+        stats = cache.stats()
+        info = (f'hit={stats["hit"]} miss={stats["miss"]} evicted={stats["evicted"]} '
+                f'cached={stats["size"] / 1048576:.1f}MB')
+    print(f'{name:<12} reset_hard={reset_time:.3f}s compare_commit x{len(history) - 1}={compare_time:.3f}s {info}')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--commits', type=int, default=100)
+    parser.add_argument('--files', type=int, default=30)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as path:
+        history = create_repo(path, args.commits, args.files)
+        bench('inplace', 0, path, history)
+        bench('cache-96MB', 100663296, path, history)
+        bench('cache-1MB', 1048576, path, history)
+
+
+if __name__ == '__main__':
+    main()
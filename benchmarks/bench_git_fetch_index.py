@@ -0,0 +1,128 @@
+"""
+Benchmark end-to-end fetch + index time, indexing after fetch versus indexing while fetching.
+
+Creates a repo with many commits of text and binary files, serves it by a local `git daemon`,
+then fetches the whole history with GitTransport.fetch_pack_v1() and generates .idx in two ways:
+- "after": write pack, then GenIdx.pack_to_idx() re-reads and parses the whole pack
+- "stream": StreamIdx consumes pack chunks while receiving, .idx is written right after pack
+
+Usage:
+    python -m benchmarks.bench_git_fetch_index
+    python -m benchmarks.bench_git_fetch_index --commits 200 --rounds 5
+"""
+import argparse
+import os
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import tempfile
+import time
+
+import trio
+
+from alasio.ext.path.atomic import atomic_read_bytes, atomic_write
+from alasio.git.fetch.argument import Arguments
+from alasio.git.fetch.pkt import FetchPayload
+from alasio.git.fetch.transport_git import GitTransport
+from alasio.git.stage.genidx import GenIdx
+
+
+def run_git(path, *args):
+    return subprocess.run(
+        ['git', '-c', 'user.name=bench', '-c', 'user.email=bench@bench', *args],
+        cwd=path, check=True, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+    ).stdout.decode().strip()
+
+
+def create_repo(path, commits, files):
+    os.makedirs(path)
+    run_git(path, 'init', '-q')
+    rng = random.Random(1)
+    texts = [[f'line {i} {rng.random()}\n' for i in range(500)] for _ in range(files)]
+    binary = bytes(rng.getrandbits(8) for _ in range(500000))
+    for n in range(commits):
+        for index, lines in enumerate(texts):
+            lines[rng.randrange(len(lines))] = f'changed {n} {rng.random()}\n'
+            with open(os.path.join(path, f'file{index}.txt'), 'w', encoding='utf-8', newline='') as f:
+                f.write(''.join(lines))
+        with open(os.path.join(path, 'data.bin'), 'wb') as f:
+            f.write(binary[n * 100:] + binary[:n * 100])
+        run_git(path, 'add', '-A')
+        run_git(path, 'commit', '-q', '-m', f'commit {n}')
+    return run_git(path, 'rev-parse', 'HEAD')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_daemon(base):
+    port = free_port()
+    process = subprocess.Popen(
+        ['git', 'daemon', '--export-all', '--reuseaddr', f'--base-path={base}',
+         '--listen=127.0.0.1', f'--port={port}', base],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    for _ in range(100):
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.1).close()
+            break
+        except OSError:
+            time.sleep(0.05)
+    return process, port
+
+
+async def fetch(url, output, head, mode):
+    transport = GitTransport(Arguments(repo_path=output, repo_url=url))
+    payload = FetchPayload()
+    payload.add_line(f'want {head} {transport.capabilities.as_string()}')
+    payload.add_delimiter()
+    payload.add_done()
+    pack_file = os.path.join(output, f'{mode}.pack')
+    idx_file = os.path.join(output, f'{mode}.idx')
+    if mode == 'stream':
+        await transport.fetch_pack_v1(payload, output_file=pack_file, index_file=idx_file)
+    else:
+        await transport.fetch_pack_v1(payload, output_file=pack_file)
+        data = atomic_read_bytes(pack_file)
+        atomic_write(idx_file, GenIdx(output).pack_to_idx(data))
+    return os.path.getsize(pack_file)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--commits', type=int, default=100)
+    parser.add_argument('--files', type=int, default=20)
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as base:
+        repo = os.path.join(base, 'src')
+        head = create_repo(repo, args.commits, args.files)
+        subprocess.run(['git', 'clone', '-q', '--bare', repo, os.path.join(base, 'repo.git')], check=True)
+        process, port = start_daemon(base)
+        url = f'git://127.0.0.1:{port}/repo.git'
+        try:
+            for mode in ['after', 'stream']:
+                cost = []
+                size = 0
+                for _ in range(args.rounds):
+                    output = os.path.join(base, 'output')
+                    shutil.rmtree(output, ignore_errors=True)
+                    os.makedirs(output)
+                    start = time.perf_counter()
+                    size = trio.run(fetch, url, output, head, mode)
+                    cost.append(time.perf_counter() - start)
+                print(f'{mode:<8} pack={size / 1048576:.1f}MB '
+                      f'median={statistics.median(cost):.3f}s min={min(cost):.3f}s')
+        finally:
+            process.kill()
+            process.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark GenIdx.pack_to_idx(), resolving objects in current process versus in ProcessPool.
+
+Creates a repo with files that change a little in every commit, then packs it with git in two shapes:
+- "wide": --depth=1, many deltas share the same full object as source
+- "deep": --depth=250, long delta chains
+Idx from both modes are checked to be byte-identical to the one generated by git.
+
+Usage:
+    python -m benchmarks.bench_git_genidx
+    python -m benchmarks.bench_git_genidx --files 16 --commits 100 --process 8
+"""
+import argparse
+import os
+import random
+import subprocess
+import tempfile
+import time
+
+from alasio.ext.concurrent.processpool import get_max_worker
+from alasio.git.stage.genidx import GenIdx
+
+
+def run_git(path, *args, stdin=None):
+    return subprocess.run(
+        ['git', '-c', 'user.name=bench', '-c', 'user.email=bench@bench', *args],
+        cwd=path, check=True, input=stdin, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+    ).stdout
+
+
+def create_repo(path, files, commits, lines):
+    run_git(path, 'init', '-q')
+    rng = random.Random(1)
+    contents = [[f'line {i} {rng.random()}\n' for i in range(lines)] for _ in range(files)]
+    for n in range(commits):
+        for index, content in enumerate(contents):
+            for _ in range(5):
+                content[rng.randrange(lines)] = f'changed {n} {rng.random()}\n'
+            with open(os.path.join(path, f'file{index}.txt'), 'w', encoding='utf-8', newline='') as f:
+                f.write(''.join(content))
+        run_git(path, 'add', '-A')
+        run_git(path, 'commit', '-q', '-m', f'commit {n}')
+
+
+def create_pack(path, depth):
+    revs = run_git(path, 'rev-list', '--objects', '--all')
+    output = os.path.join(path, f'.git/bench-{depth}')
+    sha = run_git(path, 'pack-objects', '-q', '--delta-base-offset', f'--depth={depth}', '--window=50',
+                  output, stdin=revs).decode().strip()
+    with open(f'{output}-{sha}.pack', 'rb') as f:
+        data = f.read()
+    with open(f'{output}-{sha}.idx', 'rb') as f:
+        idx = f.read()
+    return data, idx
+
+
+def bench(path, name, data, idx, process):
+    class Serial(GenIdx):
+        idx_process = 0
+
+    class Parallel(GenIdx):
+        idx_process = process
+        idx_process_min_size = 0
+
+    for cls in [Serial, Parallel]:
+        start = time.perf_counter()
+        result = cls(path).pack_to_idx(data)
+        cost = time.perf_counter() - start
+        assert result == idx, f'{cls.__name__} idx not match'
+        print(f'{name:<5} {cls.__name__:<9} process={cls.idx_process:<3} '
+              f'pack={len(data) / 1048576:.1f}MB cost={cost:.3f}s')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--files', type=int, default=8)
+    parser.add_argument('--commits', type=int, default=60)
+    parser.add_argument('--lines', type=int, default=20000)
+    parser.add_argument('--process', type=int, default=get_max_worker())
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as path:
+        create_repo(path, args.files, args.commits, args.lines)
+        for name, depth in [('wide', 1), ('deep', 250)]:
+            data, idx = create_pack(path, depth)
+            bench(path, name, data, idx, args.process)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""
+Benchmark IdxFile lookup, parsing .idx into dict versus mmap with binary search.
+
+Creates a synthetic pack of blobs and its .idx, then reports time and peak python memory
+to open the idx, time of the first lookup, and random sha1 and offset lookups.
+Also reports GitObjectManager.read_lazy() of the same pack and its object_pack_offset() lookups,
+since manager is the main user of idx_mmap.
+
+Usage:
+    python -m benchmarks.bench_git_idx
+    python -m benchmarks.bench_git_idx --objects 500000 --lookups 20000
+"""
+import argparse
+import hashlib
+import os
+import random
+import struct
+import tempfile
+import time
+import tracemalloc
+import zlib
+from zlib import crc32
+
+from alasio.git.file.gitobject import GitObjectManager
+from alasio.git.file.pack import PackFile
+from alasio.git.stage.genidx import GenIdx, PackObjectInfo
+
+
+def create_pack(folder, count):
+    """
+    Returns:
+        str: Path to .pack file
+    """
+    file = os.path.join(folder, 'pack-bench.pack')
+    list_info = []
+    sha = hashlib.sha1()
+    offset = 12
+    with open(file, 'wb') as f:
+        header = b'PACK' + struct.pack('>II', 2, count)
+        f.write(header)
+        sha.update(header)
+        for index in range(count):
+            content = f'blob {index}\n'.encode()
+            # small objects, size < 16 fits in 1 byte header
+            content = content[:15]
+            entry = bytes([(3 << 4) | len(content)]) + zlib.compress(content)
+            f.write(entry)
+            sha.update(entry)
+            blob_sha = hashlib.sha1(b'blob %d\x00' % len(content) + content).digest()
+            list_info.append(PackObjectInfo(sha=blob_sha, offset=offset, crc=crc32(entry)))
+            offset += len(entry)
+        checksum = sha.digest()
+        f.write(checksum)
+
+    list_info.sort(key=lambda i: i.sha)
+    idx = b''.join(GenIdx._iter_idx_data(list_info, checksum))
+    idx += hashlib.sha1(idx).digest()
+    with open(file[:-5] + '.idx', 'wb') as f:
+        f.write(idx)
+    return file, [i.sha.hex() for i in list_info], [i.offset for i in list_info]
+
+
+def bench(mode, file, sha1_list, offset_list, lookups):
+    pack = PackFile(file)
+    pack.idx_mmap = mode == 'mmap'
+
+    start = time.perf_counter()
+    pack.idx_read()
+    open_time = time.perf_counter() - start
+    # measure memory in another round, tracemalloc slows down allocation a lot
+    pack.clear_idx()
+    tracemalloc.start()
+    pack.idx_read()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    rng = random.Random(1)
+    sample = rng.sample(range(len(sha1_list)), min(lookups, len(sha1_list)))
+
+    start = time.perf_counter()
+    _ = pack.dict_offset[sha1_list[sample[0]]]
+    first_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in sample:
+        _ = pack.dict_offset[sha1_list[i]]
+    sha1_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in sample:
+        _ = pack.dict_offset_to_sha1[offset_list[i]]
+    offset_time = time.perf_counter() - start
+
+    print(f'{mode:<5} objects={len(sha1_list):<8} open={open_time * 1000:.1f}ms '
+          f'peak_mem={peak / 1048576:.1f}MB first_lookup={first_time * 1000:.2f}ms '
+          f'sha1_lookup={sha1_time / len(sample) * 1e6:.2f}us '
+          f'offset_lookup={offset_time / len(sample) * 1e6:.2f}us')
+    pack.clear_idx()
+
+
+def bench_manager(mode, repo_path, sha1_list, lookups):
+    def read():
+        repo = GitObjectManager(repo_path)
+        repo.idx_mmap = mode == 'mmap'
+        return repo.read_lazy()
+
+    start = time.perf_counter()
+    repo = read()
+    open_time = time.perf_counter() - start
+    tracemalloc.start()
+    read()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    rng = random.Random(1)
+    sample = rng.sample(sha1_list, min(lookups, len(sha1_list)))
+    start = time.perf_counter()
+    for sha1 in sample:
+        _ = repo.object_pack_offset(sha1)
+    lookup_time = time.perf_counter() - start
+
+    print(f'{mode:<5} manager read_lazy={open_time * 1000:.1f}ms peak_mem={peak / 1048576:.1f}MB '
+          f'object_pack_offset={lookup_time / len(sample) * 1e6:.2f}us')
+    for pack in repo.dict_pack.values():
+        pack.clear_idx()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--objects', type=int, default=300000)
+    parser.add_argument('--lookups', type=int, default=10000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        pack_folder = os.path.join(folder, '.git/objects/pack')
+        os.makedirs(pack_folder)
+        file, sha1_list, offset_list = create_pack(pack_folder, args.objects)
+        for mode in ['dict', 'mmap']:
+            bench(mode, file, sha1_list, offset_list, args.lookups)
+        for mode in ['dict', 'mmap']:
+            bench_manager(mode, folder, sha1_list, args.lookups)
+
+
+if __name__ == '__main__':
+    main()
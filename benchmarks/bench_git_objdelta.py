@@ -0,0 +1,83 @@
+"""
+Benchmark delta application, applying deltas one by one versus applying a chain in one pass.
+
+Generates a chain of deltas on a random blob, each delta copies large runs of its source
+and inserts a few literals, like editing a large image or JSON file across commits.
+
+Usage:
+    python -m benchmarks.bench_git_objdelta
+    python -m benchmarks.bench_git_objdelta --size 50000000 --depth 50
+"""
+import argparse
+import random
+import time
+from collections import deque
+
+from alasio.git.obj.objdelta import RefDeltaObj, apply_delta, apply_delta_chain, apply_delta_ops, compile_delta
+
+
+def randbytes(rng, n):
+    return rng.getrandbits(n * 8).to_bytes(n, 'little')
+
+
+def generate_chain(rng, source, depth, max_run):
+    deltas = []
+    data = source
+    for _ in range(depth):
+        instructions = deque()
+        total = 0
+        while total < len(data) - 1000:
+            size = min(rng.randint(max_run // 10, max_run), len(data) - 1000 - total)
+            instructions.append((total, size, None))
+            total += size
+            literal = memoryview(randbytes(rng, 50))
+            instructions.append((0, 0, literal))
+            total += 50
+        delta = RefDeltaObj(ref='', source_size=len(data), result_size=total, all_instructions=instructions)
+        data = apply_delta(memoryview(data), delta)
+        deltas.append(delta)
+    return deltas, data
+
+
+def timeit(func, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        result = func()
+    return (time.perf_counter() - start) / rounds * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size', type=int, default=20000000)
+    parser.add_argument('--depth', type=int, default=20)
+    parser.add_argument('--max-run', type=int, default=3000000, help='Maximum bytes of a copy instruction')
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    source = randbytes(rng, args.size)
+    deltas, expect = generate_chain(rng, source, args.depth, args.max_run)
+
+    def sequential():
+        data = memoryview(source)
+        for delta in deltas:
+            data = memoryview(apply_delta(data, delta))
+        return bytes(data)
+
+    cost, result = timeit(sequential, args.rounds)
+    assert result == expect
+    print(f'sequential apply_delta    depth={args.depth} size={args.size} {cost:.2f}ms')
+
+    cost, result = timeit(lambda: apply_delta_chain(memoryview(source), deltas), args.rounds)
+    assert result == expect
+    print(f'apply_delta_chain         depth={args.depth} size={args.size} {cost:.2f}ms')
+
+    cost, _ = timeit(lambda: apply_delta(memoryview(source), deltas[0]), args.rounds)
+    print(f'single apply_delta        {cost:.2f}ms')
+    ops = compile_delta(deltas[0])
+    cost, _ = timeit(lambda: apply_delta_ops(memoryview(source), ops), args.rounds)
+    print(f'single apply_delta_ops    {cost:.2f}ms (precompiled)')
+
+
+if __name__ == '__main__':
+    main()
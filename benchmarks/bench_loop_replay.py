@@ -0,0 +1,101 @@
+"""
+Benchmark a state loop offline, replaying recorded screenshots with ReplayDevice under LoopProfiler.
+
+Synthetic screenshots are saved into a frame log, a button appears after some frames.
+A task waits for the button in ModuleBase.loop(), matching it on the luma channel like templates do.
+- "replay": frames replayed at max speed, reports loop and matching time per iteration
+- "log": frame log size and load time, delta frames compress consecutive screenshots against the previous one
+
+Usage:
+    python -m benchmarks.bench_loop_replay
+    python -m benchmarks.bench_loop_replay --frames 300 --appear 250
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from alasio.base.base import ModuleBase
+from alasio.base.image.color import rgb2luma
+from alasio.base.image.imfile import crop
+from alasio.base.profiler import LoopProfiler
+from alasio.device.config import DeviceConfig
+from alasio.device.replay import ReplayDevice, save_frame_log
+
+AREA = (600, 300, 700, 360)
+SEARCH = (580, 280, 720, 380)
+
+
+def create_frames(count, appear):
+    rng = np.random.default_rng(1)
+    blocks = rng.integers(0, 256, size=(18, 32, 3), dtype=np.uint8)
+    background = cv2.resize(blocks, (1280, 720), interpolation=cv2.INTER_NEAREST)
+    button = rng.integers(0, 256, size=(AREA[3] - AREA[1], AREA[2] - AREA[0], 3), dtype=np.uint8)
+    frames = []
+    for index in range(count):
+        image = background.copy()
+        # a bit of animation on every frame
+        image[0:40, index % 1240:index % 1240 + 40] = 255
+        if index >= appear:
+            image[AREA[1]:AREA[3], AREA[0]:AREA[2]] = button
+        frames.append({'time': index * 0.3, 'image': image})
+    return frames, rgb2luma(button)
+
+
+class Button:
+    def __init__(self, template):
+        self.template = template
+
+    def __str__(self):
+        return 'Button(CONFIRM)'
+
+    def match(self, image):
+        result = cv2.matchTemplate(rgb2luma(crop(image, SEARCH, copy=False)), self.template, cv2.TM_CCOEFF_NORMED)
+        _, sim, _, _ = cv2.minMaxLoc(result)
+        return sim > 0.85
+
+
+class Task(ModuleBase):
+    def wait_button(self, button):
+        for _ in self.loop(skip_first=False):
+            if button.match(self.device.image):
+                return True
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--frames', type=int, default=100)
+    parser.add_argument('--appear', type=int, default=80, help='Frame index that button appears')
+    args = parser.parse_args()
+
+    frames, template = create_frames(args.frames, args.appear)
+    with tempfile.TemporaryDirectory() as folder:
+        file = os.path.join(folder, 'frames.zst')
+        start = time.perf_counter()
+        save_frame_log(file, frames)
+        save = time.perf_counter() - start
+        raw = sum(frame['image'].nbytes for frame in frames)
+        start = time.perf_counter()
+        device = ReplayDevice(DeviceConfig(), file)
+        load = time.perf_counter() - start
+        print(f'log    frames={args.frames} raw={raw / 1048576:.1f}MB log={os.path.getsize(file) / 1048576:.2f}MB '
+              f'save={save:.3f}s load={load:.3f}s')
+
+    button = Button(template)
+    task = Task(DeviceConfig(), device=device)
+    with LoopProfiler() as profiler:
+        profiler.track(button)
+        start = time.perf_counter()
+        task.wait_button(button)
+        cost = time.perf_counter() - start
+    stats = next(iter(profiler.loops.values()))
+    print(f'replay frames_to_decision={stats.frames_to_decision:.0f} cost={cost:.3f}s '
+          f'fps={stats.frames / cost:.0f} match_share={stats.match / stats.total:.0%}')
+    profiler.print_report()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark ProcessPool throughput on 1080p image jobs.
+
+- "pickle": images are pickled through Pipe, the default mode
+- "shared": ProcessPool(shared_memory=True), images are written into shared memory of the worker,
+  only handles go through Pipe
+- "initargs": a reference screenshot is preloaded by initializer once per worker,
+  compared with sending it along with every image
+Each job crops a region of the image and compares it with a template, which is cheap,
+so the cost is dominated by passing arguments.
+
+Usage:
+    python -m benchmarks.bench_processpool
+    python -m benchmarks.bench_processpool --workers 4 --jobs 200
+"""
+import argparse
+import time
+
+import numpy as np
+
+from alasio.ext.concurrent.processpool import ProcessPool, get_max_worker
+
+AREA = (slice(500, 580), slice(900, 1020))
+_REFERENCE = {}
+
+
+def match(image, template):
+    crop = image[AREA].astype(np.int16)
+    return int(np.abs(crop - template).mean())
+
+
+def match_reference(image, reference):
+    return match(image, reference[AREA])
+
+
+def preload_reference(reference):
+    _REFERENCE['reference'] = reference
+
+
+def match_preloaded(image):
+    return match(image, _REFERENCE['reference'][AREA])
+
+
+def run(pool, images, *args):
+    start = time.perf_counter()
+    for _ in pool.map(images, *args):
+        pass
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=min(get_max_worker(), 4))
+    parser.add_argument('--jobs', type=int, default=100)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    # a few distinct frames, like screenshots of a game
+    frames = [rng.integers(0, 256, (1080, 1920, 3), dtype=np.uint8) for _ in range(4)]
+    images = [frames[i % len(frames)] for i in range(args.jobs)]
+    template = frames[0][AREA].astype(np.int16)
+    reference = frames[0]
+    print(f'workers={args.workers} jobs={args.jobs} image={frames[0].nbytes / 1048576:.1f}MB')
+
+    for name, shared in [('pickle', False), ('shared', True)]:
+        with ProcessPool(match, max_workers=args.workers, shared_memory=shared) as pool:
+            # warm up, start all workers
+            run(pool, images[:args.workers], [template] * args.workers)
+            cost = run(pool, images, [template] * args.jobs)
+        print(f'{name:<8} cost={cost:.3f}s throughput={args.jobs / cost:.1f} images/s')
+
+    with ProcessPool(match_reference, max_workers=args.workers, shared_memory=True) as pool:
+        run(pool, images[:args.workers], [reference] * args.workers)
+        cost = run(pool, images, [reference] * args.jobs)
+    print(f'{"send":<8} cost={cost:.3f}s throughput={args.jobs / cost:.1f} images/s (reference in every job)')
+    with ProcessPool(match_preloaded, max_workers=args.workers, shared_memory=True,
+                     initializer=preload_reference, initargs=(reference,)) as pool:
+        run(pool, images[:args.workers])
+        cost = run(pool, images)
+    print(f'{"initargs":<8} cost={cost:.3f}s throughput={args.jobs / cost:.1f} images/s (reference preloaded)')
+
+
+if __name__ == '__main__':
+    main()
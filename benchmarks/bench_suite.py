@@ -0,0 +1,360 @@
+"""
+Benchmark suite of hot paths on synthetic data, runs offline without emulator, network or game resources.
+
+- "template": crop(), rgb2luma() and cv2.matchTemplate() on a 1280x720 screenshot
+- "image": image_decode() of PNG and JPG screenshots
+- "config": msgpack config decode by load_msgpack_with_default(), valid data and data with broken fields
+- "table": AlasioTable.select() on a table of 5000 rows
+- "adb": ADB message framing, message_send() and message_recv() over a local socket pair
+- "git": PackFile.idx_read(), and GitObjectManager.cat() on a freshly read synthetic pack
+- "deploy": PackDecodeBase.decode_content() of zstd compressed and raw assets
+- "websocket": encoding ResponseEvent for each connection, compared with sharing by BroadcastEncoder
+Each case runs on PerformanceTest, results can be exported to JSON and compared with a baseline.
+Exit code is 1 if any benchmark is slower than baseline beyond noise.
+Registered functions take short labels as arguments, so results are matched across runs by name and parameters.
+
+Usage:
+    python -m benchmarks.bench_suite
+    python -m benchmarks.bench_suite --case template image --cpu 0 --warmup 3
+    python -m benchmarks.bench_suite --json ./temp/baseline.json
+    python -m benchmarks.bench_suite --baseline ./temp/baseline.json --threshold 0.2
+"""
+import argparse
+import os
+import random
+import socket
+import sys
+import tempfile
+from hashlib import sha1
+
+import msgspec
+
+from alasio.ext.perf import PerformanceTest
+
+
+# models of "config" case, msgspec resolves string annotations in module globals
+class SchedulerModel(msgspec.Struct):
+    Enable: bool = False
+    NextRun: str = '2020-01-01 00:00:00'
+    ServerUpdate: str = '00:00'
+
+
+class SettingModel(msgspec.Struct):
+    Name: str = ''
+    Value: int = 0
+    Options: "list[str]" = []
+    Ratio: float = 1.
+
+
+class TaskConfig(msgspec.Struct):
+    Scheduler: SchedulerModel = msgspec.field(default_factory=SchedulerModel)
+    Settings: "dict[str, SettingModel]" = {}
+
+
+def random_bytes(rng, size):
+    # random.randbytes() is new in python 3.9
+    return rng.getrandbits(size * 8).to_bytes(size, 'little')
+
+
+def create_screenshot(width=1280, height=720):
+    """
+    Synthetic game screenshot, flat color blocks with noise, compresses like real screenshots do
+    """
+    import cv2
+    import numpy as np
+    rng = np.random.default_rng(1)
+    blocks = rng.integers(0, 256, size=(height // 40, width // 40, 3), dtype=np.uint8)
+    image = cv2.resize(blocks, (width, height), interpolation=cv2.INTER_NEAREST)
+    noise = rng.integers(0, 8, size=image.shape, dtype=np.uint8)
+    return cv2.add(image, noise)
+
+
+def case_template(perf, folder):
+    import cv2
+    from alasio.base.image.color import rgb2luma
+    from alasio.base.image.imfile import crop
+
+    screen = create_screenshot()
+    area = (600, 300, 700, 360)
+    template = rgb2luma(crop(screen, area))
+    # search area is a bit larger than template, like Template.match() does
+    search = (580, 280, 720, 380)
+
+    def template_crop():
+        return crop(screen, search).shape
+
+    def template_luma():
+        return rgb2luma(screen).shape
+
+    def template_match():
+        result = cv2.matchTemplate(rgb2luma(crop(screen, search)), template, cv2.TM_CCOEFF_NORMED)
+        _, sim, _, point = cv2.minMaxLoc(result)
+        return point
+
+    def template_match_full():
+        result = cv2.matchTemplate(rgb2luma(screen), template, cv2.TM_CCOEFF_NORMED)
+        _, sim, _, point = cv2.minMaxLoc(result)
+        return point
+
+    with perf:
+        perf.register(template_crop)
+        perf.register(template_luma)
+        perf.register(template_match)
+        perf.register(template_match_full)
+
+
+def case_image(perf, folder):
+    import numpy as np
+    from alasio.base.image.imfile import image_decode, image_encode
+
+    screen = create_screenshot()
+
+    encoded = {ext: np.frombuffer(image_encode(screen, ext=ext).tobytes(), dtype=np.uint8) for ext in ['png', 'jpg']}
+
+    def image_decode_screenshot(ext):
+        return image_decode(encoded[ext]).shape
+
+    with perf:
+        for ext in encoded:
+            perf.register(image_decode_screenshot, ext)
+
+
+def case_config(perf, folder):
+    from msgspecerror import load_msgpack_with_default
+
+    rng = random.Random(1)
+    settings = {
+        f'Setting{i}': {'Name': f'setting_{i}', 'Value': rng.randrange(1000),
+                        'Options': [f'option_{j}' for j in range(5)], 'Ratio': rng.random()}
+        for i in range(100)
+    }
+    data = {'valid': msgspec.msgpack.encode({'Scheduler': {'Enable': True}, 'Settings': settings})}
+    # a few fields have wrong types, like configs from an older version
+    for i in range(0, 100, 10):
+        settings[f'Setting{i}']['Value'] = 'broken'
+    data['broken'] = msgspec.msgpack.encode({'Scheduler': {'Enable': 'yes'}, 'Settings': settings})
+
+    def config_decode(name):
+        obj, errors = load_msgpack_with_default(data[name], TaskConfig)
+        return len(errors)
+
+    with perf:
+        for name in data:
+            perf.register(config_decode, name)
+
+
+def case_table(perf, folder):
+    import msgspec
+    from alasio.db.conn import SQLITE_POOL
+    from alasio.db.table import AlasioTable
+
+    class User(msgspec.Struct):
+        id: int = 0
+        name: str = ''
+        age: int = 0
+        email: str = ''
+
+    class UserTable(AlasioTable):
+        TABLE_NAME = 'users'
+        PRIMARY_KEY = 'id'
+        AUTO_INCREMENT = 'id'
+        CREATE_TABLE = '''
+            CREATE TABLE "{TABLE_NAME}" (
+                "id" INTEGER PRIMARY KEY AUTOINCREMENT,
+                "name" TEXT NOT NULL,
+                "age" INTEGER NOT NULL,
+                "email" TEXT NOT NULL
+            )
+        '''
+        MODEL = User
+
+    os.makedirs(folder, exist_ok=True)
+    file = os.path.join(folder, 'bench.db')
+    table = UserTable(file)
+    table.create_table()
+    rng = random.Random(1)
+    table.insert_row([User(name=f'user{i}', age=rng.randrange(100), email=f'user{i}@example.com')
+                      for i in range(5000)])
+
+    def table_select_all():
+        return len(table.select())
+
+    def table_select_where():
+        return len(table.select(age=30))
+
+    def table_select_one():
+        return table.select_one(id=2500).name
+
+    try:
+        with perf:
+            perf.register(table_select_all)
+            perf.register(table_select_where)
+            perf.register(table_select_one)
+    finally:
+        SQLITE_POOL.delete_file(file)
+
+
+def case_adb(perf, folder):
+    from alasio.adb.protocol.tcp_protocol import AdbProtocolTCP
+
+    # AdbProtocolTCP does not connect on init, socket pair stands in for adbd
+    protocol = AdbProtocolTCP()
+    sender, receiver = socket.socketpair()
+    rng = random.Random(1)
+    payloads = {size: random_bytes(rng, size) for size in [0, 4096, 32768]}
+
+    def adb_message_roundtrip(size):
+        protocol.message_send(sender, b'WRTE', 1, 2, payloads[size])
+        command, arg0, arg1, payload = protocol.message_recv(receiver)
+        return len(payload)
+
+    try:
+        with perf:
+            for size in payloads:
+                perf.register(adb_message_roundtrip, size)
+    finally:
+        sender.close()
+        receiver.close()
+
+
+def case_git(perf, folder):
+    from alasio.git.file.gitobject import GitObjectManager
+    from alasio.git.file.pack import PackFile
+    from benchmarks.bench_git_idx import create_pack
+
+    pack_folder = os.path.join(folder, '.git/objects/pack')
+    os.makedirs(pack_folder, exist_ok=True)
+    file, sha1_list, _ = create_pack(pack_folder, 20000)
+    sample = random.Random(1).sample(sha1_list, 1000)
+
+    pack = PackFile(file)
+
+    def git_idx_read():
+        pack.clear_idx()
+        pack.idx_read()
+        return len(pack.dict_offset)
+
+    def git_cat():
+        repo = GitObjectManager(folder).read_lazy()
+        return sum(len(repo.cat(sha).data) for sha in sample)
+
+    with perf:
+        perf.register(git_idx_read)
+        perf.register(git_cat)
+
+
+def case_deploy(perf, folder):
+    from alasio.deploy.pack.decode_base import PackDecodeBase
+    from alasio.deploy.pack.pack_model import IdxInfo
+    from alasio.ext.compress.algo_zstd import zstd_compress
+
+    # compressible binary-ish content, like game assets
+    rng = random.Random(1)
+    blocks = [random_bytes(rng, 4096) for _ in range(16)]
+    content = b''.join(blocks[rng.randrange(16)] for _ in range(1024))
+    digest = sha1(content).hexdigest()
+
+    data = zstd_compress(content, level=3)
+    assets = {
+        'zstd': (IdxInfo(path='asset.bin', size=len(content), sha1=digest, eol=2, algo=2, data_size=len(data)), data),
+        'raw': (IdxInfo(path='asset.bin', size=len(content), sha1=digest, eol=2, algo=0, data_size=len(content)),
+                content),
+    }
+
+    def deploy_decode(algo):
+        info, data = assets[algo]
+        return len(PackDecodeBase.decode_content(info, data))
+
+    with perf:
+        for algo in assets:
+            perf.register(deploy_decode, algo)
+
+
+def case_websocket(perf, folder):
+    from alasio.backend.reactive.event import ResponseEvent
+    from alasio.backend.ws.ws_server import BroadcastEncoder, WebsocketTopicServer
+
+    rng = random.Random(1)
+    events = [
+        ResponseEvent(t='ConfigScan', o='set', k=('Main', f'Setting{i}'),
+                      v={'name': f'setting_{i}', 'value': rng.randrange(1000), 'options': ['a', 'b', 'c']})
+        for i in range(100)
+    ]
+
+    def ws_encode_per_connection(connections):
+        size = 0
+        for event in events:
+            for _ in range(connections):
+                size += len(WebsocketTopicServer._encode_msg(event))
+        return size
+
+    def ws_encode_broadcast(connections):
+        encoder = BroadcastEncoder()
+        size = 0
+        for event in events:
+            for _ in range(connections):
+                size += len(encoder.encode(event))
+        return size
+
+    with perf:
+        perf.register(ws_encode_per_connection, 10)
+        perf.register(ws_encode_broadcast, 10)
+
+
+CASES = {
+    'template': case_template,
+    'image': case_image,
+    'config': case_config,
+    'table': case_table,
+    'adb': case_adb,
+    'git': case_git,
+    'deploy': case_deploy,
+    'websocket': case_websocket,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--case', nargs='+', choices=list(CASES), help='Cases to run, default to all')
+    parser.add_argument('--json', help='Export results to JSON file')
+    parser.add_argument('--baseline', help='Compare results with a JSON file exported by --json')
+    parser.add_argument('--threshold', type=float, default=0.1, help='Minimum relative slowdown to report')
+    parser.add_argument('--mad-factor', type=float, default=3., help='Minimum slowdown in scaled MADs to report')
+    parser.add_argument('--cpu', type=int, nargs='+', help='Pin process on these CPUs while testing')
+    parser.add_argument('--warmup', type=int, default=3, help='Warm-up iterations before timing')
+    parser.add_argument('--repeat', type=int, default=7, help='Samples of each function')
+    parser.add_argument('--min-duration', type=float, default=0.3, help='Minimum seconds of each function')
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as folder:
+        for name in args.case or list(CASES):
+            print(f'\n===== Case: {name} =====')
+            perf = PerformanceTest()
+            # functions in the same case do different things, don't compare outputs
+            perf.verify = False
+            perf.warmup = args.warmup
+            perf.repeat = args.repeat
+            perf.min_duration = args.min_duration
+            perf.cpus = args.cpu
+            try:
+                CASES[name](perf, os.path.join(folder, name))
+            except ImportError as e:
+                print(f'Skip case "{name}", missing dependency: {e}')
+                continue
+            results += perf.results
+
+    perf = PerformanceTest()
+    perf.cpus = args.cpu
+    if args.json:
+        perf.export_json(args.json, results)
+        print(f'Results exported to {args.json}')
+    if args.baseline:
+        regressions = perf.compare(args.baseline, results, threshold=args.threshold, mad_factor=args.mad_factor)
+        if regressions:
+            print(f'{len(regressions)} benchmarks regressed')
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
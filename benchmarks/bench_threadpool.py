@@ -0,0 +1,97 @@
+"""
+Benchmark ThreadPool job submission when the pool is saturated.
+
+- "sleep": jobs sleep shortly, more jobs than workers, submitter keeps the pool full
+- "tiny": jobs return immediately, measures scheduling overhead per job
+- "nested": jobs submitted from many threads at once, contending for workers
+- "imap": the same tiny jobs through imap() with adaptive chunks, compared with one job per item
+Ideal cost of "sleep" is jobs * duration / pool_size.
+
+Usage:
+    python -m benchmarks.bench_threadpool
+    python -m benchmarks.bench_threadpool --pool 4 --jobs 2000 --duration 0.001
+"""
+import argparse
+import threading
+import time
+
+from alasio.ext.concurrent.threadpool import ThreadPool
+
+
+def bench_sleep(pool, jobs, duration):
+    start = time.perf_counter()
+    with pool.wait_jobs() as waiter:
+        for _ in range(jobs):
+            waiter.start_thread_soon(time.sleep, duration)
+    return time.perf_counter() - start
+
+
+def bench_per_item(pool, jobs):
+    start = time.perf_counter()
+    with pool.gather_jobs() as gather:
+        for item in range(jobs):
+            gather.start_thread_soon(abs, item)
+    return time.perf_counter() - start
+
+
+def bench_imap(pool, jobs):
+    start = time.perf_counter()
+    for _ in pool.imap(abs, range(jobs)):
+        pass
+    return time.perf_counter() - start
+
+
+def bench_nested(pool, jobs, duration, submitters=8):
+    def submit():
+        with pool.wait_jobs() as waiter:
+            for _ in range(jobs // submitters):
+                waiter.start_thread_soon(time.sleep, duration)
+
+    threads = [threading.Thread(target=submit) for _ in range(submitters)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def show_stats(pool):
+    stats = getattr(pool, 'stats', None)
+    if stats is None:
+        return ''
+    stats = stats()
+    return (f' max_queue={stats.max_queue_depth} avg_wait={stats.wait_avg * 1000:.2f}ms'
+            f' max_wait={stats.wait_max * 1000:.2f}ms blocked={stats.blocked}')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pool', type=int, default=4)
+    parser.add_argument('--jobs', type=int, default=2000)
+    parser.add_argument('--duration', type=float, default=0.0005, help='Seconds each "sleep" job sleeps')
+    args = parser.parse_args()
+
+    ideal = args.jobs * args.duration / args.pool
+    pool = ThreadPool(pool_size=args.pool)
+    cost = bench_sleep(pool, args.jobs, args.duration)
+    print(f'sleep  pool={args.pool} jobs={args.jobs} cost={cost:.3f}s ideal={ideal:.3f}s{show_stats(pool)}')
+
+    jobs = args.jobs * 10
+    pool = ThreadPool(pool_size=args.pool)
+    cost = bench_per_item(pool, jobs)
+    print(f'tiny   pool={args.pool} jobs={jobs} cost={cost:.3f}s '
+          f'per_item={cost / jobs * 1e6:.1f}us{show_stats(pool)}')
+
+    pool = ThreadPool(pool_size=args.pool)
+    cost = bench_imap(pool, jobs)
+    print(f'imap   pool={args.pool} jobs={jobs} cost={cost:.3f}s '
+          f'per_item={cost / jobs * 1e6:.1f}us{show_stats(pool)}')
+
+    pool = ThreadPool(pool_size=args.pool)
+    cost = bench_nested(pool, args.jobs, args.duration)
+    print(f'nested pool={args.pool} jobs={args.jobs} cost={cost:.3f}s ideal={ideal:.3f}s{show_stats(pool)}')
+
+
+if __name__ == '__main__':
+    main()
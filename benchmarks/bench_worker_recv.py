@@ -0,0 +1,144 @@
+"""
+Benchmark receiving worker logs with one thread per worker versus WorkerReceiver.
+
+Simulates N workers with one writer process, which sends logs to N pipes in
+"sparse" (a few logs per worker, spread over time) or "bursty" (a random worker
+sends a burst of logs) pattern. Each log carries its send time, receiver reports
+latency, CPU time of the receiving process and number of threads.
+
+Usage:
+    python -m benchmarks.bench_worker_recv
+    python -m benchmarks.bench_worker_recv --workers 100 --pattern bursty
+"""
+import argparse
+import multiprocessing
+import random
+import statistics
+import threading
+import time
+
+from alasio.backend.worker.receiver import WorkerReceiver, WorkerRecvStats
+
+
+class BenchWorker:
+    def __init__(self, config, conn):
+        self.config = config
+        self.conn = conn
+        self.recv_stats = WorkerRecvStats()
+
+
+def writer(conns, pattern, messages, seed):
+    rng = random.Random(seed)
+    payload = b'x' * 120
+    if pattern == 'sparse':
+        # every worker sends `messages` logs, one every ~5ms globally
+        order = [conn for conn in conns for _ in range(messages)]
+        rng.shuffle(order)
+        for conn in order:
+            conn.send_bytes(repr(time.time()).encode() + b'|' + payload)
+            time.sleep(0.005)
+    else:
+        # bursts of 200 logs from a random worker
+        total = len(conns) * messages
+        while total > 0:
+            conn = rng.choice(conns)
+            for _ in range(min(200, total)):
+                conn.send_bytes(repr(time.time()).encode() + b'|' + payload)
+            total -= 200
+            time.sleep(0.02)
+    for conn in conns:
+        conn.close()
+
+
+class Result:
+    def __init__(self, total):
+        self.total = total
+        self.lock = threading.Lock()
+        self.latency = []
+        self.done = threading.Event()
+
+    def handle(self, data, worker=None):
+        sent = float(data.split(b'|', 1)[0])
+        with self.lock:
+            self.latency.append(time.time() - sent)
+            if len(self.latency) >= self.total:
+                self.done.set()
+
+
+def run_thread_mode(parents, result):
+    def recv_loop(conn):
+        while True:
+            try:
+                data = conn.recv_bytes()
+            except (EOFError, OSError):
+                break
+            result.handle(data)
+
+    threads = []
+    for index, conn in enumerate(parents):
+        thread = threading.Thread(target=recv_loop, args=(conn,), name=f'WorkerRecv-{index}', daemon=True)
+        thread.start()
+        threads.append(thread)
+    return threads, None
+
+
+def run_hybrid_mode(parents, result):
+    receiver = WorkerReceiver(handle=result.handle, disconnect=lambda worker: None)
+    for index, conn in enumerate(parents):
+        receiver.add(BenchWorker(f'bench-{index}', conn))
+    return [], receiver
+
+
+def bench(mode, workers, pattern, messages):
+    ctx = multiprocessing.get_context('spawn')
+    pipes = [ctx.Pipe() for _ in range(workers)]
+    parents = [p for p, _ in pipes]
+    children = [c for _, c in pipes]
+    result = Result(total=workers * messages)
+
+    if mode == 'thread':
+        threads, receiver = run_thread_mode(parents, result)
+    else:
+        threads, receiver = run_hybrid_mode(parents, result)
+    thread_count = threading.active_count()
+
+    process = ctx.Process(target=writer, args=(children, pattern, messages, 1))
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    process.start()
+    for conn in children:
+        conn.close()
+    result.done.wait(timeout=120)
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    process.join()
+
+    if receiver is not None:
+        receiver.close()
+    for conn in parents:
+        conn.close()
+    for thread in threads:
+        thread.join(timeout=1)
+
+    latency = sorted(result.latency)
+    p99 = latency[int(len(latency) * 0.99) - 1] if latency else 0
+    print(f'{mode:<8} {pattern:<8} workers={workers:<4} threads={thread_count:<5} '
+          f'received={len(latency):<7} wall={wall:.2f}s cpu={cpu:.2f}s '
+          f'latency_mean={statistics.mean(latency) * 1000:.2f}ms latency_p99={p99 * 1000:.2f}ms')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=50)
+    parser.add_argument('--messages', type=int, default=20, help='Messages per worker')
+    parser.add_argument('--pattern', choices=['sparse', 'bursty', 'all'], default='all')
+    args = parser.parse_args()
+
+    patterns = ['sparse', 'bursty'] if args.pattern == 'all' else [args.pattern]
+    for pattern in patterns:
+        for mode in ['thread', 'hybrid']:
+            bench(mode, args.workers, pattern, args.messages)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark worker startup, spawn versus fork from zygote.
+
+Creates a temporary mod whose entry imports numpy, cv2 and msgspec and returns immediately,
+then starts workers one after another, like restarting all configs after an update.
+Reports startup_latency (worker_start() to BackendBridge ready) and total time until worker
+finished its entry, which includes mod imports.
+
+Usage:
+    python -m benchmarks.bench_worker_start
+    python -m benchmarks.bench_worker_start --workers 20
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from alasio.backend.worker.manager import WorkerManager
+from alasio.backend.worker.zygote import zygote_available
+
+MOD_ENTRY = '''
+import cv2
+import msgspec
+import numpy
+
+
+class Scheduler:
+    def __init__(self, config_name):
+        self.config_name = config_name
+
+    def run(self):
+        pass
+'''
+
+
+class SpawnManager(WorkerManager):
+    START_METHOD = 'spawn'
+
+    def on_config_event(self, event):
+        pass
+
+    def on_worker_state(self, config, state):
+        pass
+
+
+class ZygoteManager(SpawnManager):
+    START_METHOD = 'zygote'
+
+
+def bench(cls, workers, mod_root):
+    cls.singleton_clear()
+    manager = cls()
+    kwargs = dict(project_root=mod_root, mod_root=mod_root, path_main='bench_entry.py')
+    if cls.START_METHOD == 'zygote':
+        start = time.perf_counter()
+        manager.zygote_get('BenchMod', **kwargs)
+        print(f'{cls.START_METHOD:<8} zygote pre-warm: {time.perf_counter() - start:.3f}s')
+
+    startup = []
+    total = []
+    for index in range(workers):
+        config = f'bench_{index}'
+        start = time.perf_counter()
+        success, msg = manager.worker_start('BenchMod', config, **kwargs)
+        assert success, msg
+        state = manager.state[config]
+        state.wait_running(timeout=60)
+        startup.append(state.startup_latency)
+        manager.worker_wait_stopped(config, timeout=60)
+        total.append(time.perf_counter() - start)
+
+    method = cls.START_METHOD
+    print(f'{method:<8} workers={workers:<4} '
+          f'startup_mean={statistics.mean(startup):.3f}s startup_max={max(startup):.3f}s '
+          f'total_mean={statistics.mean(total):.3f}s total_sum={sum(total):.3f}s')
+    manager.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as mod_root:
+        with open(os.path.join(mod_root, 'bench_entry.py'), 'w', encoding='utf-8') as f:
+            f.write(MOD_ENTRY)
+        bench(SpawnManager, args.workers, mod_root)
+        if zygote_available():
+            bench(ZygoteManager, args.workers, mod_root)
+        else:
+            print('zygote   fork() is not available on this platform')
+
+
+if __name__ == '__main__':
+    main()
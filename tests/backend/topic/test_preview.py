@@ -364,3 +364,27 @@ async def test_preview_task_on_error_sends_cache(preview_task, worker, autojump_
     preview_task.on_worker_state('error')
     topic_normal.server.send_lossy.assert_called_with(preview_data_3)
     topic_realtime.server.send_lossy.assert_not_called()
+
+
+@pytest.mark.trio
+async def test_preview_task_command_reports_subscribers(preview_task, worker, autojump_clock):
+    """
+    Test that preview command reports subscriber count and speed,
+    and forces a preview only when a new subscriber joins.
+    """
+    topic_normal = MockTopic()
+    topic_realtime = MockTopic()
+
+    preview_task.subscribe(topic_normal, 'normal')
+    await trio.testing.wait_all_tasks_blocked()
+    assert worker.commands[-1].v == (1, 'normal', True)
+
+    # next recurrence is not forced
+    await trio.sleep(preview_task.recurrence)
+    await trio.testing.wait_all_tasks_blocked()
+    assert worker.commands[-1].v == (1, 'normal', False)
+
+    await trio.sleep(0.5)
+    preview_task.subscribe(topic_realtime, 'realtime')
+    await trio.testing.wait_all_tasks_blocked()
+    assert worker.commands[-1].v == (2, 'realtime', True)
@@ -74,6 +74,47 @@ def mock_handler(event):
                 assert data_updates[0].v == {'data': 123}
                 assert data_updates[0].c == 'test_events'
 
+    def test_preview_shared_memory(self, manager):
+        """测试预览图片通过共享内存传输"""
+        received_events = []
+
+        def mock_handler(event):
+            if event.t == 'Preview':
+                # read immediately, like PreviewTask.on_preview()
+                data = event.v
+                if not isinstance(data, bytes):
+                    data = manager.state['test_preview'].preview_read(data)
+                received_events.append((event.v, data))
+
+        manager.on_config_event = mock_handler
+
+        success, msg = manager.worker_start('WorkerTestPreview', 'test_preview')
+        assert success, f"Failed to start worker: {msg}"
+
+        state = manager.state['test_preview']
+        state.wait_running(timeout=WORKER_STARTUP_TIMEOUT)
+        assert state.preview_ring is not None
+
+        for _ in AssertTimeout(WORKER_COMPLETION_TIMEOUT):
+            with _:
+                state.send_test_continue()
+                assert len(received_events) >= 5
+
+        # first 3 previews are notifications of (slot, timestamp, size)
+        for n in range(1, 4):
+            notify, data = received_events[n - 1]
+            assert list(notify) == [n - 1, n, 1016]
+            assert data == b''.join((b'Preview_', n.to_bytes(8, 'big'), bytes([n]) * 1000))
+        # large preview and stop signal go through pipe
+        notify, data = received_events[3]
+        assert isinstance(notify, bytes)
+        assert data[:16] == b''.join((b'Preview_', (4).to_bytes(8, 'big')))
+        notify, data = received_events[4]
+        assert data == b''.join((b'PreviewS', (5).to_bytes(8, 'big')))
+
+        manager.worker_force_kill('test_preview')
+        assert state.preview_ring is None
+
     def test_scheduler_status_change(self, manager):
         """测试子进程改变 worker status"""
         # 启动 worker
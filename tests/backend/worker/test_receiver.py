@@ -0,0 +1,213 @@
+import threading
+from multiprocessing import Pipe
+
+import pytest
+
+from alasio.backend.worker.manager import WorkerManager
+from alasio.backend.worker.receiver import WorkerReceiver, WorkerRecvStats
+from alasio.testing.timeout import AssertTimeout
+from tests.backend.worker.const import *
+
+
+class FakeWorker:
+    def __init__(self, config):
+        self.config = config
+        self.conn, self.child = Pipe()
+        self.recv_stats = WorkerRecvStats()
+
+
+class Collector:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.messages = []
+        self.disconnected = []
+
+    def handle(self, data, worker):
+        with self.lock:
+            self.messages.append((worker.config, data))
+
+    def disconnect(self, worker):
+        with self.lock:
+            self.disconnected.append(worker.config)
+
+
+@pytest.fixture
+def collector():
+    return Collector()
+
+
+@pytest.fixture
+def receiver(collector):
+    receiver = WorkerReceiver(handle=collector.handle, disconnect=collector.disconnect, pool_size=2)
+    yield receiver
+    receiver.close()
+
+
+def test_receive_sparse_and_bursty(receiver, collector):
+    workers = [FakeWorker(f'w{i}') for i in range(10)]
+    for worker in workers:
+        receiver.add(worker)
+
+    # sparse
+    for worker in workers:
+        worker.child.send_bytes(worker.config.encode())
+    # bursty
+    for n in range(1000):
+        workers[0].child.send_bytes(str(n).encode())
+
+    for _ in AssertTimeout(3):
+        with _:
+            assert len(collector.messages) == 1010
+
+    # messages from the same pipe are in order
+    burst = [data for config, data in collector.messages if config == 'w0']
+    assert burst == [b'w0'] + [str(n).encode() for n in range(1000)]
+    assert workers[0].recv_stats.messages == 1001
+    assert workers[1].recv_stats.messages == 1
+    assert workers[0].recv_stats.drains >= 1
+    # only selector and drain threads
+    names = {t.name for t in threading.enumerate()}
+    assert 'WorkerRecvSelector' in names
+    assert len([n for n in names if n.startswith('WorkerRecvDrain-')]) == 2
+
+
+def test_chatty_worker_yields(receiver, collector):
+    receiver.DRAIN_BATCH = 10
+    receiver.pool_size = 1
+    chatty = FakeWorker('chatty')
+    quiet = FakeWorker('quiet')
+    receiver.add(chatty)
+    receiver.add(quiet)
+
+    for n in range(100):
+        chatty.child.send_bytes(b'x')
+    quiet.child.send_bytes(b'y')
+
+    for _ in AssertTimeout(3):
+        with _:
+            assert len(collector.messages) == 101
+
+
+def test_disconnect(receiver, collector):
+    worker = FakeWorker('w')
+    receiver.add(worker)
+    worker.child.send_bytes(b'1')
+    worker.child.close()
+
+    for _ in AssertTimeout(3):
+        with _:
+            assert collector.disconnected == ['w']
+    assert collector.messages == [('w', b'1')]
+    assert not receiver.is_registered(worker)
+
+
+def test_removed_no_disconnect(receiver, collector):
+    worker = FakeWorker('w')
+    receiver.add(worker)
+    receiver.remove(worker)
+    worker.conn.close()
+    worker.child.close()
+
+    worker2 = FakeWorker('w2')
+    receiver.add(worker2)
+    worker2.child.send_bytes(b'2')
+    for _ in AssertTimeout(3):
+        with _:
+            assert collector.messages == [('w2', b'2')]
+    assert collector.disconnected == []
+
+
+def test_stale_item_after_restart(receiver, collector):
+    worker = FakeWorker('w')
+    receiver.add(worker)
+    old_conn, old_child = worker.conn, worker.child
+    # worker restarted, same WorkerState with a new pipe
+    receiver.remove(worker)
+    worker.conn, worker.child = Pipe()
+    receiver.add(worker)
+    # stale item of the old pipe, queued before remove()
+    old_child.send_bytes(b'old')
+    receiver._queue.put((worker, old_conn, 0.))
+
+    worker.child.send_bytes(b'1')
+    for _ in AssertTimeout(3):
+        with _:
+            assert collector.messages == [('w', b'1')]
+    # old pipe is not drained, new registration is kept
+    old_child.close()
+    receiver._queue.put((worker, old_conn, 0.))
+    worker.child.send_bytes(b'2')
+    for _ in AssertTimeout(3):
+        with _:
+            assert collector.messages == [('w', b'1'), ('w', b'2')]
+    assert collector.disconnected == []
+    assert receiver.is_registered(worker)
+    old_conn.close()
+
+
+def test_close_wake_pipe(collector):
+    receiver = WorkerReceiver(handle=collector.handle, disconnect=collector.disconnect, pool_size=1)
+    worker = FakeWorker('w')
+    receiver.add(worker)
+    wake_r, wake_w = receiver._wake_r, receiver._wake_w
+    receiver.close()
+    assert wake_r.closed
+    assert wake_w.closed
+
+    # restart after close
+    receiver.add(worker)
+    worker.child.send_bytes(b'1')
+    for _ in AssertTimeout(3):
+        with _:
+            assert collector.messages == [('w', b'1')]
+    receiver.close()
+    assert receiver._wake_r.closed
+
+
+class HybridWorkerManager(WorkerManager):
+    RECV_MODE = 'hybrid'
+
+
+@pytest.fixture
+def manager():
+    HybridWorkerManager.singleton_clear()
+    mgr = HybridWorkerManager()
+    yield mgr
+    try:
+        mgr.close()
+    except Exception as e:
+        print(f"Warning: Error during cleanup: {e}")
+
+
+def test_hybrid_manager(manager):
+    received_events = []
+    manager.on_config_event = received_events.append
+
+    configs = [f'test_hybrid_{i}' for i in range(3)]
+    for config in configs:
+        success, msg = manager.worker_start('WorkerTestSendEvents', config)
+        assert success, f"Failed to start worker: {msg}"
+        assert manager.state[config].recv_thread is None
+
+    for config in configs:
+        manager.state[config].wait_running(timeout=WORKER_STARTUP_TIMEOUT)
+
+    for _ in AssertTimeout(WORKER_COMPLETION_TIMEOUT):
+        with _:
+            for config in configs:
+                manager.state[config].send_test_continue()
+            events = [e for e in received_events if e.t == 'CustomEvent']
+            assert len(events) >= 6
+
+    for config in configs:
+        assert manager.state[config].recv_stats.messages >= 3
+
+    # disconnect is handled by drain thread
+    state = manager.state[configs[0]]
+    state.process_kill()
+    for _ in AssertTimeout(WORKER_STOP_TIMEOUT):
+        with _:
+            assert state.state in ['idle', 'error']
+
+    manager.worker_force_kill(configs[1])
+    assert configs[1] not in manager.state
@@ -0,0 +1,56 @@
+from alasio.backend.worker.shm import PreviewRing
+
+
+def make_frame(timestamp, size=100):
+    return b''.join((b'Preview_', timestamp.to_bytes(8, 'big'), bytes([timestamp % 256]) * size))
+
+
+def test_ring_write_read():
+    ring = PreviewRing.create(slots=2, slot_size=1024)
+    worker = PreviewRing.attach(ring.name, slots=2, slot_size=1024)
+    try:
+        data = make_frame(1)
+        notify = worker.write(data, 1)
+        assert notify == (0, 1, len(data))
+        assert ring.read(*notify) == data
+
+        data = make_frame(2)
+        notify = worker.write(data, 2)
+        assert notify == (1, 2, len(data))
+        assert ring.read(*notify) == data
+    finally:
+        worker.close()
+        ring.close()
+
+
+def test_ring_overwritten():
+    ring = PreviewRing.create(slots=2, slot_size=1024)
+    worker = PreviewRing.attach(ring.name, slots=2, slot_size=1024)
+    try:
+        notify1 = worker.write(make_frame(1), 1)
+        worker.write(make_frame(2), 2)
+        # slot 0 overwritten by frame 3
+        notify3 = worker.write(make_frame(3), 3)
+        assert notify3[0] == notify1[0]
+        assert ring.read(*notify1) is None
+        assert ring.read(*notify3) == make_frame(3)
+    finally:
+        worker.close()
+        ring.close()
+
+
+def test_ring_invalid():
+    ring = PreviewRing.create(slots=2, slot_size=1024)
+    try:
+        # too large
+        assert ring.write(make_frame(1, size=2000), 1) is None
+        # invalid timestamp
+        assert ring.write(make_frame(0), 0) is None
+        # invalid notify
+        assert ring.read(5, 1, 10) is None
+        assert ring.read(0, 1, 5000) is None
+        assert ring.read(0, 1, 10) is None
+    finally:
+        ring.close()
+    # read after close
+    assert ring.read(0, 1, 10) is None
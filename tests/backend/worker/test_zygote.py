@@ -0,0 +1,150 @@
+import os
+import signal
+
+import pytest
+
+from alasio.backend.worker.manager import WorkerManager
+from alasio.backend.worker.zygote import zygote_available
+from alasio.testing.timeout import AssertTimeout
+from tests.backend.worker.const import *
+
+pytestmark = pytest.mark.skipif(not zygote_available(), reason='fork() is not available')
+
+ZYGOTE_STARTUP_TIMEOUT = 30.
+
+
+class ZygoteWorkerManager(WorkerManager):
+    START_METHOD = 'zygote'
+
+
+@pytest.fixture
+def manager():
+    ZygoteWorkerManager.singleton_clear()
+    mgr = ZygoteWorkerManager()
+    yield mgr
+    try:
+        mgr.close()
+    except Exception as e:
+        print(f"Warning: Error during cleanup: {e}")
+
+
+def test_zygote_start_and_complete(manager):
+    received_events = []
+    manager.on_config_event = received_events.append
+
+    # pre-warm
+    zygote = manager.zygote_get('WorkerTestRun3')
+    assert zygote.is_alive()
+
+    success, msg = manager.worker_start('WorkerTestRun3', 'test_zygote')
+    assert success, f"Failed to start worker: {msg}"
+    state = manager.state['test_zygote']
+    assert state.start_method == 'zygote'
+    assert state.wait_running(timeout=ZYGOTE_STARTUP_TIMEOUT)
+    assert state.startup_latency > 0
+
+    for _ in AssertTimeout(WORKER_COMPLETION_TIMEOUT):
+        with _:
+            if state.conn:
+                state.send_test_continue()
+            assert state.state == 'idle'
+    logs = [e.v for e in received_events if e.t == 'Log' and e.v in ['0', '1', '2']]
+    assert logs == ['0', '1', '2']
+
+    # same zygote is reused
+    assert manager.zygote_get('WorkerTestRun3') is zygote
+
+
+def test_zygote_error_and_force_kill(manager):
+    success, msg = manager.worker_start('WorkerTestError', 'test_zygote_error')
+    assert success, f"Failed to start worker: {msg}"
+    state = manager.state['test_zygote_error']
+    assert state.start_method == 'zygote'
+    for _ in AssertTimeout(ZYGOTE_STARTUP_TIMEOUT):
+        with _:
+            if state.conn:
+                state.send_test_continue()
+            assert state.state == 'error'
+
+    success, msg = manager.worker_start('WorkerTestInfinite', 'test_zygote_kill')
+    assert success, f"Failed to start worker: {msg}"
+    state = manager.state['test_zygote_kill']
+    assert state.wait_running(timeout=ZYGOTE_STARTUP_TIMEOUT)
+    process = state.process
+    manager.worker_force_kill('test_zygote_kill')
+    assert not process.is_alive()
+    assert 'test_zygote_kill' not in manager.state
+
+
+def test_zygote_close(manager):
+    zygote = manager.zygote_get('WorkerTestRun3')
+    manager.zygote_close('WorkerTestRun3')
+    assert not zygote.is_alive()
+    # restarted on next access
+    assert manager.zygote_get('WorkerTestRun3') is not zygote
+
+
+def test_zygote_close_running_worker(manager):
+    success, msg = manager.worker_start('WorkerTestRun3', 'test_zygote_orphan')
+    assert success, f"Failed to start worker: {msg}"
+    state = manager.state['test_zygote_orphan']
+    assert state.wait_running(timeout=ZYGOTE_STARTUP_TIMEOUT)
+
+    # worker outlives zygote, and a clean exit is not reported as error
+    zygote = manager.zygote_get('WorkerTestRun3')
+    manager.zygote_close('WorkerTestRun3')
+    assert not zygote.is_alive()
+    # closed zygote stays to reap the running worker
+    assert zygote.process.is_alive()
+    for _ in AssertTimeout(WORKER_COMPLETION_TIMEOUT):
+        with _:
+            if state.conn:
+                state.send_test_continue()
+            assert state.state == 'idle'
+    # and exits after exitcode is polled
+    for _ in AssertTimeout(3):
+        with _:
+            assert not zygote.process.is_alive()
+
+
+def test_zygote_signal_reaped(manager):
+    success, msg = manager.worker_start('WorkerTestRun3', 'test_zygote_reaped')
+    assert success, f"Failed to start worker: {msg}"
+    state = manager.state['test_zygote_reaped']
+    assert state.wait_running(timeout=ZYGOTE_STARTUP_TIMEOUT)
+    process = state.process
+    zygote = process.zygote
+    assert zygote.signal(process.pid, 0)
+    for _ in AssertTimeout(WORKER_COMPLETION_TIMEOUT):
+        with _:
+            if state.conn:
+                state.send_test_continue()
+            assert state.state == 'idle'
+    assert process.exitcode == 0
+    # pid of a reaped worker may be reused, zygote refuses to signal it
+    assert not zygote.signal(process.pid, 0)
+
+
+def test_zygote_lost(manager):
+    success, msg = manager.worker_start('WorkerTestInfinite', 'test_zygote_lost')
+    assert success, f"Failed to start worker: {msg}"
+    state = manager.state['test_zygote_lost']
+    assert state.wait_running(timeout=ZYGOTE_STARTUP_TIMEOUT)
+    process = state.process
+    zygote = process.zygote
+    # zygote crashed, or killed by OOM killer
+    zygote.process.kill()
+    zygote.process.join(timeout=3)
+
+    try:
+        # exitcode is unknown, not reported as a clean exit
+        assert process.exitcode == -1
+        assert not process.is_alive()
+        # orphaned worker is not signaled
+        process.kill()
+        os.kill(process.pid, 0)
+    finally:
+        os.kill(process.pid, signal.SIGKILL)
+    for _ in AssertTimeout(WORKER_COMPLETION_TIMEOUT):
+        with _:
+            assert state.state == 'error'
@@ -0,0 +1,131 @@
+import msgspec
+import pytest
+import trio
+
+from alasio.backend.reactive.base_msgbus import on_msgbus_config_event
+from alasio.backend.reactive.event import ResponseEvent
+from alasio.backend.topic.state import DICT_CONFIG_TO_CONN
+from alasio.backend.worker.event import ConfigEvent
+from alasio.backend.ws.topic import WebsocketServer
+from alasio.backend.ws.ws_server import BroadcastEncoder
+from alasio.backend.ws.ws_topic import BaseTopic
+
+
+class BroadcastTopic(BaseTopic):
+    @on_msgbus_config_event('TestBroadcast')
+    async def on_config_event(self, value):
+        return ResponseEvent(t=self.topic_name(), o='set', k=('key',), v=value)
+
+
+def create_server(buffer_length=32):
+    server = WebsocketServer(ws=None)
+    server.send_buffer, recv = trio.open_memory_channel(buffer_length)
+    return server, recv
+
+
+@pytest.fixture
+def servers():
+    BroadcastTopic.singleton_clear()
+    created = []
+    for _ in range(3):
+        server, recv = create_server()
+        BroadcastTopic(server.id, server)
+        DICT_CONFIG_TO_CONN['test_broadcast'].add(server.id)
+        created.append((server, recv))
+    yield created
+    BroadcastTopic.singleton_clear()
+    DICT_CONFIG_TO_CONN.pop('test_broadcast', None)
+
+
+def test_encoder_once():
+    encoder = BroadcastEncoder()
+    value = {'a': [1, 2, 3]}
+    data1 = encoder.encode(ResponseEvent(t='Topic', o='set', k=('a',), v=value))
+    data2 = encoder.encode(ResponseEvent(t='Topic', o='set', k=('a',), v=value))
+    assert data1 is data2
+    assert encoder.encoded == 1
+    assert encoder.hit == 1
+
+    # different keys
+    data3 = encoder.encode(ResponseEvent(t='Topic', o='set', k=('b',), v=value))
+    assert data3 != data1
+    # list of events
+    events = [ResponseEvent(t='Topic', o='set', k=('a',), v=value)]
+    assert encoder.encode(events) == msgspec.json.encode(events)
+    assert encoder.encoded == 3
+    # bytes
+    assert encoder.encode(b'raw') == b'raw'
+
+
+@pytest.mark.trio
+async def test_handle_config_event(servers):
+    value = {'value': 1}
+    await WebsocketServer.handle_config_event(ConfigEvent(t='TestBroadcast', c='test_broadcast', v=value))
+
+    received = [recv.receive_nowait() for _, recv in servers]
+    assert received[0] == msgspec.json.encode(ResponseEvent(t='BroadcastTopic', o='set', k=('key',), v=value))
+    # encoded once, same bytes object in every connection
+    assert all(data is received[0] for data in received)
+    for server, _ in servers:
+        assert server.broadcast_stats.sent == 1
+
+
+@pytest.fixture
+def fast_slow():
+    BroadcastTopic.singleton_clear()
+    fast, fast_recv = create_server()
+    slow, slow_recv = create_server(buffer_length=1)
+    for server in [fast, slow]:
+        BroadcastTopic(server.id, server)
+        DICT_CONFIG_TO_CONN['test_broadcast_slow'].add(server.id)
+    yield (fast, fast_recv), (slow, slow_recv)
+    BroadcastTopic.singleton_clear()
+    DICT_CONFIG_TO_CONN.pop('test_broadcast_slow', None)
+
+
+async def broadcast(count):
+    for n in range(count):
+        await WebsocketServer.handle_config_event(ConfigEvent(t='TestBroadcast', c='test_broadcast_slow', v=n))
+
+
+@pytest.mark.trio
+async def test_slow_client_lossless(fast_slow):
+    (fast, fast_recv), (slow, slow_recv) = fast_slow
+    # slow client doesn't read at all, broadcast must not wait for it
+    with trio.fail_after(1):
+        await broadcast(5)
+
+    assert [msgspec.json.decode(fast_recv.receive_nowait())['v'] for _ in range(5)] == [0, 1, 2, 3, 4]
+    assert fast.broadcast_stats.sent == 5
+    assert fast.broadcast_stats.blocked == 0
+    # 1 in send_buffer, 4 wait in overflow, none dropped
+    assert slow.broadcast_stats.sent == 5
+    assert slow.broadcast_stats.blocked == 4
+    assert len(slow.broadcast_overflow) == 4
+    assert not slow.lossy_buffer
+
+    # task_send moves overflow into send_buffer as it drains, order is kept
+    received = []
+    while True:
+        try:
+            data = slow_recv.receive_nowait()
+        except trio.WouldBlock:
+            break
+        received.append(msgspec.json.decode(data)['v'])
+        slow._broadcast_flush()
+    assert received == [0, 1, 2, 3, 4]
+
+
+@pytest.mark.trio
+async def test_slow_client_overflow_close(fast_slow):
+    (fast, fast_recv), (slow, slow_recv) = fast_slow
+    slow.BROADCAST_OVERFLOW_LENGTH = 3
+    with trio.fail_after(1):
+        await broadcast(10)
+
+    assert fast.broadcast_stats.sent == 10
+    # connection closed instead of dropping state changes
+    assert slow.conn_terminated.is_set()
+    assert slow.broadcast_stats.overflow_closed == 1
+    assert not slow.broadcast_overflow
+    assert not slow.send_broadcast(b'data')
@@ -0,0 +1,108 @@
+import numpy as np
+
+from alasio.base.image.imfile import image_decode
+from alasio.base.image.impreview import (
+    PreviewEncoder, image_preview, image_signature, preview_profile, signature_diff
+)
+
+
+def create_image(value=0, size=(1280, 720)):
+    width, height = size
+    image = np.zeros((height, width, 3), dtype=np.uint8)
+    image[:] = value
+    return image
+
+
+def test_image_preview_header():
+    image = create_image(100)
+    data = image_preview(image, now=1.5)
+    assert data[:8] == b'Preview_'
+    assert int.from_bytes(data[8:16], 'big') == 1500
+    decoded = image_decode(np.frombuffer(data[16:], dtype=np.uint8))
+    assert decoded.shape == (360, 640, 3)
+
+    data = image_preview(image, now=1.5, scale=1 / 3)
+    decoded = image_decode(np.frombuffer(data[16:], dtype=np.uint8))
+    assert decoded.shape == (240, 427, 3)
+
+
+def test_signature_same_and_changed():
+    image1 = create_image(100)
+    image2 = create_image(100)
+    sig1 = image_signature(image1)
+    sig2 = image_signature(image2)
+    assert signature_diff(sig1, sig2) == 0
+
+    # a large area changed
+    image2[100:400, 100:600] = 200
+    sig2 = image_signature(image2)
+    assert signature_diff(sig1, sig2) > 1
+
+    # not comparable
+    assert signature_diff(None, sig1) == 255
+    sig3 = image_signature(create_image(100, size=(720, 1280)))
+    assert signature_diff(sig1, sig3) == 255
+
+
+def test_preview_profile():
+    assert preview_profile(1, 'normal') == (0.5, 75)
+    assert preview_profile(10, 'normal') == (0.5, 75)
+    scale1, quality1 = preview_profile(1, 'realtime')
+    scale2, quality2 = preview_profile(2, 'realtime')
+    scale5, quality5 = preview_profile(5, 'realtime')
+    assert quality1 >= quality2 >= quality5
+    assert scale1 >= scale2 >= scale5
+
+
+class Recorder:
+    def __init__(self):
+        self.sent = []
+        self.skipped = 0
+
+    def send(self, data):
+        self.sent.append(data)
+
+    def on_skip(self):
+        self.skipped += 1
+
+
+def test_encoder_skip_duplicated():
+    recorder = Recorder()
+    encoder = PreviewEncoder(send=recorder.send, on_skip=recorder.on_skip)
+
+    encoder.submit(create_image(100), now=1)
+    assert encoder.wait_idle()
+    assert len(recorder.sent) == 1
+
+    # same screen, skipped
+    encoder.submit(create_image(100), now=2)
+    assert encoder.wait_idle()
+    assert len(recorder.sent) == 1
+    assert recorder.skipped == 1
+
+    # same screen but forced
+    encoder.submit(create_image(100), now=3, force=True)
+    assert encoder.wait_idle()
+    assert len(recorder.sent) == 2
+
+    # screen changed
+    encoder.submit(create_image(150), now=4)
+    assert encoder.wait_idle()
+    assert len(recorder.sent) == 3
+    assert int.from_bytes(recorder.sent[-1][8:16], 'big') == 4000
+
+
+def test_encoder_stop():
+    recorder = Recorder()
+    encoder = PreviewEncoder(send=recorder.send, on_skip=recorder.on_skip)
+
+    encoder.submit(create_image(100), now=1)
+    encoder.submit_stop(now=2)
+    assert encoder.wait_idle()
+    assert recorder.sent[-1] == b'PreviewS' + (2000).to_bytes(8, 'big')
+
+    # signature cleared after stop, same screen will be sent again
+    encoder.submit(create_image(100), now=3)
+    assert encoder.wait_idle()
+    assert recorder.sent[-1][:8] == b'Preview_'
+    assert recorder.skipped == 0
@@ -0,0 +1,97 @@
+import os
+
+import numpy as np
+import pytest
+
+from alasio.assets.template.template import MatchResult, Template
+from alasio.base.base import ModuleBase
+from alasio.base.profiler import LoopProfiler
+from alasio.device.config import DeviceConfig
+from alasio.device.replay import ReplayDevice, ReplayEnd, save_frame_log
+
+FOLDER = os.path.abspath('./temp/test_profiler')
+
+
+class BrightTemplate(Template):
+    def DEFAULT_MATCH(self, image, search=None):
+        return MatchResult(match=bool(image[15, 15, 0] > 100), area=self.area)
+
+
+BUTTON = BrightTemplate(area=(10, 10, 20, 20), color=(255, 255, 255), file='assets/BUTTON.png')
+
+
+class Task(ModuleBase):
+    def wait_button(self):
+        for _ in self.loop(skip_first=False):
+            if BUTTON.match(self.device.image):
+                return True
+
+    def wait_forever(self):
+        for _ in self.loop(skip_first=False):
+            BUTTON.match(self.device.image)
+
+
+@pytest.fixture
+def device():
+    # button appears on the 4th frame
+    frames = []
+    for index in range(6):
+        image = np.zeros((72, 128, 3), dtype=np.uint8)
+        if index >= 3:
+            image[10:20, 10:20] = 255
+        frames.append({'time': float(index), 'image': image})
+    file = os.path.join(FOLDER, 'frames.zst')
+    save_frame_log(file, frames)
+    return ReplayDevice(DeviceConfig(), file)
+
+
+def test_loop_profiler(device):
+    task = Task(DeviceConfig(), device=device)
+    loop, match = ModuleBase.loop, Template.match
+    with LoopProfiler() as profiler:
+        assert task.wait_button()
+        with pytest.raises(ReplayEnd):
+            task.wait_forever()
+
+    # restored
+    assert ModuleBase.loop is loop
+    assert Template.match is match
+
+    stats = {key.split(':')[0]: s for key, s in profiler.loops.items()}
+    wait = stats['Task.wait_button']
+    assert (wait.loops, wait.frames, wait.decisions) == (1, 4, 1)
+    assert wait.frames_to_decision == 4
+    assert len(wait.samples) == 4
+    assert wait.match > 0
+    assert wait.total >= wait.body >= wait.match
+
+    forever = stats['Task.wait_forever']
+    assert (forever.frames, forever.errors, forever.decisions) == (2, 1, 0)
+
+    match = profiler.matches['Template(assets/BUTTON.png)']
+    assert (match.calls, match.hits) == (6, 3)
+    profiler.print_report()
+
+
+def test_track(device):
+    class Asset:
+        def __str__(self):
+            return 'Asset(BUTTON)'
+
+        def match(self, image):
+            # nested matches are counted once in loop stats
+            return BUTTON.match(image)
+
+    asset = Asset()
+    profiler = LoopProfiler()
+    profiler.attach()
+    profiler.track(asset)
+    try:
+        image = device.screenshot()
+        assert not asset.match(image)
+    finally:
+        profiler.detach()
+    assert 'match' not in vars(asset)
+    assert profiler.matches['Asset(BUTTON)'].calls == 1
+    assert profiler.matches['Template(assets/BUTTON.png)'].calls == 1
+    assert profiler._match_time <= profiler.matches['Asset(BUTTON)'].total
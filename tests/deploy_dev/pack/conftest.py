@@ -16,7 +16,7 @@
 import httpx
 import pytest
 
-from alasio.deploy.pack.decode_base import PackDecodeBase
+from alasio.deploy.pack.decode_base import PackDecodeBase, PackDecodeError
 from alasio.deploy.pack.pack_model import IdxInfo
 from alasio.deploy.pack.server_file import ServerFile
 from alasio.deploy_dev.pack.pack_repo import PackFull
@@ -202,6 +202,23 @@ def _handle(self, request):
         return httpx.Response(206, content=content)
 
 
+def serve_bad_data(version, ranges, callback):
+    """
+    A ServerFile.get_file_contents() replacement that serves bad data
+    for every range.
+
+    Returns:
+        dict[Any, Exception]: Every key fails the callback
+    """
+    error = {}
+    for key in ranges:
+        try:
+            callback(key, b'bad data')
+        except PackDecodeError as e:
+            error[key] = e
+    return error
+
+
 # MockServerFile serving the website packs in memory, read-only test data
 WEBSITE_SERVER = MockServerFile()
 WEBSITE_SERVER.register_version(COMMIT, WEBSITE_FULL_PACK, WEBSITE_INDEX_PACK)
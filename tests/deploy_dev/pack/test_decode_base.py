@@ -8,6 +8,7 @@
 
 PackDecodeError tests live in test_decode_error.py.
 """
+import os
 from hashlib import sha1
 
 import pytest
@@ -16,6 +17,7 @@
 from alasio.deploy.pack.decode_base import PackDecodeBase, PackDecodeError
 from alasio.deploy.pack.pack_model import IdxInfo
 from alasio.deploy_dev.pack.pack_repo import PackFull
+from alasio.testing.filesystem import fs  # noqa: F401
 
 
 class TestPackDecodeBasic:
@@ -334,6 +336,18 @@ def test_binary_stays_as_is(self):
         assert PackDecodeBase.apply_eol(content, 2) == content
 
 
+class TestApplyEolIter:
+    """apply_eol_iter must give the same result as apply_eol on any chunking."""
+
+    @pytest.mark.parametrize('eol', [0, 1, 2])
+    def test_chunks(self, eol):
+        content = b'a\nb\r\nc\r\r\n\n\rd\r'
+        expected = PackDecodeBase.apply_eol(content, eol)
+        for size in range(1, len(content) + 1):
+            chunks = [content[i:i + size] for i in range(0, len(content), size)]
+            assert b''.join(PackDecodeBase.apply_eol_iter(chunks, eol)) == expected
+
+
 class TestPackDecodeData:
     """Data section extraction via data_start / data_size."""
 
@@ -373,6 +387,45 @@ def test_catfile_returns_memoryview(self):
             assert isinstance(content, memoryview)
             assert bytes(content) == WEBSITE_FILES[info.path][0]
 
+    def test_catfile_to_file(self, fs):
+        """catfile_to_file must write the same content as catfile."""
+        decoder = PackDecodeBase(WEBSITE_FULL_PACK)
+        os.makedirs('/out')
+        for index, info in enumerate(decoder.fileinfo.values()):
+            if info.edit == 2:
+                continue
+            file = f'/out/{index}.tmp'
+            decoder.catfile_to_file(info, file)
+            with open(file, 'rb') as f:
+                assert f.read() == bytes(decoder.catfile(info)), info.path
+
+    @pytest.mark.parametrize('chunk_size', [1, 5, 1 << 20])
+    def test_decode_content_iter(self, chunk_size):
+        """Streaming decode gives the same content on any input chunking."""
+        from alasio.deploy.pack.decode_base import iter_chunks
+
+        decoder = PackDecodeBase(WEBSITE_FULL_PACK)
+        for info in decoder.fileinfo.values():
+            if not info.data_size:
+                continue
+            chunks = iter_chunks(decoder.catdata(info), chunk_size)
+            content = b''.join(decoder.decode_content_iter(info, chunks))
+            assert content == bytes(decoder.catfile(info)), info.path
+
+    def test_decode_content_to_file_error(self, fs):
+        """Content failing the check leaves no file behind."""
+        decoder = PackDecodeBase(WEBSITE_FULL_PACK)
+        info = next(i for i in decoder.fileinfo.values() if i.algo == 0 and i.data_size)
+        data = bytearray(decoder.catdata(info))
+        data[0] ^= 1
+        os.makedirs('/out')
+        with pytest.raises(PackDecodeError, match='sha1 mismatch'):
+            decoder.decode_content_to_file(info, [bytes(data)], '/out/out.tmp')
+        # longer than the record fails before reading the rest
+        with pytest.raises(PackDecodeError, match='size mismatch'):
+            decoder.decode_content_to_file(info, [bytes(data), b'x'], '/out/out.tmp')
+        assert os.listdir('/out') == []
+
     def test_catfile_empty_file(self):
         """Files without data return an empty memoryview."""
         decoder = PackDecodeBase(WEBSITE_FULL_PACK)
@@ -11,7 +11,7 @@
 import os
 
 import pytest
-from conftest import WEBSITE_FILES, WEBSITE_FULL_PACK, WEBSITE_INDEX_PACK, WEBSITE_SERVER
+from conftest import WEBSITE_FILES, WEBSITE_FULL_PACK, WEBSITE_INDEX_PACK, WEBSITE_SERVER, serve_bad_data
 
 from alasio.deploy.pack.decode_base import PackDecodeBase, PackDecodeError
 from alasio.deploy.pack.job import DeployJob
@@ -316,7 +316,7 @@ def test_run_eol_fix_without_download(self, app_folder, fs, monkeypatch):
 
         def _fail(self, *a, **k):
             raise AssertionError('no download expected for an EOL mismatch')
-        monkeypatch.setattr(WEBSITE_SERVER, 'get_file_content', _fail)
+        monkeypatch.setattr(WEBSITE_SERVER, 'get_file_contents', _fail)
         job = ResetJob(WEBSITE_SERVER)
         assert job.run()
         assert job.error == []
@@ -330,7 +330,7 @@ def test_run_eol_fix_755_record(self, app_folder, fs, monkeypatch):
         # deploy.sh is eol=0 (LF) mode=755, the local file is CRLF
         with open(target, 'wb') as f:
             f.write(WEBSITE_FILES['scripts/deploy.sh'][0].replace(b'\n', b'\r\n'))
-        monkeypatch.setattr(WEBSITE_SERVER, 'get_file_content', lambda *a, **k: b'bad data')
+        monkeypatch.setattr(WEBSITE_SERVER, 'get_file_contents', serve_bad_data)
         job = ResetJob(WEBSITE_SERVER)
         assert job.run()
         assert file_read_bytes(target) == WEBSITE_FILES['scripts/deploy.sh'][0]
@@ -368,7 +368,7 @@ def test_run_mode_fix_without_download(self, app_folder, fs, monkeypatch):
 
         def _fail(self, *a, **k):
             raise AssertionError('no download expected for a mode mismatch')
-        monkeypatch.setattr(WEBSITE_SERVER, 'get_file_content', _fail)
+        monkeypatch.setattr(WEBSITE_SERVER, 'get_file_contents', _fail)
         job = ResetJob(WEBSITE_SERVER)
         assert job.run()
         assert job.error == []
@@ -384,13 +384,137 @@ def test_run_mode_fix_755_record(self, app_folder, fs, monkeypatch):
         # deploy.sh is mode=755, the local file has no execute bits
         fs.remove(target)
         fs.create_file(target, st_mode=0o100644, contents=WEBSITE_FILES['scripts/deploy.sh'][0])
-        monkeypatch.setattr(WEBSITE_SERVER, 'get_file_content', lambda *a, **k: b'bad data')
+        monkeypatch.setattr(WEBSITE_SERVER, 'get_file_contents', serve_bad_data)
         job = ResetJob(WEBSITE_SERVER)
         assert job.run()
         assert file_read_bytes(target) == WEBSITE_FILES['scripts/deploy.sh'][0]
         assert os.stat(target).st_mode & 0o111 == 0o111
 
 
+class TestValidateCache:
+    """validate_files(): parallel validation with the stat cache."""
+
+    @staticmethod
+    def age_files():
+        """Move the mtime of every file to the past, so none is racy."""
+        for root, _, files in os.walk(env.PROJECT_ROOT):
+            for name in files:
+                os.utime(os.path.join(root, name), (1000000000, 1000000000))
+
+    @staticmethod
+    def count_hash(monkeypatch):
+        calls = []
+        matches = ResetJob._matches
+
+        def _matches(info, current):
+            calls.append(info.path)
+            return matches(info, current)
+        monkeypatch.setattr(ResetJob, '_matches', staticmethod(_matches))
+        return calls
+
+    def test_warm_skips_hash(self, app_folder, fs, monkeypatch):
+        """Files with unchanged stat are not hashed again."""
+        setup_app(fs)
+        self.age_files()
+        assert ResetJob(WEBSITE_SERVER).validate_files()
+        assert os.path.exists(env.PROJECT_ROOT / ResetJob.VALIDATE_CACHE)
+        calls = self.count_hash(monkeypatch)
+        assert ResetJob(WEBSITE_SERVER).validate_files()
+        assert calls == []
+
+    def test_modified_same_size(self, app_folder, fs, monkeypatch):
+        """A modified file is hashed again even if the size is the same."""
+        setup_app(fs)
+        self.age_files()
+        assert ResetJob(WEBSITE_SERVER).validate_files()
+        target = env.PROJECT_ROOT / 'backend/config.py'
+        with open(target, 'wb') as f:
+            f.write(b'A' * len(WEBSITE_FILES['backend/config.py'][0]))
+        calls = self.count_hash(monkeypatch)
+        job = ResetJob(WEBSITE_SERVER)
+        assert not job.validate_files()
+        assert calls == ['backend/config.py']
+        assert [item.info.path for item in job.error] == ['backend/config.py']
+
+    def test_racy_file(self, app_folder, fs, monkeypatch):
+        """A file not older than the cache is hashed again."""
+        setup_app(fs)
+        self.age_files()
+        assert ResetJob(WEBSITE_SERVER).validate_files()
+        target = env.PROJECT_ROOT / 'backend/config.py'
+        cache = env.PROJECT_ROOT / ResetJob.VALIDATE_CACHE
+        # the file has the same mtime as the cache file
+        st = os.stat(cache)
+        os.utime(target, (st.st_atime, st.st_mtime))
+        assert ResetJob(WEBSITE_SERVER).validate_files()
+        # cache is written again with the current stat, now older than the cache
+        calls = self.count_hash(monkeypatch)
+        assert ResetJob(WEBSITE_SERVER).validate_files()
+        assert calls == []
+        os.utime(cache, (st.st_atime, st.st_mtime))
+        assert ResetJob(WEBSITE_SERVER).validate_files()
+        assert calls == ['backend/config.py']
+
+    def test_mode_changed(self, app_folder, fs):
+        """A cached file whose mode changed is still fixed."""
+        setup_app(fs)
+        self.age_files()
+        assert ResetJob(WEBSITE_SERVER).validate_files()
+        target = env.PROJECT_ROOT / 'backend/main.py'
+        os.chmod(target, 0o755)
+        job = ResetJob(WEBSITE_SERVER)
+        assert not job.validate_files()
+        error = job.error[0]
+        assert error.info.path == 'backend/main.py'
+        assert error.mode == 0o644
+        assert file_read_bytes(error.tmp) == WEBSITE_FILES['backend/main.py'][0]
+
+    def test_stale_path(self, app_folder, fs):
+        """Paths no longer in the index are dropped from the cache."""
+        setup_app(fs)
+        self.age_files()
+        job = ResetJob(WEBSITE_SERVER)
+        assert job.validate_files()
+        cache, _ = job._read_validate_cache()
+        cache['removed/file.py'] = cache['backend/main.py']
+        job._write_validate_cache(cache)
+        assert ResetJob(WEBSITE_SERVER).validate_files()
+        cache, _ = job._read_validate_cache()
+        assert 'removed/file.py' not in cache
+        assert 'backend/main.py' in cache
+
+    def test_broken_cache(self, app_folder, fs, monkeypatch):
+        """A broken cache is ignored and rebuilt."""
+        setup_app(fs)
+        with open(env.PROJECT_ROOT / ResetJob.VALIDATE_CACHE, 'wb') as f:
+            f.write(b'broken')
+        with logger.mock_capture_writer() as capture:
+            assert ResetJob(WEBSITE_SERVER).validate_files()
+        assert capture.backend.any_contains('Failed to read validate cache')
+        os.remove(env.PROJECT_ROOT / 'backend/__init__.py')
+        job = ResetJob(WEBSITE_SERVER)
+        assert not job.validate_files()
+        assert [item.info.path for item in job.error] == ['backend/__init__.py']
+
+    def test_parallel(self, app_folder, fs, monkeypatch):
+        """Batches on threads give the same errors in the record order."""
+        setup_app(fs)
+        monkeypatch.setattr(ResetJob, 'VALIDATE_BATCH', 2)
+        os.remove(env.PROJECT_ROOT / 'backend/__init__.py')
+        with open(env.PROJECT_ROOT / 'backend/main.py', 'wb') as f:
+            f.write(b'wrong')
+        with open(env.PROJECT_ROOT / 'backend/config.py', 'wb') as f:
+            f.write(WEBSITE_FILES['backend/config.py'][0].replace(b'\n', b'\r\n'))
+        serial = ResetJob(WEBSITE_SERVER)
+        serial.validate_cache = False
+        serial.VALIDATE_BATCH = 10000
+        serial.validate_files()
+        job = ResetJob(WEBSITE_SERVER)
+        assert not job.validate_files()
+        assert [item.info.path for item in job.error] == [item.info.path for item in serial.error]
+        assert len(job.error) == 3
+
+
 class TestDownloadIndex:
     """download_index(): download the index pack from the server."""
 
@@ -505,7 +629,7 @@ def test_download_unsolvable(self, app_folder, fs, monkeypatch):
         setup_app(fs)
         os.remove(env.PROJECT_ROOT / 'backend/__init__.py')
         server = WEBSITE_SERVER
-        monkeypatch.setattr(server, 'get_file_content', lambda *a, **k: b'bad data')
+        monkeypatch.setattr(server, 'get_file_contents', serve_bad_data)
         job = ResetJob(server)
         job.validate_index()
         job.validate_files()
@@ -712,7 +836,7 @@ def test_run_unsolvable(self, app_folder, fs, monkeypatch):
         setup_app(fs)
         os.remove(env.PROJECT_ROOT / 'backend/__init__.py')
         server = WEBSITE_SERVER
-        monkeypatch.setattr(server, 'get_file_content', lambda *a, **k: b'bad data')
+        monkeypatch.setattr(server, 'get_file_contents', serve_bad_data)
         job = ResetJob(server)
         assert not job.run()
         assert [item.info.path for item in job.error] == ['backend/__init__.py']
@@ -5,12 +5,16 @@
 httpx.MockTransport client to exercise the http request logic of
 ServerFile without a real server.
 """
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
 import httpx
 import pytest
-from conftest import COMMIT, WEBSITE_FULL_PACK, WEBSITE_INDEX_PACK, WEBSITE_SERVER
+from conftest import COMMIT, WEBSITE_FULL_PACK, WEBSITE_INDEX_PACK, WEBSITE_SERVER, random_bytes
 
 from alasio.deploy.pack.decode_base import PackDecodeBase, PackDecodeError
-from alasio.deploy.pack.server_file import LatestInfo, ServerFile
+from alasio.deploy.pack.server_file import LatestInfo, ServerFile, coalesce_ranges
 
 
 def range_handler(requests, data):
@@ -155,3 +159,182 @@ def handler(request):
         server = ServerFile('http://test', client=make_client(handler))
         with pytest.raises(httpx.HTTPStatusError):
             server.get_update_pack('old', 'new')
+
+
+class RangeServer(ThreadingHTTPServer):
+    """
+    A local range-capable http server, serves the same data on every
+    path with an injectable latency per request.
+    """
+    daemon_threads = True
+
+    def __init__(self, data, latency=0.):
+        super().__init__(('127.0.0.1', 0), RangeRequestHandler)
+        self.data = data
+        self.latency = latency
+        self.ranges = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+
+class RangeRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+        try:
+            time.sleep(server.latency)
+            start, _, end = self.headers['Range'].partition('=')[2].partition('-')
+            start, end = int(start), int(end) + 1
+            server.ranges.append((start, end))
+            content = server.data[start:end]
+            self.send_response(206)
+            self.send_header('Content-Length', str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def range_server():
+    servers = []
+
+    def create(data, latency=0.):
+        server = RangeServer(data, latency)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield create
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+DATA = random_bytes(1000000)
+
+
+def collect(server, ranges):
+    """Run get_file_contents() and collect the received files."""
+    received = {}
+    error = server.get_file_contents(COMMIT, ranges, received.__setitem__)
+    return received, error
+
+
+class TestCoalesceRanges:
+    """coalesce_ranges(): sort and merge nearby ranges."""
+
+    def test_merge(self):
+        ranges = {'a': (100, 10), 'b': (0, 10), 'c': (15, 5), 'd': (1000, 10)}
+        requests = coalesce_ranges(ranges, max_gap=10, max_size=1000)
+        assert [(r.start, r.end) for r in requests] == [(0, 20), (100, 110), (1000, 1010)]
+        assert requests[0].items == [('b', 0, 10), ('c', 15, 5)]
+
+    def test_max_size(self):
+        ranges = {i: (i * 10, 10) for i in range(10)}
+        requests = coalesce_ranges(ranges, max_gap=0, max_size=30)
+        assert [(r.start, r.end) for r in requests] == [(0, 30), (30, 60), (60, 90), (90, 100)]
+        # a range larger than max_size is still one request
+        requests = coalesce_ranges({'a': (0, 100)}, max_gap=0, max_size=30)
+        assert [(r.start, r.end) for r in requests] == [(0, 100)]
+
+    def test_empty(self):
+        assert coalesce_ranges({}, max_gap=10, max_size=100) == []
+
+
+class TestGetFileContents:
+    """get_file_contents(): coalesced concurrent range downloads."""
+
+    def test_coalesced(self):
+        """Nearby files share a request, every file is sliced correctly."""
+        requests = []
+        server = ServerFile('http://test', client=make_client(range_handler(requests, DATA)))
+        ranges = {i: (i * 1000, 500) for i in range(100)}
+        ranges['far'] = (900000, 20000)
+        received, error = collect(server, ranges)
+        assert error == {}
+        assert received == {k: DATA[o:o + s] for k, (o, s) in ranges.items()}
+        assert sorted(r.headers['Range'] for r in requests) == ['bytes=0-99499', 'bytes=900000-919999']
+
+    def test_range_ignored(self):
+        """A 200 response is sliced from the beginning of the file."""
+        def handler(request):
+            return httpx.Response(200, content=DATA)
+        server = ServerFile('http://test', client=make_client(handler))
+        ranges = {'a': (10, 5), 'b': (500000, 30)}
+        received, error = collect(server, ranges)
+        assert error == {}
+        assert received == {'a': DATA[10:15], 'b': DATA[500000:500030]}
+
+    def test_short_response(self):
+        """Files beyond a truncated response fail, the others succeed."""
+        def handler(request):
+            start, _, end = request.headers['Range'].partition('=')[2].partition('-')
+            return httpx.Response(206, content=DATA[int(start):int(end) - 100])
+        server = ServerFile('http://test', client=make_client(handler))
+        received, error = collect(server, {'a': (0, 100), 'b': (200, 100)})
+        assert received == {'a': DATA[:100]}
+        assert list(error) == ['b']
+        assert isinstance(error['b'], PackDecodeError)
+
+    def test_http_error(self):
+        """A failed request fails all its files."""
+        def handler(request):
+            return httpx.Response(500)
+        server = ServerFile('http://test', client=make_client(handler))
+        received, error = collect(server, {'a': (0, 100), 'b': (200, 100)})
+        assert received == {}
+        assert set(error) == {'a', 'b'}
+        assert isinstance(error['a'], httpx.HTTPStatusError)
+
+    def test_callback_error(self):
+        """A PackDecodeError from the callback fails that file only."""
+        server = ServerFile('http://test', client=make_client(range_handler([], DATA)))
+        received = {}
+
+        def callback(key, data):
+            if key == 'b':
+                raise PackDecodeError('bad')
+            received[key] = data
+
+        error = server.get_file_contents(COMMIT, {'a': (0, 10), 'b': (20, 10), 'c': (40, 10)}, callback)
+        assert list(error) == ['b']
+        assert received == {'a': DATA[0:10], 'c': DATA[40:50]}
+
+    def test_local_server(self, range_server):
+        """Files are streamed from a real http server on a pooled client."""
+        http = range_server(DATA)
+        server = ServerFile(http.url)
+        ranges = {i: (i * 300007 % 990000, 1000 + i) for i in range(50)}
+        received, error = collect(server, ranges)
+        assert error == {}
+        assert received == {k: DATA[o:o + s] for k, (o, s) in ranges.items()}
+
+    def test_concurrent(self, range_server):
+        """Far apart ranges run concurrently, total time is not the sum of latency."""
+        latency = 0.2
+        http = range_server(DATA, latency=latency)
+        server = ServerFile(http.url)
+        server.MAX_GAP = 0
+        ranges = {i: (i * 100000, 100) for i in range(server.MAX_CONCURRENCY)}
+        start = time.perf_counter()
+        received, error = collect(server, ranges)
+        cost = time.perf_counter() - start
+        assert error == {}
+        assert len(received) == len(ranges)
+        assert len(http.ranges) == len(ranges)
+        assert http.max_active > 1
+        assert cost < latency * len(ranges) / 2
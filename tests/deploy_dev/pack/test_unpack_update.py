@@ -18,7 +18,7 @@
 
 import httpx
 import pytest
-from conftest import FULL_SCENARIO_NEW, FULL_SCENARIO_OLD, MockServerFile
+from conftest import FULL_SCENARIO_NEW, FULL_SCENARIO_OLD, MockServerFile, serve_bad_data
 
 from alasio.deploy.pack.decode_base import PackDecodeBase, PackDecodeError
 from alasio.deploy.pack.job import DeployJob
@@ -500,7 +500,7 @@ def test_eol_mismatch_source_fixed_without_download(self, app_folder, monkeypatc
 
         def _fail(self, *a, **k):
             raise AssertionError('no download expected for an EOL mismatch')
-        monkeypatch.setattr(SERVER, 'get_file_content', _fail)
+        monkeypatch.setattr(SERVER, 'get_file_contents', _fail)
         job = UpdateJob(UPDATE, server=SERVER)
         assert job.run()
         assert job.error == []
@@ -513,7 +513,7 @@ def test_unsolvable_stays_in_error(self, app_folder, monkeypatch):
         """A record that cannot be downloaded stays in error."""
         setup_app()
         os.remove(env.PROJECT_ROOT / 'docs/readme.md')
-        monkeypatch.setattr(SERVER, 'get_file_content', lambda *a, **k: b'bad data')
+        monkeypatch.setattr(SERVER, 'get_file_contents', serve_bad_data)
         job = UpdateJob(UPDATE, server=SERVER)
         with logger.mock_capture_writer() as capture:
             assert not job.run()
@@ -558,7 +558,7 @@ def test_remaining_download_failed_stays_in_error(self, app_folder, monkeypatch)
         target = env.PROJECT_ROOT / 'data/blob.png'
         with open(target, 'wb') as f:
             f.write(b'corrupt content')
-        monkeypatch.setattr(SERVER, 'get_file_content', lambda *a, **k: b'bad data')
+        monkeypatch.setattr(SERVER, 'get_file_contents', serve_bad_data)
         job = UpdateJob(UPDATE, server=SERVER)
         with logger.mock_capture_writer() as capture:
             assert not job.run()
@@ -648,13 +648,13 @@ def test_download_reuse_tmp(self, app_folder, monkeypatch):
         # download; only the missing readme.md is downloaded by the
         # remaining check (its data range is the same as the copy's,
         # the copy restores the data range of its source)
-        original = SERVER.get_file_content
+        original = SERVER.get_file_contents
         calls = []
 
-        def _serve(version, offset, size):
-            calls.append(offset)
-            return original(version, offset, size)
-        monkeypatch.setattr(SERVER, 'get_file_content', _serve)
+        def _serve(version, ranges, callback):
+            calls.extend(offset for offset, _ in ranges.values())
+            return original(version, ranges, callback)
+        monkeypatch.setattr(SERVER, 'get_file_contents', _serve)
         job = UpdateJob(UPDATE, server=SERVER)
         assert job.run()
         assert job.error == []
@@ -670,7 +670,7 @@ def test_download_no_error_is_noop(self, app_folder, monkeypatch):
 
         def _fail(self, *a, **k):
             raise AssertionError('no download expected for a healthy tree')
-        monkeypatch.setattr(SERVER, 'get_file_content', _fail)
+        monkeypatch.setattr(SERVER, 'get_file_contents', _fail)
         job = UpdateJob(UPDATE, server=SERVER)
         assert job.run()
         assert job.error == []
@@ -0,0 +1,98 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+from alasio.base.exception import ScriptError
+from alasio.device.config import DeviceConfig
+from alasio.device.replay import ReplayDevice, ReplayEnd, iter_frame_log, save_frame_log
+
+FOLDER = os.path.abspath('./temp/test_replay')
+
+
+def create_frames(count=5, start=1000000000.):
+    frames = []
+    for index in range(count):
+        image = np.zeros((72, 128, 3), dtype=np.uint8)
+        image[10:20, 10:20] = index * 40
+        frames.append({'time': start + index * 0.05, 'image': image})
+    return frames
+
+
+@pytest.fixture
+def frame_log():
+    file = os.path.join(FOLDER, 'frames.zst')
+    frames = create_frames()
+    save_frame_log(file, frames)
+    return file, frames
+
+
+def test_frame_log(frame_log):
+    file, frames = frame_log
+    loaded = list(iter_frame_log(file))
+    assert len(loaded) == len(frames)
+    for (imtime, image), frame in zip(loaded, frames):
+        assert imtime == frame['time']
+        assert image.dtype == np.uint8
+        assert np.array_equal(image, frame['image'])
+
+
+def test_frame_log_shape_change():
+    file = os.path.join(FOLDER, 'shape.zst')
+    frames = create_frames(2) + [{'time': 1., 'image': np.ones((10, 10), dtype=np.uint8)}]
+    save_frame_log(file, frames)
+    loaded = [image for _, image in iter_frame_log(file)]
+    assert loaded[2].shape == (10, 10)
+    assert np.array_equal(loaded[1], frames[1]['image'])
+
+
+def test_frame_log_broken(frame_log):
+    file, _ = frame_log
+    with open(file, 'rb') as f:
+        data = f.read()
+    broken = os.path.join(FOLDER, 'broken.zst')
+    with open(broken, 'wb') as f:
+        f.write(data[:-10])
+    with pytest.raises(ValueError):
+        list(iter_frame_log(broken))
+
+
+@pytest.mark.parametrize('preload', [True, False])
+def test_replay(frame_log, preload):
+    file, frames = frame_log
+    device = ReplayDevice(DeviceConfig(), file, preload=preload)
+    for frame in frames:
+        assert np.array_equal(device.screenshot(), frame['image'])
+        assert device.image is not None
+    assert device.frame_count == len(frames)
+    with pytest.raises(ReplayEnd):
+        device.screenshot()
+
+    device.reset()
+    assert np.array_equal(device.screenshot(), frames[0]['image'])
+
+
+def test_replay_loop(frame_log):
+    file, frames = frame_log
+    device = ReplayDevice(DeviceConfig(), file)
+    device.REPLAY_LOOP = True
+    for _ in range(len(frames)):
+        device.screenshot()
+    assert np.array_equal(device.screenshot(), frames[0]['image'])
+
+
+def test_replay_speed(frame_log):
+    file, frames = frame_log
+    device = ReplayDevice(DeviceConfig(), file)
+    device.REPLAY_SPEED = 1.
+    start = time.perf_counter()
+    for _ in range(len(frames)):
+        device.screenshot()
+    # frames are recorded 0.05s apart
+    assert time.perf_counter() - start >= 0.19
+
+
+def test_replay_no_file():
+    with pytest.raises(ScriptError):
+        ReplayDevice(DeviceConfig())
@@ -0,0 +1,307 @@
+import os
+import threading
+import time
+
+import pytest
+
+from alasio.ext.cache.policy import CachePolicy, FrequencySketch, LRUPolicy, SizedLRUPolicy, TinyLFUPolicy
+from alasio.ext.cache.resource import ResourceCache, ResourceCacheTTL
+from alasio.ext.concurrent.threadpool import THREAD_POOL
+
+
+class CountingCache(ResourceCache):
+    def __init__(self, policy=None):
+        super().__init__(policy)
+        self.loaded = []
+
+    def load_resource(self, file, **kwargs):
+        self.loaded.append(file)
+        return f'content of {file}'
+
+
+class CountingCacheTTL(ResourceCacheTTL):
+    def __init__(self, policy=None):
+        super().__init__(policy)
+        self.loaded = []
+
+    def load_resource(self, file, **kwargs):
+        self.loaded.append(file)
+        return f'content of {file}'
+
+
+class TestLRUPolicy:
+    def test_evict_least_recent(self):
+        cache = CountingCache(LRUPolicy(maxsize=3))
+        for file in ['a', 'b', 'c']:
+            cache.get(file)
+        # "a" becomes the most recent
+        assert cache.get('a') == 'content of a'
+        cache.get('d')
+        assert set(cache._cache) == {'a', 'c', 'd'}
+
+        stats = cache.stats()
+        assert (stats.hits, stats.misses, stats.evictions) == (1, 4, 1)
+        assert stats.size == 3
+        assert stats.hit_rate == 0.2
+
+        # evicted one is loaded again
+        cache.get('b')
+        assert cache.loaded == ['a', 'b', 'c', 'd', 'b']
+
+    def test_gc(self):
+        cache = CountingCache(LRUPolicy(maxsize=2))
+        cache.get('a')
+        cache.get('b')
+        cache.gc()
+        assert cache._cache == {}
+        assert cache._policy.weight == 0
+        cache.get('c')
+        cache.get('d')
+        assert set(cache._cache) == {'c', 'd'}
+
+    def test_ttl_gc(self):
+        cache = CountingCacheTTL(LRUPolicy(maxsize=2))
+        cache.get('a')
+        cache.get('b')
+        cache.get('c')
+        assert set(cache._cache) == {'b', 'c'}
+        assert set(cache._last_use) == {'b', 'c'}
+        cache.gc(idle=-1)
+        assert cache._cache == {}
+        assert cache._policy.weight == 0
+
+
+class TestSizedLRUPolicy:
+    def test_byte_budget(self):
+        cache = CountingCache(SizedLRUPolicy(maxsize=40, sizer=len))
+        # each value is 12 bytes
+        for file in ['a', 'b', 'c']:
+            cache.get(file)
+        assert cache.stats().weight == 36
+        cache.get('d')
+        assert set(cache._cache) == {'b', 'c', 'd'}
+        assert cache.stats().weight == 36
+
+    def test_too_large(self):
+        cache = CountingCache(SizedLRUPolicy(maxsize=20, sizer=len))
+        cache.get('a')
+        # returned but not cached, and existing entries are kept
+        assert cache.get('large' * 10) == 'content of ' + 'large' * 10
+        assert set(cache._cache) == {'a'}
+        stats = cache.stats()
+        assert (stats.evictions, stats.rejections) == (1, 1)
+
+
+class TestTinyLFUPolicy:
+    def test_sketch(self):
+        sketch = FrequencySketch(64)
+        for _ in range(5):
+            sketch.increment('hot')
+        sketch.increment('cold')
+        assert sketch.frequency('hot') >= 5
+        assert sketch.frequency('cold') >= 1
+        assert sketch.frequency('hot') > sketch.frequency('cold')
+        # saturates at 15 and halves on reset
+        for _ in range(20):
+            sketch.increment('hot')
+        assert sketch.frequency('hot') == 15
+        sketch.reset()
+        assert sketch.frequency('hot') == 7
+
+    def test_scan_resistant(self):
+        cache = CountingCache(TinyLFUPolicy(maxsize=100))
+        hot = [f'hot{i}' for i in range(50)]
+        for _ in range(10):
+            for file in hot:
+                cache.get(file)
+        # a one-time scan doesn't flush frequently used entries
+        for i in range(1000):
+            cache.get(f'scan{i}')
+            cache.get(hot[i % 50])
+        assert len(cache._cache) <= 100
+        assert all(file in cache._cache for file in hot)
+        stats = cache.stats()
+        assert stats.rejections > 0
+        assert stats.weight == len(cache._cache)
+
+    def test_lru_evicts_hot(self):
+        # compared with LRU, which is flushed by the same scan
+        cache = CountingCache(LRUPolicy(maxsize=100))
+        hot = [f'hot{i}' for i in range(50)]
+        for _ in range(10):
+            for file in hot:
+                cache.get(file)
+        for i in range(1000):
+            cache.get(f'scan{i}')
+            if i % 2:
+                cache.get(hot[i % 50])
+        assert not all(file in cache._cache for file in hot)
+
+    @pytest.mark.parametrize('maxsize', [1, 2, 3])
+    def test_small(self, maxsize):
+        cache = CountingCache(TinyLFUPolicy(maxsize=maxsize))
+        for i in range(20):
+            assert cache.get(f'file{i % 5}') == f'content of file{i % 5}'
+            assert len(cache._cache) <= maxsize
+
+
+def test_no_policy():
+    cache = CountingCache()
+    cache.get('a')
+    cache.get('a')
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.size) == (0, 0, 1)
+
+    cache = CountingCache(CachePolicy())
+    cache.get('a')
+    cache.get('a')
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions, stats.size) == (1, 1, 0, 1)
+
+
+@pytest.mark.parametrize('policy', [LRUPolicy, TinyLFUPolicy])
+def test_threaded(policy):
+    cache = CountingCache(policy(maxsize=20))
+    errors = []
+
+    def worker(seed):
+        try:
+            for i in range(2000):
+                file = f'file{(i * seed) % 40}'
+                assert cache.get(file) == f'content of {file}'
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in [1, 3, 7, 11]]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    stats = cache.stats()
+    assert stats.hits + stats.misses == 8000
+    assert len(cache._cache) <= 20
+    assert stats.weight == len(cache._cache)
+
+
+class SlowCache(ResourceCache):
+    def __init__(self, delay=0.05):
+        super().__init__()
+        self.delay = delay
+        self.loaded = []
+        self.error = None
+
+    def load_resource(self, file, **kwargs):
+        self.loaded.append(file)
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return f'content of {file}'
+
+
+class TestSingleFlight:
+    def test_thundering_herd(self):
+        cache = SlowCache()
+        barrier = threading.Barrier(8)
+
+        def get():
+            barrier.wait()
+            return cache.get('a')
+
+        with THREAD_POOL.gather_jobs() as pool:
+            for _ in range(8):
+                pool.start_thread_soon(get)
+        assert pool.results == ['content of a'] * 8
+        assert cache.loaded == ['a']
+        assert cache._flight == {}
+
+    def test_error_shared(self):
+        cache = SlowCache()
+        cache.error = ValueError('broken')
+        barrier = threading.Barrier(4)
+        errors = []
+
+        def get():
+            barrier.wait()
+            try:
+                cache.get('a')
+            except ValueError as e:
+                errors.append(e)
+
+        with THREAD_POOL.wait_jobs() as pool:
+            for _ in range(4):
+                pool.start_thread_soon(get)
+        assert len(errors) == 4
+        assert cache.loaded == ['a']
+        # no negative cache by default, load again
+        with pytest.raises(ValueError):
+            cache.get('a')
+        assert cache.loaded == ['a', 'a']
+
+    def test_error_ttl(self):
+        cache = SlowCache(delay=0)
+        cache.ERROR_TTL = 0.2
+        cache.error = ValueError('broken')
+        for _ in range(3):
+            with pytest.raises(ValueError):
+                cache.get('a')
+        assert cache.loaded == ['a']
+
+        # reload after TTL
+        time.sleep(0.25)
+        cache.error = None
+        assert cache.get('a') == 'content of a'
+        assert cache.loaded == ['a', 'a']
+
+
+    def test_base_exception_ends_flight(self):
+        cache = SlowCache(delay=0)
+        cache.ERROR_TTL = 10
+        cache.error = KeyboardInterrupt()
+        with pytest.raises(KeyboardInterrupt):
+            cache.get('a')
+        # flight ended, and KeyboardInterrupt is not cached as a load error
+        assert cache._flight == {}
+        assert cache._error == {}
+        cache.error = None
+        assert cache.get('a') == 'content of a'
+
+
+class FileCache(ResourceCacheTTL):
+    REFRESH_AHEAD = True
+    REFRESH_INTERVAL = 0
+
+    def load_resource(self, file, **kwargs):
+        with open(file, 'r', encoding='utf-8') as f:
+            return f.read()
+
+
+def test_refresh_ahead():
+    folder = os.path.abspath('./temp/test_resource')
+    os.makedirs(folder, exist_ok=True)
+    file = os.path.join(folder, 'refresh.txt')
+    with open(file, 'w', encoding='utf-8') as f:
+        f.write('old')
+    os.utime(file, (1000000000, 1000000000))
+
+    cache = FileCache()
+    assert cache.get(file) == 'old'
+    assert cache.get(file) == 'old'
+
+    with open(file, 'w', encoding='utf-8') as f:
+        f.write('new')
+    # the hit that notices the change returns the old value and reloads in background
+    assert cache.get(file) == 'old'
+    flight = cache._flight.get(file)
+    if flight is not None:
+        flight.result()
+    assert cache.get(file) == 'new'
+
+    # failed refresh keeps the old value
+    os.remove(file)
+    assert cache.get(file) == 'new'
+    flight = cache._flight.get(file)
+    if flight is not None:
+        with pytest.raises(FileNotFoundError):
+            flight.result()
+    assert cache.get(file) == 'new'
@@ -1,6 +1,6 @@
 import pytest
 
-from alasio.ext.compress.algo_lzma import _lzma_dictsize, lzma_compress, lzma_decompress
+from alasio.ext.compress.algo_lzma import _lzma_dictsize, lzma_compress, lzma_decompress, lzma_decompress_iter
 
 
 class TestLzmaDictsize:
@@ -190,3 +190,22 @@ def test_memoryview_slice(self):
         compressed = lzma_compress(view)
         assert lzma_decompress(memoryview(compressed)) == bytes(view)
         assert lzma_decompress(compressed) == b"Hello Alasio LZMA! " * 100
+
+
+class TestLzmaDecompressIter:
+    """Tests for lzma_decompress_iter function."""
+
+    @pytest.mark.parametrize("size", [1, 7, 4096, 1 << 30])
+    def test_roundtrip(self, size):
+        """Any input chunking gives the same content in bounded output chunks."""
+        data = bytes(range(256)) * 40 + b"A" * 100000
+        compressed = lzma_compress(data)
+        chunks = [compressed[i:i + size] for i in range(0, len(compressed), size)]
+        out = list(lzma_decompress_iter(chunks, chunk_size=4096))
+        assert b"".join(out) == data
+        assert max(len(chunk) for chunk in out) <= 4096
+
+    def test_truncated(self):
+        compressed = lzma_compress(b"Hello Alasio! " * 100)
+        with pytest.raises(EOFError):
+            b"".join(lzma_decompress_iter([compressed[:-5]]))
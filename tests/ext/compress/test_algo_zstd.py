@@ -1,7 +1,7 @@
 import pytest
 import zstandard as zstd
 
-from alasio.ext.compress.algo_zstd import zstd_compress, zstd_decompress
+from alasio.ext.compress.algo_zstd import zstd_compress, zstd_decompress, zstd_decompress_iter
 
 
 class TestZstdCompress:
@@ -310,3 +310,31 @@ def test_memoryview_slice(self):
         compressed = zstd_compress(view)
         assert zstd_decompress(memoryview(compressed)) == bytes(view)
         assert zstd_decompress(compressed) == b"Hello Alasio! " * 100
+
+
+def split_chunks(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class TestZstdDecompressIter:
+    """Tests for zstd_decompress_iter function."""
+
+    @pytest.mark.parametrize("size", [1, 3, 4096, 1 << 30])
+    @pytest.mark.parametrize("magicless", [True, False])
+    def test_roundtrip(self, size, magicless):
+        """Any input chunking gives the same content in bounded output chunks."""
+        data = bytes(range(256)) * 400 + b"A" * 200000
+        compressed = zstd_compress(data, level=3, magicless=magicless)
+        out = list(zstd_decompress_iter(split_chunks(compressed, size), chunk_size=4096))
+        assert b"".join(out) == data
+        assert max(len(chunk) for chunk in out) <= 4096
+
+    def test_with_source(self):
+        """Patch data decompresses with the old file as dictionary."""
+        old = b"Hello Alasio! " * 1000
+        new = old.replace(b"Alasio", b"World!", 3)
+        compressed = zstd_compress(new, source=old, level=3)
+        assert b"".join(zstd_decompress_iter([compressed], source=old)) == new
+
+    def test_empty(self):
+        assert b"".join(zstd_decompress_iter([zstd_compress(b"")])) == b""
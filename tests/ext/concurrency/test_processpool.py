@@ -230,3 +230,95 @@ def test_performance_overhead():
     overhead = (pool_duration - local_duration) / count * 1000  # ms per task
     print(f"\nProcessPool Overhead: {overhead:.3f} ms/task "
           f"(Pool: {pool_duration:.3f}s, Local: {local_duration:.3f}s, Count: {count})")
+
+
+# ===========================
+# Shared memory, initializer and map
+# ===========================
+
+def worker_describe(*args, **kwargs):
+    import numpy as np
+
+    def describe(value):
+        if isinstance(value, np.ndarray):
+            return 'ndarray', value.dtype.str, value.shape, int(value.sum())
+        if isinstance(value, memoryview):
+            return 'memoryview', value.format, value.shape, value.tobytes()
+        return type(value).__name__, value
+
+    return [describe(arg) for arg in args], {k: describe(v) for k, v in kwargs.items()}
+
+
+_WORKER_STATE = {}
+
+
+def worker_init(value):
+    _WORKER_STATE['value'] = value
+
+
+def worker_init_raise():
+    raise ValueError('init failed')
+
+
+def worker_state(x):
+    return _WORKER_STATE['value'] + x
+
+
+def test_shared_memory_args():
+    np = pytest.importorskip('numpy')
+    data = bytes(range(256)) * 1024
+    image = np.arange(1080 * 192 * 3, dtype=np.uint16).reshape(1080, 192, 3)
+    view = memoryview(np.arange(100000, dtype=np.int32)).cast('B').cast('i')
+    with ProcessPool(worker_describe, max_workers=1, shared_memory=True) as pool:
+        args, kwargs = pool.submit(data, b'small', image, view=view).get()
+        assert args[0] == ('bytes', data)
+        assert args[1] == ('bytes', b'small')
+        assert args[2] == ('ndarray', image.dtype.str, image.shape, int(image.sum()))
+        assert kwargs['view'] == ('memoryview', 'i', (100000,), view.tobytes())
+        arena = pool._idle_workers[0].arena
+        name = arena.shm.name
+
+        # memory is reused by the next job
+        args, _ = pool.submit(image[::2, ::2]).get()
+        assert args[0] == ('ndarray', image.dtype.str, (540, 96, 3), int(image[::2, ::2].sum()))
+        assert arena.shm.name == name
+
+        # and grows if not enough
+        large = np.ones((1080, 1920, 3), dtype=np.uint8)
+        args, _ = pool.submit(large).get()
+        assert args[0] == ('ndarray', '|u1', (1080, 1920, 3), 1080 * 1920 * 3)
+        assert arena.shm.name != name
+        assert arena.shm.size >= large.nbytes
+
+    assert arena.shm is None
+
+
+def test_shared_memory_disabled():
+    data = b'1' * 100000
+    with ProcessPool(worker_echo, max_workers=1) as pool:
+        assert pool.submit(data).get() == data
+        assert pool._idle_workers[0].arena is None
+
+
+def test_initializer():
+    with ProcessPool(worker_state, max_workers=2, initializer=worker_init, initargs=(10,)) as pool:
+        assert [job.get() for job in [pool.submit(i) for i in range(4)]] == [10, 11, 12, 13]
+
+
+def test_initializer_error():
+    with ProcessPool(worker_state, max_workers=1, initializer=worker_init_raise) as pool:
+        for _ in range(2):
+            with pytest.raises(ValueError, match='init failed'):
+                pool.submit(1).get()
+        # worker is kept
+        assert len(pool._workers) == 1
+
+
+def test_map():
+    with ProcessPool(worker_add, max_workers=2) as pool:
+        assert list(pool.map(range(10), range(10, 20))) == [a + b for a, b in zip(range(10), range(10, 20))]
+        assert list(pool.map([], [])) == []
+
+    with ProcessPool(worker_raise, max_workers=2) as pool:
+        with pytest.raises(ValueError, match='bad'):
+            list(pool.map(['bad']))
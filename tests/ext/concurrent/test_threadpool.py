@@ -5,6 +5,7 @@
 import pytest
 
 from alasio.ext.concurrent.cmd import CmdlineError, CmdlineResultStr
+from alasio.ext.concurrent.prioritythreadpool import PriorityThreadPool
 from alasio.ext.concurrent.threadpool import (
     THREAD_POOL,
     Error,
@@ -562,14 +563,14 @@ def submit_third():
             j.get()
 
     def test_pool_full_with_multiple_waiting(self):
-        """Multiple callers can queue when the pool is full."""
-        pool = ThreadPool(pool_size=2)
+        """Multiple callers can queue when the pool and its queue are full."""
+        pool = ThreadPool(pool_size=2, queue_size=1)
         blockers = [threading.Event() for _ in range(2)]
         long_jobs = [pool.start_thread_soon(_wait_on, e) for e in blockers]
         time.sleep(0.05)
 
         # Submit 3 extra jobs from a background thread so the main thread
-        # isn't blocked (the pool is full, so start_thread_soon will block).
+        # isn't blocked (the queue is full, so start_thread_soon will block).
         extra = []
         submitted = threading.Event()
 
@@ -631,25 +632,158 @@ def test_worker_catches_job_while_exiting(self):
             pool.IDLE_TIMEOUT = original_timeout
 
 
-class TestThreadPoolReleaseFullLock:
-    """Tests for the release_full_lock race-condition handling."""
+class TestThreadPoolQueue:
+    """Tests for the job queue and its metrics."""
+
+    def test_fifo_order(self):
+        """Queued jobs run in submission order on a single worker."""
+        pool = ThreadPool(pool_size=1)
+        blocker = threading.Event()
+        order = []
+        first = pool.start_thread_soon(_wait_on, blocker)
+        time.sleep(0.02)
+        jobs = [pool.start_thread_soon(order.append, i) for i in range(10)]
+        # all jobs are queued without blocking the submitter
+        assert pool.stats().queue_depth == 10
+        blocker.set()
+        first.get()
+        for job in jobs:
+            job.get()
+        assert order == list(range(10))
+
+    def test_stats(self):
+        """stats() reports queue depth, wait time and blocked submissions."""
+        pool = ThreadPool(pool_size=1, queue_size=2)
+        blocker = threading.Event()
+        first = pool.start_thread_soon(_wait_on, blocker)
+        time.sleep(0.02)
+        pool.start_thread_soon(lambda: 1)
+        pool.start_thread_soon(lambda: 2)
+        # third one blocks until the blocker finishes
+        threading.Timer(0.05, blocker.set).start()
+        last = pool.start_thread_soon(lambda: 3)
+        assert last.get() == 3
+        first.get()
+
+        stats = pool.stats()
+        assert stats.submitted == 4
+        assert stats.queue_depth == 0
+        assert stats.max_queue_depth == 2
+        assert stats.blocked == 1
+        assert stats.workers == 1
+        assert stats.wait_max >= 0.03
+        assert stats.wait_avg > 0
+
+    def test_no_polling_delay(self):
+        """A saturated pool hands the next job to the finished worker without delay."""
+        pool = ThreadPool(pool_size=1)
+        pool.start_thread_soon(lambda: 1).get()
+        with pool.wait_jobs() as waiter:
+            for _ in range(50):
+                waiter.start_thread_soon(time.sleep, 0.001)
+        # 10ms polling would add far more than this
+        assert pool.stats().wait_max < 0.5
+
+    def test_kill_replaces_worker(self):
+        """Killing a busy worker lets queued jobs run on a new worker."""
+        pool = ThreadPool(pool_size=1)
+        job = pool.start_thread_soon(_busy_loop)
+        queued = [pool.start_thread_soon(lambda v=i: v) for i in range(3)]
+        time.sleep(0.05)
+        with pytest.raises(JobTimeout):
+            job.get_or_kill(timeout=0.05)
+        assert [j.get() for j in queued] == [0, 1, 2]
+
+    def test_kill_queued_job(self):
+        """A job that times out while waiting in queue is removed and never runs."""
+        pool = ThreadPool(pool_size=1)
+        blocker = threading.Event()
+        first = pool.start_thread_soon(_wait_on, blocker)
+        time.sleep(0.02)
+        ran = []
+        queued = pool.start_thread_soon(ran.append, 1)
+        after = pool.start_thread_soon(ran.append, 2)
+        with pytest.raises(JobTimeout):
+            queued.get_or_kill(timeout=0.05)
+        assert pool.stats().queue_depth == 1
+        with pytest.raises(JobKill):
+            queued.get()
 
-    def test_release_full_lock_double_release(self):
-        """release_full_lock handles the RuntimeError from double-release gracefully.
+        blocker.set()
+        first.get()
+        after.get()
+        assert ran == [2]
 
-        Both ``notify_worker`` and ``notify_pool`` start in the *locked* state
-        after ``ThreadPool.__init__``.  To exercise the RuntimeError catch we
-        unlock both first so that ``release_full_lock`` can acquire
-        ``notify_worker`` but then fails to release ``notify_pool`` because it
-        is already unlocked.
-        """
+
+class TestImap:
+    """Tests for imap and imap_unordered."""
+
+    def test_imap_ordered(self):
+        """imap yields results in input order."""
         pool = ThreadPool(pool_size=4)
-        # Unlock both so we can trigger the race-condition path
-        pool.notify_worker.release()
-        pool.notify_pool.release()
-        # notify_worker is unlocked → acquire(blocking=False) succeeds
-        # notify_pool is unlocked → release() raises RuntimeError → caught
-        pool.release_full_lock()  # should not raise
+
+        def slow_first(x):
+            if x == 0:
+                time.sleep(0.05)
+            return x * 2
+
+        assert list(pool.imap(slow_first, range(100), chunksize=5)) == [x * 2 for x in range(100)]
+
+    def test_imap_unordered(self):
+        """imap_unordered yields all results."""
+        pool = ThreadPool(pool_size=4)
+        assert sorted(pool.imap_unordered(lambda x: x * 2, range(1000))) == [x * 2 for x in range(1000)]
+
+    def test_imap_empty(self):
+        pool = ThreadPool(pool_size=4)
+        assert list(pool.imap(abs, [])) == []
+        assert list(pool.imap_unordered(abs, [])) == []
+
+    def test_adaptive_chunksize(self):
+        """Fast items are grouped into larger chunks."""
+        pool = ThreadPool(pool_size=4)
+        it = pool.imap(abs, range(20000))
+        assert it.chunksize == 1
+        assert sum(it) == sum(range(20000))
+        assert it.chunksize > 1
+        assert it.submitted < 20000
+
+    def test_window_bounds_inflight(self):
+        """No more than `window` chunks are submitted ahead of the consumer."""
+        pool = ThreadPool(pool_size=2)
+        pulled = []
+
+        def source():
+            for i in range(100):
+                pulled.append(i)
+                yield i
+
+        it = pool.imap(abs, source(), chunksize=1, window=3)
+        time.sleep(0.05)
+        assert len(pulled) == 3
+        assert next(it) == 0
+        assert len(pulled) <= 4
+        assert list(it) == list(range(1, 100))
+
+    def test_imap_error(self):
+        """The first error is raised when reached, and iteration stops."""
+        pool = ThreadPool(pool_size=4)
+
+        def fail(x):
+            if x == 5:
+                raise ValueError('fail at 5')
+            return x
+
+        it = pool.imap(fail, range(100), chunksize=1)
+        assert [next(it) for _ in range(5)] == [0, 1, 2, 3, 4]
+        with pytest.raises(ValueError, match='fail at 5'):
+            next(it)
+        assert list(it) == []
+
+    def test_priority_imap(self):
+        pool = PriorityThreadPool(pool_size=2)
+        assert list(pool.imap(lambda x: x + 1, range(50), priority=1)) == list(range(1, 51))
+        assert sorted(pool.imap_unordered(lambda x: x + 1, range(50), priority=1)) == list(range(1, 51))
 
 
 # ===================================================================
@@ -0,0 +1,129 @@
+"""
+Tests for the structural-sharing diff engine in ``alasio.ext.deep``:
+
+- ``deep_diff``/``deep_patch``, same output as ``deep_iter_diff``/``deep_iter_patch`` with tuple paths
+- ``deep_patch_ops``/``deep_apply_patch``, compact ops that survive msgpack round trip
+- ``PathIntern``, the same path is the same tuple object
+"""
+import copy
+
+import msgspec
+import pytest
+
+from alasio.ext.deep import (
+    OP_ADD, OP_DEL, OP_SET, PathIntern, deep_apply_patch, deep_diff, deep_iter_diff, deep_iter_patch, deep_patch,
+    deep_patch_ops
+)
+
+BEFORE = {
+    'a': 1,
+    'b': {'c': 2, 'd': {'e': 3}, 'g': [1, 2]},
+    'n': None,
+    'x': {'y': 1},
+}
+AFTER = {
+    'a': 1,
+    'b': {'c': 3, 'd': {'e': 3}, 'g': [1, 2, 3], 'h': {'i': 4}},
+    'x': 2,
+    'z': None,
+}
+
+
+class TestDeepDiff:
+    def test_same_as_deep_iter_diff(self):
+        expected = sorted((tuple(path), v1, v2) for path, v1, v2 in deep_iter_diff(BEFORE, AFTER))
+        assert sorted(deep_diff(BEFORE, AFTER), key=lambda x: x[0]) == sorted(expected, key=lambda x: x[0])
+
+    def test_same_as_deep_iter_patch(self):
+        expected = [(op, tuple(path), value) for op, path, value in deep_iter_patch(BEFORE, AFTER)]
+        assert sorted(deep_patch(BEFORE, AFTER), key=lambda x: x[1]) == sorted(expected, key=lambda x: x[1])
+
+    def test_identical(self):
+        assert list(deep_diff(BEFORE, copy.deepcopy(BEFORE))) == []
+        assert list(deep_patch(BEFORE, BEFORE)) == []
+
+    def test_non_dict(self):
+        assert list(deep_diff({'a': 1}, 2)) == [((), {'a': 1}, 2)]
+        assert list(deep_patch(1, {'a': 2})) == [(OP_SET, (), {'a': 2})]
+
+    def test_none_value(self):
+        assert list(deep_patch({'a': None}, {})) == [(OP_DEL, ('a',), None)]
+        assert list(deep_patch({}, {'a': None})) == [(OP_ADD, ('a',), None)]
+        assert list(deep_patch({'a': None}, {'a': 0})) == [(OP_SET, ('a',), 0)]
+
+    def test_structural_sharing(self):
+        # unchanged subtrees are shared, they are skipped by identity
+        class Unequal:
+            def __eq__(self, other):
+                raise AssertionError('shared subtree should not be compared')
+
+            __hash__ = object.__hash__
+
+        shared = {'k': Unequal()}
+        before = {'shared': shared, 'v': {'w': 1}}
+        after = {'shared': shared, 'v': {'w': 2}}
+        assert list(deep_patch(before, after)) == [(OP_SET, ('v', 'w'), 2)]
+
+    def test_interned_path(self):
+        before = {'a': {'b': 1}}
+        path1 = list(deep_diff(before, {'a': {'b': 2}}))[0][0]
+        path2 = list(deep_diff(before, {'a': {'b': 3}}))[0][0]
+        assert path1 == ('a', 'b')
+        assert path1 is path2
+
+    def test_circular(self):
+        d1 = {'x': 1}
+        d1['a'] = d1
+        d2 = {'x': 2}
+        d2['a'] = d2
+        assert list(deep_patch(d1, d2)) == [(OP_SET, ('x',), 2)]
+
+    def test_deep_equal(self):
+        # Very deep nested equal dicts must not raise RecursionError
+        d1 = cur1 = {}
+        d2 = cur2 = {}
+        for _ in range(1100):
+            cur1['k'] = {}
+            cur1 = cur1['k']
+            cur2['k'] = {}
+            cur2 = cur2['k']
+        cur1['v'] = 1
+        cur2['v'] = 1
+        assert list(deep_diff(d1, d2)) == []
+
+
+class TestPathIntern:
+    def test_intern(self):
+        intern = PathIntern()
+        path = intern.intern(['a', 'b'])
+        assert path == ('a', 'b')
+        assert intern.intern(('a', 'b')) is path
+        assert intern.intern([]) == ()
+
+    def test_limit(self):
+        intern = PathIntern(limit=2)
+        path = intern.intern(['a', 'b', 'c'])
+        # tree is dropped after exceeding limit, paths are still valid
+        assert intern.intern(['a', 'b', 'c']) == path
+        assert intern.size <= 3
+
+
+class TestDeepApplyPatch:
+    def test_apply(self):
+        before = copy.deepcopy(BEFORE)
+        ops = deep_patch_ops(before, AFTER)
+        assert deep_apply_patch(before, ops) == AFTER
+
+    def test_compact_ops(self):
+        ops = deep_patch_ops({'a': 1, 'b': 2}, {'a': 3, 'c': 4})
+        assert sorted(ops) == [(OP_ADD, ('c',), 4), (OP_DEL, ('b',)), (OP_SET, ('a',), 3)]
+
+    @pytest.mark.parametrize('codec', [msgspec.msgpack, msgspec.json])
+    def test_roundtrip(self, codec):
+        ops = codec.decode(codec.encode(deep_patch_ops(BEFORE, AFTER)))
+        assert deep_apply_patch(copy.deepcopy(BEFORE), ops) == AFTER
+
+    def test_root(self):
+        assert deep_apply_patch({'a': 1}, deep_patch_ops({'a': 1}, 2)) == 2
+        assert deep_apply_patch({'a': 1}, [(OP_DEL, ())]) == {}
+        assert deep_apply_patch(None, [(OP_SET, ('a', 'b'), 1)]) == {'a': {'b': 1}}
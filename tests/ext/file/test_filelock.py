@@ -475,3 +475,133 @@ def test_del_releases_lock(self, lock_dir):
         lock2 = SQLiteFileLock(lock_file, timeout=0)
         lock2.acquire()
         lock2.release()
+
+
+def test_blocking_file_acquire_waits(lock_dir):
+    """Blocking acquire must wait for the file lock, SQLite busy timeout overflows on large values"""
+    lock_file = lock_dir / "a.lock"
+    holder = SQLiteFileLock(lock_file, timeout=0)
+    handle = holder._file_acquire(0, 0.05)
+    results = []
+
+    def wait_file_lock():
+        # bypass the process-wide lock, like another process does
+        contender = SQLiteFileLock(lock_file)
+        contender._file_release(contender._file_acquire(-1, 0.05))
+        results.append("acquired")
+
+    thread = threading.Thread(target=wait_file_lock)
+    thread.start()
+    time.sleep(0.2)
+    assert results == []
+    holder._file_release(handle)
+    thread.join(timeout=10)
+    assert results == ["acquired"]
+
+
+class CountingLock(SQLiteFileLock):
+    file_acquired = 0
+
+    def _file_acquire(self, timeout, poll_interval):
+        CountingLock.file_acquired += 1
+        return super()._file_acquire(timeout, poll_interval)
+
+
+class TestProcessRegistry:
+    """Test cases for the process-wide fast path"""
+
+    def test_handoff_between_threads(self, lock_dir):
+        """Threads waiting in the same process inherit the file lock without reopening it"""
+        from alasio.ext.file import filelock
+        lock_file = lock_dir / "a.lock"
+        CountingLock.file_acquired = 0
+        holder = CountingLock(lock_file)
+        holder.acquire()
+        counter = []
+        started = threading.Barrier(5)
+
+        def work():
+            started.wait()
+            for _ in range(10):
+                with CountingLock(lock_file):
+                    counter.append(1)
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        started.wait()
+        # let the threads queue up on the process-wide lock
+        time.sleep(0.1)
+        holder.release()
+        for thread in threads:
+            thread.join(timeout=10)
+        assert len(counter) == 40
+        # file lock is acquired by the first holder, then handed over
+        assert CountingLock.file_acquired < 40
+        # released when nobody holds or waits
+        assert filelock._REGISTRY == {}
+        other = SQLiteFileLock(lock_file, timeout=0)
+        other.acquire()
+        other.release()
+
+    def test_registry_cleared_on_timeout(self, lock_dir):
+        """A waiter that times out must not leave state behind"""
+        from alasio.ext.file import filelock
+        lock_file = lock_dir / "a.lock"
+        holder = SQLiteFileLock(lock_file, timeout=0)
+        holder.acquire()
+        with pytest.raises(FilelockTimeout):
+            SQLiteFileLock(lock_file, timeout=0).acquire()
+        holder.release()
+        assert filelock._REGISTRY == {}
+
+
+@pytest.mark.skipif(os.name == 'nt', reason='fcntl.flock() is not available on Windows')
+class TestFlockFileLock:
+    """Test cases for the fcntl.flock() backend"""
+
+    def test_exclusion_between_threads(self, lock_dir):
+        from alasio.ext.file.filelock import FlockFileLock
+        lock_file = lock_dir / "flock" / "a.lock"
+        holder = FlockFileLock(lock_file, timeout=0)
+        holder.acquire()
+        assert holder.is_locked
+        results = []
+
+        def try_acquire():
+            try:
+                FlockFileLock(lock_file, timeout=0.2).acquire()
+            except FilelockTimeout:
+                results.append("timeout")
+
+        thread = threading.Thread(target=try_acquire)
+        thread.start()
+        thread.join(timeout=10)
+        holder.release()
+        assert results == ["timeout"]
+        with FlockFileLock(lock_file, timeout=0) as lock:
+            assert lock.is_locked
+
+    def test_exclusion_between_processes(self, lock_dir):
+        from alasio.ext.file.filelock import FlockFileLock
+        lock_file = lock_dir / "b.lock"
+        code = (
+            "import sys\n"
+            "from alasio.ext.file.filelock import FlockFileLock, FilelockTimeout\n"
+            "try:\n"
+            "    with FlockFileLock(sys.argv[1], timeout=0.2):\n"
+            "        print('ACQUIRED')\n"
+            "except FilelockTimeout:\n"
+            "    print('TIMEOUT')\n"
+        )
+        with FlockFileLock(lock_file, timeout=0):
+            result = subprocess.run(
+                [sys.executable, "-c", code, str(lock_file)],
+                capture_output=True, text=True, timeout=10, check=False,
+            )
+        assert "TIMEOUT" in result.stdout
+        result = subprocess.run(
+            [sys.executable, "-c", code, str(lock_file)],
+            capture_output=True, text=True, timeout=10, check=False,
+        )
+        assert "ACQUIRED" in result.stdout
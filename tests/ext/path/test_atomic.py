@@ -0,0 +1,135 @@
+import os
+import shutil
+import threading
+
+import pytest
+
+from alasio.ext.env import ALASIO_ROOT
+from alasio.ext.path import atomic
+from alasio.ext.path.atomic import AtomicWriteBatch, is_tmp_file, sync_files
+
+
+@pytest.fixture
+def temp_dir():
+    """
+    Create a temporary test folder under ALASIO_ROOT,
+    removed after each test
+
+    Yields:
+        str: Absolute path of the temporary test folder
+    """
+    folder = ALASIO_ROOT.joinpath('test_atomic_tmp')
+    shutil.rmtree(folder, ignore_errors=True)
+    os.mkdir(folder)
+    yield str(folder)
+    shutil.rmtree(folder, ignore_errors=True)
+
+
+def read(file):
+    with open(file, 'rb') as f:
+        return f.read()
+
+
+def list_tmp(folder):
+    return [name for _, _, files in os.walk(folder) for name in files if is_tmp_file(name)]
+
+
+class TestAtomicWriteBatch:
+    def test_write(self, temp_dir):
+        old = os.path.join(temp_dir, 'old.txt')
+        with open(old, 'wb') as f:
+            f.write(b'old')
+        with AtomicWriteBatch() as batch:
+            for i in range(20):
+                batch.write(os.path.join(temp_dir, f'sub/{i}.txt'), f'content {i}')
+            batch.write(old, b'new')
+            batch.write_stream(os.path.join(temp_dir, 'stream.bin'), [b'a', b'b'])
+            # empty stream creates nothing
+            batch.write_stream(os.path.join(temp_dir, 'empty.bin'), [])
+            # targets are untouched until exit
+            assert read(old) == b'old'
+            assert not os.path.exists(os.path.join(temp_dir, 'sub/0.txt'))
+
+        assert read(old) == b'new'
+        assert read(os.path.join(temp_dir, 'sub/19.txt')) == b'content 19'
+        assert read(os.path.join(temp_dir, 'stream.bin')) == b'ab'
+        assert not os.path.exists(os.path.join(temp_dir, 'empty.bin'))
+        assert list_tmp(temp_dir) == []
+
+    def test_write_twice(self, temp_dir):
+        file = os.path.join(temp_dir, 'a.txt')
+        with AtomicWriteBatch() as batch:
+            batch.write(file, b'1')
+            batch.write(file, b'2')
+        assert read(file) == b'2'
+        assert list_tmp(temp_dir) == []
+
+    def test_abort(self, temp_dir):
+        old = os.path.join(temp_dir, 'old.txt')
+        with open(old, 'wb') as f:
+            f.write(b'old')
+        with pytest.raises(ValueError):
+            with AtomicWriteBatch() as batch:
+                batch.write(old, b'new')
+                batch.write(os.path.join(temp_dir, 'a.txt'), b'a')
+                raise ValueError
+        assert read(old) == b'old'
+        assert os.listdir(temp_dir) == ['old.txt']
+
+    def test_order(self, temp_dir, monkeypatch):
+        replaced = []
+        replace_tmp = atomic.replace_tmp
+
+        def record(tmp, file):
+            replaced.append(os.path.basename(file))
+            replace_tmp(tmp, file)
+
+        monkeypatch.setattr(atomic, 'replace_tmp', record)
+        with AtomicWriteBatch() as batch:
+            batch.write(os.path.join(temp_dir, 'manifest'), b'', order=1)
+            batch.write(os.path.join(temp_dir, 'b'), b'')
+            batch.write(os.path.join(temp_dir, 'a'), b'')
+        assert replaced == ['b', 'a', 'manifest']
+
+    def test_replace_failed(self, temp_dir, monkeypatch):
+        replace_tmp = atomic.replace_tmp
+
+        def fail_on_b(tmp, file):
+            if file.endswith('b'):
+                raise PermissionError(file)
+            replace_tmp(tmp, file)
+
+        monkeypatch.setattr(atomic, 'replace_tmp', fail_on_b)
+        with pytest.raises(PermissionError):
+            with AtomicWriteBatch() as batch:
+                for name in ['a', 'b', 'c']:
+                    batch.write(os.path.join(temp_dir, name), name)
+        # like atomic_write() one by one, files before the failure are written
+        assert read(os.path.join(temp_dir, 'a')) == b'a'
+        assert not os.path.exists(os.path.join(temp_dir, 'c'))
+        # tmp of "b" is left by the patched replace_tmp, tmp of "c" is removed
+        assert len(list_tmp(temp_dir)) == 1
+
+    def test_threaded(self, temp_dir):
+        with AtomicWriteBatch() as batch:
+            threads = [
+                threading.Thread(target=batch.write, args=(os.path.join(temp_dir, f'{i}.txt'), str(i)))
+                for i in range(16)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        assert sorted(os.listdir(temp_dir)) == sorted(f'{i}.txt' for i in range(16))
+
+
+@pytest.mark.parametrize('syncfs', [True, False])
+def test_sync_files(temp_dir, syncfs):
+    files = []
+    for i in range(3):
+        file = os.path.join(temp_dir, f'{i}.txt')
+        atomic.file_write(file, b'1', fsync=False)
+        files.append(file)
+    sync_files(files, syncfs=syncfs)
+    with pytest.raises(FileNotFoundError):
+        sync_files([os.path.join(temp_dir, 'missing/a.txt')], syncfs=syncfs)
@@ -0,0 +1,102 @@
+import os
+
+import psutil
+import pytest
+
+from alasio.ext.perf import PerformanceTest, median_mad, set_cpu_affinity
+
+
+def result(name, median, mad=0., params='()'):
+    return {'name': name, 'params': params, 'iterations': 100, 'avg_time': median, 'median': median, 'mad': mad}
+
+
+def test_median_mad():
+    median, mad = median_mad([1., 2., 3., 4., 100.])
+    assert median == 3.
+    # the outlier doesn't affect MAD
+    assert mad == 1.
+
+
+def test_warmup_and_samples():
+    calls = []
+
+    def func():
+        calls.append(1)
+
+    perf = PerformanceTest()
+    perf.verify = False
+    perf.min_duration = 0.
+    perf.min_iterations = 20
+    perf.warmup = 7
+    perf.repeat = 5
+    perf.register(func)
+    results = perf.run_performance_test({0: 23})
+    # iterations are rounded down to fill samples evenly
+    assert results[0]['iterations'] == 20
+    assert len(results[0]['samples']) == 5
+    assert len(calls) == 27
+
+    calls.clear()
+    perf.run_all_tests()
+    assert perf.results[0]['name'] == 'func'
+    assert perf.results[0]['median'] > 0
+
+
+@pytest.mark.skipif(not hasattr(psutil.Process, 'cpu_affinity'), reason='cpu_affinity() not supported')
+def test_cpu_affinity():
+    original = psutil.Process().cpu_affinity()
+    cpu = original[0]
+    seen = []
+
+    perf = PerformanceTest()
+    perf.verify = False
+    perf.min_iterations = 1
+    perf.min_duration = 0.
+    perf.cpus = cpu
+    perf.register(lambda: seen.append(psutil.Process().cpu_affinity()))
+    perf.run_all_tests()
+    assert seen[-1] == [cpu]
+    # restored after test
+    assert psutil.Process().cpu_affinity() == original
+
+    previous = set_cpu_affinity([cpu])
+    assert previous == original
+    set_cpu_affinity(previous)
+
+
+def test_compare():
+    perf = PerformanceTest()
+    baseline = [
+        result('stable', 1e-3),
+        result('noisy', 1e-3, mad=1e-4),
+        result('faster', 1e-3),
+        result('removed', 1e-3),
+    ]
+    current = [
+        result('stable', 1.2e-3),
+        # 20% slower but within noise
+        result('noisy', 1.2e-3, mad=1e-4),
+        result('faster', 0.5e-3),
+        result('added', 1e-3),
+    ]
+    regressions = perf.compare(baseline, current, threshold=0.1)
+    assert [r['key'] for r in regressions] == ['stable()']
+    assert regressions[0]['ratio'] == 1.2
+
+    # small difference is not a regression
+    assert perf.compare(baseline, [result('stable', 1.05e-3)], threshold=0.1) == []
+
+
+def test_export_json():
+    folder = os.path.abspath('./temp/test_perf')
+    file = os.path.join(folder, 'baseline.json')
+
+    perf = PerformanceTest()
+    perf.results = [result('func', 1e-3, params='(1)'), result('func', 2e-3, params='(2)')]
+    perf.export_json(file)
+    assert PerformanceTest.load_json(file) == perf.results
+    assert perf.compare(file) == []
+
+    slower = [result('func', 1e-3, params='(1)'), result('func', 3e-3, params='(2)')]
+    regressions = perf.compare(file, slower)
+    assert [r['key'] for r in regressions] == ['func(2)']
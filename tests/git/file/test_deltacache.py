@@ -0,0 +1,116 @@
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from alasio.git.file.deltacache import DeltaBaseCache
+from alasio.git.obj.obj import GitObject
+from alasio.git.repo import GitRepo
+
+pytestmark = pytest.mark.skipif(shutil.which('git') is None, reason='git is not installed')
+
+
+def run_git(path, *args):
+    subprocess.run(
+        ['git', '-c', 'user.name=test', '-c', 'user.email=test@test', *args],
+        cwd=path, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+def create_delta_repo(path, commits=30):
+    """
+    Create a repo whose files change a little in each commit, then repack into long delta chains
+    """
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    os.makedirs(path)
+    run_git(path, 'init', '-q')
+    lines = [f'line {i} {"x" * 40}\n' for i in range(300)]
+    for n in range(commits):
+        lines[(n * 7) % len(lines)] = f'changed {n}\n'
+        os.makedirs(os.path.join(path, 'sub'), exist_ok=True)
+        for name in ['a.txt', 'sub/b.txt']:
+            with open(os.path.join(path, name), 'w', encoding='utf-8', newline='') as f:
+                f.write(f'{name}\n' + ''.join(lines))
+        run_git(path, 'add', '-A')
+        run_git(path, 'commit', '-q', '-m', f'commit {n}')
+    run_git(path, 'repack', '-adf', '-q', '--depth=50', '--window=50')
+    return path
+
+
+@pytest.fixture(scope='module')
+def repo_path():
+    return create_delta_repo(os.path.abspath('./temp/test_deltacache'))
+
+
+def cat_sha1(repo, sha1):
+    obj = repo.cat(sha1)
+    # decode to get raw data
+    _ = obj.decoded
+    return obj.sha1().hex()
+
+
+def test_cache_lru():
+    def obj(size):
+        return GitObject(type=3, size=size, data=memoryview(b'x' * size))
+
+    cache = DeltaBaseCache(limit=100)
+    cache.set('a', obj(40))
+    cache.set('b', obj(40))
+    assert cache.get('a') is not None
+    # "b" is the least recently used
+    cache.set('c', obj(40))
+    assert 'b' not in cache
+    assert 'a' in cache and 'c' in cache
+    assert cache.size == 80
+    assert cache.evicted == 1
+    # too large
+    cache.set('d', obj(101))
+    assert 'd' not in cache
+    assert cache.get('b') is None
+    assert cache.hit == 1
+    assert cache.miss == 1
+
+
+@pytest.mark.parametrize('limit, chain_min_size', [(100663296, 1048576), (40000, 1048576), (0, 0), (100663296, 0)])
+def test_cat_delta_chain(repo_path, limit, chain_min_size):
+    repo = GitRepo(repo_path)
+    repo.delta_base_cache_limit = limit
+    repo.delta_chain_min_size = chain_min_size
+    repo.read_lazy()
+    # all objects resolve to their sha1
+    sha1_list = [sha1 for pack in repo.dict_pack.values() for sha1 in pack.dict_offset]
+    assert any(repo.cat_shallow(sha1).type in [6, 7] for sha1 in sha1_list)
+    for sha1 in sha1_list:
+        assert cat_sha1(repo, sha1) == sha1
+
+    cache = repo.delta_base_cache
+    if limit == 0:
+        assert cache is None
+        return
+    assert cache.size <= limit
+    # second round
+    for sha1 in sha1_list:
+        assert cat_sha1(repo, sha1) == sha1
+    if limit > 1000000:
+        assert cache.hit > 0
+        # delta objects in dict_object are not resolved in place
+        assert any(obj.type in [6, 7] for obj in repo.dict_object.values())
+    else:
+        assert cache.evicted > 0
+
+
+@pytest.mark.parametrize('idx_mmap', [False, True])
+def test_object_pack_offset(repo_path, idx_mmap):
+    repo = GitRepo(repo_path)
+    repo.idx_mmap = idx_mmap
+    repo.read_lazy()
+    for pack in repo.dict_pack.values():
+        for sha1, (offset, _) in pack.dict_offset.items():
+            assert repo.object_pack_offset(sha1) == (pack, offset)
+            # ofs_delta objects are solved by looking up .idx
+            assert cat_sha1(repo, sha1) == sha1
+    assert repo.object_pack_offset('0' * 40) is None
+    for pack in repo.dict_pack.values():
+        pack.clear_idx()
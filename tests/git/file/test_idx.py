@@ -0,0 +1,111 @@
+import hashlib
+import os
+import struct
+import zlib
+
+import pytest
+
+from alasio.git.file.exception import PackBroken
+from alasio.git.file.pack import PackFile
+from alasio.git.obj.obj import parse_objdata
+from alasio.git.stage.genidx import GenIdx
+
+
+def encode_pack_object(objtype, data):
+    size = len(data)
+    byte = (objtype << 4) | (size & 0x0f)
+    size >>= 4
+    header = bytearray()
+    while size:
+        header.append(byte | 0x80)
+        byte = size & 0x7f
+        size >>= 7
+    header.append(byte)
+    return bytes(header) + zlib.compress(data)
+
+
+def create_pack(folder, count):
+    """
+    Create a pack of blobs and its idx
+
+    Returns:
+        str: Path to .pack file
+    """
+    body = [encode_pack_object(3, f'blob {i}\n'.encode() * (i % 7 + 1)) for i in range(count)]
+    data = b''.join([b'PACK', struct.pack('>II', 2, count), *body])
+    data += hashlib.sha1(data).digest()
+    idx = GenIdx('').pack_to_idx(data)
+
+    os.makedirs(folder, exist_ok=True)
+    file = os.path.join(folder, f'pack-{count}.pack')
+    with open(file, 'wb') as f:
+        f.write(data)
+    with open(file[:-5] + '.idx', 'wb') as f:
+        f.write(idx)
+    return file
+
+
+@pytest.fixture(scope='module')
+def pack_file():
+    return create_pack(os.path.abspath('./temp/test_idx'), 1000)
+
+
+def test_idx_mmap_same_as_dict(pack_file):
+    pack_dict = PackFile(pack_file)
+    assert pack_dict.idx_read() == 1000
+    pack_mmap = PackFile(pack_file)
+    pack_mmap.idx_mmap = True
+    assert pack_mmap.idx_read() == 1000
+
+    assert pack_mmap.pack_sha1 == pack_dict.pack_sha1
+    assert pack_mmap.idx_sha1 == pack_dict.idx_sha1
+    assert pack_mmap.pack_end == pack_dict.pack_end
+    assert len(pack_mmap.dict_offset) == len(pack_dict.dict_offset)
+    # iterate in the same offset order
+    assert list(pack_mmap.dict_offset.items()) == list(pack_dict.dict_offset.items())
+    for sha1, offset in pack_dict.dict_offset.items():
+        assert pack_mmap.dict_offset[sha1] == offset
+        assert pack_mmap.dict_offset_to_sha1[offset[0]] == sha1
+        assert sha1 in pack_mmap.dict_offset
+
+    # missing
+    with pytest.raises(KeyError):
+        _ = pack_mmap.dict_offset['0' * 40]
+    with pytest.raises(KeyError):
+        _ = pack_mmap.dict_offset['not a sha1']
+    with pytest.raises(KeyError):
+        _ = pack_mmap.dict_offset_to_sha1[1]
+    assert pack_mmap.dict_offset.get('f' * 40) is None
+    pack_mmap.clear_idx()
+
+
+def test_idx_mmap_read_objects(pack_file):
+    pack_dict = PackFile(pack_file)
+    pack_dict.read_full()
+    pack_mmap = PackFile(pack_file)
+    pack_mmap.idx_mmap = True
+    pack_mmap.read_lazy(skip_size=100)
+
+    for sha1 in pack_dict.dict_object_data:
+        obj = pack_mmap.addread(sha1)
+        expect = parse_objdata(pack_dict.dict_object_data[sha1])
+        assert obj.decoded == expect.decoded
+    pack_mmap.clear_idx()
+
+
+def test_idx_mmap_broken(pack_file):
+    broken = pack_file[:-5] + '-broken.pack'
+    with open(pack_file, 'rb') as f:
+        data = f.read()
+    with open(broken, 'wb') as f:
+        f.write(data)
+    with open(pack_file[:-5] + '.idx', 'rb') as f:
+        idx = bytearray(f.read())
+    idx[2000] ^= 0xff
+    with open(broken[:-5] + '.idx', 'wb') as f:
+        f.write(idx)
+
+    pack = PackFile(broken)
+    pack.idx_mmap = True
+    with pytest.raises(PackBroken):
+        pack.idx_read()
@@ -0,0 +1,139 @@
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from alasio.ext.path.atomic import atomic_read_bytes, atomic_write
+from alasio.git.file.objtype import gen_objtype_table
+from alasio.git.repo import GitRepo
+from alasio.git.stage.genidx import GenIdx, PackObjectInfo, StreamIdx
+from tests.git.file.test_deltacache import create_delta_repo, run_git
+
+pytestmark = pytest.mark.skipif(shutil.which('git') is None, reason='git is not installed')
+
+DICT_TYPE = {'commit': 1, 'tree': 2, 'blob': 3, 'tag': 4}
+
+
+@pytest.fixture(scope='module')
+def repo_path():
+    return create_delta_repo(os.path.abspath('./temp/test_objtype'), commits=10)
+
+
+def git_objects(path):
+    """
+    Returns:
+        dict[str, tuple[int, int]]: key: sha1, value: (objtype, size)
+    """
+    stdout = subprocess.run(
+        ['git', 'cat-file', '--batch-check', '--batch-all-objects'],
+        cwd=path, check=True, stdout=subprocess.PIPE,
+    ).stdout.decode()
+    out = {}
+    for line in stdout.splitlines():
+        sha1, objtype, size = line.split()
+        out[sha1] = (DICT_TYPE[objtype], int(size))
+    return out
+
+
+def iter_pack(path):
+    folder = os.path.join(path, '.git/objects/pack')
+    for name in os.listdir(folder):
+        if name.endswith('.pack'):
+            yield os.path.join(folder, name)
+
+
+def remove_objtype(path):
+    for pack in iter_pack(path):
+        try:
+            os.remove(pack[:-5] + '.objtype')
+        except FileNotFoundError:
+            pass
+
+
+def write_objtype(path):
+    for pack in iter_pack(path):
+        data = atomic_read_bytes(pack)
+        genidx = GenIdx(path)
+        genidx.pack_to_idx(data)
+        atomic_write(pack[:-5] + '.objtype', genidx.pack_to_objtype())
+
+
+@pytest.mark.parametrize('idx_mmap', [False, True])
+def test_dict_objtype(repo_path, idx_mmap):
+    expected = git_objects(repo_path)
+    remove_objtype(repo_path)
+    repo = GitRepo(repo_path)
+    repo.idx_mmap = idx_mmap
+    repo.read_lazy()
+    assert repo.dict_objtype == {k: v[0] for k, v in expected.items()}
+    for pack in repo.dict_pack.values():
+        assert pack.objtype_read() is None
+
+    write_objtype(repo_path)
+    repo = GitRepo(repo_path)
+    repo.idx_mmap = idx_mmap
+    repo.read_lazy()
+    for pack in repo.dict_pack.values():
+        assert pack.objtype_read() is not None
+    assert repo.dict_objtype == {k: v[0] for k, v in expected.items()}
+    for sha1, info in expected.items():
+        assert repo.objtype_info(sha1) == info
+    repo._manager_clear_sub()
+    for pack in repo.dict_pack.values():
+        pack.clear_idx()
+
+
+def test_stream_idx_objtype(repo_path):
+    for pack in iter_pack(repo_path):
+        data = atomic_read_bytes(pack)
+        genidx = GenIdx(repo_path)
+        genidx.pack_to_idx(data)
+        indexer = StreamIdx(repo_path)
+        indexer.feed(data)
+        indexer.finish()
+        assert indexer.pack_to_objtype() == genidx.pack_to_objtype()
+
+
+def test_objtype_outdated(repo_path):
+    # table of another pack is ignored
+    for pack in iter_pack(repo_path):
+        info = [PackObjectInfo(sha=b'0' * 20, offset=12, crc=0, type=3, size=1)]
+        atomic_write(pack[:-5] + '.objtype', gen_objtype_table(info, b'\x00' * 20))
+    repo = GitRepo(repo_path)
+    repo.read_lazy()
+    for pack in repo.dict_pack.values():
+        assert pack.objtype_read() is None
+    assert len(repo.dict_objtype) == len(git_objects(repo_path))
+
+    # broken table is ignored
+    write_objtype(repo_path)
+    for pack in iter_pack(repo_path):
+        file = pack[:-5] + '.objtype'
+        data = bytearray(atomic_read_bytes(file))
+        data[-30] ^= 1
+        atomic_write(file, bytes(data))
+    repo = GitRepo(repo_path)
+    repo.read_lazy()
+    for pack in repo.dict_pack.values():
+        assert pack.objtype_read() is None
+    remove_objtype(repo_path)
+
+
+def test_dict_objtype_loose(repo_path):
+    # loose objects are read on threads while pack objects are parsed
+    path = os.path.abspath('./temp/test_objtype_loose')
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    shutil.copytree(repo_path, path)
+    for n in range(60):
+        with open(os.path.join(path, f'loose{n}.txt'), 'w', encoding='utf-8') as f:
+            f.write(f'loose {n}\n')
+    run_git(path, 'add', '-A')
+    run_git(path, 'commit', '-q', '-m', 'loose')
+
+    repo = GitRepo(path)
+    repo.read_lazy()
+    assert len(repo.loose.dict_object_unread) > 50
+    expected = git_objects(path)
+    assert repo.dict_objtype == {k: v[0] for k, v in expected.items()}
@@ -0,0 +1,114 @@
+import random
+
+import pytest
+
+from alasio.git.file.exception import ObjectBroken
+from alasio.git.obj.objdelta import (
+    RefDeltaObj, apply_delta, apply_delta_chain, apply_delta_ops, compile_delta, compose_delta_ops,
+    parse_delta_object
+)
+
+
+def randbytes(rng, n):
+    return rng.getrandbits(n * 8).to_bytes(n, 'little')
+
+
+def encode_varint(value):
+    out = bytearray()
+    while True:
+        byte = value & 0x7f
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def encode_copy(offset, size):
+    header = 0x80
+    out = bytearray()
+    for i in range(4):
+        byte = (offset >> (i * 8)) & 0xff
+        if byte:
+            header |= 1 << i
+            out.append(byte)
+    if size != 0x10000:
+        for i in range(3):
+            byte = (size >> (i * 8)) & 0xff
+            if byte:
+                header |= 1 << (i + 4)
+                out.append(byte)
+    return bytes([header]) + bytes(out)
+
+
+def generate_delta(rng, source):
+    """
+    Generate a random delta from source, encoded in git delta format then parsed
+
+    Returns:
+        RefDeltaObj:
+    """
+    ops = []
+    result_size = 0
+    for _ in range(rng.randint(1, 50)):
+        if source and rng.random() < 0.7:
+            size = rng.choice([1, rng.randint(1, 300), 0x10000])
+            size = min(size, len(source))
+            offset = rng.randint(0, len(source) - size)
+            ops.append(encode_copy(offset, size))
+        else:
+            size = rng.randint(1, 127)
+            ops.append(bytes([size]) + randbytes(rng, size))
+        result_size += size
+    data = encode_varint(len(source)) + encode_varint(result_size) + b''.join(ops)
+    source_size, result_size, all_instructions = parse_delta_object(memoryview(data))
+    return RefDeltaObj(ref='', source_size=source_size, result_size=result_size,
+                       all_instructions=all_instructions)
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_apply_delta_ops_identical(seed):
+    rng = random.Random(seed)
+    source = randbytes(rng, rng.choice([0, 10, 1000, 100000]))
+    delta = generate_delta(rng, source)
+    expect = apply_delta(memoryview(source), delta)
+    assert apply_delta_ops(memoryview(source), compile_delta(delta)) == expect
+    assert apply_delta_chain(memoryview(source), [delta]) == expect
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_apply_delta_chain_identical(seed):
+    rng = random.Random(seed)
+    source = randbytes(rng, rng.choice([10, 1000, 100000]))
+    data = source
+    deltas = []
+    for _ in range(rng.randint(2, 10)):
+        delta = generate_delta(rng, data)
+        data = apply_delta(memoryview(data), delta)
+        deltas.append(delta)
+    assert apply_delta_chain(memoryview(source), deltas) == data
+
+    ops = compose_delta_ops(compile_delta(deltas[0]), compile_delta(deltas[1]))
+    assert ops.source_size == len(source)
+    assert apply_delta_ops(source, ops) == apply_delta(memoryview(apply_delta(memoryview(source), deltas[0])), deltas[1])
+
+
+def test_apply_delta_broken():
+    rng = random.Random(1)
+    source = randbytes(rng, 100)
+    delta = generate_delta(rng, source)
+    # wrong source size
+    with pytest.raises(ObjectBroken):
+        apply_delta_ops(source[:50], compile_delta(delta))
+    # copy out of source
+    delta = RefDeltaObj(ref='', source_size=100, result_size=20, all_instructions=[(90, 20, None)])
+    with pytest.raises(ObjectBroken):
+        apply_delta(memoryview(source), delta)
+    with pytest.raises(ObjectBroken):
+        compile_delta(delta)
+    # chain does not match
+    first = RefDeltaObj(ref='', source_size=100, result_size=10, all_instructions=[(0, 10, None)])
+    second = RefDeltaObj(ref='', source_size=20, result_size=10, all_instructions=[(0, 10, None)])
+    with pytest.raises(ObjectBroken):
+        apply_delta_chain(memoryview(source), [first, second])
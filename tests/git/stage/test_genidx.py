@@ -0,0 +1,225 @@
+import os
+import random
+import shutil
+import socket
+import struct
+import subprocess
+import time
+
+import pytest
+
+from alasio.git.fetch.argument import Arguments
+from alasio.git.fetch.pkt import FetchPayload
+from alasio.git.fetch.transport_git import GitTransport
+from alasio.git.file.exception import PackBroken
+from alasio.git.stage.genidx import GenIdx, PackObjectInfo, StreamIdx
+
+pytestmark = pytest.mark.skipif(shutil.which('git') is None, reason='git is not installed')
+
+
+def run_git(path, *args, stdin=None):
+    return subprocess.run(
+        ['git', '-c', 'user.name=test', '-c', 'user.email=test@test', *args],
+        cwd=path, check=True, input=stdin, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+    ).stdout
+
+
+def create_repo(path, commits=20):
+    """
+    Create a repo whose files change a little in each commit, so pack has both base objects and deltas
+    """
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    os.makedirs(os.path.join(path, 'sub'))
+    run_git(path, 'init', '-q')
+    rng = random.Random(1)
+    lines = [f'line {i} {"x" * 40}\n' for i in range(300)]
+    # incompressible binary to have objects larger than a chunk
+    binary = bytes(rng.getrandbits(8) for _ in range(200000))
+    for n in range(commits):
+        lines[(n * 7) % len(lines)] = f'changed {n}\n'
+        for name in ['a.txt', 'sub/b.txt']:
+            with open(os.path.join(path, name), 'w', encoding='utf-8', newline='') as f:
+                f.write(f'{name}\n' + ''.join(lines))
+        with open(os.path.join(path, 'sub/c.bin'), 'wb') as f:
+            f.write(binary[n:] + binary[:n])
+        run_git(path, 'add', '-A')
+        run_git(path, 'commit', '-q', '-m', f'commit {n}')
+    return path
+
+
+@pytest.fixture(scope='module')
+def repo_path():
+    return create_repo(os.path.abspath('./temp/test_genidx'))
+
+
+def create_pack(repo_path, *args):
+    """
+    Returns:
+        tuple[bytes, bytes]: pack data, idx generated by git
+    """
+    revs = run_git(repo_path, 'rev-list', '--objects', '--all')
+    output = os.path.join(repo_path, '.git/test-pack')
+    sha = run_git(repo_path, 'pack-objects', '-q', '--depth=50', *args, output, stdin=revs).decode().strip()
+    with open(f'{output}-{sha}.pack', 'rb') as f:
+        data = f.read()
+    with open(f'{output}-{sha}.idx', 'rb') as f:
+        idx = f.read()
+    return data, idx
+
+
+@pytest.fixture(scope='module')
+def pack(repo_path):
+    # OFS_DELTA, like packs from fetch
+    return create_pack(repo_path, '--delta-base-offset')
+
+
+def feed_chunks(indexer, data, rng, max_size):
+    index = 0
+    while index < len(data):
+        size = rng.randint(1, max_size)
+        indexer.feed(data[index:index + size])
+        index += size
+
+
+@pytest.mark.parametrize('max_size', [1, 37, 4096, 262144, 0])
+def test_stream_idx(repo_path, pack, max_size):
+    data, idx = pack
+    if max_size == 0:
+        # whole pack in one chunk
+        indexer = StreamIdx(repo_path)
+        indexer.feed(data)
+    elif max_size == 1:
+        # byte by byte on the first 50KB only, the rest in large chunks
+        indexer = StreamIdx(repo_path)
+        for i in range(50000):
+            indexer.feed(data[i:i + 1])
+        indexer.feed(data[50000:])
+    else:
+        indexer = StreamIdx(repo_path)
+        feed_chunks(indexer, data, random.Random(max_size), max_size)
+    assert indexer.finish() == idx
+    assert not indexer._set_pending_offset
+    assert GenIdx(repo_path).pack_to_idx(data) == idx
+
+
+def test_stream_idx_ref_delta(repo_path):
+    # REF_DELTA whose source is in the same pack
+    data, idx = create_pack(repo_path)
+    indexer = StreamIdx(repo_path)
+    feed_chunks(indexer, data, random.Random(1), 4096)
+    assert indexer.finish() == idx
+
+
+class ParallelGenIdx(GenIdx):
+    idx_process = 2
+    idx_process_min_size = 0
+
+
+@pytest.mark.parametrize('depth', [1, 10, 50])
+def test_pack_to_idx_parallel(repo_path, depth):
+    # depth=1 gives wide delta trees, depth=50 gives deep chains
+    data, idx = create_pack(repo_path, '--delta-base-offset', f'--depth={depth}')
+    assert GenIdx(repo_path).pack_to_idx(data) == idx
+    assert ParallelGenIdx(repo_path).pack_to_idx(data) == idx
+
+
+def test_idx_large_offset():
+    list_info = [
+        PackObjectInfo(sha=bytes([1] * 20), offset=12, crc=0),
+        PackObjectInfo(sha=bytes([2] * 20), offset=2147483648 + 10, crc=0),
+        PackObjectInfo(sha=bytes([3] * 20), offset=100, crc=0),
+        PackObjectInfo(sha=bytes([4] * 20), offset=4294967296 * 3, crc=0),
+    ]
+    idx = b''.join(GenIdx._iter_idx_data(list_info, bytes(20)))
+    start = 8 + 1024 + 24 * len(list_info)
+    table = struct.unpack('>4I', idx[start:start + 16])
+    table_large = struct.unpack('>2Q', idx[start + 16:start + 32])
+    assert table[0] == 12
+    assert table[2] == 100
+    # MSB set, and the rest is index into large offset table
+    assert table_large[table[1] - 2147483648] == 2147483648 + 10
+    assert table_large[table[3] - 2147483648] == 4294967296 * 3
+
+
+def test_stream_idx_broken(repo_path, pack):
+    data, _ = pack
+    # incomplete
+    indexer = StreamIdx(repo_path)
+    indexer.feed(data[:-30])
+    with pytest.raises(PackBroken):
+        indexer.finish()
+    # checksum not match
+    indexer = StreamIdx(repo_path)
+    indexer.feed(data[:-1])
+    indexer.feed(bytes([data[-1] ^ 1]))
+    with pytest.raises(PackBroken):
+        indexer.finish()
+    # header
+    indexer = StreamIdx(repo_path)
+    with pytest.raises(PackBroken):
+        indexer.feed(b'PACK\x00\x00\x00\x03' + data[8:100])
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(scope='module')
+def git_daemon(repo_path):
+    """
+    Serve repo by a local `git daemon`, as a stand-in of remote git server
+    """
+    base = os.path.abspath('./temp/test_genidx_daemon')
+    if os.path.exists(base):
+        shutil.rmtree(base)
+    os.makedirs(base)
+    subprocess.run(['git', 'clone', '-q', '--bare', repo_path, os.path.join(base, 'repo.git')], check=True)
+    port = free_port()
+    process = subprocess.Popen(
+        ['git', 'daemon', '--export-all', '--reuseaddr', f'--base-path={base}',
+         '--listen=127.0.0.1', f'--port={port}', base],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        for _ in range(100):
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=0.1).close()
+                break
+            except OSError:
+                time.sleep(0.05)
+        else:
+            pytest.skip('git daemon failed to start')
+        yield f'git://127.0.0.1:{port}/repo.git'
+    finally:
+        process.kill()
+        process.wait()
+
+
+@pytest.mark.trio
+async def test_fetch_with_index(repo_path, git_daemon):
+    output = os.path.abspath('./temp/test_genidx_fetch')
+    if os.path.exists(output):
+        shutil.rmtree(output)
+    os.makedirs(output)
+    head = run_git(repo_path, 'rev-parse', 'HEAD').decode().strip()
+
+    transport = GitTransport(Arguments(repo_path=output, repo_url=git_daemon))
+    payload = FetchPayload()
+    payload.add_line(f'want {head} {transport.capabilities.as_string()}')
+    payload.add_delimiter()
+    payload.add_done()
+    pack_file = os.path.join(output, 'fetch.pack')
+    idx_file = os.path.join(output, 'fetch.idx')
+    await transport.fetch_pack_v1(payload, output_file=pack_file, index_file=idx_file)
+
+    with open(pack_file, 'rb') as f:
+        data = f.read()
+    with open(idx_file, 'rb') as f:
+        idx = f.read()
+    assert idx == GenIdx(output).pack_to_idx(data)
+    # git accepts the idx
+    result = subprocess.run(['git', 'verify-pack', pack_file], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    assert result.returncode == 0
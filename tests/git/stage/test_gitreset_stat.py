@@ -0,0 +1,140 @@
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from alasio.git.repo import GitRepo
+from alasio.git.stage import gitreset
+
+pytestmark = pytest.mark.skipif(shutil.which('git') is None, reason='git is not installed')
+
+
+def run_git(path, *args):
+    return subprocess.run(
+        ['git', '-c', 'user.name=test', '-c', 'user.email=test@test', *args],
+        cwd=path, check=True, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+    ).stdout.decode()
+
+
+def create_repo(path, count=20):
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    os.makedirs(os.path.join(path, 'sub'))
+    run_git(path, 'init', '-q')
+    for i in range(count):
+        with open(os.path.join(path, f'sub/file{i}.txt'), 'w', encoding='utf-8', newline='') as f:
+            f.write(f'content {i}\n')
+    run_git(path, 'add', '-A')
+    run_git(path, 'commit', '-q', '-m', 'init')
+    return path
+
+
+class StatRepo(GitRepo):
+    reset_stat_cache = True
+
+
+@pytest.fixture
+def hash_counter(monkeypatch):
+    hashed = []
+
+    def git_file_hash(file):
+        hashed.append(file)
+        return origin(file)
+
+    origin = gitreset.git_file_hash
+    monkeypatch.setattr(gitreset, 'git_file_hash', git_file_hash)
+    return hashed
+
+
+def set_mtime_old(path):
+    """
+    Make files older than index, so they are not racy
+    """
+    for root, _, files in os.walk(path):
+        if '.git' in root:
+            continue
+        for file in files:
+            file = os.path.join(root, file)
+            st = os.stat(file)
+            os.utime(file, ns=(st.st_atime_ns - 10 ** 10, st.st_mtime_ns - 10 ** 10))
+
+
+def test_reset_stat_cache(hash_counter):
+    path = create_repo(os.path.abspath('./temp/test_gitreset_stat'))
+    head = run_git(path, 'rev-parse', 'HEAD').strip()
+    set_mtime_old(path)
+
+    # first reset, index from git CLI has outdated stat after utime, all files are hashed
+    repo = StatRepo(path)
+    repo.git_reset_hard(head)
+    assert len(hash_counter) == 20
+    # git accepts the index
+    assert run_git(path, 'status', '--porcelain') == ''
+
+    # second reset, nothing hashed
+    hash_counter.clear()
+    repo = StatRepo(path)
+    repo.git_reset_hard(head)
+    assert hash_counter == []
+
+    # modified file is detected by stat and restored
+    file = os.path.join(path, 'sub/file3.txt')
+    with open(file, 'w', encoding='utf-8', newline='') as f:
+        f.write('modified\n')
+    # deleted file is written
+    os.remove(os.path.join(path, 'sub/file4.txt'))
+    repo = StatRepo(path)
+    repo.git_reset_hard(head)
+    assert [os.path.basename(f) for f in hash_counter] == ['file3.txt']
+    with open(file, 'r', encoding='utf-8') as f:
+        assert f.read() == 'content 3\n'
+    with open(os.path.join(path, 'sub/file4.txt'), 'r', encoding='utf-8') as f:
+        assert f.read() == 'content 4\n'
+    assert run_git(path, 'status', '--porcelain') == ''
+    repo.index_read()
+    assert len(repo.dict_entry) == 20
+
+
+def test_reset_stat_cache_racy(hash_counter):
+    path = create_repo(os.path.abspath('./temp/test_gitreset_stat_racy'))
+    head = run_git(path, 'rev-parse', 'HEAD').strip()
+    repo = StatRepo(path)
+    repo.git_reset_hard(head)
+
+    # modify file with same size, then restore the stat recorded in index
+    # and make index no older than file, stat can't tell the difference
+    file = os.path.join(path, 'sub/file5.txt')
+    st = os.stat(file)
+    with open(file, 'w', encoding='utf-8', newline='') as f:
+        f.write('changed 5\n')
+    os.utime(file, ns=(st.st_atime_ns, st.st_mtime_ns))
+    index = os.path.join(path, '.git/index')
+    os.utime(index, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+    hash_counter.clear()
+    repo = StatRepo(path)
+    repo.git_reset_hard(head)
+    # racy entries are hashed, so the modification is caught
+    assert os.path.join(path, 'sub/file5.txt').replace('\\', '/') in [f.replace('\\', '/') for f in hash_counter]
+    with open(file, 'r', encoding='utf-8') as f:
+        assert f.read() == 'content 5\n'
+
+
+def test_index_entry_stat_match():
+    path = os.path.abspath('./temp/test_gitreset_stat_match.txt')
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(b'content\n')
+    st = os.stat(path)
+    file = gitreset.FileEntry(path='a.txt', sha1='0' * 40, mode=b'100644')
+    entry = gitreset.index_entry_from_stat(file, st)
+    mtime_ns = st.st_mtime_ns
+
+    assert gitreset.index_entry_stat_match(entry, st, mtime_ns + 1)
+    # racy, index written at the same time as file
+    assert not gitreset.index_entry_stat_match(entry, st, mtime_ns)
+    assert not gitreset.index_entry_stat_match(entry, st, mtime_ns - 1)
+    # stat changed
+    entry.size += 1
+    assert not gitreset.index_entry_stat_match(entry, st, mtime_ns + 1)